@@ -0,0 +1,167 @@
+#
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+#
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+from urllib.parse import urlparse
+
+import requests
+
+
+OSS_REGISTRY_URL = os.environ.get("CONNECTOR_OPS_OSS_REGISTRY_URL", "https://connectors.airbyte.com/files/registries/v0/oss_registry.json")
+CLOUD_REGISTRY_URL = os.environ.get(
+    "CONNECTOR_OPS_CLOUD_REGISTRY_URL", "https://connectors.airbyte.com/files/registries/v0/cloud_registry.json"
+)
+DEFAULT_REGISTRY_CACHE_DIRECTORY = Path(
+    os.environ.get(
+        "CONNECTOR_OPS_REGISTRY_CACHE_DIRECTORY", Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "connector_ops"
+    )
+)
+# A cached registry younger than this is used without asking the server if it changed
+DEFAULT_REGISTRY_CACHE_TTL_SECONDS = int(os.environ.get("CONNECTOR_OPS_REGISTRY_CACHE_TTL_SECONDS", 300))
+REGISTRY_REQUEST_TIMEOUT_SECONDS = 60
+CONNECTOR_TYPES = ["source", "destination"]
+
+
+class RegistryUnavailableError(Exception):
+    pass
+
+
+class ConnectorRegistry:
+    """Lazily loaded connector registry, indexed by docker repository and definition id.
+
+    The registry is only fetched when it is first accessed. Remote registries are cached on disk:
+    a cached registry younger than the TTL is used as is, an older one is revalidated with its ETag,
+    and a stale cache is used when the registry can't be fetched.
+    The registry URL can be the path, or file:// URL, of a local JSON file standing in for the remote registry.
+    """
+
+    def __init__(
+        self,
+        registry_url: str,
+        cache_directory: Optional[Path] = DEFAULT_REGISTRY_CACHE_DIRECTORY,
+        cache_ttl_seconds: int = DEFAULT_REGISTRY_CACHE_TTL_SECONDS,
+    ):
+        self.registry_url = registry_url
+        self.cache_directory = cache_directory
+        self.cache_ttl_seconds = cache_ttl_seconds
+
+    @property
+    def local_registry_path(self) -> Optional[Path]:
+        parsed_url = urlparse(self.registry_url)
+        if parsed_url.scheme == "file":
+            return Path(parsed_url.path)
+        if parsed_url.scheme in ("http", "https"):
+            return None
+        return Path(self.registry_url)
+
+    @property
+    def _cache_file_path(self) -> Optional[Path]:
+        if self.cache_directory is None:
+            return None
+        return self.cache_directory / f"registry_{hashlib.sha256(self.registry_url.encode()).hexdigest()[:16]}.json"
+
+    @functools.cached_property
+    def registry(self) -> dict:
+        """The registry content, loaded on first access."""
+        local_registry_path = self.local_registry_path
+        if local_registry_path is not None:
+            return json.loads(local_registry_path.read_text())
+        return self._load_remote_registry()
+
+    def _read_cache(self) -> Optional[dict]:
+        cache_file_path = self._cache_file_path
+        if cache_file_path is None:
+            return None
+        try:
+            cache = json.loads(cache_file_path.read_text())
+        except (OSError, ValueError):
+            return None
+        return cache if isinstance(cache, dict) and {"fetched_at", "registry"} <= cache.keys() else None
+
+    def _write_cache(self, cache: dict) -> None:
+        cache_file_path = self._cache_file_path
+        if cache_file_path is None:
+            return
+        try:
+            cache_file_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so that concurrent processes never read a partially written cache
+            temporary_file = tempfile.NamedTemporaryFile("w", dir=cache_file_path.parent, delete=False)
+            try:
+                with temporary_file:
+                    json.dump(cache, temporary_file)
+                os.replace(temporary_file.name, cache_file_path)
+            except BaseException:
+                # Do not leave the partially written temporary file behind
+                Path(temporary_file.name).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            logging.warning(f"Could not write the registry cache to {cache_file_path}: {e}")
+
+    def _load_remote_registry(self) -> dict:
+        cache = self._read_cache()
+        if cache is not None and time.time() - cache["fetched_at"] < self.cache_ttl_seconds:
+            return cache["registry"]
+
+        headers = {"If-None-Match": cache["etag"]} if cache is not None and cache.get("etag") else {}
+        try:
+            response = requests.get(self.registry_url, headers=headers, timeout=REGISTRY_REQUEST_TIMEOUT_SECONDS)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if cache is None:
+                raise RegistryUnavailableError(f"Could not fetch the registry from {self.registry_url}: {e}") from e
+            logging.warning(f"Could not fetch the registry from {self.registry_url}, using the cached registry: {e}")
+            return cache["registry"]
+
+        if response.status_code == 304 and cache is not None:
+            cache["fetched_at"] = time.time()
+        else:
+            cache = {"etag": response.headers.get("ETag"), "fetched_at": time.time(), "registry": response.json()}
+        self._write_cache(cache)
+        return cache["registry"]
+
+    @functools.cached_property
+    def entries_by_docker_repository(self) -> Dict[str, dict]:
+        return {
+            entry["dockerRepository"]: entry
+            for connector_type in CONNECTOR_TYPES
+            for entry in self.registry.get(f"{connector_type}s", [])
+            if "dockerRepository" in entry
+        }
+
+    @functools.cached_property
+    def entries_by_definition_id(self) -> Dict[str, dict]:
+        return {
+            entry[f"{connector_type}DefinitionId"]: entry
+            for connector_type in CONNECTOR_TYPES
+            for entry in self.registry.get(f"{connector_type}s", [])
+            if f"{connector_type}DefinitionId" in entry
+        }
+
+    def get_entry_by_docker_repository(self, docker_repository: str) -> Optional[dict]:
+        return self.entries_by_docker_repository.get(docker_repository)
+
+    def get_entry_by_definition_id(self, definition_id: str) -> Optional[dict]:
+        return self.entries_by_definition_id.get(definition_id)
+
+
+@functools.lru_cache(maxsize=None)
+def get_registry(registry_url: Union[str, Path]) -> ConnectorRegistry:
+    """Get the registry client of a registry URL, shared by all the callers of the process."""
+    return ConnectorRegistry(str(registry_url))
+
+
+def get_oss_registry() -> ConnectorRegistry:
+    return get_registry(OSS_REGISTRY_URL)
+
+
+def get_cloud_registry() -> ConnectorRegistry:
+    return get_registry(CLOUD_REGISTRY_URL)
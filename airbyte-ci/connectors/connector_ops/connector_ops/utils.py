@@ -2,32 +2,35 @@
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 #
 
+import copy
 import functools
 import json
 import logging
 import os
 import re
+import stat
+import time
 from dataclasses import dataclass
 from enum import Enum
-from glob import glob
 from pathlib import Path
-from typing import List, Optional, Set, Tuple, Union
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import git
 import requests
 import yaml
 from ci_credentials import SecretsManager
-from pydash.collections import find
 from pydash.objects import get
 from rich.console import Console
 from simpleeval import simple_eval
 
+from connector_ops.registry import CLOUD_REGISTRY_URL, OSS_REGISTRY_URL, get_cloud_registry, get_oss_registry
+
 
 console = Console()
 
 DIFFED_BRANCH = os.environ.get("DIFFED_BRANCH", "origin/master")
-OSS_CATALOG_URL = "https://connectors.airbyte.com/files/registries/v0/oss_registry.json"
-CLOUD_CATALOG_URL = "https://connectors.airbyte.com/files/registries/v0/cloud_registry.json"
+OSS_CATALOG_URL = OSS_REGISTRY_URL
+CLOUD_CATALOG_URL = CLOUD_REGISTRY_URL
 BASE_AIRBYTE_DOCS_URL = "https://docs.airbyte.com"
 CONNECTOR_PATH_PREFIX = "airbyte-integrations/connectors"
 SOURCE_CONNECTOR_PATH_PREFIX = CONNECTOR_PATH_PREFIX + "/source-"
@@ -59,7 +62,13 @@ def download_catalog(catalog_url):
     return response.json()
 
 
-OSS_CATALOG = download_catalog(OSS_CATALOG_URL)
+def __getattr__(name: str):
+    # The OSS registry used to be downloaded when importing this module, it is now only loaded on first access
+    if name == "OSS_CATALOG":
+        return get_oss_registry().registry
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 MANIFEST_FILE_NAME = "manifest.yaml"
 COMPONENTS_FILE_NAME = "components.py"
 DOCKERFILE_FILE_NAME = "Dockerfile"
@@ -76,6 +85,15 @@ ALLOWED_HOST_THRESHOLD = {
     "ql": 300,
 }
 
+# The C loader is an order of magnitude faster than the pure Python one when libyaml is available
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+# Files modified less than this long before they were parsed are not cached:
+# they could be modified again within the resolution of the file system timestamps without changing their mtime.
+RACY_MTIME_WINDOW_NS = 2 * 10**9
+
+# Absolute metadata file path -> ((mtime, size, inode) of the parsed file, parsed metadata data section)
+_METADATA_CACHE: Dict[str, Tuple[Tuple[int, int, int], dict]] = {}
+
 
 class ConnectorInvalidNameError(Exception):
     pass
@@ -89,6 +107,41 @@ def get_connector_name_from_path(path):
     return path.split("/")[2]
 
 
+def load_connector_metadata(metadata_file_path: Path) -> Optional[dict]:
+    """Load the data section of a connector metadata file.
+
+    The parsed metadata is cached and only parsed again when the file modification time, size or inode changes.
+    The returned dict is shared between callers and must not be mutated.
+
+    Args:
+        metadata_file_path (Path): Path to the metadata.yaml file.
+
+    Returns:
+        Optional[dict]: The data section of the metadata file, None if the file does not exist.
+    """
+    cache_key = os.path.abspath(metadata_file_path)
+    try:
+        stat_result = os.stat(cache_key)
+    except OSError:
+        stat_result = None
+    if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+        _METADATA_CACHE.pop(cache_key, None)
+        return None
+
+    file_stamp = (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+    cached = _METADATA_CACHE.get(cache_key)
+    if cached is not None and cached[0] == file_stamp:
+        return cached[1]
+
+    with open(cache_key) as metadata_file:
+        metadata = yaml.load(metadata_file, Loader=YAML_LOADER)["data"]
+    if time.time_ns() - stat_result.st_mtime_ns > RACY_MTIME_WINDOW_NS:
+        _METADATA_CACHE[cache_key] = (file_stamp, metadata)
+    else:
+        _METADATA_CACHE.pop(cache_key, None)
+    return metadata
+
+
 def get_changed_metadata(diff_regex: Optional[str] = None) -> Set[str]:
     """Retrieve the set of connectors for which the metadata file was changed in the current branch (compared to master).
 
@@ -247,6 +300,27 @@ class ConnectorLanguageError(Exception):
     pass
 
 
+def get_connector_language(code_directory: Path, technical_name: str) -> Optional[ConnectorLanguage]:
+    """Infer the language of a connector from the files in its code directory.
+
+    Args:
+        code_directory (Path): Path to the connector directory.
+        technical_name (str): The technical name of the connector, e.g. source-faker.
+
+    Returns:
+        Optional[ConnectorLanguage]: The language of the connector, None if it could not be inferred.
+    """
+    if Path(code_directory / MANIFEST_FILE_NAME).is_file():
+        return ConnectorLanguage.MANIFEST_ONLY
+    if Path(code_directory / technical_name.replace("-", "_") / MANIFEST_FILE_NAME).is_file():
+        return ConnectorLanguage.LOW_CODE
+    if Path(code_directory / "setup.py").is_file() or Path(code_directory / PYPROJECT_FILE_NAME).is_file():
+        return ConnectorLanguage.PYTHON
+    if Path(code_directory / "src" / "main" / "java").exists() or Path(code_directory / "src" / "main" / "kotlin").exists():
+        return ConnectorLanguage.JAVA
+    return None
+
+
 @dataclass(frozen=True)
 class Connector:
     """Utility class to gather metadata about a connector."""
@@ -276,7 +350,8 @@ class Connector:
 
     @property
     def connector_type(self) -> str:
-        return self.metadata["connectorType"] if self.metadata else None
+        metadata = self.metadata
+        return metadata["connectorType"] if metadata else None
 
     @property
     def is_third_party(self) -> bool:
@@ -284,11 +359,8 @@ class Connector:
 
     @property
     def has_airbyte_docs(self) -> bool:
-        return (
-            self.metadata
-            and self.metadata.get("documentationUrl") is not None
-            and BASE_AIRBYTE_DOCS_URL in str(self.metadata.get("documentationUrl"))
-        )
+        metadata = self.metadata
+        return metadata and metadata.get("documentationUrl") is not None and BASE_AIRBYTE_DOCS_URL in str(metadata.get("documentationUrl"))
 
     @property
     def local_connector_documentation_directory(self) -> Path:
@@ -378,10 +450,8 @@ class Connector:
 
     @property
     def metadata(self) -> Optional[dict]:
-        file_path = self.metadata_file_path
-        if not file_path.is_file():
-            return None
-        return yaml.safe_load((self.code_directory / METADATA_FILE_NAME).read_text())["data"]
+        # Callers own the returned metadata, the cached one must not be mutated
+        return copy.deepcopy(load_connector_metadata(self.metadata_file_path))
 
     @property
     def connector_spec_file_content(self) -> Optional[dict]:
@@ -405,21 +475,14 @@ class Connector:
 
     @property
     def language(self) -> ConnectorLanguage:
-        if Path(self.code_directory / "manifest.yaml").is_file():
-            return ConnectorLanguage.MANIFEST_ONLY
-        if Path(self.code_directory / self.technical_name.replace("-", "_") / "manifest.yaml").is_file():
-            return ConnectorLanguage.LOW_CODE
-        if Path(self.code_directory / "setup.py").is_file() or Path(self.code_directory / "pyproject.toml").is_file():
-            return ConnectorLanguage.PYTHON
-        if Path(self.code_directory / "src" / "main" / "java").exists() or Path(self.code_directory / "src" / "main" / "kotlin").exists():
-            return ConnectorLanguage.JAVA
-        return None
+        return get_connector_language(self.code_directory, self.technical_name)
 
     @property
     def version(self) -> Optional[str]:
-        if self.metadata is None:
+        metadata = self.metadata
+        if metadata is None:
             return self.version_in_dockerfile_label
-        return self.metadata["dockerImageTag"]
+        return metadata["dockerImageTag"]
 
     @property
     def version_in_dockerfile_label(self) -> Optional[str]:
@@ -438,11 +501,13 @@ class Connector:
 
     @property
     def name_from_metadata(self) -> Optional[str]:
-        return self.metadata.get("name") if self.metadata else None
+        metadata = self.metadata
+        return metadata.get("name") if metadata else None
 
     @property
     def support_level(self) -> Optional[str]:
-        return self.metadata.get("supportLevel") if self.metadata else None
+        metadata = self.metadata
+        return metadata.get("supportLevel") if metadata else None
 
     def metadata_query_match(self, query_string: str) -> bool:
         """Evaluate a query string against the connector metadata.
@@ -550,11 +615,13 @@ class Connector:
 
     @property
     def allowed_hosts(self) -> Optional[List[str]]:
-        return self.metadata.get("allowedHosts") if self.metadata else None
+        metadata = self.metadata
+        return metadata.get("allowedHosts") if metadata else None
 
     @property
     def suggested_streams(self) -> Optional[List[str]]:
-        return self.metadata.get("suggestedStreams") if self.metadata else None
+        metadata = self.metadata
+        return metadata.get("suggestedStreams") if metadata else None
 
     @property
     def acceptance_test_config_path(self) -> Path:
@@ -571,17 +638,20 @@ class Connector:
 
     @property
     def supports_normalization(self) -> bool:
-        return self.metadata and self.metadata.get("normalizationConfig") is not None
+        metadata = self.metadata
+        return metadata and metadata.get("normalizationConfig") is not None
 
     @property
     def normalization_repository(self) -> Optional[str]:
-        if self.supports_normalization:
-            return f"{self.metadata['normalizationConfig']['normalizationRepository']}"
+        metadata = self.metadata
+        if metadata and metadata.get("normalizationConfig") is not None:
+            return f"{metadata['normalizationConfig']['normalizationRepository']}"
 
     @property
     def normalization_tag(self) -> Optional[str]:
-        if self.supports_normalization:
-            return f"{self.metadata['normalizationConfig']['normalizationTag']}"
+        metadata = self.metadata
+        if metadata and metadata.get("normalizationConfig") is not None:
+            return f"{metadata['normalizationConfig']['normalizationTag']}"
 
     @property
     def is_using_poetry(self) -> bool:
@@ -631,14 +701,12 @@ class Connector:
             bool: True if the connector is released, False otherwise.
         """
         metadata = self.metadata
-        registry = download_catalog(OSS_CATALOG_URL)
-        for connector in registry[f"{self.connector_type}s"]:
-            if (
-                connector[self.registry_primary_key_field] == metadata["definitionId"]
-                and connector["dockerImageTag"] == metadata["dockerImageTag"]
-            ):
-                return True
-        return False
+        registry_entry = get_oss_registry().get_entry_by_docker_repository(metadata["dockerRepository"])
+        return (
+            registry_entry is not None
+            and registry_entry.get(self.registry_primary_key_field) == metadata["definitionId"]
+            and registry_entry["dockerImageTag"] == metadata["dockerImageTag"]
+        )
 
     @property
     def cloud_usage(self) -> Optional[str]:
@@ -649,10 +717,7 @@ class Connector:
         """
         metadata = self.metadata
         definition_id = metadata.get("definitionId")
-        cloud_registry = download_catalog(CLOUD_CATALOG_URL)
-
-        all_connectors_of_type = cloud_registry[f"{self.connector_type}s"]
-        connector_entry = find(all_connectors_of_type, {self.registry_primary_key_field: definition_id})
+        connector_entry = get_cloud_registry().get_entry_by_definition_id(definition_id)
         if not connector_entry:
             return None
 
@@ -666,10 +731,7 @@ class Connector:
         metadata = self.metadata
         definition_id = metadata.get("definitionId")
         # We use the OSS registry as the source of truth for released connectors as the cloud registry can be a subset of the OSS registry.
-        oss_registry = download_catalog(OSS_CATALOG_URL)
-
-        all_connectors_of_type = oss_registry[f"{self.connector_type}s"]
-        connector_entry = find(all_connectors_of_type, {self.registry_primary_key_field: definition_id})
+        connector_entry = get_oss_registry().get_entry_by_definition_id(definition_id)
         if not connector_entry:
             return None
 
@@ -677,7 +739,8 @@ class Connector:
 
     @property
     def image_address(self) -> str:
-        return f'{self.metadata["dockerRepository"]}:{self.metadata["dockerImageTag"]}'
+        metadata = self.metadata
+        return f'{metadata["dockerRepository"]}:{metadata["dockerImageTag"]}'
 
     @property
     def cdk_name(self) -> str | None:
@@ -721,6 +784,78 @@ class Connector:
         return sorted(list(set(dependencies_paths)))
 
 
+def _list_directories(path: Path) -> List[os.DirEntry]:
+    try:
+        with os.scandir(path) as entries:
+            return [entry for entry in entries if entry.is_dir()]
+    except FileNotFoundError:
+        return []
+
+
+class ConnectorIndex:
+    """Index of the connectors of a repository by technical name.
+
+    Connector directories are found by listing the connectors folder and the third-party organization folders,
+    instead of globbing the whole connectors tree for metadata files, so indexing the repository does not parse any metadata file.
+    """
+
+    def __init__(self, repo_path: Union[str, Path]):
+        self.connectors_path = Path(repo_path) / CONNECTOR_PATH_PREFIX
+        # technical name -> path of the connector directory relative to CONNECTOR_PATH_PREFIX
+        self.relative_connector_paths = self._find_relative_connector_paths()
+
+    @classmethod
+    def from_current_repo(cls) -> "ConnectorIndex":
+        return cls(git.Repo(search_parent_directories=True).working_tree_dir)
+
+    def _find_relative_connector_paths(self) -> Dict[str, str]:
+        relative_connector_paths = {}
+        for directory in _list_directories(self.connectors_path):
+            if directory.name == THIRD_PARTY_GLOB:
+                connector_directories = [
+                    connector_directory
+                    for organization_directory in _list_directories(Path(directory.path))
+                    for connector_directory in _list_directories(Path(organization_directory.path))
+                ]
+            else:
+                connector_directories = [directory]
+            for connector_directory in connector_directories:
+                code_directory = Path(connector_directory.path)
+                if SCAFFOLD_CONNECTOR_GLOB not in connector_directory.name and (code_directory / METADATA_FILE_NAME).is_file():
+                    relative_connector_paths[connector_directory.name] = code_directory.relative_to(self.connectors_path).as_posix()
+        return relative_connector_paths
+
+    def __contains__(self, technical_name: str) -> bool:
+        return technical_name in self.relative_connector_paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.relative_connector_paths)
+
+    def __len__(self) -> int:
+        return len(self.relative_connector_paths)
+
+    def get_connectors(self) -> Set[Connector]:
+        return {Connector(relative_connector_path) for relative_connector_path in self.relative_connector_paths.values()}
+
+    def get_relative_connector_path(self, file_path: str) -> Optional[str]:
+        """Find the indexed connector a file belongs to.
+
+        Args:
+            file_path (str): Path of the file relative to the repository root, e.g. airbyte-integrations/connectors/source-faker/main.py.
+
+        Returns:
+            Optional[str]: The path of the connector directory relative to CONNECTOR_PATH_PREFIX, None if the file is not in an indexed connector.
+        """
+        if not file_path.startswith(CONNECTOR_PATH_PREFIX + "/"):
+            return None
+        path_parts = file_path[len(CONNECTOR_PATH_PREFIX) + 1 :].split("/")
+        # Third-party connectors are nested in a directory per organization
+        candidate_path_parts = path_parts[:3] if path_parts[0] == THIRD_PARTY_GLOB else path_parts[:1]
+        if self.relative_connector_paths.get(candidate_path_parts[-1]) == "/".join(candidate_path_parts):
+            return "/".join(candidate_path_parts)
+        return None
+
+
 def get_changed_connectors(
     modified_files: Optional[Set[Union[str, Path]]] = None, source: bool = True, destination: bool = True, third_party: bool = True
 ) -> Set[Connector]:
@@ -738,48 +873,26 @@ def get_changed_connectors(
         prefix_to_check.append(THIRD_PARTY_CONNECTOR_PATH_PREFIX)
 
     changed_source_connector_files = {
-        file_path
+        str(file_path)
         for file_path in modified_files
-        if any(file_path.startswith(prefix) for prefix in prefix_to_check) and SCAFFOLD_CONNECTOR_GLOB not in file_path
+        if any(str(file_path).startswith(prefix) for prefix in prefix_to_check) and SCAFFOLD_CONNECTOR_GLOB not in str(file_path)
+    }
+    connector_index = ConnectorIndex.from_current_repo()
+    return {
+        # Files of deleted connectors are not in the index
+        Connector(connector_index.get_relative_connector_path(changed_file) or get_connector_name_from_path(changed_file))
+        for changed_file in changed_source_connector_files
     }
-    return {Connector(get_connector_name_from_path(changed_file)) for changed_file in changed_source_connector_files}
-
-
-def _get_relative_connector_folder_name_from_metadata_path(metadata_file_path: str) -> str:
-    """Get the relative connector folder name from the metadata file path.
-
-    Args:
-        metadata_file_path (Path): Path to the metadata file.
-
-    Returns:
-        str: The relative connector folder name.
-    """
-    # remove CONNECTOR_PATH_PREFIX and anything before
-    metadata_file_path = metadata_file_path.split(CONNECTOR_PATH_PREFIX)[-1]
-
-    # remove metadata.yaml
-    metadata_file_path = metadata_file_path.replace(METADATA_FILE_NAME, "")
-
-    # remove leading and trailing slashes
-    metadata_file_path = metadata_file_path.strip("/")
-    return metadata_file_path
 
 
 def get_all_connectors_in_repo() -> Set[Connector]:
     """Retrieve a set of all Connectors in the repo.
-    We globe the connectors folder for metadata.yaml files and construct Connectors from the directory name.
+    We list the connectors folder for directories with a metadata.yaml file and construct Connectors from the directory name.
 
     Returns:
         A set of Connectors.
     """
-    repo = git.Repo(search_parent_directories=True)
-    repo_path = repo.working_tree_dir
-
-    return {
-        Connector(_get_relative_connector_folder_name_from_metadata_path(metadata_file))
-        for metadata_file in glob(f"{repo_path}/{CONNECTOR_PATH_PREFIX}/**/metadata.yaml", recursive=True)
-        if SCAFFOLD_CONNECTOR_GLOB not in metadata_file
-    }
+    return ConnectorIndex.from_current_repo().get_connectors()
 
 
 class ConnectorTypeEnum(str, Enum):
@@ -0,0 +1,126 @@
+#
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+#
+
+import json
+import time
+
+import pytest
+import requests
+
+from connector_ops import registry, utils
+
+
+REGISTRY = {
+    "sources": [
+        {
+            "sourceDefinitionId": "dfd88b22-b603-4c3d-aad7-3701784586b1",
+            "dockerRepository": "airbyte/source-faker",
+            "dockerImageTag": "6.2.21",
+            "generated": {"sbomUrl": "https://example.com/source-faker.spdx.json"},
+        }
+    ],
+    "destinations": [
+        {
+            "destinationDefinitionId": "22f6c74f-5699-40ff-833c-4a879ea40133",
+            "dockerRepository": "airbyte/destination-bigquery",
+            "dockerImageTag": "2.9.0",
+        }
+    ],
+}
+
+
+@pytest.fixture
+def local_registry_path(tmp_path):
+    registry_path = tmp_path / "oss_registry.json"
+    registry_path.write_text(json.dumps(REGISTRY))
+    return registry_path
+
+
+@pytest.fixture
+def mock_registry_response(mocker):
+    response = mocker.Mock(status_code=200, headers={"ETag": '"v1"'})
+    response.json.return_value = REGISTRY
+    return mocker.patch.object(registry.requests, "get", return_value=response)
+
+
+@pytest.mark.parametrize("url_prefix", ["", "file://"])
+def test_local_registry(local_registry_path, url_prefix, mocker):
+    requests_get = mocker.patch.object(registry.requests, "get")
+    connector_registry = registry.ConnectorRegistry(f"{url_prefix}{local_registry_path}")
+
+    assert connector_registry.get_entry_by_docker_repository("airbyte/source-faker") == REGISTRY["sources"][0]
+    assert connector_registry.get_entry_by_definition_id("22f6c74f-5699-40ff-833c-4a879ea40133") == REGISTRY["destinations"][0]
+    assert connector_registry.get_entry_by_docker_repository("airbyte/source-unknown") is None
+    requests_get.assert_not_called()
+
+
+def test_remote_registry_is_cached_on_disk(tmp_path, mock_registry_response):
+    connector_registry = registry.ConnectorRegistry("https://example.com/oss_registry.json", cache_directory=tmp_path)
+    assert connector_registry.registry == REGISTRY
+    assert mock_registry_response.call_count == 1
+
+    # A new client, e.g. in another process, uses the cache while it is younger than the TTL
+    assert registry.ConnectorRegistry("https://example.com/oss_registry.json", cache_directory=tmp_path).registry == REGISTRY
+    assert mock_registry_response.call_count == 1
+
+
+def test_expired_cache_is_revalidated_with_etag(tmp_path, mock_registry_response):
+    registry.ConnectorRegistry("https://example.com/oss_registry.json", cache_directory=tmp_path).registry
+    mock_registry_response.return_value.status_code = 304
+    mock_registry_response.return_value.json.side_effect = AssertionError("A not modified response has no body")
+
+    connector_registry = registry.ConnectorRegistry("https://example.com/oss_registry.json", cache_directory=tmp_path, cache_ttl_seconds=0)
+
+    assert connector_registry.registry == REGISTRY
+    assert mock_registry_response.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert connector_registry._read_cache()["fetched_at"] == pytest.approx(time.time(), abs=5)
+
+
+def test_failed_cache_write_leaves_no_temporary_file(tmp_path, mock_registry_response, mocker):
+    mocker.patch.object(registry.json, "dump", side_effect=OSError("No space left on device"))
+
+    assert registry.ConnectorRegistry("https://example.com/oss_registry.json", cache_directory=tmp_path).registry == REGISTRY
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stale_cache_is_used_when_the_registry_is_unavailable(tmp_path, mock_registry_response):
+    registry.ConnectorRegistry("https://example.com/oss_registry.json", cache_directory=tmp_path).registry
+    mock_registry_response.side_effect = requests.ConnectionError()
+
+    assert (
+        registry.ConnectorRegistry("https://example.com/oss_registry.json", cache_directory=tmp_path, cache_ttl_seconds=0).registry
+        == REGISTRY
+    )
+    with pytest.raises(registry.RegistryUnavailableError):
+        registry.ConnectorRegistry("https://example.com/oss_registry.json", cache_directory=None).registry
+
+
+def test_connector_registry_lookups(local_registry_path, mocker):
+    mocker.patch.object(utils, "get_oss_registry", return_value=registry.ConnectorRegistry(str(local_registry_path)))
+    connector = utils.Connector("source-faker")
+    mocker.patch.object(
+        utils.Connector,
+        "metadata",
+        {
+            "connectorType": "source",
+            "dockerRepository": "airbyte/source-faker",
+            "definitionId": "dfd88b22-b603-4c3d-aad7-3701784586b1",
+            "dockerImageTag": "6.2.21",
+        },
+    )
+
+    assert connector.is_released
+    assert connector.sbom_url == "https://example.com/source-faker.spdx.json"
+
+    mocker.patch.object(
+        utils.Connector,
+        "metadata",
+        {
+            "connectorType": "source",
+            "dockerRepository": "airbyte/source-faker",
+            "definitionId": "dfd88b22-b603-4c3d-aad7-3701784586b1",
+            "dockerImageTag": "6.2.22",
+        },
+    )
+    assert not connector.is_released
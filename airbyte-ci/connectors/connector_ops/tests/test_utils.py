@@ -2,11 +2,13 @@
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 #
 
+import os
 from contextlib import nullcontext as does_not_raise
 from pathlib import Path
 
 import pytest
 import semver
+
 from connector_ops import utils
 
 
@@ -182,3 +184,74 @@ def test_get_all_connectors_in_repo():
         assert connector.metadata is not None
         if connector.has_airbyte_docs and connector.is_enabled_in_any_registry:
             assert connector.documentation_file_path.exists()
+
+
+def test_load_connector_metadata_is_invalidated_on_change(tmp_path, mocker):
+    metadata_file_path = tmp_path / utils.METADATA_FILE_NAME
+    metadata_file_path.write_text("data:\n  dockerImageTag: 0.1.0\n")
+    old_mtime_ns = metadata_file_path.stat().st_mtime_ns - 10 * utils.RACY_MTIME_WINDOW_NS
+    os.utime(metadata_file_path, ns=(old_mtime_ns, old_mtime_ns))
+    yaml_load_spy = mocker.spy(utils.yaml, "load")
+
+    assert utils.load_connector_metadata(metadata_file_path) == {"dockerImageTag": "0.1.0"}
+    assert utils.load_connector_metadata(metadata_file_path) is utils.load_connector_metadata(metadata_file_path)
+    assert yaml_load_spy.call_count == 1
+
+    metadata_file_path.write_text("data:\n  dockerImageTag: 0.2.0\n")
+    assert utils.load_connector_metadata(metadata_file_path) == {"dockerImageTag": "0.2.0"}
+    assert yaml_load_spy.call_count == 2
+
+    metadata_file_path.unlink()
+    assert utils.load_connector_metadata(metadata_file_path) is None
+
+
+def test_connector_metadata_is_a_copy(mocker):
+    connector = utils.Connector("source-faker")
+    connector.metadata["dockerImageTag"] = "mutated"
+    assert connector.metadata["dockerImageTag"] == connector.version != "mutated"
+
+    # The properties copy the metadata once, even when they read several fields
+    deepcopy_spy = mocker.spy(utils.copy, "deepcopy")
+    assert connector.image_address == f"airbyte/source-faker:{connector.version}"
+    assert deepcopy_spy.call_count == 2
+
+
+def test_connector_index(tmp_path):
+    connectors_path = tmp_path / utils.CONNECTOR_PATH_PREFIX
+    for relative_connector_path in ["source-foo", "third-party/acme/airbyte-bar-source", "source-scaffold-source-http"]:
+        (connectors_path / relative_connector_path).mkdir(parents=True)
+        (connectors_path / relative_connector_path / utils.METADATA_FILE_NAME).write_text(
+            "data:\n  dockerImageTag: 1.2.3\n  supportLevel: community\n"
+        )
+    (connectors_path / "source-without-metadata").mkdir()
+
+    connector_index = utils.ConnectorIndex(tmp_path)
+
+    assert connector_index.relative_connector_paths == {
+        "source-foo": "source-foo",
+        "airbyte-bar-source": "third-party/acme/airbyte-bar-source",
+    }
+    assert connector_index.get_connectors() == {utils.Connector("source-foo"), utils.Connector("third-party/acme/airbyte-bar-source")}
+    assert connector_index.get_relative_connector_path("airbyte-integrations/connectors/source-foo/manifest.yaml") == "source-foo"
+    assert (
+        connector_index.get_relative_connector_path("airbyte-integrations/connectors/third-party/acme/airbyte-bar-source/main.py")
+        == "third-party/acme/airbyte-bar-source"
+    )
+    assert connector_index.get_relative_connector_path("airbyte-integrations/connectors/source-deleted/main.py") is None
+    assert connector_index.get_relative_connector_path("docs/integrations/sources/foo.md") is None
+
+
+def test_get_changed_connectors():
+    changed_connectors = utils.get_changed_connectors(
+        modified_files={
+            "airbyte-integrations/connectors/source-faker/metadata.yaml",
+            "airbyte-integrations/connectors/third-party/farosai/airbyte-pagerduty-source/metadata.yaml",
+            "airbyte-integrations/connectors/destination-deleted/main.py",
+            "docs/integrations/sources/faker.md",
+        }
+    )
+    assert changed_connectors == {
+        utils.Connector("source-faker"),
+        utils.Connector("third-party/farosai/airbyte-pagerduty-source"),
+        utils.Connector("destination-deleted"),
+    }
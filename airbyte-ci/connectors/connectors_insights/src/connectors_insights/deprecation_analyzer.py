@@ -0,0 +1,283 @@
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+
+"""In-process equivalent of running pylint with the cdk_deprecation_checkers plugin on a connector source tree.
+
+The deprecation rules are read from the pylint plugin, so that both analyses always report the same deprecations.
+The messages are formatted like pylint JSON messages so that they can be parsed by get_pylint_inferred_insights.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+    PylintMessage = Dict[str, Any]
+
+CDK_DEPRECATION_CHECKERS_PATH = Path(__file__).parent / "pylint_plugins" / "cdk_deprecation_checkers.py"
+CONNECTORS_INSIGHTS_CACHE_DIRECTORY = Path(
+    os.environ.get(
+        "CONNECTORS_INSIGHTS_CACHE_DIRECTORY", Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "connectors_insights"
+    )
+)
+DEFAULT_CACHE_DIRECTORY = CONNECTORS_INSIGHTS_CACHE_DIRECTORY / "deprecation_analysis"
+# Part of the cache keys, to be bumped when the messages reported for a source change
+ANALYZER_VERSION = "2"
+
+# Message ids and types used by pylint for the messages of the cdk_deprecation_checkers plugin
+DEPRECATED_MODULE_MESSAGE = ("W4901", "warning", "deprecated-module")
+DEPRECATED_CLASS_MESSAGE = ("W4904", "warning", "deprecated-class")
+FORBIDDEN_METHOD_NAME_MESSAGE = ("C9001", "convention", "forbidden-method-name")
+
+FUNCTION_DEF_KEYWORD_PATTERN = re.compile(rb"(async\s+)?def\s+")
+
+
+@dataclass(frozen=True)
+class DeprecationRules:
+    deprecated_classes: FrozenSet[Tuple[Optional[str], str]]
+    deprecated_modules: FrozenSet[str]
+    forbidden_method_names: FrozenSet[str]
+
+    @classmethod
+    def from_pylint_plugin(cls, plugin_path: Path = CDK_DEPRECATION_CHECKERS_PATH) -> DeprecationRules:
+        """Read the rules declared in the module level constants of the pylint plugin, without importing pylint.
+
+        Args:
+            plugin_path (Path): The path to the pylint plugin.
+
+        Returns:
+            DeprecationRules: The deprecation rules of the plugin.
+        """
+        constants = {}
+        for node in ast.parse(plugin_path.read_text()).body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                constants[node.targets[0].id] = node.value
+            elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) and node.value is not None:
+                constants[node.target.id] = node.value
+
+        deprecated_classes = set()
+        for element in getattr(constants["DEPRECATED_CLASSES"], "elts", []):
+            # Elements are DeprecatedClass(module, name) namedtuples
+            module, name = (ast.literal_eval(argument) for argument in element.args)
+            deprecated_classes.add((module, name))
+        return cls(
+            deprecated_classes=frozenset(deprecated_classes),
+            deprecated_modules=frozenset(ast.literal_eval(constants["DEPRECATED_MODULES"])),
+            forbidden_method_names=frozenset(ast.literal_eval(constants["FORBIDDEN_METHOD_NAMES"])),
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        rules = [sorted(self.deprecated_classes, key=str), sorted(self.deprecated_modules), sorted(self.forbidden_method_names)]
+        return hashlib.sha256(json.dumps(rules).encode()).hexdigest()
+
+    def get_deprecated_classes(self, module: Optional[str]) -> Set[str]:
+        return {name for deprecated_module, name in self.deprecated_classes if deprecated_module is None or deprecated_module == module}
+
+
+class _DeprecationVisitor(ast.NodeVisitor):
+    """Report the nodes pylint's DeprecatedMixin and the ForbiddenMethodNameChecker of the plugin would report."""
+
+    def __init__(self, rules: DeprecationRules, module_name: str, is_package: bool, source_lines: Optional[List[bytes]] = None) -> None:
+        self.rules = rules
+        self.source_lines = source_lines or []
+        self.module_name = module_name
+        self.is_package = is_package
+        self.messages: List[PylintMessage] = []
+        self._scopes: List[str] = []
+
+    def _get_position(self, node: ast.AST) -> Tuple[int, int, Optional[int], Optional[int]]:
+        line, column = getattr(node, "lineno", 0), getattr(node, "col_offset", 0)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and 0 < line <= len(self.source_lines):
+            # Like pylint, the messages of a function are located on its `def name` part only
+            keyword_match = FUNCTION_DEF_KEYWORD_PATTERN.match(self.source_lines[line - 1], column)
+            if keyword_match:
+                return line, column, line, keyword_match.end() + len(node.name.encode("utf-8"))
+        return line, column, getattr(node, "end_lineno", None), getattr(node, "end_col_offset", None)
+
+    def _add_message(self, message: Tuple[str, str, str], node: ast.AST, text: str) -> None:
+        message_id, message_type, symbol = message
+        line, column, end_line, end_column = self._get_position(node)
+        self.messages.append(
+            {
+                "type": message_type,
+                "obj": ".".join(self._scopes),
+                "line": line,
+                "column": column,
+                "endLine": end_line,
+                "endColumn": end_column,
+                "symbol": symbol,
+                "message": text,
+                "message-id": message_id,
+            }
+        )
+
+    def _resolve_import_from(self, node: ast.ImportFrom) -> Optional[str]:
+        if not node.level:
+            return node.module
+        package_parts = self.module_name.split(".") if self.is_package else self.module_name.split(".")[:-1]
+        if node.level > 1:
+            package_parts = package_parts[: -(node.level - 1)]
+        return ".".join(package_parts + ([node.module] if node.module else [])) or None
+
+    def _check_deprecated_module(self, node: ast.AST, module_path: Optional[str]) -> None:
+        for deprecated_module in self.rules.deprecated_modules:
+            if module_path and (module_path == deprecated_module or module_path.startswith(deprecated_module + ".")):
+                self._add_message(DEPRECATED_MODULE_MESSAGE, node, f"Deprecated module {module_path!r}")
+
+    def _check_deprecated_classes(self, node: ast.AST, module_name: Optional[str], class_names: Iterable[str]) -> None:
+        deprecated_classes = self.rules.get_deprecated_classes(module_name)
+        for class_name in class_names:
+            if class_name in deprecated_classes:
+                self._add_message(DEPRECATED_CLASS_MESSAGE, node, f"Using deprecated class {class_name} of module {module_name}")
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self._check_deprecated_module(node, alias.name)
+            if "." in alias.name:
+                module_name, class_name = alias.name.split(".", 1)
+                self._check_deprecated_classes(node, module_name, (class_name,))
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        module_name = self._resolve_import_from(node)
+        self._check_deprecated_module(node, module_name)
+        self._check_deprecated_classes(node, module_name, (alias.name for alias in node.names))
+
+    def visit_Call(self, node: ast.Call) -> None:
+        # Like pylint, a class called from a module is checked with the module name as written, e.g. `logger.AirbyteLogger()`
+        # is checked against the module `logger`: without inference the name is not resolved to `airbyte_cdk.logger`
+        if isinstance(node.func, ast.Attribute) and isinstance(node.func.value, ast.Name):
+            self._check_deprecated_classes(node, node.func.value.id, (node.func.attr,))
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._scopes.append(node.name)
+        if node.name in self.rules.forbidden_method_names:
+            self._add_message(FORBIDDEN_METHOD_NAME_MESSAGE, node, f'Method name "{node.name}" is forbidden')
+        self.generic_visit(node)
+        self._scopes.pop()
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self._scopes.append(node.name)
+        self.generic_visit(node)
+        self._scopes.pop()
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._scopes.append(node.name)
+        self.generic_visit(node)
+        self._scopes.pop()
+
+
+class DeprecationAnalyzer:
+    """Find the deprecated classes, modules and forbidden method names used in Python source trees.
+
+    The messages of a file are cached by the hash of its content, in memory and on disk when a cache directory is set,
+    so that unchanged files are not analyzed again.
+    """
+
+    def __init__(self, rules: Optional[DeprecationRules] = None, cache_directory: Optional[Path] = DEFAULT_CACHE_DIRECTORY) -> None:
+        self.rules = rules or DeprecationRules.from_pylint_plugin()
+        self.cache_directory = cache_directory
+        self._messages_by_content_hash: Dict[str, List[PylintMessage]] = {}
+
+    def _get_content_hash(self, module_name: str, source: bytes) -> str:
+        content_hash = hashlib.sha256(ANALYZER_VERSION.encode())
+        content_hash.update(self.rules.fingerprint.encode())
+        # The module name is part of the key because relative imports are resolved from it
+        content_hash.update(module_name.encode())
+        content_hash.update(source)
+        return content_hash.hexdigest()
+
+    def _read_cache(self, content_hash: str) -> Optional[List[PylintMessage]]:
+        if content_hash in self._messages_by_content_hash:
+            return self._messages_by_content_hash[content_hash]
+        if self.cache_directory is None:
+            return None
+        try:
+            messages = json.loads((self.cache_directory / f"{content_hash}.json").read_text())
+        except (OSError, ValueError):
+            return None
+        self._messages_by_content_hash[content_hash] = messages
+        return messages
+
+    def _write_cache(self, content_hash: str, messages: List[PylintMessage]) -> None:
+        self._messages_by_content_hash[content_hash] = messages
+        if self.cache_directory is None:
+            return
+        try:
+            self.cache_directory.mkdir(parents=True, exist_ok=True)
+            (self.cache_directory / f"{content_hash}.json").write_text(json.dumps(messages))
+        except OSError:
+            pass
+
+    def analyze_source(self, source: bytes, module_name: str, is_package: bool = False) -> List[PylintMessage]:
+        """Analyze the source code of a module.
+
+        Args:
+            source (bytes): The source code.
+            module_name (str): The dotted name of the module, used to resolve relative imports.
+            is_package (bool): Whether the module is the __init__ module of a package.
+
+        Returns:
+            List[PylintMessage]: The messages, without their module and path.
+        """
+        content_hash = self._get_content_hash(module_name, source)
+        cached_messages = self._read_cache(content_hash)
+        if cached_messages is not None:
+            return cached_messages
+        try:
+            tree = ast.parse(source)
+        except (SyntaxError, ValueError):
+            # pylint would report a syntax-error, which is not an insight
+            messages: List[PylintMessage] = []
+        else:
+            visitor = _DeprecationVisitor(self.rules, module_name, is_package, source.splitlines())
+            visitor.visit(tree)
+            messages = visitor.messages
+        self._write_cache(content_hash, messages)
+        return messages
+
+    @staticmethod
+    def _get_package_files(directory: Path) -> List[Path]:
+        # Like pylint, only descend into the sub directories which are packages
+        file_paths = []
+        for path in sorted(directory.iterdir()):
+            if path.is_file() and path.suffix == ".py":
+                file_paths.append(path)
+            elif path.is_dir() and (path / "__init__.py").is_file():
+                file_paths.extend(DeprecationAnalyzer._get_package_files(path))
+        return file_paths
+
+    def analyze_directory(self, directory: Path) -> List[PylintMessage]:
+        """Analyze all the Python files of a directory, like `pylint .` would from this directory.
+
+        Args:
+            directory (Path): The directory to analyze, usually the connector package directory.
+
+        Returns:
+            List[PylintMessage]: The messages of all the files.
+        """
+        if not directory.is_dir():
+            return []
+        messages = []
+        for file_path in self._get_package_files(directory):
+            relative_path = file_path.relative_to(directory)
+            is_package = file_path.name == "__init__.py"
+            module_parts = [directory.name, *relative_path.parent.parts] + ([] if is_package else [file_path.stem])
+            module_name = ".".join(module_parts)
+            for message in self.analyze_source(file_path.read_bytes(), module_name, is_package):
+                messages.append({**message, "module": module_name, "path": str(relative_path)})
+        return messages
+
+    def get_pylint_output(self, directory: Path) -> str:
+        """Get the messages of a directory in the pylint JSON output format."""
+        return json.dumps(self.analyze_directory(directory))
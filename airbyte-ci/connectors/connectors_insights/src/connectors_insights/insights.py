@@ -2,26 +2,33 @@
 from __future__ import annotations
 
 import datetime
+import functools
 import itertools
 import json
 import logging
 import re
+import threading
 from typing import TYPE_CHECKING
 
+import asyncer
 import requests
 
 from connectors_insights.hacks import get_ci_on_master_report
 from connectors_insights.models import ConnectorInsights
-from connectors_insights.pylint import get_pylint_output
+from connectors_insights.pylint import get_deprecation_analysis_output
 from connectors_insights.result_backends import FileToPersist, ResultBackend
 
 if TYPE_CHECKING:
-    from typing import Dict, List, Tuple
+    from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
 
     import dagger
     from anyio import Semaphore
     from connector_ops.utils import Connector  # type: ignore
 
+SBOM_REQUEST_TIMEOUT_SECONDS = 60
+
+_thread_local = threading.local()
+
 
 def get_manifest_inferred_insights(connector: Connector) -> dict:
     if connector.manifest_path is None or not connector.manifest_path.exists():
@@ -81,14 +88,18 @@ def get_sbom_inferred_insights(raw_sbom: str | None, connector: Connector) -> Di
     python_artifacts = {package["name"]: package for package in sbom["packages"] if package["SPDXID"].startswith("SPDXRef-Package-python-")}
     sbom_inferred_insights["cdk_version"] = python_artifacts.get("airbyte-cdk", {}).get("versionInfo")
 
+    dependencies = []
+    seen_dependencies: Set[Tuple[str, str, str]] = set()
     for package in sbom["packages"]:
         package_type = package["SPDXID"].split("-")[2]
         try:
-            dependency = {"type": package_type, "version": package["versionInfo"], "package_name": package["name"]}
+            dependency_key = (package_type, package["versionInfo"], package["name"])
         except KeyError:
             continue
-        if isinstance(sbom_inferred_insights["dependencies"], list) and dependency not in sbom_inferred_insights["dependencies"]:
-            sbom_inferred_insights["dependencies"].append(dependency)
+        if dependency_key not in seen_dependencies:
+            seen_dependencies.add(dependency_key)
+            dependencies.append({"type": package_type, "version": package["versionInfo"], "package_name": package["name"]})
+    sbom_inferred_insights["dependencies"] = dependencies
     return sbom_inferred_insights
 
 
@@ -122,7 +133,7 @@ def get_pylint_inferred_insights(pylint_output: str | None) -> Dict:
     }
 
 
-def should_skip_generation(
+async def should_skip_generation(
     result_backends: List[ResultBackend] | None, connector: Connector, files_to_persist: List[FileToPersist], rewrite: bool
 ) -> bool:
     """Check if the insights generation should be skipped because they already exist.
@@ -140,10 +151,20 @@ def should_skip_generation(
     if rewrite or not result_backends:
         return False
 
-    for result_backend, file_to_persist in itertools.product(result_backends, files_to_persist):
-        if not result_backend.artifact_already_exists(connector, file_to_persist):
-            return False
-    return True
+    soon_artifact_exists = []
+    async with asyncer.create_task_group() as task_group:
+        for result_backend, file_to_persist in itertools.product(result_backends, files_to_persist):
+            soon_artifact_exists.append(task_group.soonify(result_backend.artifact_already_exists_async)(connector, file_to_persist))
+    return all(soon_exists.value for soon_exists in soon_artifact_exists)
+
+
+def get_http_session() -> requests.Session:
+    """Get the HTTP session of the current thread, to reuse connections across the connectors.
+    Requests sessions are not thread safe, so each worker thread gets its own session.
+    """
+    if not hasattr(_thread_local, "http_session"):
+        _thread_local.http_session = requests.Session()
+    return _thread_local.http_session
 
 
 def fetch_sbom(connector: Connector) -> str | None:
@@ -158,12 +179,17 @@ def fetch_sbom(connector: Connector) -> str | None:
         str | None: The SBOM in JSON format if the connector is released, None otherwise.
     """
     if connector.sbom_url:
-        r = requests.get(connector.sbom_url)
+        r = get_http_session().get(connector.sbom_url, timeout=SBOM_REQUEST_TIMEOUT_SECONDS)
         r.raise_for_status()
         return r.text
     return None
 
 
+async def fetch_sbom_async(connector: Connector) -> str | None:
+    """Fetch the SBOM for the connector in a worker thread, so that the other connectors make progress in the meantime."""
+    return await asyncer.asyncify(fetch_sbom)(connector)
+
+
 def generate_insights(connector: Connector, sbom: str | None, pylint_output: str | None) -> ConnectorInsights:
     """Generate insights for the connector.
 
@@ -188,15 +214,27 @@ def generate_insights(connector: Connector, sbom: str | None, pylint_output: str
     )
 
 
-# TODO: make it async for concurrent uploads
-def persist_files(
+async def persist_file(
+    connector: Connector,
+    file_to_persist: FileToPersist,
+    result_backend: ResultBackend,
+    rewrite: bool,
+    logger: logging.Logger,
+) -> None:
+    if not rewrite and await result_backend.artifact_already_exists_async(connector, file_to_persist):
+        logger.info(f"Skipping writing {file_to_persist.file_name} for {connector.technical_name} because it already exists.")
+        return
+    await result_backend.write_async(connector, file_to_persist)
+
+
+async def persist_files(
     connector: Connector,
     files_to_persist: List[FileToPersist],
     result_backends: List[ResultBackend] | None,
     rewrite: bool,
     logger: logging.Logger,
 ) -> None:
-    """Persist the files to the result backends.
+    """Persist the files to the result backends, concurrently.
 
     Args:
         connector (Connector): The connector to persist the files for.
@@ -211,14 +249,49 @@ def persist_files(
     if not result_backends:
         logger.warning(f"No result backends provided to persist files for {connector.technical_name}")
         return None
-    for backend, file in itertools.product(result_backends, files_to_persist):
-        if file.file_content:
-            if not rewrite and backend.artifact_already_exists(connector, file):
-                logger.info(f"Skipping writing {file.file_name} for {connector.technical_name} because it already exists.")
-                continue
-            backend.write(connector, file)
-        else:
-            logger.warning(f"No content provided for {file.file_name} for {connector.technical_name}")
+    async with asyncer.create_task_group() as task_group:
+        for backend, file in itertools.product(result_backends, files_to_persist):
+            if file.file_content:
+                task_group.soonify(persist_file)(connector, file, backend, rewrite, logger)
+            else:
+                logger.warning(f"No content provided for {file.file_name} for {connector.technical_name}")
+
+
+def get_error_message(error: Exception) -> str:
+    # Errors raised in task groups are wrapped in exception groups
+    if isinstance(error, ExceptionGroup):
+        return ", ".join(get_error_message(sub_error) for sub_error in error.exceptions if isinstance(sub_error, Exception))
+    return str(error)
+
+
+async def run_concurrently(*async_functions: Callable[[], Awaitable[Any]]) -> List[Any]:
+    """Run the async functions concurrently and return their results in order.
+    Unlike in a bare task group, the failure of a function does not cancel the others: all the errors are raised together.
+
+    Args:
+        async_functions (Callable[[], Awaitable[Any]]): The async functions to run.
+
+    Raises:
+        ExceptionGroup: The errors raised by the functions, if any.
+
+    Returns:
+        List[Any]: The results of the functions.
+    """
+    results: List[Any] = [None] * len(async_functions)
+    errors: List[Exception] = []
+
+    async def run(index: int, async_function: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            results[index] = await async_function()
+        except Exception as e:
+            errors.append(e)
+
+    async with asyncer.create_task_group() as task_group:
+        for index, async_function in enumerate(async_functions):
+            task_group.soonify(run)(index, async_function)
+    if errors:
+        raise ExceptionGroup("Concurrent calls failed", errors)
+    return results
 
 
 async def generate_insights_for_connector(
@@ -244,20 +317,29 @@ async def generate_insights_for_connector(
     files_to_persist = [insights_file]
 
     async with semaphore:
-        if should_skip_generation(result_backends, connector, files_to_persist, rewrite):
+        if await should_skip_generation(result_backends, connector, files_to_persist, rewrite):
             logger.info(f"Skipping insights generation for {connector.technical_name} because it is already generated.")
             return True, connector
 
         logger.info(f"Generating insights for {connector.technical_name}")
         result_backends = result_backends or []
         try:
-            pylint_output = await get_pylint_output(dagger_client, connector)
-            raw_sbom = fetch_sbom(connector)
-            insights = generate_insights(connector, raw_sbom, pylint_output)
+            # The SBOM is downloaded while the connector code is analyzed
+            pylint_output, raw_sbom = await run_concurrently(
+                functools.partial(get_deprecation_analysis_output, dagger_client, connector),
+                functools.partial(fetch_sbom_async, connector),
+            )
+            insights = await asyncer.asyncify(generate_insights)(connector, raw_sbom, pylint_output)
             insights_file.set_file_content(insights.json())
-            persist_files(connector, files_to_persist, result_backends, rewrite, logger)
-            logger.info(f"Finished generating insights for {connector.technical_name}")
-            return True, connector
         except Exception as e:
-            logger.error(f"Failed to generate insights for {connector.technical_name}: {e}")
+            logger.error(f"Failed to generate insights for {connector.technical_name}: {get_error_message(e)}")
             return False, connector
+
+    # The files are persisted out of the semaphore so that the generation of the next connector starts during the uploads
+    try:
+        await persist_files(connector, files_to_persist, result_backends, rewrite, logger)
+    except Exception as e:
+        logger.error(f"Failed to persist insights for {connector.technical_name}: {get_error_message(e)}")
+        return False, connector
+    logger.info(f"Finished generating insights for {connector.technical_name}")
+    return True, connector
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import functools
 import os
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+import asyncer
 from connector_ops.utils import ConnectorLanguage  # type: ignore
 
+from connectors_insights.deprecation_analyzer import DeprecationAnalyzer
 from connectors_insights.utils import never_fail_exec
 
 if TYPE_CHECKING:
@@ -25,6 +28,8 @@ PYLINT_COMMAND = [
     ".",
 ]
 
+PYLINT_CONNECTOR_LANGUAGES = [ConnectorLanguage.PYTHON, ConnectorLanguage.LOW_CODE, ConnectorLanguage.MANIFEST_ONLY]
+
 
 async def get_pylint_output(dagger_client: dagger.Client, connector: Connector) -> str | None:
     """Invoke pylint to check for deprecated classes and modules in the connector code.
@@ -38,7 +43,7 @@ async def get_pylint_output(dagger_client: dagger.Client, connector: Connector)
     Returns:
         str | None: Pylint output.
     """
-    if connector.language not in [ConnectorLanguage.PYTHON, ConnectorLanguage.LOW_CODE, ConnectorLanguage.MANIFEST_ONLY]:
+    if connector.language not in PYLINT_CONNECTOR_LANGUAGES:
         return None
     cdk_deprecation_checker_path = Path(os.path.abspath(__file__)).parent / "pylint_plugins/cdk_deprecation_checkers.py"
     pip_cache_volume: dagger.CacheVolume = dagger_client.cache_volume("pip_cache")
@@ -56,3 +61,28 @@ async def get_pylint_output(dagger_client: dagger.Client, connector: Connector)
         .with_(never_fail_exec(PYLINT_COMMAND))
         .stdout()
     )
+
+
+@functools.lru_cache(maxsize=None)
+def get_deprecation_analyzer() -> DeprecationAnalyzer:
+    return DeprecationAnalyzer()
+
+
+async def get_deprecation_analysis_output(dagger_client: dagger.Client, connector: Connector) -> str | None:
+    """Check for deprecated classes and modules in the connector code, with the rules of the cdk_deprecation_checkers.py pylint plugin.
+    The local source tree of the connector is analyzed in process when it is available,
+    pylint is run in the connector container otherwise.
+
+    Args:
+        dagger_client (dagger.Client): Current dagger client.
+        connector (Connector): Connector object.
+
+    Returns:
+        str | None: Pylint compatible output.
+    """
+    if connector.language not in PYLINT_CONNECTOR_LANGUAGES:
+        return None
+    if not connector.code_directory.is_dir():
+        return await get_pylint_output(dagger_client, connector)
+    package_directory = connector.code_directory / connector.technical_name.replace("-", "_")
+    return await asyncer.asyncify(get_deprecation_analyzer().get_pylint_output)(package_directory)
@@ -7,6 +7,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+import asyncer
 from connector_ops.utils import Connector  # type: ignore
 from google.cloud import storage  # type: ignore
 
@@ -40,6 +41,13 @@ class ResultBackend(ABC):
     def artifact_already_exists(self, connector: Connector, file_to_persist: FileToPersist) -> bool:
         raise NotImplementedError("insights_already_exist method must be implemented by subclass")
 
+    # The backends use blocking clients: the async methods run them in worker threads so that they do not block the event loop
+    async def write_async(self, connector: Connector, file_to_persist: FileToPersist) -> None:
+        await asyncer.asyncify(self.write)(connector, file_to_persist)
+
+    async def artifact_already_exists_async(self, connector: Connector, file_to_persist: FileToPersist) -> bool:
+        return await asyncer.asyncify(self.artifact_already_exists)(connector, file_to_persist)
+
 
 class LocalDir(ResultBackend):
     def __init__(self, local_directory: Path):
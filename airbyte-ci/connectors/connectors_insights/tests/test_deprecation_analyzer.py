@@ -0,0 +1,192 @@
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+
+import json
+import textwrap
+
+import pytest
+from connectors_insights.deprecation_analyzer import DeprecationAnalyzer, DeprecationRules
+
+
+SOURCE = textwrap.dedent(
+    """\
+    import airbyte_cdk.logger
+    import airbyte_cdk.sources.streams.http.auth as auth
+    from airbyte_cdk import logger
+    from airbyte_cdk.logger import AirbyteLogger as Logger
+    from airbyte_cdk.sources.streams.http.auth import TokenAuthenticator
+    from source_google_analytics import GoogleAnalyticsDataApiBaseStream
+
+    from . import sub
+    from .sub import GoogleAnalyticsDataApiBaseStream as Base
+
+
+    class Stream(Base):
+        def get_updated_state(self, current_stream_state, latest_record):
+            return logger.AirbyteLogger()
+
+        async def read(self):
+            def get_updated_state():
+                return airbyte_cdk.logger.AirbyteLogger()
+
+            return auth.TokenAuthenticator("token")
+
+
+    def get_updated_state():
+        return sub.GoogleAnalyticsDataApiBaseStream()
+    """
+)
+
+SUB_MODULE_SOURCE = textwrap.dedent(
+    """\
+    from ..source import Stream
+    from .. import GoogleAnalyticsDataApiBaseStream
+    """
+)
+
+
+def pylint_message(path, obj, line, column, end_line, end_column, symbol, message):
+    message_id, message_type = {
+        "deprecated-module": ("W4901", "warning"),
+        "deprecated-class": ("W4904", "warning"),
+        "forbidden-method-name": ("C9001", "convention"),
+    }[symbol]
+    return {
+        "type": message_type,
+        "obj": obj,
+        "line": line,
+        "column": column,
+        "endLine": end_line,
+        "endColumn": end_column,
+        "symbol": symbol,
+        "message": message,
+        "message-id": message_id,
+        "module": "source_test." + path[:-3].replace("/", ".").replace(".__init__", ""),
+        "path": path,
+    }
+
+
+# The messages pylint reports with the cdk_deprecation_checkers plugin on the sources above
+EXPECTED_MESSAGES = [
+    pylint_message("source.py", "", 2, 0, 2, 52, "deprecated-module", "Deprecated module 'airbyte_cdk.sources.streams.http.auth'"),
+    pylint_message("source.py", "", 4, 0, 4, 54, "deprecated-class", "Using deprecated class AirbyteLogger of module airbyte_cdk.logger"),
+    pylint_message("source.py", "", 5, 0, 5, 68, "deprecated-module", "Deprecated module 'airbyte_cdk.sources.streams.http.auth'"),
+    pylint_message(
+        "source.py",
+        "",
+        6,
+        0,
+        6,
+        68,
+        "deprecated-class",
+        "Using deprecated class GoogleAnalyticsDataApiBaseStream of module source_google_analytics",
+    ),
+    pylint_message(
+        "source.py",
+        "",
+        9,
+        0,
+        9,
+        57,
+        "deprecated-class",
+        "Using deprecated class GoogleAnalyticsDataApiBaseStream of module source_test.sub",
+    ),
+    pylint_message(
+        "source.py", "Stream.get_updated_state", 13, 4, 13, 25, "forbidden-method-name", 'Method name "get_updated_state" is forbidden'
+    ),
+    pylint_message(
+        "source.py", "Stream.read.get_updated_state", 17, 8, 17, 29, "forbidden-method-name", 'Method name "get_updated_state" is forbidden'
+    ),
+    pylint_message(
+        "source.py", "get_updated_state", 23, 0, 23, 21, "forbidden-method-name", 'Method name "get_updated_state" is forbidden'
+    ),
+    pylint_message(
+        "source.py",
+        "get_updated_state",
+        24,
+        11,
+        24,
+        49,
+        "deprecated-class",
+        "Using deprecated class GoogleAnalyticsDataApiBaseStream of module sub",
+    ),
+    pylint_message(
+        "sub/streams.py",
+        "",
+        2,
+        0,
+        2,
+        47,
+        "deprecated-class",
+        "Using deprecated class GoogleAnalyticsDataApiBaseStream of module source_test",
+    ),
+]
+
+
+@pytest.fixture
+def connector_source_directory(tmp_path):
+    package_directory = tmp_path / "source_test"
+    (package_directory / "sub").mkdir(parents=True)
+    (package_directory / "__init__.py").write_text("")
+    (package_directory / "source.py").write_text(SOURCE)
+    (package_directory / "sub" / "__init__.py").write_text("")
+    (package_directory / "sub" / "streams.py").write_text(SUB_MODULE_SOURCE)
+    # Like pylint, directories which are not packages are not analyzed
+    (package_directory / "scripts").mkdir()
+    (package_directory / "scripts" / "script.py").write_text("from airbyte_cdk.logger import AirbyteLogger\n")
+    return package_directory
+
+
+def sort_messages(messages):
+    return sorted(messages, key=lambda message: (message["path"], message["line"], message["column"], message["symbol"]))
+
+
+def test_rules_are_read_from_the_pylint_plugin():
+    rules = DeprecationRules.from_pylint_plugin()
+
+    assert rules.deprecated_classes == frozenset({("airbyte_cdk.logger", "AirbyteLogger"), (None, "GoogleAnalyticsDataApiBaseStream")})
+    assert rules.deprecated_modules == frozenset({"airbyte_cdk.sources.streams.http.auth"})
+    assert rules.forbidden_method_names == frozenset({"get_updated_state"})
+
+
+def test_analyze_directory_reports_the_pylint_messages(connector_source_directory):
+    messages = DeprecationAnalyzer(cache_directory=None).analyze_directory(connector_source_directory)
+
+    assert sort_messages(messages) == EXPECTED_MESSAGES
+
+
+def test_calls_are_checked_with_the_module_name_as_written(connector_source_directory):
+    messages = DeprecationAnalyzer(cache_directory=None).analyze_directory(connector_source_directory)
+
+    # Without inference, `logger.AirbyteLogger()` is checked against the module `logger`, not `airbyte_cdk.logger`
+    assert not [message for message in messages if message["line"] in (14, 18)]
+
+
+def test_get_pylint_output_is_pylint_json(connector_source_directory):
+    pylint_output = DeprecationAnalyzer(cache_directory=None).get_pylint_output(connector_source_directory)
+
+    assert sort_messages(json.loads(pylint_output)) == EXPECTED_MESSAGES
+
+
+def test_analyze_source_ignores_syntax_errors():
+    assert DeprecationAnalyzer(cache_directory=None).analyze_source(b"def get_updated_state(:\n", "source_test.source") == []
+
+
+def test_analyze_missing_directory(tmp_path):
+    assert DeprecationAnalyzer(cache_directory=None).analyze_directory(tmp_path / "missing") == []
+
+
+def test_messages_are_cached_by_content(tmp_path, mocker):
+    cache_directory = tmp_path / "cache"
+    source = b"from airbyte_cdk.logger import AirbyteLogger\n"
+    messages = DeprecationAnalyzer(cache_directory=cache_directory).analyze_source(source, "source_test.source")
+    assert len(list(cache_directory.iterdir())) == 1
+
+    analyzer = DeprecationAnalyzer(cache_directory=cache_directory)
+    write_cache_spy = mocker.spy(analyzer, "_write_cache")
+    assert analyzer.analyze_source(source, "source_test.source") == messages
+    assert write_cache_spy.call_count == 0
+
+    # The module name is part of the cache key, as relative imports are resolved from it
+    assert analyzer.analyze_source(b"from . import GoogleAnalyticsDataApiBaseStream\n", "source_test.source") != analyzer.analyze_source(
+        b"from . import GoogleAnalyticsDataApiBaseStream\n", "source_other.source"
+    )
@@ -0,0 +1,164 @@
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+
+import functools
+import logging
+import threading
+from unittest.mock import MagicMock
+
+import anyio
+import pytest
+from connectors_insights import insights
+from connectors_insights.result_backends import ResultBackend
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class InMemoryBackend(ResultBackend):
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.fail = fail
+        self.written = {}
+
+    def _write(self, connector, file_to_persist):
+        if self.fail:
+            raise RuntimeError("backend is unavailable")
+        self.written[(connector.technical_name, file_to_persist.file_name)] = file_to_persist.file_content
+
+    def artifact_already_exists(self, connector, file_to_persist):
+        return (connector.technical_name, file_to_persist.file_name) in self.written
+
+
+def make_connector(technical_name):
+    connector = MagicMock()
+    connector.technical_name = technical_name
+    connector.sbom_url = f"https://example.com/{technical_name}/spdx.json"
+    return connector
+
+
+@pytest.fixture
+def generated_insights(mocker):
+    async def get_deprecation_analysis_output(dagger_client, connector):
+        return "[]"
+
+    mocker.patch.object(insights, "get_deprecation_analysis_output", side_effect=get_deprecation_analysis_output)
+    return mocker.patch.object(insights, "generate_insights", return_value=MagicMock(json=MagicMock(return_value='{"insights": true}')))
+
+
+def test_get_http_session_is_reused_in_a_thread_but_not_shared_across_threads():
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.extend([insights.get_http_session(), insights.get_http_session()]))
+    thread.start()
+    thread.join()
+
+    assert sessions[0] is sessions[1]
+    assert insights.get_http_session() is insights.get_http_session()
+    assert insights.get_http_session() is not sessions[0]
+
+
+def test_get_error_message_aggregates_exception_groups():
+    error = ExceptionGroup("unhandled errors", [ValueError("pylint failed"), ExceptionGroup("nested", [RuntimeError("sbom failed")])])
+
+    assert insights.get_error_message(error) == "pylint failed, sbom failed"
+
+
+async def test_run_concurrently_returns_results_in_order():
+    async def sleep_and_return(delay, value):
+        await anyio.sleep(delay)
+        return value
+
+    assert await insights.run_concurrently(
+        functools.partial(sleep_and_return, 0.02, "first"), functools.partial(sleep_and_return, 0, "second")
+    ) == ["first", "second"]
+
+
+async def test_generate_insights_for_connector_fetches_sboms_concurrently(mocker, generated_insights):
+    connectors = [make_connector(f"source-{i}") for i in range(3)]
+    # Each SBOM fetch blocks its worker thread until all the fetches started: this only passes if they run concurrently
+    all_fetches_started = threading.Barrier(len(connectors), timeout=10)
+    fetching_threads = set()
+
+    def fetch_sbom(connector):
+        fetching_threads.add(threading.get_ident())
+        all_fetches_started.wait()
+        return "{}"
+
+    mocker.patch.object(insights, "fetch_sbom", side_effect=fetch_sbom)
+    backend = InMemoryBackend()
+    semaphore = anyio.Semaphore(len(connectors))
+
+    results = []
+    async with anyio.create_task_group() as task_group:
+        for connector in connectors:
+
+            async def generate(connector=connector):
+                results.append(await insights.generate_insights_for_connector(MagicMock(), connector, semaphore, result_backends=[backend]))
+
+            task_group.start_soon(generate)
+
+    assert sorted(results, key=lambda result: result[1].technical_name) == [(True, connector) for connector in connectors]
+    assert len(fetching_threads) == len(connectors)
+    assert backend.written == {(connector.technical_name, "insights.json"): '{"insights": true}' for connector in connectors}
+
+
+async def test_generate_insights_for_connector_reports_all_the_errors(mocker, generated_insights, caplog):
+    pylint_failed = threading.Event()
+
+    async def get_deprecation_analysis_output(dagger_client, connector):
+        pylint_failed.set()
+        raise ValueError("pylint failed")
+
+    def fetch_sbom(connector):
+        # The SBOM download fails after the code analysis, which must not hide its error
+        pylint_failed.wait(timeout=10)
+        raise RuntimeError("sbom failed")
+
+    mocker.patch.object(insights, "get_deprecation_analysis_output", side_effect=get_deprecation_analysis_output)
+    mocker.patch.object(insights, "fetch_sbom", side_effect=fetch_sbom)
+    connector = make_connector("source-faulty")
+    backend = InMemoryBackend()
+
+    with caplog.at_level(logging.ERROR):
+        result = await insights.generate_insights_for_connector(MagicMock(), connector, anyio.Semaphore(1), result_backends=[backend])
+
+    assert result == (False, connector)
+    assert not backend.written
+    [record] = caplog.records
+    assert "Failed to generate insights for source-faulty" in record.message
+    assert "pylint failed" in record.message
+    assert "sbom failed" in record.message
+
+
+async def test_generate_insights_for_connector_reports_persistence_errors(mocker, generated_insights, caplog):
+    mocker.patch.object(insights, "fetch_sbom", return_value="{}")
+    connector = make_connector("source-test")
+    healthy_backend, failing_backend = InMemoryBackend(), InMemoryBackend(fail=True)
+
+    with caplog.at_level(logging.ERROR):
+        result = await insights.generate_insights_for_connector(
+            MagicMock(), connector, anyio.Semaphore(1), result_backends=[healthy_backend, failing_backend]
+        )
+
+    assert result == (False, connector)
+    assert healthy_backend.written == {("source-test", "insights.json"): '{"insights": true}'}
+    [record] = caplog.records
+    assert "Failed to persist insights for source-test: backend is unavailable" in record.message
+
+
+async def test_generate_insights_for_connector_skips_existing_insights(mocker, generated_insights):
+    fetch_sbom = mocker.patch.object(insights, "fetch_sbom")
+    connector = make_connector("source-test")
+    backend = InMemoryBackend()
+    backend.written[("source-test", "insights.json")] = "{}"
+
+    assert await insights.generate_insights_for_connector(MagicMock(), connector, anyio.Semaphore(1), result_backends=[backend]) == (
+        True,
+        connector,
+    )
+    fetch_sbom.assert_not_called()
+    generated_insights.assert_not_called()
@@ -1,5 +1,6 @@
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 
+import os
 from pathlib import Path
 from typing import Iterable, Optional, Set, Tuple
 
@@ -34,6 +35,8 @@ class CheckConnectorUsesHTTPSOnly(SecurityCheck):
         "acceptance_tests_logs",
         ".hypothesis",
         ".ruff_cache",
+        ".mypy_cache",
+        "__pycache__",
         "htmlcov",
     }
 
@@ -60,16 +63,21 @@ class CheckConnectorUsesHTTPSOnly(SecurityCheck):
     ) -> Iterable[Tuple[Path, str]]:
         ignored_directories = ignored_directories if ignored_directories is not None else set()
         ignored_filename_patterns = ignored_filename_patterns if ignored_filename_patterns is not None else set()
-
-        for path in directory.rglob("*"):
-            ignore_directory = any([ignored_directory in path.parts for ignored_directory in ignored_directories])
-            ignore_filename = any([path.match(ignored_filename_pattern) for ignored_filename_pattern in ignored_filename_patterns])
-            ignore = ignore_directory or ignore_filename
-            if path.is_file() and not ignore:
+        if not ignored_directories.isdisjoint(directory.parts):
+            return
+
+        # The ignored directories are pruned from the walk, so that virtual environments and caches are never listed
+        for root, directory_names, file_names in os.walk(directory):
+            directory_names[:] = sorted(directory_name for directory_name in directory_names if directory_name not in ignored_directories)
+            for file_name in sorted(file_names):
+                path = Path(root) / file_name
+                if any(path.match(ignored_filename_pattern) for ignored_filename_pattern in ignored_filename_patterns):
+                    continue
                 try:
-                    for line in open(path, "r"):
-                        yield path, line
-                except UnicodeDecodeError:
+                    with open(path, "r") as file:
+                        for line in file:
+                            yield path, line
+                except (UnicodeDecodeError, OSError):
                     continue
 
     @staticmethod
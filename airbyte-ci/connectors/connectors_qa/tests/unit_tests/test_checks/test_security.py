@@ -1,5 +1,8 @@
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 
+import os
+from pathlib import Path
+
 from connectors_qa import consts
 from connectors_qa.checks import security
 from connectors_qa.models import CheckStatus
@@ -47,6 +50,66 @@ class TestCheckConnectorUsesHTTPSOnly:
         assert result.status == CheckStatus.PASSED
         assert result.message == "No file with http:// URLs found"
 
+    def test_ignored_directories_are_not_walked(self, mocker, tmp_path):
+        # Arrange
+        connector = mocker.MagicMock(code_directory=tmp_path)
+        (tmp_path / "file.py").write_text("http://example.com")
+        (tmp_path / ".venv" / "lib").mkdir(parents=True)
+        (tmp_path / ".venv" / "lib" / "dependency.py").write_text("http://example.com")
+        walked_directories = []
+        walk = os.walk
+
+        def recording_walk(*args, **kwargs):
+            for root, directory_names, file_names in walk(*args, **kwargs):
+                walked_directories.append(Path(root))
+                yield root, directory_names, file_names
+
+        mocker.patch.object(security.os, "walk", recording_walk)
+
+        # Act
+        result = security.CheckConnectorUsesHTTPSOnly()._run(connector)
+
+        # Assert
+        assert result.status == CheckStatus.FAILED
+        assert result.message == f"The following files have http:// URLs:\n\t- {tmp_path / 'file.py'}"
+        assert walked_directories == [tmp_path]
+
+    def test_pass_when_connector_directory_is_ignored(self, mocker, tmp_path):
+        # Arrange
+        connector = mocker.MagicMock(code_directory=tmp_path / "source-file")
+        connector.code_directory.mkdir()
+        (connector.code_directory / "file.py").write_text("http://example.com")
+
+        # Act
+        result = security.CheckConnectorUsesHTTPSOnly()._run(connector)
+
+        # Assert
+        assert result.status == CheckStatus.PASSED
+
+    def test_files_are_read_up_to_a_decode_error(self, tmp_path):
+        # Arrange
+        (tmp_path / "main.py").write_text("first line\nsecond line")
+        # Larger than the decoding buffer, so that lines are read before the invalid bytes are decoded
+        (tmp_path / "partially_binary.txt").write_bytes(b"text line\n" * 10000 + b"\xff\xfe\x00")
+
+        # Act
+        lines = list(security.CheckConnectorUsesHTTPSOnly._read_all_files_in_directory(tmp_path))
+
+        # Assert
+        assert lines[:2] == [(tmp_path / "main.py", "first line\n"), (tmp_path / "main.py", "second line")]
+        assert lines[2:]
+        assert set(lines[2:]) == {(tmp_path / "partially_binary.txt", "text line\n")}
+
+    def test_lines_are_only_split_on_line_feeds(self, tmp_path):
+        # Arrange
+        (tmp_path / "main.py").write_text("first\x0bline\u2028\nsecond line\x1c\n")
+
+        # Act
+        lines = list(security.CheckConnectorUsesHTTPSOnly._read_all_files_in_directory(tmp_path))
+
+        # Assert
+        assert lines == [(tmp_path / "main.py", "first\x0bline\u2028\n"), (tmp_path / "main.py", "second line\x1c\n")]
+
     def test_pass_when_http_url_in_ignored_patterns(self, mocker, tmp_path):
         # Arrange
         connector = mocker.MagicMock(code_directory=tmp_path)
@@ -1,6 +1,7 @@
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 from __future__ import annotations
 
+import json
 import logging
 import re
 from collections.abc import Iterable
@@ -8,6 +9,7 @@ from pathlib import Path
 from typing import Optional
 
 import duckdb
+import pyarrow as pa  # type: ignore
 from airbyte_protocol.models import AirbyteMessage  # type: ignore
 
 from live_tests.commons.backends.file_backend import FileBackend
@@ -15,6 +17,9 @@ from live_tests.commons.backends.file_backend import FileBackend
 
 class DuckDbBackend(FileBackend):
     SAMPLE_SIZE = -1
+    # Table storing each record as a canonical JSON value, without its emission timestamp, to compare records across executions
+    RECORDS_JSON_TABLE_NAME = "records_json"
+    RECORDS_JSON_BATCH_SIZE = 10_000
 
     def __init__(
         self,
@@ -25,6 +30,8 @@ class DuckDbBackend(FileBackend):
         super().__init__(output_directory)
         self.duckdb_path = duckdb_path
         self.schema = schema
+        self._duck_db_conn: Optional[duckdb.DuckDBPyConnection] = None
+        self._records_json_batch: tuple[list[str], list[str]] = ([], [])
 
     @property
     def jsonl_files_to_insert(self) -> Iterable[Path]:
@@ -39,6 +46,16 @@ class DuckDbBackend(FileBackend):
             self.jsonl_records_path,
         ]
 
+    @property
+    def sanitized_schema_name(self) -> str:
+        if not self.schema:
+            return "main"
+        return "_".join([self.sanitize_table_name(s) for s in self.schema])
+
+    @property
+    def records_json_table(self) -> str:
+        return f"{self.sanitized_schema_name}.{self.RECORDS_JSON_TABLE_NAME}"
+
     @staticmethod
     def sanitize_table_name(table_name: str) -> str:
         sanitized = str(table_name).replace(" ", "_")
@@ -48,33 +65,68 @@ class DuckDbBackend(FileBackend):
         return sanitized
 
     def write(self, airbyte_messages: Iterable[AirbyteMessage]) -> None:
-        # Use the FileBackend to write the messages to disk as jsonl files
-        super().write(airbyte_messages)
         duck_db_conn = duckdb.connect(str(self.duckdb_path))
+        try:
+            sanitized_schema_name = self.sanitized_schema_name
+            if self.schema:
+                duck_db_conn.sql(f"CREATE SCHEMA IF NOT EXISTS {sanitized_schema_name}")
+                duck_db_conn.sql(f"USE {sanitized_schema_name}")
+                logging.info(f"Using schema {sanitized_schema_name}")
+
+            # The table is created even without records so that executions can always be compared.
+            # Records are appended to it in Arrow batches while the FileBackend writes the messages to disk as jsonl files.
+            duck_db_conn.sql(f"CREATE TABLE {self.RECORDS_JSON_TABLE_NAME} (stream VARCHAR, record JSON)")
+            self._duck_db_conn = duck_db_conn
+            try:
+                super().write(airbyte_messages)
+                self._append_records_json_batch()
+            finally:
+                self._duck_db_conn = None
+                self._records_json_batch = ([], [])
+            logging.info(f"Table {self.RECORDS_JSON_TABLE_NAME} created in schema {sanitized_schema_name}")
+
+            # Typed tables are inferred from the whole jsonl files, they can only be created once the files are complete
+            for json_file in self.jsonl_files_to_insert:
+                if json_file.exists():
+                    table_name = self.sanitize_table_name(json_file.stem)
+                    logging.info(f"Creating table {table_name} from {json_file} in schema {sanitized_schema_name}")
+                    duck_db_conn.sql(
+                        f"CREATE TABLE {table_name} AS SELECT * FROM read_json_auto('{json_file}', sample_size = {self.SAMPLE_SIZE}, format = 'newline_delimited')"
+                    )
+                    logging.info(f"Table {table_name} created in schema {sanitized_schema_name}")
+
+            for json_file in self.record_per_stream_paths_data_only.values():
+                if json_file.exists():
+                    table_name = self.sanitize_table_name(f"records_{json_file.stem}")
+                    logging.info(
+                        f"Creating table {table_name} from {json_file} in schema {sanitized_schema_name} to store stream records with the data field only"
+                    )
+                    duck_db_conn.sql(
+                        f"CREATE TABLE {self.sanitize_table_name(table_name)} AS SELECT * FROM read_json_auto('{json_file}', sample_size = {self.SAMPLE_SIZE}, format = 'newline_delimited')"
+                    )
+                    logging.info(f"Table {table_name} created in schema {sanitized_schema_name}")
+        finally:
+            duck_db_conn.close()
+
+    def _on_record(self, message: AirbyteMessage, serialized_data: str) -> None:
+        if self._duck_db_conn is None:
+            return
+        streams, records = self._records_json_batch
+        streams.append(message.record.stream)
+        # The data is serialized with sorted keys, so identical records have identical JSON values
+        serialized_meta = message.record.meta.json(sort_keys=True) if message.record.meta else "null"
+        records.append(f'{{"namespace": {json.dumps(message.record.namespace)}, "data": {serialized_data}, "meta": {serialized_meta}}}')
+        if len(records) >= self.RECORDS_JSON_BATCH_SIZE:
+            self._append_records_json_batch()
 
-        if self.schema:
-            sanitized_schema_name = "_".join([self.sanitize_table_name(s) for s in self.schema])
-            duck_db_conn.sql(f"CREATE SCHEMA IF NOT EXISTS {sanitized_schema_name}")
-            duck_db_conn.sql(f"USE {sanitized_schema_name}")
-            logging.info(f"Using schema {sanitized_schema_name}")
-
-        for json_file in self.jsonl_files_to_insert:
-            if json_file.exists():
-                table_name = self.sanitize_table_name(json_file.stem)
-                logging.info(f"Creating table {table_name} from {json_file} in schema {sanitized_schema_name}")
-                duck_db_conn.sql(
-                    f"CREATE TABLE {table_name} AS SELECT * FROM read_json_auto('{json_file}', sample_size = {self.SAMPLE_SIZE}, format = 'newline_delimited')"
-                )
-                logging.info(f"Table {table_name} created in schema {sanitized_schema_name}")
-
-        for json_file in self.record_per_stream_paths_data_only.values():
-            if json_file.exists():
-                table_name = self.sanitize_table_name(f"records_{json_file.stem}")
-                logging.info(
-                    f"Creating table {table_name} from {json_file} in schema {sanitized_schema_name} to store stream records with the data field only"
-                )
-                duck_db_conn.sql(
-                    f"CREATE TABLE {self.sanitize_table_name(table_name)} AS SELECT * FROM read_json_auto('{json_file}', sample_size = {self.SAMPLE_SIZE}, format = 'newline_delimited')"
-                )
-                logging.info(f"Table {table_name} created in schema {sanitized_schema_name}")
-        duck_db_conn.close()
+    def _append_records_json_batch(self) -> None:
+        streams, records = self._records_json_batch
+        if not records or self._duck_db_conn is None:
+            return
+        records_json_batch = pa.table({"stream": pa.array(streams, type=pa.string()), "record": pa.array(records, type=pa.string())})
+        self._duck_db_conn.register("records_json_batch", records_json_batch)
+        try:
+            self._duck_db_conn.sql(f"INSERT INTO {self.RECORDS_JSON_TABLE_NAME} SELECT stream, record::JSON FROM records_json_batch")
+        finally:
+            self._duck_db_conn.unregister("records_json_batch")
+        self._records_json_batch = ([], [])
@@ -3,23 +3,87 @@ from __future__ import annotations
 
 import json
 import logging
+import queue
+import threading
 from collections.abc import Iterable
 from pathlib import Path
-from typing import Any, TextIO
+from types import TracebackType
+from typing import Optional
 
 from airbyte_protocol.models import AirbyteMessage  # type: ignore
 from airbyte_protocol.models import Type as AirbyteMessageType
-from cachetools import LRUCache, cached
 
 from live_tests.commons.backends.base_backend import BaseBackend
 from live_tests.commons.utils import sanitize_stream_name
 
 
-class FileDescriptorLRUCache(LRUCache):
-    def popitem(self) -> tuple[Any, Any]:
-        filepath, fd = LRUCache.popitem(self)
-        fd.close()  # type: ignore  # Close the file descriptor when it's evicted from the cache
-        return filepath, fd
+class BufferedFileWriter:
+    """Buffer the lines written to each file in memory and append full buffers to the files on a background thread.
+
+    A file is only open while a buffer is appended to it, so the number of open file descriptors does not grow
+    with the number of streams. The buffers of a file are appended in the order they were filled.
+    """
+
+    DEFAULT_BUFFER_SIZE = 1024 * 1024
+    MAX_PENDING_BUFFERS = 64
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE, max_pending_buffers: int = MAX_PENDING_BUFFERS):
+        self.buffer_size = buffer_size
+        self._buffers: dict[Path, list[str]] = {}
+        self._buffer_sizes: dict[Path, int] = {}
+        # Bounding the queue applies backpressure on the producer when the disk is slower than the message parsing
+        self._pending_buffers: queue.Queue[Optional[tuple[Path, list[str]]]] = queue.Queue(maxsize=max_pending_buffers)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._append_pending_buffers, name="file-backend-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> BufferedFileWriter:
+        return self
+
+    def __exit__(
+        self, exc_type: Optional[type[BaseException]], exc_value: Optional[BaseException], traceback: Optional[TracebackType]
+    ) -> None:
+        self.close()
+
+    def write(self, path: Path, line: str) -> None:
+        self._buffers.setdefault(path, []).append(line)
+        buffer_size = self._buffer_sizes.get(path, 0) + len(line)
+        if buffer_size >= self.buffer_size:
+            self._flush(path)
+        else:
+            self._buffer_sizes[path] = buffer_size
+
+    def close(self) -> None:
+        """Append the remaining buffers and wait for the background thread to finish."""
+        try:
+            for path in list(self._buffers):
+                self._flush(path)
+        finally:
+            self._pending_buffers.put(None)
+            self._thread.join()
+        self._raise_on_error()
+
+    def _flush(self, path: Path) -> None:
+        lines = self._buffers.pop(path)
+        self._buffer_sizes.pop(path, None)
+        self._raise_on_error()
+        self._pending_buffers.put((path, lines))
+
+    def _raise_on_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _append_pending_buffers(self) -> None:
+        while (pending_buffer := self._pending_buffers.get()) is not None:
+            if self._error is not None:
+                # Keep consuming the queue so that the producer never blocks after a failure
+                continue
+            path, lines = pending_buffer
+            try:
+                with open(path, "a") as f:
+                    f.write("".join(lines))
+            except BaseException as e:
+                self._error = e
 
 
 class FileBackend(BaseBackend):
@@ -31,7 +95,6 @@ class FileBackend(BaseBackend):
     RELATIVE_TRACES_PATH = "traces.jsonl"
     RELATIVE_LOGS_PATH = "logs.jsonl"
     RELATIVE_CONTROLS_PATH = "controls.jsonl"
-    CACHE = FileDescriptorLRUCache(maxsize=250)
 
     def __init__(self, output_directory: Path):
         self._output_directory = output_directory
@@ -89,27 +152,36 @@ class FileBackend(BaseBackend):
         """
         Write AirbyteMessages to the appropriate file.
 
-        We use an LRU cache here to manage open file objects, in order to limit the number of concurrently open file
-        descriptors. This mitigates the risk of hitting limits on the number of open file descriptors, particularly for
-        connections with a high number of streams. The cache is designed to automatically close files upon eviction.
+        Each message is serialized once, in the calling thread, and the serialized lines are handed to a BufferedFileWriter
+        which appends them to the files on a background thread. Files are only open while a buffer is appended to them,
+        which avoids hitting limits on the number of open file descriptors for connections with a high number of streams.
         """
-
-        @cached(cache=self.CACHE)
-        def _open_file(path: Path) -> TextIO:
-            return open(path, "a")
-
-        try:
-            logging.info("Writing airbyte messages to disk")
+        logging.info("Writing airbyte messages to disk")
+        output_paths: dict[str, Path] = {}
+        with BufferedFileWriter() as writer:
             for _message in airbyte_messages:
                 if not isinstance(_message, AirbyteMessage):
                     continue
                 filepaths, messages = self._get_filepaths_and_messages(_message)
                 for filepath, message in zip(filepaths, messages, strict=False):
-                    _open_file(self._output_directory / filepath).write(f"{message}\n")
-            logging.info("Finished writing airbyte messages to disk")
-        finally:
-            for f in self.CACHE.values():
-                f.close()
+                    if (output_path := output_paths.get(filepath)) is None:
+                        output_path = output_paths[filepath] = self._output_directory / filepath
+                    writer.write(output_path, f"{message}\n")
+        logging.info("Finished writing airbyte messages to disk")
+
+    def _on_record(self, message: AirbyteMessage, serialized_data: str) -> None:
+        """Hook called for each record message written, with the serialized record data. Subclasses can reuse it to ingest records."""
+        pass
+
+    @staticmethod
+    def _serialize_record_message(message: AirbyteMessage, serialized_data: str) -> str:
+        """Serialize a record message with sorted keys, splicing its already serialized data instead of serializing it again.
+
+        The result is the same as message.json(sort_keys=True): "data" is the first key of the sorted record fields,
+        and the fields sorted before "record" are null on record messages.
+        """
+        serialized_message_without_data = message.json(sort_keys=True, exclude={"record": {"data"}})
+        return serialized_message_without_data.replace('"record": {', f'"record": {{"data": {serialized_data}, ', 1)
 
     def _get_filepaths_and_messages(self, message: AirbyteMessage) -> tuple[tuple[str, ...], tuple[str, ...]]:
         if message.type == AirbyteMessageType.CATALOG:
@@ -120,18 +192,25 @@ class FileBackend(BaseBackend):
 
         elif message.type == AirbyteMessageType.RECORD:
             stream_name = message.record.stream
-            stream_file_path = self.record_per_stream_directory / f"{sanitize_stream_name(stream_name)}.jsonl"
-            stream_file_path_data_only = self.record_per_stream_directory / f"{sanitize_stream_name(stream_name)}_data_only.jsonl"
-            self.record_per_stream_paths[stream_name] = stream_file_path
-            self.record_per_stream_paths_data_only[stream_name] = stream_file_path_data_only
+            if stream_name not in self.record_per_stream_paths:
+                self.record_per_stream_paths[stream_name] = self.record_per_stream_directory / f"{sanitize_stream_name(stream_name)}.jsonl"
+                self.record_per_stream_paths_data_only[stream_name] = (
+                    self.record_per_stream_directory / f"{sanitize_stream_name(stream_name)}_data_only.jsonl"
+                )
+            stream_file_path = self.record_per_stream_paths[stream_name]
+            stream_file_path_data_only = self.record_per_stream_paths_data_only[stream_name]
+            # The record data, which is the bulk of the message, is serialized once and reused for every output
+            serialized_data = json.dumps(message.record.data, sort_keys=True)
+            serialized_message = self._serialize_record_message(message, serialized_data)
+            self._on_record(message, serialized_data)
             return (
                 self.RELATIVE_RECORDS_PATH,
                 str(stream_file_path),
                 str(stream_file_path_data_only),
             ), (
-                message.json(sort_keys=True),
-                message.json(sort_keys=True),
-                json.dumps(message.record.data, sort_keys=True),
+                serialized_message,
+                serialized_message,
+                serialized_data,
             )
 
         elif message.type == AirbyteMessageType.SPEC:
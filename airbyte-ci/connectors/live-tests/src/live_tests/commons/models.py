@@ -7,11 +7,11 @@ import hashlib
 import json
 import logging
 import tempfile
+from array import array
 from collections import defaultdict
 from collections.abc import Iterable, Iterator, MutableMapping
 from dataclasses import dataclass, field
 from enum import Enum
-from functools import cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -255,6 +255,66 @@ class ExecutionInputs:
         return output_dir
 
 
+@dataclass
+class ExecutionResultIndex:
+    """Aggregates of the messages produced by a command execution, built in a single pass over the command output.
+
+    Records are not kept in memory: the byte offsets of their lines in the command output are indexed per stream,
+    so that the records of a stream can be parsed again without scanning the whole output.
+    """
+
+    message_count_per_type: dict[AirbyteMessageType, int] = field(default_factory=lambda: defaultdict(int))
+    record_count_per_stream: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    record_offsets_per_stream: dict[str, array] = field(default_factory=dict)
+    primary_key_hashes_per_stream: dict[str, set[int]] = field(default_factory=lambda: defaultdict(set))
+    states_per_stream: dict[str, list[AirbyteStateMessage]] = field(default_factory=lambda: defaultdict(list))
+    status_messages_per_stream: dict[str, list[AirbyteStreamStatusTraceMessage]] = field(default_factory=lambda: defaultdict(list))
+    stream_schema_builders: dict[str, SchemaBuilder] = field(default_factory=dict)
+
+    @property
+    def stream_schemas(self) -> dict[str, Any]:
+        return {stream: sort_dict_keys(builder.to_schema()) for stream, builder in self.stream_schema_builders.items()}
+
+    @staticmethod
+    def hash_primary_key_value(record_data: dict[str, Any], primary_key: List[str]) -> int:
+        """Hash the value of the primary key field of a record. A missing field and a null value have different hashes."""
+        primary_key_value: Any = record_data
+        for key_part in primary_key:
+            if not isinstance(primary_key_value, dict) or key_part not in primary_key_value:
+                serialized_value = b""
+                break
+            primary_key_value = primary_key_value[key_part]
+        else:
+            serialized_value = json.dumps(primary_key_value, sort_keys=True).encode("utf-8")
+        # 64 bits hashes keep the sets small, collisions are negligible for the number of records of a connection
+        return int.from_bytes(hashlib.blake2b(serialized_value, digest_size=8).digest(), "big")
+
+    def add(self, message: AirbyteMessage, offset: int, primary_key: Optional[List[str]] = None) -> None:
+        """Index a message of the command output.
+
+        Args:
+            message (AirbyteMessage): The parsed message.
+            offset (int): The byte offset of the message line in the command output.
+            primary_key (Optional[List[str]], optional): The path of the primary key field in the records of the message stream.
+        """
+        self.message_count_per_type[message.type] += 1
+        if message.type is AirbyteMessageType.RECORD:
+            stream = message.record.stream
+            self.record_count_per_stream[stream] += 1
+            self.record_offsets_per_stream.setdefault(stream, array("Q")).append(offset)
+            if primary_key:
+                self.primary_key_hashes_per_stream[stream].add(self.hash_primary_key_value(message.record.data, primary_key))
+            if stream not in self.stream_schema_builders:
+                stream_schema_builder = SchemaBuilder()
+                stream_schema_builder.add_schema({"type": "object", "properties": {}})
+                self.stream_schema_builders[stream] = stream_schema_builder
+            self.stream_schema_builders[stream].add_object(ExecutionResult.get_obfuscated_types(message.record.data))
+        elif message.type is AirbyteMessageType.STATE and message.state.stream:
+            self.states_per_stream[message.state.stream.stream_descriptor.name].append(message.state)
+        elif message.type is AirbyteMessageType.TRACE and message.trace.type == TraceType.STREAM_STATUS:
+            self.status_messages_per_stream[message.trace.stream_status.stream_descriptor.name].append(message.trace.stream_status)
+
+
 @dataclass
 class ExecutionResult:
     hashed_connection_id: str
@@ -271,6 +331,7 @@ class ExecutionResult:
     http_flows: list[http.HTTPFlow] = field(default_factory=list)
     stream_schemas: Optional[dict[str, Any]] = None
     backend: Optional[FileBackend] = None
+    _index: Optional[ExecutionResultIndex] = field(default=None, repr=False)
 
     HTTP_DUMP_FILE_NAME = "http_dump.mitm"
     HAR_FILE_NAME = "http_dump.har"
@@ -295,6 +356,32 @@ class ExecutionResult:
     def primary_keys_per_stream(self) -> Dict[str, List[str]]:
         return {stream.stream.name: stream.primary_key[0] if stream.primary_key else None for stream in self.configured_catalog.streams}
 
+    @property
+    def index(self) -> ExecutionResultIndex:
+        """The aggregates of the command output, built by the first pass over the messages if it was not already built."""
+        if self._index is None:
+            for _ in self.parse_and_index_airbyte_messages():
+                pass
+        assert self._index is not None
+        return self._index
+
+    def parse_and_index_airbyte_messages(self) -> Iterator[AirbyteMessage]:
+        """Parse the messages of the command output, building the execution result index on the way."""
+        index = ExecutionResultIndex()
+        primary_keys_per_stream = self.primary_keys_per_stream if self.configured_catalog else {}
+        offset = 0
+        with open(self.stdout_file_path, "rb") as command_output:
+            for line in command_output:
+                try:
+                    message = AirbyteMessage.parse_raw(line)
+                except ValidationError:
+                    pass
+                else:
+                    index.add(message, offset, primary_keys_per_stream.get(message.record.stream) if message.record else None)
+                    yield message
+                offset += len(line)
+        self._index = index
+
     @classmethod
     async def load(
         cls: type[ExecutionResult],
@@ -354,16 +441,9 @@ class ExecutionResult:
 
     def generate_stream_schemas(self) -> dict[str, Any]:
         self.logger.info("Generating stream schemas")
-        stream_builders: dict[str, SchemaBuilder] = {}
-        for record in self.get_records():
-            stream = record.record.stream
-            if stream not in stream_builders:
-                stream_schema_builder = SchemaBuilder()
-                stream_schema_builder.add_schema({"type": "object", "properties": {}})
-                stream_builders[stream] = stream_schema_builder
-            stream_builders[stream].add_object(self.get_obfuscated_types(record.record.data))
+        stream_schemas = self.index.stream_schemas
         self.logger.info("Stream schemas generated")
-        return {stream: sort_dict_keys(stream_builders[stream].to_schema()) for stream in stream_builders}
+        return stream_schemas
 
     @staticmethod
     def get_obfuscated_types(data: dict[str, Any]) -> dict[str, Any]:
@@ -392,40 +472,33 @@ class ExecutionResult:
         return types
 
     def get_records_per_stream(self, stream: str) -> Iterator[AirbyteMessage]:
-        assert self.backend is not None, "Backend must be set to get records per stream"
         self.logger.info(f"Reading records for stream {stream}")
-        if stream not in self.backend.record_per_stream_paths:
+        if stream not in self.index.record_offsets_per_stream:
             self.logger.warning(f"No records found for stream {stream}")
-            yield from []
-        else:
-            for message in self.parse_airbyte_messages_from_command_output(
-                self.backend.record_per_stream_paths[stream], log_validation_errors=True
-            ):
-                if message.type is AirbyteMessageType.RECORD:
-                    yield message
+            return
+        # Only the indexed lines of the stream records are read from the command output
+        with open(self.stdout_file_path, "rb") as command_output:
+            for offset in self.index.record_offsets_per_stream[stream]:
+                command_output.seek(offset)
+                yield AirbyteMessage.parse_raw(command_output.readline())
+
+    def get_record_count_per_stream(self) -> dict[str, int]:
+        return dict(self.index.record_count_per_stream)
+
+    def get_primary_key_hashes(self, stream: str) -> set[int]:
+        """Hashes of the primary key values of the records of a stream, see ExecutionResultIndex.hash_primary_key_value."""
+        return self.index.primary_key_hashes_per_stream.get(stream, set())
 
     def get_states_per_stream(self, stream: str) -> Dict[str, List[AirbyteStateMessage]]:
         self.logger.info(f"Reading state messages for stream {stream}")
-        states = defaultdict(list)
-        for message in self.airbyte_messages:
-            if message.type is AirbyteMessageType.STATE:
-                states[message.state.stream.stream_descriptor.name].append(message.state)
-        return states
+        return defaultdict(list, self.index.states_per_stream)
 
     def get_status_messages_per_stream(self, stream: str) -> Dict[str, List[AirbyteStreamStatusTraceMessage]]:
         self.logger.info(f"Reading state messages for stream {stream}")
-        statuses = defaultdict(list)
-        for message in self.airbyte_messages:
-            if message.type is AirbyteMessageType.TRACE and message.trace.type == TraceType.STREAM_STATUS:
-                statuses[message.trace.stream_status.stream_descriptor.name].append(message.trace.stream_status)
-        return statuses
+        return defaultdict(list, self.index.status_messages_per_stream)
 
-    @cache
     def get_message_count_per_type(self) -> dict[AirbyteMessageType, int]:
-        message_count: dict[AirbyteMessageType, int] = defaultdict(int)
-        for message in self.airbyte_messages:
-            message_count[message.type] += 1
-        return message_count
+        return self.index.message_count_per_type
 
     async def save_http_dump(self, output_dir: Path) -> None:
         if self.http_dump:
@@ -450,7 +523,8 @@ class ExecutionResult:
             self.backend = DuckDbBackend(airbyte_messages_dir, duckdb_path, self.duckdb_schema)
         else:
             self.backend = FileBackend(airbyte_messages_dir)
-        self.backend.write(self.airbyte_messages)
+        # The messages are indexed while they are written, the command output is parsed once for both
+        self.backend.write(self.parse_and_index_airbyte_messages())
         self.logger.info("Airbyte messages saved")
 
     def save_stream_schemas(self, output_dir: Path) -> None:
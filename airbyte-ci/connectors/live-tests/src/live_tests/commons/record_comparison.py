@@ -0,0 +1,207 @@
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Optional
+
+import duckdb
+
+from live_tests.commons.backends import DuckDbBackend
+from live_tests.commons.models import ExecutionResult
+
+MAX_DIFF_SAMPLE_SIZE = 100
+
+
+@dataclass
+class RecordsSample:
+    """The number of records matching a comparison criteria and a bounded sample of these records."""
+
+    count: int = 0
+    records: list[Any] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+
+@dataclass
+class StreamRecordsDiff:
+    """Differences between the records of a stream produced by the control and target versions.
+
+    changed: pairs of control and target records with the same primary key but different values.
+    control_only: records produced by the control version only.
+    target_only: records produced by the target version only.
+    """
+
+    changed: RecordsSample
+    control_only: RecordsSample
+    target_only: RecordsSample
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.control_only or self.target_only)
+
+
+class DuckDbRecordsComparison:
+    """Compare the records of a control and a target execution with joins over the tables written by their DuckDB backends.
+
+    Records are never loaded in Python: each check returns counts and a sample of at most `sample_size` records,
+    so that memory usage does not depend on the number of records produced by the connector.
+    """
+
+    def __init__(self, duckdb_path: Path, control_table: str, target_table: str, sample_size: int = MAX_DIFF_SAMPLE_SIZE):
+        self.duckdb_path = duckdb_path
+        self.control_table = control_table
+        self.target_table = target_table
+        self.sample_size = sample_size
+        self._connection: Optional[duckdb.DuckDBPyConnection] = None
+
+    @classmethod
+    def from_execution_results(
+        cls: type[DuckDbRecordsComparison],
+        control_execution_result: ExecutionResult,
+        target_execution_result: ExecutionResult,
+        sample_size: int = MAX_DIFF_SAMPLE_SIZE,
+    ) -> DuckDbRecordsComparison:
+        control_backend, target_backend = control_execution_result.backend, target_execution_result.backend
+        assert isinstance(control_backend, DuckDbBackend), "The control execution artifacts must be saved to DuckDB to compare records."
+        assert isinstance(target_backend, DuckDbBackend), "The target execution artifacts must be saved to DuckDB to compare records."
+        assert control_backend.duckdb_path == target_backend.duckdb_path, "Control and target records must be stored in the same database."
+        return cls(control_backend.duckdb_path, control_backend.records_json_table, target_backend.records_json_table, sample_size)
+
+    def __enter__(self) -> DuckDbRecordsComparison:
+        self._connection = duckdb.connect(str(self.duckdb_path))
+        return self
+
+    def __exit__(
+        self, exc_type: Optional[type[BaseException]], exc_value: Optional[BaseException], traceback: Optional[TracebackType]
+    ) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    @property
+    def connection(self) -> duckdb.DuckDBPyConnection:
+        assert self._connection is not None, "The comparison must be used as a context manager to query the database."
+        return self._connection
+
+    @staticmethod
+    def get_primary_key_path(primary_key: list[str]) -> str:
+        """Build the JSON path of a primary key field in the record JSON values, e.g. ["id"] -> '$.data."id"'."""
+        return "$.data." + ".".join(json.dumps(key_part) for key_part in primary_key)
+
+    def get_record_counts(self) -> tuple[dict[str, int], dict[str, int]]:
+        """Count the records of each stream on the control and target versions."""
+        return self._get_record_counts(self.control_table), self._get_record_counts(self.target_table)
+
+    def get_records_with_missing_primary_key(self, stream: str, primary_key: list[str]) -> RecordsSample:
+        """Find the control records whose primary key value is not produced by the target version."""
+        missing_records_query = f"""
+            SELECT control.record
+            FROM {self.control_table} AS control
+            WHERE control.stream = $stream AND NOT EXISTS (
+                SELECT 1 FROM {self.target_table} AS target
+                WHERE target.stream = $stream
+                AND json_extract(target.record, $pk_path) IS NOT DISTINCT FROM json_extract(control.record, $pk_path)
+            )
+        """
+        parameters = {"stream": stream, "pk_path": self.get_primary_key_path(primary_key)}
+        count = self._fetch_value(f"SELECT count(*) FROM ({missing_records_query})", parameters)
+        sample = self.connection.execute(
+            f"{missing_records_query} ORDER BY json_extract(control.record, $pk_path) LIMIT {self.sample_size}", parameters
+        ).fetchall()
+        return RecordsSample(count, [json.loads(record) for (record,) in sample])
+
+    def get_diff_with_primary_key(self, stream: str, primary_key: list[str]) -> StreamRecordsDiff:
+        """Match control and target records on their primary key value and find the records which differ.
+
+        Records sharing a primary key value are matched in the order of their JSON value,
+        so that extra duplicates on one side are reported as records produced by this side only.
+        """
+        self.connection.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE mismatching_records AS
+            WITH
+                control AS (
+                    SELECT pk, record, row_number() OVER (PARTITION BY pk ORDER BY record) AS occurrence
+                    FROM (SELECT json_extract(record, $pk_path) AS pk, record FROM {self.control_table} WHERE stream = $stream)
+                ),
+                target AS (
+                    SELECT pk, record, row_number() OVER (PARTITION BY pk ORDER BY record) AS occurrence
+                    FROM (SELECT json_extract(record, $pk_path) AS pk, record FROM {self.target_table} WHERE stream = $stream)
+                )
+            SELECT coalesce(control.pk, target.pk) AS pk, control.record AS control_record, target.record AS target_record
+            FROM control
+            FULL OUTER JOIN target ON control.pk IS NOT DISTINCT FROM target.pk AND control.occurrence = target.occurrence
+            WHERE control.record IS DISTINCT FROM target.record
+            """,
+            {"stream": stream, "pk_path": self.get_primary_key_path(primary_key)},
+        )
+        try:
+            return StreamRecordsDiff(
+                changed=self._sample_mismatching_records(
+                    "control_record IS NOT NULL AND target_record IS NOT NULL", ["control_record", "target_record"]
+                ),
+                control_only=self._sample_mismatching_records("target_record IS NULL", ["control_record"]),
+                target_only=self._sample_mismatching_records("control_record IS NULL", ["target_record"]),
+            )
+        finally:
+            self.connection.execute("DROP TABLE mismatching_records")
+
+    def get_diff_without_primary_key(self, stream: str) -> StreamRecordsDiff:
+        """Compare the control and target records of a stream as multisets, ignoring their order."""
+        self.connection.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE mismatching_records AS
+            WITH
+                control AS (SELECT record, count(*) AS occurrences FROM {self.control_table} WHERE stream = $stream GROUP BY record),
+                target AS (SELECT record, count(*) AS occurrences FROM {self.target_table} WHERE stream = $stream GROUP BY record)
+            SELECT
+                coalesce(control.record, target.record) AS record,
+                coalesce(control.occurrences, 0) AS control_occurrences,
+                coalesce(target.occurrences, 0) AS target_occurrences
+            FROM control
+            FULL OUTER JOIN target ON control.record = target.record
+            WHERE control_occurrences != target_occurrences
+            """,
+            {"stream": stream},
+        )
+        try:
+            return StreamRecordsDiff(
+                changed=RecordsSample(),
+                control_only=self._sample_unmatched_occurrences("control_occurrences", "target_occurrences"),
+                target_only=self._sample_unmatched_occurrences("target_occurrences", "control_occurrences"),
+            )
+        finally:
+            self.connection.execute("DROP TABLE mismatching_records")
+
+    def _get_record_counts(self, table: str) -> dict[str, int]:
+        return dict(self.connection.execute(f"SELECT stream, count(*) FROM {table} GROUP BY stream").fetchall())
+
+    def _fetch_value(self, query: str, parameters: Optional[dict[str, Any]] = None) -> Any:
+        result = self.connection.execute(query, parameters).fetchone()
+        assert result is not None
+        return result[0]
+
+    def _sample_mismatching_records(self, condition: str, columns: list[str]) -> RecordsSample:
+        count = self._fetch_value(f"SELECT count(*) FROM mismatching_records WHERE {condition}")
+        rows = self.connection.execute(
+            f"SELECT {', '.join(columns)} FROM mismatching_records WHERE {condition} ORDER BY pk, {', '.join(columns)} LIMIT {self.sample_size}"
+        ).fetchall()
+        if len(columns) == 1:
+            return RecordsSample(count, [json.loads(row[0]) for row in rows])
+        return RecordsSample(count, [tuple(json.loads(value) for value in row) for row in rows])
+
+    def _sample_unmatched_occurrences(self, side_occurrences: str, other_side_occurrences: str) -> RecordsSample:
+        condition = f"{side_occurrences} > {other_side_occurrences}"
+        count = self._fetch_value(
+            f"SELECT coalesce(sum({side_occurrences} - {other_side_occurrences}), 0) FROM mismatching_records WHERE {condition}"
+        )
+        rows = self.connection.execute(
+            f"SELECT record, {side_occurrences} - {other_side_occurrences} FROM mismatching_records WHERE {condition} ORDER BY record LIMIT {self.sample_size}"
+        ).fetchall()
+        records: list[Any] = []
+        for record, unmatched_occurrences in rows:
+            records.extend([json.loads(record)] * min(unmatched_occurrences, self.sample_size - len(records)))
+        return RecordsSample(int(count), records)
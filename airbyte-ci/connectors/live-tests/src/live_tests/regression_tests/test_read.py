@@ -2,14 +2,14 @@
 from __future__ import annotations
 
 import json
-from collections.abc import Callable, Generator, Iterable
-from typing import TYPE_CHECKING, Any, Optional
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Optional
 
 import pytest
-from airbyte_protocol.models import AirbyteMessage  # type: ignore
 from deepdiff import DeepDiff  # type: ignore
 
 from live_tests.commons.models import ExecutionResult
+from live_tests.commons.record_comparison import DuckDbRecordsComparison
 from live_tests.utils import fail_test_on_failing_execution_results, get_and_write_diff, get_test_logger, write_string_to_test_artifact
 
 if TYPE_CHECKING:
@@ -56,44 +56,36 @@ class TestDataIntegrity:
 
         logger = get_test_logger(request)
         streams_with_missing_records = set()
-        for stream_name in read_with_state_control_execution_result.configured_streams:
-            _primary_key = read_with_state_control_execution_result.primary_keys_per_stream[stream_name]
-            if not _primary_key:
-                # TODO: report skipped PK test per individual stream
-                logger.warning(f"No primary keys provided on stream {stream_name}.")
-                continue
-
-            primary_key = _primary_key[0] if isinstance(_primary_key, list) else _primary_key
-
-            control_pks = set()
-            target_pks = set()
-            logger.info(f"Retrieving primary keys for stream {stream_name} on control version.")
-            for control_record in read_with_state_control_execution_result.get_records_per_stream(stream_name):
-                control_pks.add(control_record.record.data[primary_key])
-
-            logger.info(f"Retrieving primary keys for stream {stream_name} on target version.")
-            for target_record in read_with_state_target_execution_result.get_records_per_stream(stream_name):
-                target_pks.add(target_record.record.data[primary_key])
-
-            if missing_pks := control_pks - target_pks:
-                logger.warning(f"Found {len(missing_pks)} primary keys for stream {stream_name}. Retrieving missing records.")
-                streams_with_missing_records.add(stream_name)
-                missing_records = [
-                    r
-                    for r in read_with_state_control_execution_result.get_records_per_stream(stream_name)
-                    if r.record.data[primary_key] in missing_pks
-                ]
-                record_property(
-                    f"Missing records on stream {stream_name}",
-                    json.dumps(missing_records),
-                )
-                artifact_path = write_string_to_test_artifact(
-                    request,
-                    json.dumps(missing_records),
-                    f"missing_records_{stream_name}.json",
-                    subdir=request.node.name,
-                )
-                logger.info(f"Missing records for stream {stream_name} are stored in {artifact_path}.")
+        with DuckDbRecordsComparison.from_execution_results(
+            read_with_state_control_execution_result, read_with_state_target_execution_result
+        ) as records_comparison:
+            for stream_name in read_with_state_control_execution_result.configured_streams:
+                primary_key = read_with_state_control_execution_result.primary_keys_per_stream[stream_name]
+                if not primary_key:
+                    # TODO: report skipped PK test per individual stream
+                    logger.warning(f"No primary keys provided on stream {stream_name}.")
+                    continue
+
+                logger.info(f"Looking for control primary keys missing in the target version for stream {stream_name}.")
+                # The primary key hashes indexed when parsing the outputs spare the database query when no key is missing
+                if read_with_state_control_execution_result.get_primary_key_hashes(
+                    stream_name
+                ) <= read_with_state_target_execution_result.get_primary_key_hashes(stream_name):
+                    continue
+                if missing_records := records_comparison.get_records_with_missing_primary_key(stream_name, primary_key):
+                    logger.warning(f"Found {missing_records.count} records with missing primary keys for stream {stream_name}.")
+                    streams_with_missing_records.add(stream_name)
+                    record_property(
+                        f"Missing records on stream {stream_name} ({len(missing_records.records)} out of {missing_records.count})",
+                        json.dumps(missing_records.records),
+                    )
+                    artifact_path = write_string_to_test_artifact(
+                        request,
+                        json.dumps(missing_records.records),
+                        f"missing_records_{stream_name}.json",
+                        subdir=request.node.name,
+                    )
+                    logger.info(f"A sample of the missing records for stream {stream_name} is stored in {artifact_path}.")
         if streams_with_missing_records:
             pytest.fail(f"Missing records for streams: {', '.join(streams_with_missing_records)}.")
 
@@ -104,9 +96,11 @@ class TestDataIntegrity:
         read_target_execution_result: ExecutionResult,
     ) -> None:
         record_count_difference_per_stream: dict[str, dict[str, int]] = {}
+        control_record_counts = read_control_execution_result.get_record_count_per_stream()
+        target_record_counts = read_target_execution_result.get_record_count_per_stream()
         for stream_name in read_control_execution_result.configured_streams:
-            control_records_count = sum(1 for _ in read_control_execution_result.get_records_per_stream(stream_name))
-            target_records_count = sum(1 for _ in read_target_execution_result.get_records_per_stream(stream_name))
+            control_records_count = control_record_counts.get(stream_name, 0)
+            target_records_count = target_record_counts.get(stream_name, 0)
 
             difference = {
                 "delta": target_records_count - control_records_count,
@@ -147,40 +141,40 @@ class TestDataIntegrity:
             read_target_execution_result (ExecutionResult): The target version execution result.
         """
         streams_with_diff = set()
-        for stream in read_control_execution_result.configured_streams:
-            control_records = list(read_control_execution_result.get_records_per_stream(stream))
-            target_records = list(read_target_execution_result.get_records_per_stream(stream))
-
-            if control_records and not target_records:
-                pytest.fail(f"Stream {stream} is missing in the target version.")
-
-            if primary_key := read_control_execution_result.primary_keys_per_stream.get(stream):
-                diffs = self._get_diff_on_stream_with_pk(
-                    request,
-                    record_property,
-                    stream,
-                    control_records,
-                    target_records,
-                    primary_key,
-                )
-            else:
-                diffs = self._get_diff_on_stream_without_pk(
-                    request,
-                    record_property,
-                    stream,
-                    control_records,
-                    target_records,
-                )
-
-            if diffs:
-                streams_with_diff.add(stream)
+        with DuckDbRecordsComparison.from_execution_results(
+            read_control_execution_result, read_target_execution_result
+        ) as records_comparison:
+            control_record_counts = read_control_execution_result.get_record_count_per_stream()
+            target_record_counts = read_target_execution_result.get_record_count_per_stream()
+            for stream in read_control_execution_result.configured_streams:
+                if control_record_counts.get(stream) and not target_record_counts.get(stream):
+                    pytest.fail(f"Stream {stream} is missing in the target version.")
+
+                if primary_key := read_control_execution_result.primary_keys_per_stream.get(stream):
+                    diffs = self._get_diff_on_stream_with_pk(
+                        request,
+                        record_property,
+                        stream,
+                        records_comparison,
+                        primary_key,
+                    )
+                else:
+                    diffs = self._get_diff_on_stream_without_pk(
+                        request,
+                        record_property,
+                        stream,
+                        records_comparison,
+                    )
+
+                if diffs:
+                    streams_with_diff.add(stream)
 
         if streams_with_diff:
             messages = [
                 f"Records for stream {stream} are different. Please check the diff in the test artifacts for debugging."
                 for stream in sorted(streams_with_diff)
             ]
-            pytest.fail("/n".join(messages))
+            pytest.fail("\n".join(messages))
 
     def _check_record_schema_match(
         self,
@@ -444,19 +438,17 @@ class TestDataIntegrity:
         request: SubRequest,
         record_property: Callable,
         stream: str,
-        control_records: list[AirbyteMessage],
-        target_records: list[AirbyteMessage],
+        records_comparison: DuckDbRecordsComparison,
         primary_key: list[str],
     ) -> Optional[Iterable[str]]:
-        control_pks = {r.record.data[primary_key[0]] for r in control_records}
-        target_pks = {r.record.data[primary_key[0]] for r in target_records}
+        stream_diff = records_comparison.get_diff_with_primary_key(stream, primary_key)
 
-        # Compare the diff for all records whose primary key is in
+        # Compare the diff for a sample of the records whose primary key is in both versions but whose values differ
         record_diff_path_prefix = f"{stream}_record_diff"
         record_diff = get_and_write_diff(
             request,
-            _get_filtered_sorted_records(control_records, target_pks, True, primary_key),
-            _get_filtered_sorted_records(target_records, control_pks, True, primary_key),
+            [control_record for control_record, _ in stream_diff.changed.records],
+            [target_record for _, target_record in stream_diff.changed.records],
             record_diff_path_prefix,
             ignore_order=False,
             exclude_paths=EXCLUDE_PATHS,
@@ -465,7 +457,7 @@ class TestDataIntegrity:
         control_records_diff_path_prefix = f"{stream}_control_records_diff"
         control_records_diff = get_and_write_diff(
             request,
-            _get_filtered_sorted_records(control_records, target_pks, False, primary_key),
+            stream_diff.control_only.records,
             [],
             control_records_diff_path_prefix,
             ignore_order=False,
@@ -476,25 +468,23 @@ class TestDataIntegrity:
         target_records_diff = get_and_write_diff(
             request,
             [],
-            _get_filtered_sorted_records(target_records, control_pks, False, primary_key),
+            stream_diff.target_only.records,
             target_records_diff_path_prefix,
             ignore_order=False,
             exclude_paths=EXCLUDE_PATHS,
         )
 
-        has_diff = record_diff or control_records_diff or target_records_diff
-
-        if has_diff:
+        if stream_diff:
             record_property(
-                f"{stream} stream: records with primary key in target & control whose values differ",
+                f"{stream} stream: {stream_diff.changed.count} records with primary key in target & control whose values differ",
                 record_diff,
             )
             record_property(
-                f"{stream} stream: records in control but not target",
+                f"{stream} stream: {stream_diff.control_only.count} records in control but not target",
                 control_records_diff,
             )
             record_property(
-                f"{stream} stream: records in target but not control",
+                f"{stream} stream: {stream_diff.target_only.count} records in target but not control",
                 target_records_diff,
             )
 
@@ -506,46 +496,21 @@ class TestDataIntegrity:
         request: SubRequest,
         record_property: Callable,
         stream: str,
-        control_records: list[AirbyteMessage],
-        target_records: list[AirbyteMessage],
+        records_comparison: DuckDbRecordsComparison,
     ) -> Optional[Iterable[str]]:
+        stream_diff = records_comparison.get_diff_without_primary_key(stream)
         diff = get_and_write_diff(
             request,
-            [json.loads(r.record.json(sort_keys=True)) for r in control_records],
-            [json.loads(r.record.json(sort_keys=True)) for r in target_records],
+            stream_diff.control_only.records,
+            stream_diff.target_only.records,
             f"{stream}_diff",
             ignore_order=True,
             exclude_paths=EXCLUDE_PATHS,
         )
-        if diff:
-            record_property(f"Diff for stream {stream}", diff)
+        if stream_diff:
+            record_property(
+                f"Diff for stream {stream} ({stream_diff.control_only.count} records in control only, {stream_diff.target_only.count} records in target only)",
+                diff,
+            )
             return (diff,)
         return None
-
-
-def _get_filtered_sorted_records(
-    records: list[AirbyteMessage],
-    primary_key_set: set[Generator[Any, Any, None]],
-    include_target: bool,
-    primary_key: list[str],
-) -> list[dict]:
-    """
-    Get a list of records sorted by primary key, and filtered as specified.
-
-    For example, if `include_target` is true, we filter the records such that
-    only those whose primary key is in `primary_key_set` are returned.
-    If `include_target` is false, we only return records whose primary key
-    is not in `primary_key_set`.
-    """
-    if include_target:
-        _filter = lambda x: x["data"].get(primary_key[0]) in primary_key_set
-    else:
-        _filter = lambda x: x["data"].get(primary_key[0]) not in primary_key_set
-
-    return sorted(
-        filter(
-            _filter,
-            [json.loads(s.record.json(sort_keys=True)) for s in records],
-        ),
-        key=lambda x: x["data"][primary_key[0]],
-    )
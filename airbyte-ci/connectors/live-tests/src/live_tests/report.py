@@ -269,7 +269,7 @@ class TestReport(BaseReport):
 
     @cache
     def _get_record_count_for_stream(self, result: ExecutionResult, stream: str) -> int:
-        return sum(1 for _ in result.get_records_per_stream(stream))  # type: ignore
+        return result.get_record_count_per_stream().get(stream, 0)
 
     def get_untested_streams(self) -> list[str]:
         streams_with_data: set[str] = set()
@@ -1,7 +1,9 @@
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 
+import json
 from pathlib import Path
 
+import duckdb
 import pytest
 from airbyte_protocol.models import (
     AirbyteCatalog,
@@ -14,7 +16,8 @@ from airbyte_protocol.models import (
 )
 from airbyte_protocol.models import Type as AirbyteMessageType
 
-from live_tests.commons.backends import FileBackend
+from live_tests.commons.backends import DuckDbBackend, FileBackend
+from live_tests.commons.backends.file_backend import BufferedFileWriter
 
 
 @pytest.mark.parametrize(
@@ -69,3 +72,59 @@ def test_write(tmp_path, messages, expected_writes):
         expected_path = Path(tmp_path / expected_file)
         assert expected_path.exists()
         content = expected_path.read_text()
+
+
+def test_write_serializes_records_like_the_message(tmp_path):
+    messages = [
+        AirbyteMessage(
+            type=AirbyteMessageType.RECORD,
+            record=AirbyteRecordMessage(stream="test_stream", data={"b": [1, {"d": None, "c": "é"}], "a": 1}, emitted_at=i),
+        )
+        for i in range(3)
+    ]
+    backend = FileBackend(tmp_path)
+    backend.write(messages)
+
+    expected_lines = [message.json(sort_keys=True) for message in messages]
+    assert (tmp_path / "records.jsonl").read_text().splitlines() == expected_lines
+    assert backend.record_per_stream_paths["test_stream"].read_text().splitlines() == expected_lines
+    assert (
+        backend.record_per_stream_paths_data_only["test_stream"].read_text().splitlines()
+        == [json.dumps({"a": 1, "b": [1, {"c": "é", "d": None}]}, sort_keys=True)] * 3
+    )
+
+
+def test_buffered_file_writer_keeps_line_order(tmp_path):
+    with BufferedFileWriter(buffer_size=10, max_pending_buffers=1) as writer:
+        for i in range(100):
+            writer.write(tmp_path / f"stream_{i % 3}.jsonl", f"{i}\n")
+
+    for stream in range(3):
+        assert (tmp_path / f"stream_{stream}.jsonl").read_text().splitlines() == [str(i) for i in range(stream, 100, 3)]
+
+
+def test_buffered_file_writer_raises_write_errors(tmp_path):
+    writer = BufferedFileWriter(buffer_size=1)
+    writer.write(tmp_path / "missing_directory" / "stream.jsonl", "line\n")
+    with pytest.raises(FileNotFoundError):
+        writer.close()
+
+
+def test_duckdb_backend_appends_records_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(DuckDbBackend, "RECORDS_JSON_BATCH_SIZE", 2)
+    backend = DuckDbBackend(tmp_path / "output", tmp_path / "duckdb.db", ("control", "read", "abcdefgh"))
+    backend.write(
+        [
+            AirbyteMessage(
+                type=AirbyteMessageType.RECORD,
+                record=AirbyteRecordMessage(stream=f"stream_{i % 2}", data={"id": i}, emitted_at=i),
+            )
+            for i in range(5)
+        ]
+    )
+
+    with duckdb.connect(str(tmp_path / "duckdb.db")) as conn:
+        rows = conn.sql(f"SELECT stream, record FROM {backend.records_json_table} ORDER BY record->>'$.data.id'").fetchall()
+    assert [(stream, json.loads(record)) for stream, record in rows] == [
+        (f"stream_{i % 2}", {"namespace": None, "data": {"id": i}, "meta": None}) for i in range(5)
+    ]
@@ -0,0 +1,138 @@
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+
+from unittest.mock import MagicMock
+
+import pytest
+from airbyte_protocol.models import (
+    AirbyteMessage,
+    AirbyteRecordMessage,
+    AirbyteStateMessage,
+    AirbyteStateType,
+    AirbyteStreamState,
+    AirbyteStreamStatus,
+    AirbyteStreamStatusTraceMessage,
+    AirbyteTraceMessage,
+    ConfiguredAirbyteCatalog,
+    StreamDescriptor,
+    TraceType,
+)
+from airbyte_protocol.models import Type as AirbyteMessageType
+
+from live_tests.commons.backends import FileBackend
+from live_tests.commons.models import Command, ExecutionResult, ExecutionResultIndex
+
+
+def record(stream, data):
+    return AirbyteMessage(type=AirbyteMessageType.RECORD, record=AirbyteRecordMessage(stream=stream, data=data, emitted_at=1))
+
+
+def state(stream, cursor):
+    return AirbyteMessage(
+        type=AirbyteMessageType.STATE,
+        state=AirbyteStateMessage(
+            type=AirbyteStateType.STREAM,
+            stream=AirbyteStreamState(stream_descriptor=StreamDescriptor(name=stream), stream_state={"cursor": cursor}),
+        ),
+    )
+
+
+def status(stream, stream_status):
+    return AirbyteMessage(
+        type=AirbyteMessageType.TRACE,
+        trace=AirbyteTraceMessage(
+            type=TraceType.STREAM_STATUS,
+            emitted_at=1,
+            stream_status=AirbyteStreamStatusTraceMessage(stream_descriptor=StreamDescriptor(name=stream), status=stream_status),
+        ),
+    )
+
+
+@pytest.fixture
+def execution_result(tmp_path):
+    messages = [
+        status("users", AirbyteStreamStatus.STARTED),
+        record("users", {"id": "integer_1", "name": "string_alice"}),
+        record("events", {"name": "string_click"}),
+        record("users", {"id": "integer_2", "name": "string_bob"}),
+        state("users", 2),
+        record("users", {"name": "string_anonymous"}),
+        status("users", AirbyteStreamStatus.COMPLETE),
+    ]
+    stdout_file_path = tmp_path / "stdout.jsonl"
+    stdout_file_path.write_text(
+        "\n".join([messages[0].json(exclude_unset=True), "not a message"] + [m.json(exclude_unset=True) for m in messages[1:]])
+    )
+    configured_catalog = ConfiguredAirbyteCatalog.parse_obj(
+        {
+            "streams": [
+                {
+                    "stream": {"name": "users", "json_schema": {}, "supported_sync_modes": ["full_refresh"]},
+                    "sync_mode": "full_refresh",
+                    "destination_sync_mode": "overwrite",
+                    "primary_key": [["id"]],
+                },
+                {
+                    "stream": {"name": "events", "json_schema": {}, "supported_sync_modes": ["full_refresh"]},
+                    "sync_mode": "full_refresh",
+                    "destination_sync_mode": "overwrite",
+                },
+            ]
+        }
+    )
+    return ExecutionResult(
+        hashed_connection_id="abcdefgh",
+        actor_id="actor_id",
+        configured_catalog=configured_catalog,
+        connector_under_test=MagicMock(),
+        command=Command.READ,
+        stdout_file_path=stdout_file_path,
+        stderr_file_path=tmp_path / "stderr.txt",
+        success=True,
+        executed_container=None,
+        config=None,
+    )
+
+
+def test_index_aggregates(execution_result):
+    assert execution_result.get_message_count_per_type() == {
+        AirbyteMessageType.RECORD: 4,
+        AirbyteMessageType.STATE: 1,
+        AirbyteMessageType.TRACE: 2,
+    }
+    assert execution_result.get_record_count_per_stream() == {"users": 3, "events": 1}
+    assert [s.stream.stream_state.dict() for s in execution_result.get_states_per_stream("users")["users"]] == [{"cursor": 2}]
+    assert [s.status for s in execution_result.get_status_messages_per_stream("users")["users"]] == [
+        AirbyteStreamStatus.STARTED,
+        AirbyteStreamStatus.COMPLETE,
+    ]
+    assert execution_result.generate_stream_schemas()["users"]["properties"] == {
+        "id": {"type": "integer"},
+        "name": {"type": "string"},
+    }
+
+
+def test_get_records_per_stream_reads_indexed_lines(execution_result):
+    assert [message.record.data for message in execution_result.get_records_per_stream("users")] == [
+        {"id": "integer_1", "name": "string_alice"},
+        {"id": "integer_2", "name": "string_bob"},
+        {"name": "string_anonymous"},
+    ]
+    assert list(execution_result.get_records_per_stream("unknown_stream")) == []
+
+
+def test_primary_key_hashes(execution_result):
+    assert execution_result.get_primary_key_hashes("users") == {
+        ExecutionResultIndex.hash_primary_key_value({"id": "integer_1"}, ["id"]),
+        ExecutionResultIndex.hash_primary_key_value({"id": "integer_2"}, ["id"]),
+        ExecutionResultIndex.hash_primary_key_value({}, ["id"]),
+    }
+    assert ExecutionResultIndex.hash_primary_key_value({}, ["id"]) != ExecutionResultIndex.hash_primary_key_value({"id": None}, ["id"])
+    assert execution_result.get_primary_key_hashes("events") == set()
+
+
+def test_saving_messages_builds_the_index(tmp_path, execution_result):
+    execution_result.save_airbyte_messages(tmp_path / "output")
+
+    assert isinstance(execution_result.backend, FileBackend)
+    assert execution_result._index is not None
+    assert execution_result.get_record_count_per_stream() == {"users": 3, "events": 1}
@@ -0,0 +1,94 @@
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+
+import pytest
+from airbyte_protocol.models import AirbyteMessage, AirbyteRecordMessage
+from airbyte_protocol.models import Type as AirbyteMessageType
+
+from live_tests.commons.backends import DuckDbBackend
+from live_tests.commons.record_comparison import DuckDbRecordsComparison
+
+
+def record(stream, data, emitted_at=1):
+    return AirbyteMessage(type=AirbyteMessageType.RECORD, record=AirbyteRecordMessage(stream=stream, data=data, emitted_at=emitted_at))
+
+
+def as_record_json(data):
+    return {"namespace": None, "data": data, "meta": None}
+
+
+@pytest.fixture
+def records_comparison(tmp_path):
+    duckdb_path = tmp_path / "duckdb.db"
+    control_backend = DuckDbBackend(tmp_path / "control", duckdb_path, ("control", "read", "abcdefgh"))
+    target_backend = DuckDbBackend(tmp_path / "target", duckdb_path, ("target", "read", "abcdefgh"))
+    control_backend.write(
+        [
+            record("users", {"id": 1, "name": "alice"}),
+            record("users", {"id": 2, "name": "bob"}),
+            record("users", {"id": 2, "name": "bob"}),
+            record("users", {"id": 4, "name": "dave"}),
+            record("events", {"name": "click"}),
+            record("events", {"name": "click"}),
+            record("events", {"name": "scroll"}),
+        ]
+    )
+    target_backend.write(
+        [
+            record("users", {"id": 4, "name": "dave"}, emitted_at=2),
+            record("users", {"id": 1, "name": "Alice"}),
+            record("users", {"id": 2, "name": "bob"}),
+            record("users", {"id": 3, "name": "carol"}),
+            record("events", {"name": "click"}),
+            record("events", {"name": "view"}),
+            record("events", {"name": "scroll"}),
+        ]
+    )
+    with DuckDbRecordsComparison(duckdb_path, control_backend.records_json_table, target_backend.records_json_table) as comparison:
+        yield comparison
+
+
+def test_get_record_counts(records_comparison):
+    assert records_comparison.get_record_counts() == ({"users": 4, "events": 3}, {"users": 4, "events": 3})
+
+
+def test_get_records_with_missing_primary_key(records_comparison):
+    assert not records_comparison.get_records_with_missing_primary_key("users", ["id"])
+    records_comparison.control_table, records_comparison.target_table = records_comparison.target_table, records_comparison.control_table
+
+    missing_records = records_comparison.get_records_with_missing_primary_key("users", ["id"])
+
+    assert missing_records.count == 1
+    assert missing_records.records == [as_record_json({"id": 3, "name": "carol"})]
+
+
+def test_get_diff_with_primary_key(records_comparison):
+    stream_diff = records_comparison.get_diff_with_primary_key("users", ["id"])
+
+    # Records emitted at different times but with the same values are not reported
+    assert stream_diff.changed.count == 1
+    assert stream_diff.changed.records == [(as_record_json({"id": 1, "name": "alice"}), as_record_json({"id": 1, "name": "Alice"}))]
+    assert stream_diff.control_only.records == [as_record_json({"id": 2, "name": "bob"})]
+    assert stream_diff.target_only.records == [as_record_json({"id": 3, "name": "carol"})]
+
+
+def test_get_diff_without_primary_key(records_comparison):
+    stream_diff = records_comparison.get_diff_without_primary_key("events")
+
+    assert not stream_diff.changed
+    assert stream_diff.control_only.records == [as_record_json({"name": "click"})]
+    assert stream_diff.target_only.records == [as_record_json({"name": "view"})]
+    assert not records_comparison.get_diff_without_primary_key("unknown_stream")
+
+
+def test_diff_samples_are_bounded(tmp_path, records_comparison):
+    empty_target_backend = DuckDbBackend(tmp_path / "empty_target", records_comparison.duckdb_path, ("target", "read", "ijklmnop"))
+    records_comparison.__exit__(None, None, None)
+    empty_target_backend.write([])
+
+    with DuckDbRecordsComparison(
+        records_comparison.duckdb_path, records_comparison.control_table, empty_target_backend.records_json_table, sample_size=1
+    ) as comparison:
+        stream_diff = comparison.get_diff_with_primary_key("users", ["id"])
+
+    assert stream_diff.control_only.count == 4
+    assert stream_diff.control_only.records == [as_record_json({"id": 1, "name": "alice"})]
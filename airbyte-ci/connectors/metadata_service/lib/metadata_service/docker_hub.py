@@ -2,13 +2,38 @@
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 #
 
+import functools
+import hashlib
+import json
+import math
 import os
+import tempfile
+import threading
 import time
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import requests
 
 
+DOCKER_HUB_API_URL = os.environ.get("METADATA_SERVICE_DOCKER_HUB_API_URL", "https://registry.hub.docker.com")
+DEFAULT_DOCKER_HUB_CACHE_DIRECTORY = Path(
+    os.environ.get(
+        "METADATA_SERVICE_DOCKER_HUB_CACHE_DIRECTORY",
+        Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "metadata_service" / "docker_hub",
+    )
+)
+# Tags listed less than this ago are used without listing them again
+DEFAULT_DOCKER_HUB_CACHE_TTL_SECONDS = int(os.environ.get("METADATA_SERVICE_DOCKER_HUB_CACHE_TTL_SECONDS", 300))
+DOCKER_HUB_TAGS_PAGE_SIZE = 100
+DOCKER_HUB_REQUEST_TIMEOUT_SECONDS = 60
+DEFAULT_DOCKER_HUB_CONCURRENCY = 8
+
+# An image to look up: its name, its tag and optionally the digest the tag must point to
+ImageReference = Tuple[str, str, Optional[str]]
+
+
 def get_docker_hub_auth_token() -> str:
     docker_username = os.environ.get("DOCKER_HUB_USERNAME")
     docker_password = os.environ.get("DOCKER_HUB_PASSWORD")
@@ -37,62 +62,213 @@ def get_docker_hub_headers() -> Dict | None:
         return {"Authorization": f"JWT {token}"} if token else {}
 
 
-def get_docker_hub_tags_and_digests(
-    image_name: str,
-    retries: int = 0,
-    wait_sec: int = 30,
-    next_page_url: str | None = None,
-    tags_and_digests: Dict[str, str] | None = None,
-    paginate: bool = True,
-) -> Dict[str, str]:
+class DockerHubTagIndex:
+    """Index of the tags, and their digests, of Docker Hub repositories.
+
+    The tags of a repository are listed once, with the pages requested concurrently, and the listing is shared by all the
+    lookups of the index. Listings are cached on disk for a TTL so that successive runs do not list the same tags again.
+    A tag missing from a listing is looked up again in a fresh listing, as Docker Hub does not always list a tag right after it was published.
+    """
+
+    def __init__(
+        self,
+        api_url: str = DOCKER_HUB_API_URL,
+        cache_directory: Optional[Path] = DEFAULT_DOCKER_HUB_CACHE_DIRECTORY,
+        cache_ttl_seconds: int = DEFAULT_DOCKER_HUB_CACHE_TTL_SECONDS,
+        max_workers: int = DEFAULT_DOCKER_HUB_CONCURRENCY,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.cache_directory = cache_directory
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.max_workers = max_workers
+        self._tags_and_digests: Dict[str, Tuple[float, Dict[str, Optional[str]]]] = {}
+        # Repositories listed from Docker Hub by this index, as opposed to loaded from the disk cache
+        self._listed_repositories: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @functools.cached_property
+    def headers(self) -> Dict:
+        return get_docker_hub_headers()
+
+    def _cache_file_path(self, image_name: str) -> Optional[Path]:
+        if self.cache_directory is None:
+            return None
+        return self.cache_directory / f"{hashlib.sha256(f'{self.api_url}/{image_name}'.encode()).hexdigest()[:16]}.json"
+
+    def _read_cache(self, image_name: str) -> Optional[Tuple[float, Dict[str, Optional[str]]]]:
+        cache_file_path = self._cache_file_path(image_name)
+        if cache_file_path is None:
+            return None
+        try:
+            cache = json.loads(cache_file_path.read_text())
+            return cache["fetched_at"], cache["tags_and_digests"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_cache(self, image_name: str, fetched_at: float, tags_and_digests: Dict[str, Optional[str]]) -> None:
+        cache_file_path = self._cache_file_path(image_name)
+        if cache_file_path is None:
+            return
+        try:
+            cache_file_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so that concurrent processes never read a partially written cache
+            temporary_file = tempfile.NamedTemporaryFile("w", dir=cache_file_path.parent, delete=False)
+            try:
+                with temporary_file:
+                    json.dump({"image_name": image_name, "fetched_at": fetched_at, "tags_and_digests": tags_and_digests}, temporary_file)
+                os.replace(temporary_file.name, cache_file_path)
+            except BaseException:
+                # Do not leave the partially written temporary file behind
+                Path(temporary_file.name).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            print(f"Could not write the Docker Hub cache to {cache_file_path}: {e}")
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at < self.cache_ttl_seconds
+
+    def _get_json(self, url: str, retries: int, wait_sec: int) -> Optional[dict]:
+        # Allow for retries as the DockerHub API is not always reliable.
+        for attempt in range(retries + 1):
+            response = requests.get(url, headers=self.headers, timeout=DOCKER_HUB_REQUEST_TIMEOUT_SECONDS)
+            if response.ok:
+                return response.json()
+            # This is to handle the case when a connector has not ever been released yet.
+            if response.status_code == 404:
+                return None
+            if attempt < retries:
+                time.sleep(wait_sec)
+        response.raise_for_status()
+
+    def _list_tags_and_digests(self, image_name: str, retries: int, wait_sec: int) -> Dict[str, Optional[str]]:
+        tags_url = f"{self.api_url}/v2/repositories/{image_name}/tags"
+        first_page = self._get_json(f"{tags_url}?page_size={DOCKER_HUB_TAGS_PAGE_SIZE}", retries, wait_sec)
+        if first_page is None:
+            print(f"{tags_url} returned a 404. The connector might not be released yet.")
+            return {}
+
+        pages = [first_page]
+        if "count" in first_page:
+            # The number of pages is known upfront: request the other pages concurrently
+            page_count = math.ceil(first_page["count"] / DOCKER_HUB_TAGS_PAGE_SIZE)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pages.extend(
+                    executor.map(
+                        lambda page: (
+                            self._get_json(f"{tags_url}?page={page}&page_size={DOCKER_HUB_TAGS_PAGE_SIZE}", retries, wait_sec) or {}
+                        ),
+                        range(2, page_count + 1),
+                    )
+                )
+        else:
+            next_page_url = first_page.get("next")
+            while next_page_url:
+                page = self._get_json(next_page_url, retries, wait_sec) or {}
+                pages.append(page)
+                next_page_url = page.get("next")
+
+        return {result["name"]: result.get("digest") for page in pages for result in page.get("results", [])}
+
+    def get_tags_and_digests(
+        self, image_name: str, retries: int = 0, wait_sec: int = 30, refresh: bool = False
+    ) -> Dict[str, Optional[str]]:
+        """Get the tags and digests of a Docker Hub repository.
+
+        Args:
+            image_name (str): The image name, e.g. airbyte/source-faker.
+            retries (int, optional): The number of times to retry a failed request. Defaults to 0.
+            wait_sec (int, optional): The number of seconds to wait between retries. Defaults to 30.
+            refresh (bool, optional): Whether to list the tags from Docker Hub even if they are cached. Defaults to False.
+
+        Returns:
+            Dict[str, Optional[str]]: Mapping of image tag to digest.
+        """
+        if not refresh:
+            with self._lock:
+                cached = self._tags_and_digests.get(image_name)
+            if cached is None or not self._is_fresh(cached[0]):
+                cached = self._read_cache(image_name)
+            if cached is not None and self._is_fresh(cached[0]):
+                with self._lock:
+                    self._tags_and_digests[image_name] = cached
+                return cached[1]
+
+        fetched_at = time.time()
+        tags_and_digests = self._list_tags_and_digests(image_name, retries, wait_sec)
+        with self._lock:
+            self._tags_and_digests[image_name] = (fetched_at, tags_and_digests)
+            self._listed_repositories.add(image_name)
+        self._write_cache(image_name, fetched_at, tags_and_digests)
+        return tags_and_digests
+
+    def _load_repositories(self, image_names: Set[str], retries: int, wait_sec: int, refresh: bool) -> None:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Consume the results to surface the errors
+            list(executor.map(lambda image_name: self.get_tags_and_digests(image_name, retries, wait_sec, refresh), image_names))
+
+    def _is_listed(self, image: ImageReference) -> bool:
+        image_name, tag, digest = image
+        tags_and_digests = self._tags_and_digests[image_name][1]
+        if tag not in tags_and_digests:
+            return False
+        return digest is None or tags_and_digests[tag] == f"sha256:{digest}"
+
+    def find_missing_image_references(self, images: Iterable[ImageReference], retries: int = 0, wait_sec: int = 30) -> List[ImageReference]:
+        """Find the images which are not on Docker Hub, listing the tags of each repository once for all the images.
+
+        Args:
+            images (Iterable[ImageReference]): The images to look up, as (image name, tag, digest or None) tuples.
+            retries (int, optional): The number of times to list the tags again while some images are missing. Defaults to 0.
+            wait_sec (int, optional): The number of seconds to wait between retries. Defaults to 30.
+
+        Returns:
+            List[ImageReference]: The images which are not on Docker Hub.
+        """
+        images = list(dict.fromkeys(images))
+        self._load_repositories({image[0] for image in images}, retries, wait_sec, refresh=False)
+        missing_images = [image for image in images if not self._is_listed(image)]
+
+        # The tags loaded from the cache might predate the publication of the missing images
+        cached_repositories = {image[0] for image in missing_images} - self._listed_repositories
+        if cached_repositories:
+            self._load_repositories(cached_repositories, retries, wait_sec, refresh=True)
+            missing_images = [image for image in missing_images if not self._is_listed(image)]
+
+        # Docker Hub does not always list a tag right after it was published
+        for _ in range(retries):
+            if not missing_images:
+                break
+            time.sleep(wait_sec)
+            self._load_repositories({image[0] for image in missing_images}, retries, wait_sec, refresh=True)
+            missing_images = [image for image in missing_images if not self._is_listed(image)]
+
+        return missing_images
+
+
+@functools.lru_cache(maxsize=None)
+def get_docker_hub_tag_index() -> DockerHubTagIndex:
+    """Get the Docker Hub tag index shared by all the callers of the process."""
+    return DockerHubTagIndex()
+
+
+def get_docker_hub_tags_and_digests(image_name: str, retries: int = 0, wait_sec: int = 30, refresh: bool = False) -> Dict[str, str]:
     """Find all released tags and digests for an image.
 
     Args:
         image_name (str): The image name to get tags and digest
         retries (int, optional): The number of times to retry the request. Defaults to 0.
         wait_sec (int, optional): The number of seconds to wait between retries. Defaults to 30.
-        next_page_url (str | None, optional): The next DockerHub page to consume. Defaults to None.
-        tags_and_digest (Dict[str, str] | None, optional): The accumulated tags and digests for recursion. Defaults to None.
+        refresh (bool, optional): Whether to list the tags from Docker Hub even if they are cached. Defaults to False.
 
     Returns:
         Dict[str, str]: Mapping of image tag to digest
     """
-    headers = get_docker_hub_headers()
-    tags_and_digests = tags_and_digests or {}
-
-    if not next_page_url:
-        tags_url = f"https://registry.hub.docker.com/v2/repositories/{image_name}/tags"
-    else:
-        tags_url = next_page_url
-
-    # Allow for retries as the DockerHub API is not always reliable with returning the latest publish.
-    for _ in range(retries + 1):
-        response = requests.get(tags_url, headers=headers)
-        if response.ok:
-            break
-
-        # This is to handle the case when a connector has not ever been released yet.
-        if response.status_code == 404:
-            print(f"{tags_url} returned a 404. The connector might not be released yet.")
-            print(response)
-            return tags_and_digests
-        time.sleep(wait_sec)
-
-    response.raise_for_status()
-    json_response = response.json()
-    tags_and_digests.update({result["name"]: result.get("digest") for result in json_response.get("results", [])})
-    if paginate:
-        if next_page_url := json_response.get("next"):
-            tags_and_digests.update(
-                get_docker_hub_tags_and_digests(
-                    image_name, retries=retries, wait_sec=wait_sec, next_page_url=next_page_url, tags_and_digests=tags_and_digests
-                )
-            )
-    return tags_and_digests
+    return dict(get_docker_hub_tag_index().get_tags_and_digests(image_name, retries=retries, wait_sec=wait_sec, refresh=refresh))
 
 
 def get_latest_version_on_dockerhub(image_name: str) -> str | None:
-    tags_and_digests = get_docker_hub_tags_and_digests(image_name, retries=3, wait_sec=30)
+    # The latest tag moves with every release: a cached listing could predate a publication
+    tags_and_digests = get_docker_hub_tags_and_digests(image_name, retries=3, wait_sec=30, refresh=True)
     if latest_digest := tags_and_digests.get("latest"):
         for tag, digest in tags_and_digests.items():
             if digest == latest_digest and tag != "latest":
@@ -100,6 +276,22 @@ def get_latest_version_on_dockerhub(image_name: str) -> str | None:
     return None
 
 
+def find_missing_images_on_docker_hub(images: Iterable[Tuple[str, str]], retries: int = 0, wait_sec: int = 30) -> List[Tuple[str, str]]:
+    """Find the images, and versions, which do not exist on Docker Hub.
+
+    Args:
+        images (Iterable[Tuple[str, str]]): The (image name, version) pairs to check.
+        retries (int, optional): The number of times to look up the missing images again. Defaults to 0.
+        wait_sec (int, optional): The number of seconds to wait between retries. Defaults to 30.
+    Returns:
+        List[Tuple[str, str]]: The (image name, version) pairs which do not exist on Docker Hub.
+    """
+    missing_images = get_docker_hub_tag_index().find_missing_image_references(
+        [(image_name, version, None) for image_name, version in images], retries=retries, wait_sec=wait_sec
+    )
+    return [(image_name, version) for image_name, version, _ in missing_images]
+
+
 def is_image_on_docker_hub(image_name: str, version: str, digest: Optional[str] = None, retries: int = 0, wait_sec: int = 30) -> bool:
     """Check if a given image and version exists on Docker Hub.
 
@@ -112,23 +304,4 @@ def is_image_on_docker_hub(image_name: str, version: str, digest: Optional[str]
     Returns:
         bool: True if the image and version exists on Docker Hub, False otherwise.
     """
-
-    headers = get_docker_hub_headers()
-
-    tag_url = f"https://registry.hub.docker.com/v2/repositories/{image_name}/tags/{version}"
-
-    # Allow for retries as the DockerHub API is not always reliable with returning the latest publish.
-    for _ in range(retries + 1):
-        response = requests.get(tag_url, headers=headers)
-        if response.ok:
-            break
-        time.sleep(wait_sec)
-
-    if not response.ok:
-        response.raise_for_status()
-        return False
-
-    # If a digest is provided, check that it matches the digest of the image on Docker Hub.
-    if digest is not None:
-        return f"sha256:{digest}" == response.json()["digest"]
-    return True
+    return not get_docker_hub_tag_index().find_missing_image_references([(image_name, version, digest)], retries=retries, wait_sec=wait_sec)
@@ -7,9 +7,10 @@ import logging
 import os
 import re
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, NamedTuple, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
 import git
 import requests
@@ -38,6 +39,9 @@ from metadata_service.models.generated.GitInfo import GitInfo
 from metadata_service.models.transform import to_json_sanitized_dict
 from metadata_service.validators.metadata_validator import POST_UPLOAD_VALIDATORS, ValidatorOptions, validate_and_load
 
+# Maximum number of local files hashed or blobs listed and uploaded at the same time
+DEFAULT_UPLOAD_CONCURRENCY = 8
+
 # 🧩 TYPES
 
 
@@ -74,6 +78,14 @@ class MaybeUpload(NamedTuple):
     blob_id: str
 
 
+@dataclass(frozen=True)
+class PlannedUpload:
+    file_id: str
+    local_file_path: Path
+    blob_path: str
+    disable_cache: bool = False
+
+
 @dataclass
 class ManifestOnlyFilePaths:
     zip_file_path: Path | None
@@ -223,94 +235,146 @@ def upload_file_if_changed(
 ) -> MaybeUpload:
     """Upload a file to GCS if it has changed."""
     local_file_md5_hash = compute_gcs_md5(local_file_path)
-    remote_blob = bucket.blob(blob_path)
-
-    # reload the blob to get the md5_hash
-    if remote_blob.exists():
-        remote_blob.reload()
-
-    remote_blob_md5_hash = remote_blob.md5_hash if remote_blob.exists() else None
+    # get_blob fetches the blob metadata in a single request and returns None if the blob does not exist
+    remote_blob = bucket.get_blob(blob_path)
+    remote_blob_md5_hash = remote_blob.md5_hash if remote_blob is not None else None
 
     print(f"Local {local_file_path} md5_hash: {local_file_md5_hash}")
     print(f"Remote {blob_path} md5_hash: {remote_blob_md5_hash}")
 
     if local_file_md5_hash != remote_blob_md5_hash:
-        uploaded = _save_blob_to_gcs(remote_blob, local_file_path, disable_cache=disable_cache)
-        return MaybeUpload(uploaded, remote_blob.id)
+        blob_to_save = bucket.blob(blob_path)
+        uploaded = _save_blob_to_gcs(blob_to_save, local_file_path, disable_cache=disable_cache)
+        return MaybeUpload(uploaded, blob_to_save.id)
 
     return MaybeUpload(False, remote_blob.id)
 
 
-def _file_upload(
-    local_path: Path | None,
-    gcp_connector_dir: str,
-    bucket: storage.bucket.Bucket,
-    file_key: str,
-    *,
-    upload_as_version: bool,
-    upload_as_latest: bool,
-    skip_if_not_exists: bool = True,
-    disable_cache: bool = False,
-    version_folder: Optional[str] = None,
-    override_destination_file_name: str | None = None,
-) -> tuple[UploadedFile, UploadedFile]:
-    """Upload a file to GCS.
+class UploadPlanner:
+    """Collect the files to upload to a bucket and upload the ones which changed in a single batch.
 
-    Optionally upload it as a versioned file and/or as the latest version.
-
-    Args:
-        local_path: Path to the file to upload.
-        gcp_connector_dir: Path to the connector folder in GCS. This is the parent folder,
-            containing the versioned and "latest" folders as its subdirectories.
-        bucket: GCS bucket to upload the file to.
-        upload_as_version: The version to upload the file as or 'False' to skip uploading
-            the versioned copy.
-        upload_as_latest: Whether to upload the file as the latest version.
-        skip_if_not_exists: Whether to skip the upload if the file does not exist. Otherwise,
-            an exception will be raised if the file does not exist.
-
-    Returns: Tuple of two UploadInfo objects, each containing a boolean indicating whether the file was
-        uploaded, the blob id, and the description. The first tuple is for the versioned file, the second for the
-        latest file.
+    The remote MD5 hashes are collected by listing each destination folder once,
+    instead of fetching the metadata of every blob. Local files are hashed in parallel
+    and only the files whose hash differs from the remote one are uploaded, concurrently.
     """
-    if upload_as_version and not version_folder:
-        raise ValueError("version_folder must be provided if upload_as_version is True")
-
-    latest_file_key = f"latest_{file_key}"
-    versioned_file_key = f"versioned_{file_key}"
-    versioned_file_info = UploadedFile(id=versioned_file_key, uploaded=False, blob_id=None)
-    latest_file_info = UploadedFile(id=latest_file_key, uploaded=False, blob_id=None)
-    if not local_path or not local_path.exists():
-        msg = f"Expected to find file at {local_path}, but none was found."
-        if skip_if_not_exists:
-            logging.warning(msg)
-            return versioned_file_info, latest_file_info
-
-        raise FileNotFoundError(msg)
-
-    file_name = local_path.name if override_destination_file_name is None else override_destination_file_name
-
-    if upload_as_version:
-        remote_upload_path = f"{gcp_connector_dir}/{version_folder}"
-        versioned_uploaded, versioned_blob_id = upload_file_if_changed(
-            local_file_path=local_path,
-            bucket=bucket,
-            blob_path=f"{remote_upload_path}/{file_name}",
-            disable_cache=disable_cache,
-        )
-        versioned_file_info = UploadedFile(id=versioned_file_key, uploaded=versioned_uploaded, blob_id=versioned_blob_id)
-
-    if upload_as_latest:
-        remote_upload_path = f"{gcp_connector_dir}/{LATEST_GCS_FOLDER_NAME}"
-        latest_uploaded, latest_blob_id = upload_file_if_changed(
-            local_file_path=local_path,
-            bucket=bucket,
-            blob_path=f"{remote_upload_path}/{file_name}",
-            disable_cache=disable_cache,
-        )
-        latest_file_info = UploadedFile(id=latest_file_key, uploaded=latest_uploaded, blob_id=latest_blob_id)
 
-    return versioned_file_info, latest_file_info
+    def __init__(self, bucket: storage.bucket.Bucket, max_workers: int = DEFAULT_UPLOAD_CONCURRENCY):
+        self.bucket = bucket
+        self.max_workers = max_workers
+        self.planned_uploads: List[PlannedUpload] = []
+        self.skipped_files: List[UploadedFile] = []
+        # The planned uploads and skipped files in the order they were planned, which is the order of the results
+        self._planned_files: List[Union[PlannedUpload, UploadedFile]] = []
+
+    def add(self, file_id: str, local_file_path: Path, blob_path: str, disable_cache: bool = False) -> None:
+        planned_upload = PlannedUpload(file_id, local_file_path, blob_path, disable_cache)
+        self.planned_uploads.append(planned_upload)
+        self._planned_files.append(planned_upload)
+
+    def skip(self, file_id: str) -> None:
+        skipped_file = UploadedFile(id=file_id, uploaded=False, blob_id=None)
+        self.skipped_files.append(skipped_file)
+        self._planned_files.append(skipped_file)
+
+    def plan_file_upload(
+        self,
+        local_path: Path | None,
+        gcp_connector_dir: str,
+        file_key: str,
+        *,
+        upload_as_version: bool,
+        upload_as_latest: bool,
+        skip_if_not_exists: bool = True,
+        disable_cache: bool = False,
+        version_folder: Optional[str] = None,
+        override_destination_file_name: str | None = None,
+    ) -> None:
+        """Plan the upload of a file as a versioned file and/or as the latest version.
+
+        Args:
+            local_path: Path to the file to upload.
+            gcp_connector_dir: Path to the connector folder in GCS. This is the parent folder,
+                containing the versioned and "latest" folders as its subdirectories.
+            file_key: Key of the file, the uploaded files are identified as versioned_<file_key> and latest_<file_key>.
+            upload_as_version: Whether to upload the file in the version_folder.
+            upload_as_latest: Whether to upload the file as the latest version.
+            skip_if_not_exists: Whether to skip the upload if the file does not exist. Otherwise,
+                an exception will be raised if the file does not exist.
+        """
+        if upload_as_version and not version_folder:
+            raise ValueError("version_folder must be provided if upload_as_version is True")
+
+        latest_file_key = f"latest_{file_key}"
+        versioned_file_key = f"versioned_{file_key}"
+        if not local_path or not local_path.exists():
+            msg = f"Expected to find file at {local_path}, but none was found."
+            if skip_if_not_exists:
+                logging.warning(msg)
+                self.skip(versioned_file_key)
+                self.skip(latest_file_key)
+                return
+
+            raise FileNotFoundError(msg)
+
+        file_name = local_path.name if override_destination_file_name is None else override_destination_file_name
+
+        if upload_as_version:
+            self.add(versioned_file_key, local_path, f"{gcp_connector_dir}/{version_folder}/{file_name}", disable_cache)
+        else:
+            self.skip(versioned_file_key)
+
+        if upload_as_latest:
+            self.add(latest_file_key, local_path, f"{gcp_connector_dir}/{LATEST_GCS_FOLDER_NAME}/{file_name}", disable_cache)
+        else:
+            self.skip(latest_file_key)
+
+    def _list_remote_blobs(self, folder: str) -> Dict[str, storage.blob.Blob]:
+        return {blob.name: blob for blob in self.bucket.list_blobs(prefix=f"{folder}/")}
+
+    def _upload(self, planned_upload: PlannedUpload) -> str:
+        blob_to_save = self.bucket.blob(planned_upload.blob_path)
+        _save_blob_to_gcs(blob_to_save, planned_upload.local_file_path, disable_cache=planned_upload.disable_cache)
+        return blob_to_save.id
+
+    def execute(self) -> List[UploadedFile]:
+        """Upload the planned files which changed.
+
+        Returns:
+            List[UploadedFile]: The planned and skipped files, in the order they were planned.
+        """
+        folders = sorted({planned_upload.blob_path.rsplit("/", 1)[0] for planned_upload in self.planned_uploads})
+        local_file_paths = list(dict.fromkeys(planned_upload.local_file_path for planned_upload in self.planned_uploads))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            remote_blobs_futures = [executor.submit(self._list_remote_blobs, folder) for folder in folders]
+            local_md5_hashes = dict(zip(local_file_paths, executor.map(compute_gcs_md5, local_file_paths)))
+            remote_blobs: Dict[str, storage.blob.Blob] = {}
+            for remote_blobs_future in remote_blobs_futures:
+                remote_blobs.update(remote_blobs_future.result())
+
+            changed_uploads = []
+            for planned_upload in self.planned_uploads:
+                remote_blob = remote_blobs.get(planned_upload.blob_path)
+                local_md5_hash = local_md5_hashes[planned_upload.local_file_path]
+                remote_md5_hash = remote_blob.md5_hash if remote_blob is not None else None
+                print(f"Local {planned_upload.local_file_path} md5_hash: {local_md5_hash}")
+                print(f"Remote {planned_upload.blob_path} md5_hash: {remote_md5_hash}")
+                if local_md5_hash != remote_md5_hash:
+                    changed_uploads.append(planned_upload)
+            uploaded_blob_ids = dict(zip(changed_uploads, executor.map(self._upload, changed_uploads)))
+
+        uploaded_files = []
+        for planned_upload in self._planned_files:
+            if isinstance(planned_upload, UploadedFile):
+                uploaded_files.append(planned_upload)
+            elif planned_upload in uploaded_blob_ids:
+                uploaded_files.append(UploadedFile(id=planned_upload.file_id, uploaded=True, blob_id=uploaded_blob_ids[planned_upload]))
+            else:
+                remote_blob = remote_blobs.get(planned_upload.blob_path)
+                uploaded_files.append(
+                    UploadedFile(id=planned_upload.file_id, uploaded=False, blob_id=remote_blob.id if remote_blob is not None else None)
+                )
+        return uploaded_files
 
 
 # 🔧 METADATA MODIFICATIONS
@@ -444,117 +508,103 @@ def upload_metadata_to_gcs(bucket_name: str, metadata_file_path: Path, validator
     # Otherwise, we use the dockerImageTag from the metadata
     version_folder = metadata.data.dockerImageTag if not is_pre_release else validator_opts.prerelease_tag
 
-    # Start uploading files
-    uploaded_files = []
+    # Plan the files to upload, they are uploaded in a single batch once all of them are planned
+    upload_planner = UploadPlanner(bucket)
 
     # Metadata upload
-    metadata_files_uploaded = _file_upload(
+    upload_planner.plan_file_upload(
         file_key="metadata",
         local_path=metadata_file_path,
         gcp_connector_dir=gcp_connector_dir,
-        bucket=bucket,
         version_folder=version_folder,
         upload_as_version=True,
         upload_as_latest=should_upload_latest,
         disable_cache=True,
         override_destination_file_name=METADATA_FILE_NAME,
     )
-    uploaded_files.extend(metadata_files_uploaded)
 
     # Release candidate upload
     # We just upload the current metadata to the "release_candidate" path
     # The doc and inapp doc are not uploaded, which means that the release candidate will still point to the latest doc
     if should_upload_release_candidate:
-        release_candidate_files_uploaded = _file_upload(
+        upload_planner.plan_file_upload(
             file_key="release_candidate",
             local_path=metadata_file_path,
             gcp_connector_dir=gcp_connector_dir,
-            bucket=bucket,
             version_folder=RELEASE_CANDIDATE_GCS_FOLDER_NAME,
             upload_as_version=True,
             upload_as_latest=False,
             disable_cache=True,
             override_destination_file_name=METADATA_FILE_NAME,
         )
-        uploaded_files.extend(release_candidate_files_uploaded)
 
     # Icon upload
 
-    icon_files_uploaded = _file_upload(
+    upload_planner.plan_file_upload(
         file_key="icon",
         local_path=working_directory / ICON_FILE_NAME,
         gcp_connector_dir=gcp_connector_dir,
-        bucket=bucket,
         upload_as_version=False,
         upload_as_latest=should_upload_latest,
     )
-    uploaded_files.extend(icon_files_uploaded)
 
     # Doc upload
 
     local_doc_path = get_doc_local_file_path(metadata, docs_path, inapp=False)
-    doc_files_uploaded = _file_upload(
+    upload_planner.plan_file_upload(
         file_key="doc",
         local_path=local_doc_path,
         gcp_connector_dir=gcp_connector_dir,
-        bucket=bucket,
         upload_as_version=True,
         version_folder=version_folder,
         upload_as_latest=should_upload_latest,
         override_destination_file_name=DOC_FILE_NAME,
     )
-    uploaded_files.extend(doc_files_uploaded)
 
     local_inapp_doc_path = get_doc_local_file_path(metadata, docs_path, inapp=True)
-    inapp_doc_files_uploaded = _file_upload(
+    upload_planner.plan_file_upload(
         file_key="inapp_doc",
         local_path=local_inapp_doc_path,
         gcp_connector_dir=gcp_connector_dir,
-        bucket=bucket,
         upload_as_version=True,
         version_folder=version_folder,
         upload_as_latest=should_upload_latest,
         override_destination_file_name=DOC_INAPP_FILE_NAME,
     )
-    uploaded_files.extend(inapp_doc_files_uploaded)
 
     # Manifest and components upload
 
-    manifest_files_uploaded = _file_upload(
+    upload_planner.plan_file_upload(
         file_key="manifest",
         local_path=manifest_only_file_info.manifest_file_path,
         gcp_connector_dir=gcp_connector_dir,
-        bucket=bucket,
         upload_as_version=True,
         version_folder=version_folder,
         upload_as_latest=should_upload_latest,
         override_destination_file_name=MANIFEST_FILE_NAME,
     )
-    uploaded_files.extend(manifest_files_uploaded)
 
-    components_zip_sha256_files_uploaded = _file_upload(
+    upload_planner.plan_file_upload(
         file_key="components_zip_sha256",
         local_path=manifest_only_file_info.sha256_file_path,
         gcp_connector_dir=gcp_connector_dir,
-        bucket=bucket,
         upload_as_version=True,
         version_folder=version_folder,
         upload_as_latest=should_upload_latest,
         override_destination_file_name=COMPONENTS_ZIP_SHA256_FILE_NAME,
     )
-    uploaded_files.extend(components_zip_sha256_files_uploaded)
 
-    components_zip_files_uploaded = _file_upload(
+    upload_planner.plan_file_upload(
         file_key="components_zip",
         local_path=manifest_only_file_info.zip_file_path,
         gcp_connector_dir=gcp_connector_dir,
-        bucket=bucket,
         upload_as_version=True,
         version_folder=version_folder,
         upload_as_latest=should_upload_latest,
         override_destination_file_name=COMPONENTS_ZIP_FILE_NAME,
     )
-    uploaded_files.extend(components_zip_files_uploaded)
+
+    uploaded_files = upload_planner.execute()
 
     return MetadataUploadInfo(
         uploaded_files=uploaded_files,
@@ -11,7 +11,7 @@ import yaml
 from pydantic import ValidationError
 from pydash.objects import get
 
-from metadata_service.docker_hub import get_latest_version_on_dockerhub, is_image_on_docker_hub
+from metadata_service.docker_hub import find_missing_images_on_docker_hub, get_latest_version_on_dockerhub, is_image_on_docker_hub
 from metadata_service.models.generated.ConnectorMetadataDefinitionV0 import ConnectorMetadataDefinitionV0
 
 
@@ -64,9 +64,10 @@ def validate_metadata_images_in_dockerhub(
     images_to_check = list(set(filter(lambda x: None not in x, possible_docker_images)))
 
     print(f"Checking that the following images are on dockerhub: {images_to_check}")
-    for image, version in images_to_check:
-        if not is_image_on_docker_hub(image, version, retries=3):
-            return False, f"Image {image}:{version} does not exist in DockerHub"
+    missing_images = find_missing_images_on_docker_hub(images_to_check, retries=3)
+    if missing_images:
+        image, version = missing_images[0]
+        return False, f"Image {image}:{version} does not exist in DockerHub"
 
     return True, None
 
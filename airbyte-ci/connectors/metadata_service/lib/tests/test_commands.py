@@ -7,7 +7,7 @@ import pathlib
 import pytest
 from click.testing import CliRunner
 from pydantic import BaseModel, ValidationError, error_wrappers
-from test_gcs_upload import stub_is_image_on_docker_hub
+from test_gcs_upload import stub_find_missing_images_on_docker_hub, stub_is_image_on_docker_hub
 
 from metadata_service import commands
 from metadata_service.gcs_upload import MetadataUploadInfo, UploadedFile
@@ -27,6 +27,10 @@ def test_valid_metadata_yaml_files(mocker, valid_metadata_yaml_files, tmp_path):
 
     # Mock dockerhub for base image checks
     mocker.patch("metadata_service.validators.metadata_validator.is_image_on_docker_hub", side_effect=stub_is_image_on_docker_hub)
+    mocker.patch(
+        "metadata_service.validators.metadata_validator.find_missing_images_on_docker_hub",
+        side_effect=stub_find_missing_images_on_docker_hub,
+    )
     mocker.patch("metadata_service.commands.PRE_UPLOAD_VALIDATORS", PATCHED_VALIDATORS)
     assert len(valid_metadata_yaml_files) > 0, "No files found"
 
@@ -39,6 +43,10 @@ def test_invalid_metadata_yaml_files(mocker, invalid_metadata_yaml_files, tmp_pa
     runner = CliRunner()
 
     mocker.patch("metadata_service.validators.metadata_validator.is_image_on_docker_hub", side_effect=stub_is_image_on_docker_hub)
+    mocker.patch(
+        "metadata_service.validators.metadata_validator.find_missing_images_on_docker_hub",
+        side_effect=stub_find_missing_images_on_docker_hub,
+    )
     mocker.patch("metadata_service.commands.PRE_UPLOAD_VALIDATORS", PATCHED_VALIDATORS)
 
     assert len(invalid_metadata_yaml_files) > 0, "No files found"
@@ -3,7 +3,11 @@
 #
 
 
+import json
+import threading
 import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
 import pytest
 
@@ -29,3 +33,140 @@ def test_get_latest_version_on_dockerhub(image_name):
     assert (
         docker_hub.get_latest_version_on_dockerhub(image_name) is not None
     ), f"No latest version found for {image_name}. We expect one to exist."
+
+
+class FakeDockerHub:
+    """Serve the tags of in memory repositories like the Docker Hub API does."""
+
+    def __init__(self):
+        self.repositories = {}
+        self.requests = []
+
+    def tags_page(self, path: str, query: dict):
+        repository = path.removeprefix("/v2/repositories/").removesuffix("/tags")
+        if repository not in self.repositories:
+            return None
+        page, page_size = int(query.get("page", ["1"])[0]), int(query.get("page_size", ["10"])[0])
+        tags = list(self.repositories[repository].items())
+        return {
+            "count": len(tags),
+            "results": [{"name": tag, "digest": digest} for tag, digest in tags[(page - 1) * page_size : page * page_size]],
+        }
+
+
+@pytest.fixture
+def fake_docker_hub():
+    fake_docker_hub = FakeDockerHub()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            fake_docker_hub.requests.append(self.path)
+            page = fake_docker_hub.tags_page(url.path, parse_qs(url.query))
+            self.send_response(200 if page is not None else 404)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps(page or {"message": "not found"}).encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    fake_docker_hub.url = f"http://127.0.0.1:{server.server_port}"
+    yield fake_docker_hub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def tag_index(fake_docker_hub, tmp_path, mocker):
+    mocker.patch.object(docker_hub, "get_docker_hub_headers", return_value={})
+    return docker_hub.DockerHubTagIndex(api_url=fake_docker_hub.url, cache_directory=tmp_path)
+
+
+def test_tag_index_lists_all_pages(fake_docker_hub, tag_index):
+    fake_docker_hub.repositories["airbyte/source-faker"] = {f"0.{i}.0": f"sha256:{i}" for i in range(250)}
+
+    tags_and_digests = tag_index.get_tags_and_digests("airbyte/source-faker")
+
+    assert len(tags_and_digests) == 250
+    assert tags_and_digests["0.249.0"] == "sha256:249"
+    assert len(fake_docker_hub.requests) == 3
+
+
+def test_tag_index_resolves_images_with_one_listing_per_repository(fake_docker_hub, tag_index):
+    fake_docker_hub.repositories["airbyte/source-faker"] = {"1.0.0": "sha256:a", "1.1.0": "sha256:b"}
+    fake_docker_hub.repositories["airbyte/python-connector-base"] = {"2.0.0": "sha256:c"}
+
+    missing_images = tag_index.find_missing_image_references(
+        [
+            ("airbyte/source-faker", "1.0.0", None),
+            ("airbyte/source-faker", "1.1.0", "b"),
+            ("airbyte/source-faker", "1.2.0", None),
+            ("airbyte/python-connector-base", "2.0.0", "wrong"),
+            ("airbyte/source-unreleased", "0.1.0", None),
+        ]
+    )
+
+    assert missing_images == [
+        ("airbyte/source-faker", "1.2.0", None),
+        ("airbyte/python-connector-base", "2.0.0", "wrong"),
+        ("airbyte/source-unreleased", "0.1.0", None),
+    ]
+    assert len(fake_docker_hub.requests) == 3
+    assert tag_index.find_missing_image_references([("airbyte/source-faker", "1.0.0", None)]) == []
+    assert len(fake_docker_hub.requests) == 3
+
+
+def test_tag_index_uses_the_disk_cache(fake_docker_hub, tag_index, tmp_path):
+    fake_docker_hub.repositories["airbyte/source-faker"] = {"1.0.0": "sha256:a"}
+    assert tag_index.find_missing_image_references([("airbyte/source-faker", "1.0.0", None)]) == []
+
+    other_run_tag_index = docker_hub.DockerHubTagIndex(api_url=fake_docker_hub.url, cache_directory=tmp_path)
+    assert other_run_tag_index.find_missing_image_references([("airbyte/source-faker", "1.0.0", "a")]) == []
+    assert len(fake_docker_hub.requests) == 1
+
+    expired_cache_tag_index = docker_hub.DockerHubTagIndex(api_url=fake_docker_hub.url, cache_directory=tmp_path, cache_ttl_seconds=0)
+    assert expired_cache_tag_index.get_tags_and_digests("airbyte/source-faker") == {"1.0.0": "sha256:a"}
+    assert len(fake_docker_hub.requests) == 2
+
+
+def test_failed_cache_write_leaves_no_temporary_file(fake_docker_hub, tag_index, tmp_path, mocker):
+    fake_docker_hub.repositories["airbyte/source-faker"] = {"1.0.0": "sha256:a"}
+    mocker.patch.object(docker_hub.json, "dump", side_effect=OSError("No space left on device"))
+
+    assert tag_index.get_tags_and_digests("airbyte/source-faker") == {"1.0.0": "sha256:a"}
+    assert [path for path in tmp_path.rglob("*") if path.is_file()] == []
+
+
+def test_tag_index_lists_cached_repositories_again_for_missing_tags(fake_docker_hub, tag_index, tmp_path):
+    fake_docker_hub.repositories["airbyte/source-faker"] = {"1.0.0": "sha256:a"}
+    tag_index.get_tags_and_digests("airbyte/source-faker")
+    fake_docker_hub.repositories["airbyte/source-faker"]["1.1.0"] = "sha256:b"
+
+    other_run_tag_index = docker_hub.DockerHubTagIndex(api_url=fake_docker_hub.url, cache_directory=tmp_path)
+
+    assert other_run_tag_index.find_missing_image_references([("airbyte/source-faker", "1.1.0", None)]) == []
+    assert len(fake_docker_hub.requests) == 2
+
+
+def test_tag_index_retries_missing_images(fake_docker_hub, tag_index, mocker):
+    sleep = mocker.patch.object(docker_hub.time, "sleep")
+
+    assert tag_index.find_missing_image_references([("airbyte/source-faker", "1.0.0", None)], retries=2, wait_sec=1) == [
+        ("airbyte/source-faker", "1.0.0", None)
+    ]
+    assert sleep.call_count == 2
+    assert len(fake_docker_hub.requests) == 3
+
+
+def test_get_latest_version_on_dockerhub_does_not_use_cached_tags(fake_docker_hub, tag_index, mocker):
+    mocker.patch.object(docker_hub, "get_docker_hub_tag_index", return_value=tag_index)
+    fake_docker_hub.repositories["airbyte/source-faker"] = {"1.0.0": "sha256:a", "latest": "sha256:a"}
+    assert docker_hub.get_latest_version_on_dockerhub("airbyte/source-faker") == "1.0.0"
+
+    fake_docker_hub.repositories["airbyte/source-faker"].update({"1.1.0": "sha256:b", "latest": "sha256:b"})
+
+    assert docker_hub.get_latest_version_on_dockerhub("airbyte/source-faker") == "1.1.0"
+    assert len(fake_docker_hub.requests) == 2
@@ -3,6 +3,7 @@
 #
 
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Optional
 
 import pytest
@@ -12,12 +13,17 @@ from pydash.objects import get
 from metadata_service import gcs_upload
 from metadata_service.constants import (
     COMPONENTS_PY_FILE_NAME,
+    COMPONENTS_ZIP_FILE_NAME,
+    COMPONENTS_ZIP_SHA256_FILE_NAME,
     DOC_FILE_NAME,
+    DOC_INAPP_FILE_NAME,
+    ICON_FILE_NAME,
     LATEST_GCS_FOLDER_NAME,
     MANIFEST_FILE_NAME,
     METADATA_FILE_NAME,
     RELEASE_CANDIDATE_GCS_FOLDER_NAME,
 )
+from metadata_service.helpers.files import compute_gcs_md5
 from metadata_service.models.generated.ConnectorMetadataDefinitionV0 import ConnectorMetadataDefinitionV0
 from metadata_service.models.transform import to_json_sanitized_dict
 from metadata_service.validators.metadata_validator import ValidatorOptions
@@ -39,6 +45,10 @@ def stub_is_image_on_docker_hub(image_name: str, version: str, digest: Optional[
     return image_exists
 
 
+def stub_find_missing_images_on_docker_hub(images, retries: int = 0, wait_sec: int = 30) -> list:
+    return [(image_name, version) for image_name, version in images if not stub_is_image_on_docker_hub(image_name, version)]
+
+
 # Fixtures
 
 
@@ -95,6 +105,19 @@ def assert_blob_upload(upload_info, upload_info_file_key, blob_mock, should_uplo
         assert not file_uploaded, failure_message
 
 
+def assert_uploads_planned(execute_spy, expected_uploads):
+    """
+    Assert that the (local file path, blob path, disable cache) uploads were planned, whether they were needed or not.
+    """
+    planned_uploads = {
+        (planned_upload.local_file_path, planned_upload.blob_path, planned_upload.disable_cache)
+        for execute_call in execute_spy.call_args_list
+        for planned_upload in execute_call.args[0].planned_uploads
+    }
+    for expected_upload in expected_uploads:
+        assert expected_upload in planned_uploads
+
+
 # Mocks
 
 
@@ -111,6 +134,10 @@ def setup_upload_mocks(
 ):
     # Mock dockerhub
     mocker.patch("metadata_service.validators.metadata_validator.is_image_on_docker_hub", side_effect=stub_is_image_on_docker_hub)
+    mocker.patch(
+        "metadata_service.validators.metadata_validator.find_missing_images_on_docker_hub",
+        side_effect=stub_find_missing_images_on_docker_hub,
+    )
 
     # Mock GCS
     service_account_json = '{"type": "service_account"}'
@@ -201,6 +228,26 @@ def setup_upload_mocks(
 
     mock_bucket.blob.side_effect = side_effect_bucket_blob
 
+    # Mock bucket listing, with the blobs that exist in the listed folder
+
+    def side_effect_bucket_list_blobs(prefix):
+        listed_blobs = []
+        for file_name in [
+            METADATA_FILE_NAME,
+            DOC_FILE_NAME,
+            DOC_INAPP_FILE_NAME,
+            MANIFEST_FILE_NAME,
+            COMPONENTS_ZIP_FILE_NAME,
+            COMPONENTS_ZIP_SHA256_FILE_NAME,
+            ICON_FILE_NAME,
+        ]:
+            blob = side_effect_bucket_blob(f"{prefix}{file_name}")
+            if blob.exists():
+                listed_blobs.append(SimpleNamespace(name=f"{prefix}{file_name}", md5_hash=blob.md5_hash, id=blob.id))
+        return listed_blobs
+
+    mock_bucket.list_blobs.side_effect = side_effect_bucket_list_blobs
+
     # Mock md5 hash
     def side_effect_compute_gcs_md5(file_path):
         if str(file_path) == str(metadata_file_path):
@@ -348,8 +395,7 @@ def test_upload_metadata_to_gcs_valid_metadata(
     doc_version_blob_md5_hash,
     doc_latest_blob_md5_hash,
 ):
-    mocker.spy(gcs_upload, "_file_upload")
-    mocker.spy(gcs_upload, "upload_file_if_changed")
+    mocker.spy(gcs_upload.UploadPlanner, "execute")
     for valid_metadata_upload_file in valid_metadata_upload_files:
         print("\nTesting upload of valid metadata file: " + valid_metadata_upload_file)
         metadata_file_path = Path(valid_metadata_upload_file)
@@ -387,40 +433,18 @@ def test_upload_metadata_to_gcs_valid_metadata(
 
         expected_calls = [
             # Always upload the versioned metadata
-            mocker.call(
-                local_file_path=metadata_file_path, bucket=mocks["mock_bucket"], blob_path=expected_version_key, disable_cache=True
-            ),
+            (metadata_file_path, expected_version_key, True),
             # Always upload the versioned doc
-            mocker.call(
-                local_file_path=VALID_DOC_FILE_PATH,
-                bucket=mocks["mock_bucket"],
-                blob_path=expected_version_doc_key,
-                disable_cache=False,
-            ),
+            (VALID_DOC_FILE_PATH, expected_version_doc_key, False),
         ]
 
         if is_release_candidate:
-            expected_calls.append(
-                mocker.call(
-                    local_file_path=metadata_file_path,
-                    bucket=mocks["mock_bucket"],
-                    blob_path=expected_release_candidate_key,
-                    disable_cache=True,
-                )
-            )
+            expected_calls.append((metadata_file_path, expected_release_candidate_key, True))
         else:
-            expected_calls.append(
-                mocker.call(
-                    local_file_path=VALID_DOC_FILE_PATH, bucket=mocks["mock_bucket"], blob_path=expected_latest_doc_key, disable_cache=False
-                )
-            )
-            expected_calls.append(
-                mocker.call(
-                    local_file_path=metadata_file_path, bucket=mocks["mock_bucket"], blob_path=expected_latest_key, disable_cache=True
-                )
-            )
+            expected_calls.append((VALID_DOC_FILE_PATH, expected_latest_doc_key, False))
+            expected_calls.append((metadata_file_path, expected_latest_key, True))
 
-        gcs_upload.upload_file_if_changed.assert_has_calls(expected_calls, any_order=True)
+        assert_uploads_planned(gcs_upload.UploadPlanner.execute, expected_calls)
 
         # Assert correct files were uploaded
 
@@ -470,7 +494,7 @@ def test_upload_metadata_to_gcs_valid_metadata(
         )
 
         # clear the call count
-        gcs_upload.upload_file_if_changed.reset_mock()
+        gcs_upload.UploadPlanner.execute.reset_mock()
 
 
 def test_upload_metadata_to_gcs_non_existent_metadata_file():
@@ -486,6 +510,10 @@ def test_upload_metadata_to_gcs_non_existent_metadata_file():
 def test_upload_invalid_metadata_to_gcs(mocker, invalid_metadata_yaml_files):
     # Mock dockerhub
     mocker.patch("metadata_service.validators.metadata_validator.is_image_on_docker_hub", side_effect=stub_is_image_on_docker_hub)
+    mocker.patch(
+        "metadata_service.validators.metadata_validator.find_missing_images_on_docker_hub",
+        side_effect=stub_find_missing_images_on_docker_hub,
+    )
 
     # Test that all invalid metadata files throw a ValueError
     for invalid_metadata_file in invalid_metadata_yaml_files:
@@ -524,8 +552,7 @@ def test_upload_metadata_to_gcs_invalid_docker_images(mocker, invalid_metadata_u
 
 
 def test_upload_metadata_to_gcs_with_prerelease(mocker, valid_metadata_upload_files, tmp_path):
-    mocker.spy(gcs_upload, "_file_upload")
-    mocker.spy(gcs_upload, "upload_file_if_changed")
+    mocker.spy(gcs_upload.UploadPlanner, "execute")
     prerelease_image_tag = "1.5.6-dev.f80318f754"
 
     for valid_metadata_upload_file in valid_metadata_upload_files:
@@ -566,12 +593,10 @@ def test_upload_metadata_to_gcs_with_prerelease(mocker, valid_metadata_upload_fi
         # Assert uploads attempted
 
         expected_calls = [
-            mocker.call(
-                local_file_path=tmp_metadata_file_path, bucket=mocks["mock_bucket"], blob_path=expected_version_key, disable_cache=True
-            ),
+            (tmp_metadata_file_path, expected_version_key, True),
         ]
 
-        gcs_upload.upload_file_if_changed.assert_has_calls(expected_calls, any_order=True)
+        assert_uploads_planned(gcs_upload.UploadPlanner.execute, expected_calls)
 
         # Assert versioned uploads happened
 
@@ -614,14 +639,12 @@ def test_upload_metadata_to_gcs_with_prerelease(mocker, valid_metadata_upload_fi
         )
 
         # clear the call count
-        gcs_upload._file_upload.reset_mock()
-        gcs_upload.upload_file_if_changed.reset_mock()
+        gcs_upload.UploadPlanner.execute.reset_mock()
 
 
 @pytest.mark.parametrize("prerelease", [True, False])
 def test_upload_metadata_to_gcs_release_candidate(mocker, get_fixture_path, tmp_path, prerelease):
-    mocker.spy(gcs_upload, "_file_upload")
-    mocker.spy(gcs_upload, "upload_file_if_changed")
+    mocker.spy(gcs_upload.UploadPlanner, "execute")
     release_candidate_metadata_file = get_fixture_path(
         "metadata_upload/valid/referenced_image_in_dockerhub/metadata_release_candidate.yaml"
     )
@@ -705,8 +728,7 @@ def test_upload_metadata_to_gcs_release_candidate(mocker, get_fixture_path, tmp_
 def test_upload_metadata_to_gcs_with_manifest_files(
     mocker, valid_metadata_upload_files, tmp_path, monkeypatch, manifest_exists, components_py_exists
 ):
-    mocker.spy(gcs_upload, "_file_upload")
-    mocker.spy(gcs_upload, "upload_file_if_changed")
+    mocker.spy(gcs_upload.UploadPlanner, "execute")
     valid_metadata_upload_file = valid_metadata_upload_files[0]
 
     metadata_file_path = Path(valid_metadata_upload_file)
@@ -797,5 +819,124 @@ def test_upload_metadata_to_gcs_with_manifest_files(
     )
 
     # clear the call count
-    gcs_upload._file_upload.reset_mock()
-    gcs_upload.upload_file_if_changed.reset_mock()
+    gcs_upload.UploadPlanner.execute.reset_mock()
+
+
+# Upload planner
+
+
+class FakeBlob:
+    def __init__(self, bucket: "FakeBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+        self.cache_control = None
+
+    @property
+    def id(self) -> str:
+        return f"{self.bucket.name}/{self.name}"
+
+    @property
+    def md5_hash(self) -> Optional[str]:
+        return self.bucket.md5_hashes.get(self.name)
+
+    def upload_from_filename(self, file_path: Path):
+        self.bucket.uploaded_blob_names.append(self.name)
+        self.bucket.md5_hashes[self.name] = compute_gcs_md5(file_path)
+
+
+class FakeBucket:
+    """In-memory stand-in of a GCS bucket, counting the requests made to it."""
+
+    def __init__(self, name: str = "fake_bucket"):
+        self.name = name
+        self.md5_hashes = {}
+        self.uploaded_blob_names = []
+        self.listed_prefixes = []
+
+    def blob(self, name: str) -> FakeBlob:
+        return FakeBlob(self, name)
+
+    def list_blobs(self, prefix: str):
+        self.listed_prefixes.append(prefix)
+        return [FakeBlob(self, name) for name in self.md5_hashes if name.startswith(prefix)]
+
+
+def test_upload_planner_lists_each_folder_once_and_uploads_changed_files(tmp_path):
+    unchanged_file, changed_file, new_file = tmp_path / "unchanged.yaml", tmp_path / "changed.md", tmp_path / "new.svg"
+    for file_path in [unchanged_file, changed_file, new_file]:
+        file_path.write_text(f"content of {file_path.name}")
+    bucket = FakeBucket()
+    bucket.md5_hashes = {
+        "metadata/airbyte/source-faker/1.0.0/unchanged.yaml": compute_gcs_md5(unchanged_file),
+        "metadata/airbyte/source-faker/1.0.0/changed.md": "stale_md5_hash",
+        "metadata/airbyte/source-faker/latest/unchanged.yaml": compute_gcs_md5(unchanged_file),
+    }
+
+    upload_planner = gcs_upload.UploadPlanner(bucket)
+    upload_planner.plan_file_upload(
+        unchanged_file, "metadata/airbyte/source-faker", "metadata", upload_as_version=True, upload_as_latest=True, version_folder="1.0.0"
+    )
+    upload_planner.plan_file_upload(
+        changed_file, "metadata/airbyte/source-faker", "doc", upload_as_version=True, upload_as_latest=False, version_folder="1.0.0"
+    )
+    upload_planner.plan_file_upload(new_file, "metadata/airbyte/source-faker", "icon", upload_as_version=False, upload_as_latest=True)
+    upload_planner.plan_file_upload(
+        tmp_path / "missing.md",
+        "metadata/airbyte/source-faker",
+        "inapp_doc",
+        upload_as_version=True,
+        upload_as_latest=True,
+        version_folder="1.0.0",
+    )
+    results = upload_planner.execute()
+    uploaded_files = {uploaded_file.id: uploaded_file for uploaded_file in results}
+
+    assert [uploaded_file.id for uploaded_file in results] == [
+        "versioned_metadata",
+        "latest_metadata",
+        "versioned_doc",
+        "latest_doc",
+        "versioned_icon",
+        "latest_icon",
+        "versioned_inapp_doc",
+        "latest_inapp_doc",
+    ]
+
+    assert sorted(bucket.listed_prefixes) == ["metadata/airbyte/source-faker/1.0.0/", "metadata/airbyte/source-faker/latest/"]
+    assert sorted(bucket.uploaded_blob_names) == [
+        "metadata/airbyte/source-faker/1.0.0/changed.md",
+        "metadata/airbyte/source-faker/latest/new.svg",
+    ]
+    assert {file_id for file_id, uploaded_file in uploaded_files.items() if uploaded_file.uploaded} == {"versioned_doc", "latest_icon"}
+    assert uploaded_files["versioned_metadata"].blob_id == "fake_bucket/metadata/airbyte/source-faker/1.0.0/unchanged.yaml"
+    assert uploaded_files["latest_inapp_doc"] == gcs_upload.UploadedFile(id="latest_inapp_doc", uploaded=False, blob_id=None)
+
+    # Once uploaded, nothing changed anymore
+    assert not any(uploaded_file.uploaded for uploaded_file in upload_planner.execute())
+
+
+def test_upload_planner_hashes_each_local_file_once(mocker, tmp_path):
+    metadata_file = tmp_path / "metadata.yaml"
+    metadata_file.write_text("data: {}")
+    compute_gcs_md5_spy = mocker.spy(gcs_upload, "compute_gcs_md5")
+
+    upload_planner = gcs_upload.UploadPlanner(FakeBucket())
+    upload_planner.plan_file_upload(
+        metadata_file,
+        "metadata/airbyte/source-faker",
+        "metadata",
+        upload_as_version=True,
+        upload_as_latest=True,
+        version_folder="1.0.0-rc.1",
+    )
+    upload_planner.plan_file_upload(
+        metadata_file,
+        "metadata/airbyte/source-faker",
+        "release_candidate",
+        upload_as_version=True,
+        upload_as_latest=False,
+        version_folder=RELEASE_CANDIDATE_GCS_FOLDER_NAME,
+    )
+
+    assert all(uploaded_file.uploaded for uploaded_file in upload_planner.execute() if uploaded_file.blob_id)
+    assert compute_gcs_md5_spy.call_count == 1
@@ -18,6 +18,7 @@ from orchestrator.config import (
     NIGHTLY_GHA_WORKFLOW_ID,
     NIGHTLY_INDIVIDUAL_TEST_REPORT_FILE_NAME,
     REGISTRIES_FOLDER,
+    REGISTRY_ASSEMBLY_STATE_FOLDER,
     REPORT_FOLDER,
 )
 from orchestrator.jobs.connector_test_report import generate_connector_test_summary_reports, generate_nightly_reports
@@ -82,6 +83,9 @@ GCS_RESOURCE_TREE = {
         }
     ),
     "registry_directory_manager": gcs_file_manager.configured({"gcs_bucket": {"env": "METADATA_BUCKET"}, "prefix": REGISTRIES_FOLDER}),
+    "registry_assembly_state_directory_manager": gcs_file_manager.configured(
+        {"gcs_bucket": {"env": "METADATA_BUCKET"}, "prefix": REGISTRY_ASSEMBLY_STATE_FOLDER}
+    ),
     "registry_report_directory_manager": gcs_file_manager.configured({"gcs_bucket": {"env": "METADATA_BUCKET"}, "prefix": REPORT_FOLDER}),
     "root_metadata_directory_manager": gcs_file_manager.configured({"gcs_bucket": {"env": "METADATA_BUCKET"}, "prefix": ""}),
 }
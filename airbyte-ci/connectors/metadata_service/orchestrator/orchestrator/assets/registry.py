@@ -3,20 +3,24 @@
 #
 
 import copy
+import hashlib
 import json
-from typing import List, Union
+import sys
+from typing import Dict, List, Optional, Union
 
 import semver
 import sentry_sdk
 from dagster import MetadataValue, OpExecutionContext, Output, asset
 from dagster_gcp.gcs.file_manager import GCSFileHandle, GCSFileManager
+from metadata_service.models import transform
 from metadata_service.models.generated.ConnectorRegistryDestinationDefinition import ConnectorRegistryDestinationDefinition
 from metadata_service.models.generated.ConnectorRegistrySourceDefinition import ConnectorRegistrySourceDefinition
 from metadata_service.models.generated.ConnectorRegistryV0 import ConnectorRegistryV0
-from metadata_service.models.transform import to_json_sanitized_dict
+from metadata_service.models.transform import to_json, to_json_sanitized_dict
 from orchestrator.assets.registry_entry import ConnectorTypePrimaryKey, ConnectorTypes
 from orchestrator.logging import sentry
 from orchestrator.logging.publish_connector_lifecycle import PublishConnectorLifecycle, PublishConnectorLifecycleStage, StageStatus
+from orchestrator.utils import object_helpers
 from orchestrator.utils.object_helpers import default_none_to_dict
 from pydash.objects import set_with
 
@@ -66,7 +70,7 @@ def apply_metrics_to_registry_entry(registry_entry_dict: dict, connector_type: C
 
 @sentry_sdk.trace
 def persist_registry_to_json(
-    registry: ConnectorRegistryV0, registry_name: str, registry_directory_manager: GCSFileManager
+    registry: ConnectorRegistryV0, registry_name: str, registry_directory_manager: GCSFileManager, registry_json: Optional[str] = None
 ) -> GCSFileHandle:
     """Persist the registry to a json file on GCS bucket
 
@@ -74,12 +78,13 @@ def persist_registry_to_json(
         registry (ConnectorRegistryV0): The registry.
         registry_name (str): The name of the registry. One of "cloud" or "oss".
         registry_directory_manager (OutputDataFrame): The registry directory manager.
+        registry_json (Optional[str]): The registry already serialized with exclude_none, to not serialize it again.
 
     Returns:
         OutputDataFrame: The registry directory manager.
     """
     registry_file_name = f"{registry_name}_registry"
-    registry_json = registry.json(exclude_none=True)
+    registry_json = registry_json if registry_json is not None else registry.json(exclude_none=True)
 
     file_handle = registry_directory_manager.write_data(registry_json.encode("utf-8"), ext="json", key=registry_file_name)
     return file_handle
@@ -138,6 +143,208 @@ def get_connector_type_from_registry_entry(registry_entry: PolymorphicRegistryEn
         raise ValueError("Registry entry is not a source or destination")
 
 
+def get_registry_entry_derivation_fingerprint() -> str:
+    """Fingerprint of the code deriving the registry entries: the entries of a previous assembly must be derived again when it changes."""
+    fingerprint = hashlib.sha256()
+    for module in [sys.modules[__name__], object_helpers, transform, sys.modules[ConnectorRegistryV0.__module__]]:
+        with open(module.__file__, "rb") as module_file:
+            fingerprint.update(module_file.read())
+    return fingerprint.hexdigest()
+
+
+class IncrementalRegistryAssembler:
+    """Assemble a registry from its latest entries, only re-deriving the entries whose inputs changed since the last assembly.
+
+    An entry is derived from the latest registry entry, its metrics and its release candidate.
+    The validated entries of the last assembly are kept by the content hash of these inputs,
+    so that unchanged entries are spliced into the new registry as is instead of being sanitized, enriched and validated again.
+    The state of the last assembly can be dumped, and loaded by the next process assembling the registry
+    if it was dumped by the same version of the code deriving the entries.
+    """
+
+    def __init__(self):
+        self._entries_by_content_hash: Dict[str, PolymorphicRegistryEntry] = {}
+        # Entries of a persisted assembly state, only validated when they are reused
+        self._persisted_entry_dicts_by_content_hash: Dict[str, dict] = {}
+        self._content_hashes: Dict[str, List[str]] = {"sources": [], "destinations": []}
+        self.last_registry: Optional[ConnectorRegistryV0] = None
+        self.last_rederived_entry_count = 0
+
+    @property
+    def has_state(self) -> bool:
+        return bool(self._entries_by_content_hash or self._persisted_entry_dicts_by_content_hash)
+
+    @staticmethod
+    def _get_content_hash(
+        latest_registry_entry_json: str,
+        connector_type: ConnectorTypes,
+        metrics: dict,
+        release_candidate_registry_entry: Optional[PolymorphicRegistryEntry],
+    ) -> str:
+        content_hash = hashlib.sha256(REGISTRY_ENTRY_DERIVATION_FINGERPRINT.encode("utf-8"))
+        content_hash.update(connector_type.value.encode("utf-8"))
+        content_hash.update(latest_registry_entry_json.encode("utf-8"))
+        content_hash.update(json.dumps(metrics, sort_keys=True, default=str).encode("utf-8"))
+        if release_candidate_registry_entry is not None:
+            content_hash.update(to_json(release_candidate_registry_entry).encode("utf-8"))
+        return content_hash.hexdigest()
+
+    @staticmethod
+    def _get_registry_entry_model(connector_type: ConnectorTypes):
+        return ConnectorRegistryV0.__fields__[f"{connector_type.value}s"].type_
+
+    @staticmethod
+    def _derive_registry_entry(
+        latest_registry_entry_json: str,
+        connector_type: ConnectorTypes,
+        latest_connector_metrics: dict,
+        docker_repository_to_rc_registry_entry: dict,
+    ) -> PolymorphicRegistryEntry:
+        # We sanitize the registry entry to ensure its in a format
+        # that can be parsed by pydantic. The JSON the content hash is computed from is reused to not serialize the entry twice.
+        registry_entry_dict = json.loads(latest_registry_entry_json)
+        enriched_registry_entry_dict = apply_metrics_to_registry_entry(registry_entry_dict, connector_type, latest_connector_metrics)
+        enriched_registry_entry_dict = apply_release_candidate_entries(enriched_registry_entry_dict, docker_repository_to_rc_registry_entry)
+
+        # Validate the entry with the model the registry expects, so that the registry itself does not need to be validated again
+        registry_entry_model = IncrementalRegistryAssembler._get_registry_entry_model(connector_type)
+        return registry_entry_model.parse_obj(enriched_registry_entry_dict)
+
+    def _get_known_registry_entry(self, content_hash: str, connector_type: ConnectorTypes) -> Optional[PolymorphicRegistryEntry]:
+        if content_hash in self._entries_by_content_hash:
+            return self._entries_by_content_hash[content_hash]
+        if content_hash in self._persisted_entry_dicts_by_content_hash:
+            registry_entry_dict = self._persisted_entry_dicts_by_content_hash[content_hash]
+            return self._get_registry_entry_model(connector_type).parse_obj(registry_entry_dict)
+        return None
+
+    @sentry_sdk.trace
+    def assemble(
+        self,
+        latest_registry_entries: List,
+        release_candidate_registry_entries: List,
+        latest_connector_metrics: dict,
+    ) -> ConnectorRegistryV0:
+        """Assemble the registry, re-deriving only the entries which changed since the last assembly.
+
+        Args:
+            latest_registry_entries (List): The latest registry entries.
+            release_candidate_registry_entries (List): The release candidate registry entries.
+            latest_connector_metrics (dict): The connector metrics, by connector definition id.
+
+        Returns:
+            ConnectorRegistryV0: The registry.
+        """
+        registry_entries = {"sources": [], "destinations": []}
+        content_hashes = {"sources": [], "destinations": []}
+        entries_by_content_hash = {}
+        rederived_entry_count = 0
+
+        docker_repository_to_rc_registry_entry = {
+            release_candidate_registry_entries.dockerRepository: release_candidate_registry_entries
+            for release_candidate_registry_entries in release_candidate_registry_entries
+        }
+
+        for latest_registry_entry in latest_registry_entries:
+            connector_type = get_connector_type_from_registry_entry(latest_registry_entry)
+            plural_connector_type = f"{connector_type.value}s"
+            connector_id = str(getattr(latest_registry_entry, ConnectorTypePrimaryKey[connector_type.value]))
+            latest_registry_entry_json = to_json(latest_registry_entry)
+            content_hash = self._get_content_hash(
+                latest_registry_entry_json,
+                connector_type,
+                latest_connector_metrics.get(connector_id, {}),
+                docker_repository_to_rc_registry_entry.get(latest_registry_entry.dockerRepository),
+            )
+
+            registry_entry = entries_by_content_hash.get(content_hash) or self._get_known_registry_entry(content_hash, connector_type)
+            if registry_entry is None:
+                registry_entry = self._derive_registry_entry(
+                    latest_registry_entry_json, connector_type, latest_connector_metrics, docker_repository_to_rc_registry_entry
+                )
+                rederived_entry_count += 1
+
+            entries_by_content_hash[content_hash] = registry_entry
+            registry_entries[plural_connector_type].append(registry_entry)
+            content_hashes[plural_connector_type].append(content_hash)
+
+        # The entries are already validated: build the registry without validating all of them again
+        registry = ConnectorRegistryV0.construct(**registry_entries)
+
+        # Entries which are no longer in the registry are dropped
+        self._entries_by_content_hash = entries_by_content_hash
+        self._persisted_entry_dicts_by_content_hash = {}
+        self._content_hashes = content_hashes
+        self.last_registry = registry
+        self.last_rederived_entry_count = rederived_entry_count
+        return registry
+
+    def dump_state(self, registry_json: str) -> str:
+        """Dump the state of the last assembly, to be loaded by the next process assembling the registry.
+
+        Args:
+            registry_json (str): The last assembled registry, serialized with exclude_none.
+
+        Returns:
+            str: The fingerprint of the code deriving the entries, their content hashes, and the registry they are the entries of.
+        """
+        # The registry is embedded as is, so that the state is always consistent without serializing the entries again
+        return (
+            f'{{"derivation_fingerprint": {json.dumps(REGISTRY_ENTRY_DERIVATION_FINGERPRINT)}, '
+            f'"content_hashes": {json.dumps(self._content_hashes)}, "registry": {registry_json}}}'
+        )
+
+    def load_state(self, state: dict) -> bool:
+        """Load the state dumped by a previous assembly, its entries are only validated when they are reused.
+
+        Args:
+            state (dict): The state dumped by dump_state.
+
+        Returns:
+            bool: Whether the state was loaded. A state dumped by another version of the code deriving the entries is discarded.
+        """
+        if state.get("derivation_fingerprint") != REGISTRY_ENTRY_DERIVATION_FINGERPRINT:
+            return False
+        self._persisted_entry_dicts_by_content_hash = {
+            content_hash: registry_entry_dict
+            for plural_connector_type, content_hashes in state["content_hashes"].items()
+            for content_hash, registry_entry_dict in zip(content_hashes, state["registry"].get(plural_connector_type, []))
+        }
+        return True
+
+
+REGISTRY_ENTRY_DERIVATION_FINGERPRINT = get_registry_entry_derivation_fingerprint()
+
+# The assemblers are kept for the lifetime of the process, so that successive materializations of a registry in a process
+# do not load the assembly state again
+REGISTRY_ASSEMBLERS: Dict[str, IncrementalRegistryAssembler] = {}
+
+
+def get_registry_assembler(registry_name: str) -> IncrementalRegistryAssembler:
+    if registry_name not in REGISTRY_ASSEMBLERS:
+        REGISTRY_ASSEMBLERS[registry_name] = IncrementalRegistryAssembler()
+    return REGISTRY_ASSEMBLERS[registry_name]
+
+
+def get_registry_assembly_state_key(registry_name: str) -> str:
+    return f"{registry_name}_registry_assembly_state"
+
+
+def load_registry_assembly_state(
+    context: OpExecutionContext,
+    registry_assembler: IncrementalRegistryAssembler,
+    registry_name: str,
+    assembly_state_directory_manager: GCSFileManager,
+) -> None:
+    """Load the persisted assembly state, a missing, outdated or unreadable state only makes the assembly a full one."""
+    try:
+        state_bytes = assembly_state_directory_manager.read_by_key(get_registry_assembly_state_key(registry_name), ext="json")
+        if state_bytes is not None and not registry_assembler.load_state(json.loads(state_bytes)):
+            context.log.info(f"The {registry_name} registry assembly state was dumped by another version of the code, discarding it.")
+    except Exception as e:
+        context.log.warning(f"Could not load the {registry_name} registry assembly state, assembling the whole registry: {e}")
+
+
 @sentry_sdk.trace
 def generate_and_persist_registry(
     context: OpExecutionContext,
@@ -146,12 +353,17 @@ def generate_and_persist_registry(
     registry_directory_manager: GCSFileManager,
     registry_name: str,
     latest_connector_metrics: dict,
+    incremental: bool = True,
+    assembly_state_directory_manager: Optional[GCSFileManager] = None,
 ) -> Output[ConnectorRegistryV0]:
     """Generate the selected registry from the metadata files, and persist it to GCS.
 
     Args:
         context (OpExecutionContext): The execution context.
         registry_entry_file_blobs (storage.Blob): The registry entries.
+        incremental (bool): Whether to reuse the entries of the last assembled registry which did not change.
+        assembly_state_directory_manager (Optional[GCSFileManager]): Where the assembly state is persisted between processes,
+            apart from the public registries. The state is only kept in the process when it is None.
 
     Returns:
         Output[ConnectorRegistryV0]: The registry.
@@ -163,31 +375,22 @@ def generate_and_persist_registry(
         f"Generating {registry_name} registry...",
     )
 
-    registry_dict = {"sources": [], "destinations": []}
-
-    docker_repository_to_rc_registry_entry = {
-        release_candidate_registry_entries.dockerRepository: release_candidate_registry_entries
-        for release_candidate_registry_entries in release_candidate_registry_entries
-    }
-
-    for latest_registry_entry in latest_registry_entries:
-        connector_type = get_connector_type_from_registry_entry(latest_registry_entry)
-        plural_connector_type = f"{connector_type.value}s"
-
-        # We sanitize the registry entry to ensure its in a format
-        # that can be parsed by pydantic.
-        registry_entry_dict = to_json_sanitized_dict(latest_registry_entry)
-        enriched_registry_entry_dict = apply_metrics_to_registry_entry(registry_entry_dict, connector_type, latest_connector_metrics)
-        enriched_registry_entry_dict = apply_release_candidate_entries(enriched_registry_entry_dict, docker_repository_to_rc_registry_entry)
-
-        registry_dict[plural_connector_type].append(enriched_registry_entry_dict)
-
-    registry_model = ConnectorRegistryV0.parse_obj(registry_dict)
+    registry_assembler = get_registry_assembler(registry_name) if incremental else IncrementalRegistryAssembler()
+    if incremental and not registry_assembler.has_state and assembly_state_directory_manager is not None:
+        # Materializations usually run in a fresh process: the state of the last assembly is persisted
+        load_registry_assembly_state(context, registry_assembler, registry_name, assembly_state_directory_manager)
+    registry_model = registry_assembler.assemble(latest_registry_entries, release_candidate_registry_entries, latest_connector_metrics)
 
-    file_handle = persist_registry_to_json(registry_model, registry_name, registry_directory_manager)
+    registry_json = registry_model.json(exclude_none=True)
+    file_handle = persist_registry_to_json(registry_model, registry_name, registry_directory_manager, registry_json=registry_json)
+    if assembly_state_directory_manager is not None:
+        assembly_state_directory_manager.write_data(
+            registry_assembler.dump_state(registry_json).encode("utf-8"), ext="json", key=get_registry_assembly_state_key(registry_name)
+        )
 
     metadata = {
         "gcs_path": MetadataValue.url(file_handle.public_url),
+        "rederived_entry_count": registry_assembler.last_rederived_entry_count,
     }
 
     PublishConnectorLifecycle.log(
@@ -207,6 +410,7 @@ def generate_and_persist_registry(
     required_resource_keys={
         "slack",
         "registry_directory_manager",
+        "registry_assembly_state_directory_manager",
         "latest_oss_registry_entries_file_blobs",
         "release_candidate_oss_registry_entries_file_blobs",
         "latest_metrics_gcs_blob",
@@ -232,6 +436,7 @@ def persisted_oss_registry(
         registry_directory_manager=registry_directory_manager,
         registry_name=registry_name,
         latest_connector_metrics=latest_connector_metrics,
+        assembly_state_directory_manager=context.resources.registry_assembly_state_directory_manager,
     )
 
 
@@ -239,6 +444,7 @@ def persisted_oss_registry(
     required_resource_keys={
         "slack",
         "registry_directory_manager",
+        "registry_assembly_state_directory_manager",
         "latest_cloud_registry_entries_file_blobs",
         "release_candidate_cloud_registry_entries_file_blobs",
         "latest_metrics_gcs_blob",
@@ -264,6 +470,7 @@ def persisted_cloud_registry(
         registry_directory_manager=registry_directory_manager,
         registry_name=registry_name,
         latest_connector_metrics=latest_connector_metrics,
+        assembly_state_directory_manager=context.resources.registry_assembly_state_directory_manager,
     )
 
 
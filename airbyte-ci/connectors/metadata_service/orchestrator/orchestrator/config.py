@@ -11,6 +11,8 @@ DEFAULT_ASSET_URL = "https://storage.googleapis.com"
 VALID_REGISTRIES = ["oss", "cloud"]
 REGISTRIES_FOLDER = "registries/v0"
 REPORT_FOLDER = "generated_reports"
+# Internal state of the registry generation, kept out of the public registries folder
+REGISTRY_ASSEMBLY_STATE_FOLDER = "internal/registry_assembly_state"
 
 NIGHTLY_FOLDER = "airbyte-ci/connectors/test/nightly_builds/master"
 NIGHTLY_COMPLETE_REPORT_FILE_NAME = "complete.json"
@@ -83,6 +83,17 @@ class ContentTypeAwareGCSFileManager(GCSFileManager):
         blob.delete()
         return PublicGCSFileHandle(self._gcs_bucket, gcs_key)
 
+    def read_by_key(self, key: str, ext: Optional[str] = None) -> Optional[bytes]:
+        gcs_key = self.get_full_key(key + (("." + ext) if ext is not None else ""))
+        bucket_obj = self._client.bucket(self._gcs_bucket)
+        blob = bucket_obj.blob(gcs_key)
+
+        # if the file does not exist, return None
+        if not blob.exists():
+            return None
+
+        return blob.download_as_bytes()
+
 
 @resource(config_schema={"gcp_gcs_cred_string": StringSource})
 def gcp_gcs_client(resource_context: InitResourceContext) -> storage.Client:
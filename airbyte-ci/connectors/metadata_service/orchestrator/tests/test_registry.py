@@ -3,6 +3,8 @@
 #
 
 import copy
+import functools
+import json
 from unittest import mock
 from uuid import UUID
 
@@ -12,6 +14,7 @@ from google.cloud import storage
 from metadata_service.models.generated.ConnectorRegistryDestinationDefinition import ConnectorRegistryDestinationDefinition
 from metadata_service.models.generated.ConnectorRegistrySourceDefinition import ConnectorRegistrySourceDefinition
 from metadata_service.models.generated.ConnectorRegistryV0 import ConnectorRegistryV0
+from metadata_service.models.transform import to_json_sanitized_dict
 from orchestrator.assets import registry
 from orchestrator.assets.registry_entry import (
     get_connector_type_from_registry_entry,
@@ -540,3 +543,156 @@ def test_apply_release_candidates_newer_version(mocker):
     )
     result = registry.apply_release_candidates(latest_registry_entry, rc_registry_entry)
     assert "1.1.0-rc.1" in result["releases"]["releaseCandidates"]
+
+
+def registry_source_entry(index: int, docker_image_tag: str = "1.0.0", **extra_fields) -> ConnectorRegistrySourceDefinition:
+    return ConnectorRegistrySourceDefinition.parse_obj(
+        {
+            "name": f"source-test-{index}",
+            "sourceDefinitionId": str(UUID(int=index)),
+            "dockerRepository": f"airbyte/source-test-{index}",
+            "documentationUrl": "https://test_documentation_url.com",
+            "spec": {},
+            "dockerImageTag": docker_image_tag,
+            **extra_fields,
+        }
+    )
+
+
+def registry_destination_entry(index: int) -> ConnectorRegistryDestinationDefinition:
+    return ConnectorRegistryDestinationDefinition.parse_obj(
+        {
+            "name": f"destination-test-{index}",
+            "destinationDefinitionId": str(UUID(int=index)),
+            "dockerRepository": f"airbyte/destination-test-{index}",
+            "documentationUrl": "https://test_documentation_url.com",
+            "spec": {},
+            "dockerImageTag": "1.0.0",
+        }
+    )
+
+
+def test_incremental_registry_assembler_matches_full_assembly():
+    latest_registry_entries = [registry_source_entry(1), registry_destination_entry(2), registry_source_entry(3)]
+    release_candidate = registry_source_entry(3, "1.1.0-rc.1", releases={"rolloutConfiguration": {"enableProgressiveRollout": True}})
+    metrics = {str(UUID(int=1)): {"all": {"usage": "high"}}}
+
+    full_registry_dict = {"sources": [], "destinations": []}
+    docker_repository_to_rc_registry_entry = {release_candidate.dockerRepository: release_candidate}
+    for latest_registry_entry in latest_registry_entries:
+        connector_type = registry.get_connector_type_from_registry_entry(latest_registry_entry)
+        registry_entry_dict = registry.apply_metrics_to_registry_entry(
+            to_json_sanitized_dict(latest_registry_entry), connector_type, metrics
+        )
+        registry_entry_dict = registry.apply_release_candidate_entries(registry_entry_dict, docker_repository_to_rc_registry_entry)
+        full_registry_dict[f"{connector_type.value}s"].append(registry_entry_dict)
+
+    assembled_registry = registry.IncrementalRegistryAssembler().assemble(latest_registry_entries, [release_candidate], metrics)
+
+    assert assembled_registry.json(exclude_none=True) == ConnectorRegistryV0.parse_obj(full_registry_dict).json(exclude_none=True)
+    assert "1.1.0-rc.1" in assembled_registry.sources[1].releases.releaseCandidates.__root__
+
+
+def test_incremental_registry_assembler_only_rederives_changed_entries(mocker):
+    latest_registry_entries = [registry_source_entry(1), registry_source_entry(2), registry_destination_entry(3)]
+    assembler = registry.IncrementalRegistryAssembler()
+    first_registry = assembler.assemble(latest_registry_entries, [], {})
+    assert assembler.last_rederived_entry_count == 3
+
+    derive_spy = mocker.spy(registry.IncrementalRegistryAssembler, "_derive_registry_entry")
+    metrics = {str(UUID(int=2)): {"all": {"usage": "low"}}}
+    second_registry = assembler.assemble(latest_registry_entries[:1] + [latest_registry_entries[1], registry_source_entry(4)], [], metrics)
+
+    assert assembler.last_rederived_entry_count == 2
+    assert derive_spy.call_count == 2
+    assert second_registry.sources[0] is first_registry.sources[0]
+    assert second_registry.sources[1].generated.metrics.dict(exclude_none=True) == {"all": {"usage": "low"}}
+    assert [source.name for source in second_registry.sources] == ["source-test-1", "source-test-2", "source-test-4"]
+    assert second_registry.destinations == []
+    assert assembler.last_registry is second_registry
+
+
+def test_incremental_registry_assembler_reuses_persisted_state():
+    latest_registry_entries = [registry_source_entry(1), registry_destination_entry(2), registry_source_entry(3)]
+    metrics = {str(UUID(int=1)): {"all": {"usage": "high"}}}
+    first_assembler = registry.IncrementalRegistryAssembler()
+    first_registry = first_assembler.assemble(latest_registry_entries, [], metrics)
+    state = first_assembler.dump_state(first_registry.json(exclude_none=True))
+
+    # A fresh process loads the state persisted next to the registry
+    assembler = registry.IncrementalRegistryAssembler()
+    assembler.load_state(json.loads(state))
+    second_registry = assembler.assemble(latest_registry_entries[:2] + [registry_source_entry(3, "1.0.1")], [], metrics)
+
+    assert assembler.last_rederived_entry_count == 1
+    assert second_registry.sources[0] == first_registry.sources[0]
+    assert second_registry.destinations[0] == first_registry.destinations[0]
+    assert second_registry.sources[1].dockerImageTag == "1.0.1"
+    assert second_registry.json(exclude_none=True) == registry.IncrementalRegistryAssembler().assemble(
+        latest_registry_entries[:2] + [registry_source_entry(3, "1.0.1")], [], metrics
+    ).json(exclude_none=True)
+
+
+def test_incremental_registry_assembler_discards_state_of_another_derivation_code(mocker):
+    latest_registry_entries = [registry_source_entry(1), registry_destination_entry(2)]
+    first_assembler = registry.IncrementalRegistryAssembler()
+    state = json.loads(first_assembler.dump_state(first_assembler.assemble(latest_registry_entries, [], {}).json(exclude_none=True)))
+
+    # A deploy changes the code deriving the entries: the unchanged entries are derived again with the new code
+    mocker.patch.object(registry, "REGISTRY_ENTRY_DERIVATION_FINGERPRINT", "new-derivation-code")
+    assembler = registry.IncrementalRegistryAssembler()
+    assert not assembler.load_state(state)
+    assert not assembler.has_state
+    assembler.assemble(latest_registry_entries, [], {})
+
+    assert assembler.last_rederived_entry_count == 2
+
+
+def test_generate_and_persist_registry_persists_assembly_state(mocker):
+    mocker.patch.object(registry, "PublishConnectorLifecycle")
+    mocker.patch.dict(registry.REGISTRY_ASSEMBLERS, clear=True)
+    latest_registry_entries = [registry_source_entry(1), registry_destination_entry(2)]
+    persisted_files = {}
+
+    def write_data(directory, data, ext=None, key=None):
+        persisted_files[f"{directory}/{key}.{ext}"] = data
+        return mocker.Mock(public_url=f"https://example.com/{directory}/{key}.{ext}")
+
+    registry_directory_manager = mocker.Mock(write_data=mocker.Mock(side_effect=functools.partial(write_data, "registries")))
+    assembly_state_directory_manager = mocker.Mock(write_data=mocker.Mock(side_effect=functools.partial(write_data, "internal")))
+    assembly_state_directory_manager.read_by_key.return_value = None
+    registry.generate_and_persist_registry(
+        mocker.Mock(),
+        latest_registry_entries,
+        [],
+        registry_directory_manager,
+        "oss",
+        {},
+        assembly_state_directory_manager=assembly_state_directory_manager,
+    )
+
+    # The state is not published with the public registries
+    assert set(persisted_files) == {"registries/oss_registry.json", "internal/oss_registry_assembly_state.json"}
+
+    # The next materialization runs in a fresh process
+    registry.REGISTRY_ASSEMBLERS.clear()
+    assembly_state_directory_manager.read_by_key.return_value = persisted_files["internal/oss_registry_assembly_state.json"]
+    derive_spy = mocker.spy(registry.IncrementalRegistryAssembler, "_derive_registry_entry")
+    output = registry.generate_and_persist_registry(
+        mocker.Mock(),
+        latest_registry_entries,
+        [],
+        registry_directory_manager,
+        "oss",
+        {},
+        assembly_state_directory_manager=assembly_state_directory_manager,
+    )
+
+    assembly_state_directory_manager.read_by_key.assert_called_with("oss_registry_assembly_state", ext="json")
+    registry_directory_manager.read_by_key.assert_not_called()
+    assert derive_spy.call_count == 0
+    assert output.metadata["rederived_entry_count"].value == 0
+    assert (
+        json.loads(persisted_files["registries/oss_registry.json"])
+        == json.loads(persisted_files["internal/oss_registry_assembly_state.json"])["registry"]
+    )
@@ -5,12 +5,12 @@
 
 from __future__ import annotations
 
-import anyio
 from connector_ops.utils import ConnectorLanguage  # type: ignore
 from pipelines.airbyte_ci.connectors.build_image.steps import java_connectors, python_connectors, manifest_only_connectors
 from pipelines.airbyte_ci.connectors.build_image.steps.common import LoadContainerToLocalDockerHost, StepStatus
 from pipelines.airbyte_ci.connectors.context import ConnectorContext
 from pipelines.airbyte_ci.connectors.reports import ConnectorReport, Report
+from pipelines.helpers.execution.admission_control import Admission
 from pipelines.models.steps import StepResult
 
 
@@ -33,12 +33,12 @@ async def run_connector_build(context: ConnectorContext) -> StepResult:
     return await LANGUAGE_BUILD_CONNECTOR_MAPPING[context.connector.language](context)
 
 
-async def run_connector_build_pipeline(context: ConnectorContext, semaphore: anyio.Semaphore, image_tag: str) -> Report:
+async def run_connector_build_pipeline(context: ConnectorContext, semaphore: Admission, image_tag: str) -> Report:
     """Run a build pipeline for a single connector.
 
     Args:
         context (ConnectorContext): The initialized connector context.
-        semaphore (anyio.Semaphore): The semaphore to use to limit the number of concurrent builds.
+        semaphore (Admission): The admission to enter to limit the number of concurrent builds.
         image_tag (str): The tag to use for the built image.
     Returns:
         ConnectorReport: The reports holding builds results.
@@ -10,7 +10,7 @@ from pipelines.airbyte_ci.steps.changelog import AddChangelogEntry
 from pipelines.models.steps import Step, StepResult, StepStatus
 
 if TYPE_CHECKING:
-    from anyio import Semaphore
+    from pipelines.helpers.execution.admission_control import Admission
 
 
 class RestoreVersionState(Step):
@@ -59,7 +59,7 @@ class RestoreVersionState(Step):
 
 async def run_connector_version_bump_pipeline(
     context: ConnectorContext,
-    semaphore: "Semaphore",
+    semaphore: "Admission",
     bump_type: str,
     changelog_entry: str,
     rc: bool,
@@ -21,7 +21,7 @@ from pipelines.models.secrets import Secret
 from pipelines.models.steps import Step, StepResult, StepStatus
 
 if TYPE_CHECKING:
-    from anyio import Semaphore
+    from pipelines.helpers.execution.admission_control import Admission
 
 
 def _get_erd_folder(code_directory: Path) -> Path:
@@ -135,7 +135,7 @@ class UploadDbmlSchema(Step):
 
 async def run_connector_generate_erd_pipeline(
     context: ConnectorContext,
-    semaphore: "Semaphore",
+    semaphore: "Admission",
     skip_steps: List[str],
 ) -> Report:
     context.targeted_platforms = [LOCAL_BUILD_PLATFORM]
@@ -24,7 +24,7 @@ from pipelines.helpers.execution.run_steps import STEP_TREE, StepToRun
 from pipelines.models.steps import Step, StepResult, StepStatus
 
 if TYPE_CHECKING:
-    from anyio import Semaphore
+    from pipelines.helpers.execution.admission_control import Admission
 
 SCHEMAS_DIR_NAME = "schemas"
 
@@ -398,7 +398,7 @@ def _parse_json_streams(python_path: Path) -> dict[str, JsonStream]:
     return streams
 
 
-async def run_connector_migrate_to_inline_schemas_pipeline(context: ConnectorContext, semaphore: "Semaphore") -> Report:
+async def run_connector_migrate_to_inline_schemas_pipeline(context: ConnectorContext, semaphore: "Admission") -> Report:
     restore_original_state = RestoreInlineState(context)
 
     context.targeted_platforms = [LOCAL_BUILD_PLATFORM]
@@ -8,7 +8,6 @@ from pathlib import Path
 from typing import Any
 
 import git  # type: ignore
-from anyio import Semaphore  # type: ignore
 from connector_ops.utils import ConnectorLanguage  # type: ignore
 
 from pipelines.airbyte_ci.connectors.consts import CONNECTOR_TEST_STEP_ID
@@ -23,6 +22,7 @@ from pipelines.airbyte_ci.connectors.migrate_to_manifest_only.utils import (
 from pipelines.airbyte_ci.connectors.reports import Report
 from pipelines.helpers.connectors.command import run_connector_steps
 from pipelines.helpers.connectors.yaml import read_yaml, write_yaml
+from pipelines.helpers.execution.admission_control import Admission
 from pipelines.helpers.execution.run_steps import STEP_TREE, StepToRun
 from pipelines.models.steps import Step, StepResult, StepStatus
 
@@ -297,7 +297,7 @@ class UpdateManifestOnlyFiles(Step):
 
 
 ## MAIN FUNCTION ##
-async def run_connectors_manifest_only_pipeline(context: ConnectorContext, semaphore: "Semaphore", *args: Any) -> Report:
+async def run_connectors_manifest_only_pipeline(context: ConnectorContext, semaphore: Admission, *args: Any) -> Report:
     steps_to_run: STEP_TREE = []
     steps_to_run.append([StepToRun(id=CONNECTOR_TEST_STEP_ID.MANIFEST_ONLY_CHECK, step=CheckIsManifestMigrationCandidate(context))])
 
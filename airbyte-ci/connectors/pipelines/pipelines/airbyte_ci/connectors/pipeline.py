@@ -8,19 +8,28 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, cast
 
 import anyio
 import dagger
-from connector_ops.utils import ConnectorLanguage  # type: ignore
+from connector_ops.utils import Connector, ConnectorLanguage  # type: ignore
 from dagger import Config
 
+from pipelines import main_logger
 from pipelines.airbyte_ci.connectors.context import ConnectorContext
 from pipelines.airbyte_ci.connectors.publish.context import PublishConnectorContext
 from pipelines.airbyte_ci.connectors.test.context import ConnectorTestContext
 from pipelines.airbyte_ci.steps.no_op import NoOpStep
 from pipelines.consts import ContextState
 from pipelines.dagger.actions.system import docker
+from pipelines.helpers.execution.admission_control import (
+    GIB,
+    ResourceAdmissionController,
+    ResourceWeight,
+    get_resource_budget,
+    parse_cpu_quantity,
+    parse_memory_quantity,
+)
 from pipelines.helpers.utils import create_and_open_file
 from pipelines.models.reports import Report
 from pipelines.models.steps import StepResult, StepStatus
@@ -31,11 +40,55 @@ if TYPE_CHECKING:
 GITHUB_GLOBAL_CONTEXT = "[POC please ignore] Connectors CI"
 GITHUB_GLOBAL_DESCRIPTION = "Running connectors tests"
 
-CONNECTOR_LANGUAGE_TO_FORCED_CONCURRENCY_MAPPING = {
-    # We run the Java connectors tests sequentially because we currently have memory issues when Java integration tests are run in parallel.
+CONNECTOR_LANGUAGE_TO_RESOURCE_WEIGHT = {
+    # Java connectors are built with Gradle and their integration tests are memory hungry when run in parallel.
     # See https://github.com/airbytehq/airbyte/issues/27168
-    ConnectorLanguage.JAVA: anyio.Semaphore(1),
+    ConnectorLanguage.JAVA: ResourceWeight(memory_bytes=8 * GIB, cpus=4),
+    ConnectorLanguage.PYTHON: ResourceWeight(memory_bytes=2 * GIB, cpus=1),
+    ConnectorLanguage.LOW_CODE: ResourceWeight(memory_bytes=2 * GIB, cpus=1),
+    ConnectorLanguage.MANIFEST_ONLY: ResourceWeight(memory_bytes=1 * GIB, cpus=1),
 }
+DEFAULT_CONNECTOR_RESOURCE_WEIGHT = ResourceWeight(memory_bytes=2 * GIB, cpus=1)
+
+
+def get_connector_resource_weight(connector: Connector) -> ResourceWeight:
+    """Get the resources reserved by the pipeline of a connector.
+
+    It is the weight of the connector language, to which the resources the connector declares for its syncs in its metadata are added,
+    as the connector runs in containers next to the build and test tooling.
+
+    Args:
+        connector (Connector): The connector to get the resource weight of.
+
+    Returns:
+        ResourceWeight: The resources reserved by the connector pipeline.
+    """
+    weight = CONNECTOR_LANGUAGE_TO_RESOURCE_WEIGHT.get(connector.language, DEFAULT_CONNECTOR_RESOURCE_WEIGHT)
+    resource_requirements: Dict[str, Any] = (connector.metadata or {}).get("resourceRequirements") or {}
+    declared_requirements = cast(
+        Dict[str, Any],
+        resource_requirements.get("default")
+        or next(
+            (
+                job_requirements.get("resourceRequirements") or {}
+                for job_requirements in resource_requirements.get("jobSpecific") or []
+                if job_requirements.get("jobType") == "sync"
+            ),
+            {},
+        ),
+    )
+    try:
+        declared_weight = ResourceWeight(
+            memory_bytes=parse_memory_quantity(
+                declared_requirements.get("memory_limit") or declared_requirements.get("memory_request") or 0
+            ),
+            # CPU limits are bursts allowed in production, the requested CPUs are a better estimate of the sustained usage
+            cpus=parse_cpu_quantity(declared_requirements.get("cpu_request") or declared_requirements.get("cpu_limit") or 0),
+        )
+    except ValueError:
+        main_logger.warning(f"Ignoring invalid resource requirements declared by {connector.technical_name}: {declared_requirements}")
+        return weight
+    return weight + declared_weight
 
 
 async def context_to_step_result(context: PipelineContext) -> StepResult:
@@ -93,9 +146,15 @@ async def run_connectors_pipelines(
     execute_timeout: Optional[int],
     *args: Any,
 ) -> List[ConnectorContext] | List[PublishConnectorContext] | List[ConnectorTestContext]:
-    """Run a connector pipeline for all the connector contexts."""
+    """Run a connector pipeline for all the connector contexts.
+
+    Connector pipelines are admitted when their resource weight fits in the memory and CPUs available to the dagger engine,
+    and no more than `concurrency` pipelines run at the same time.
+    """
 
-    default_connectors_semaphore = anyio.Semaphore(concurrency)
+    resource_budget = get_resource_budget()
+    main_logger.info(f"Connector pipelines can reserve {resource_budget}, running at most {concurrency} pipelines at the same time.")
+    admission_controller = ResourceAdmissionController(resource_budget, max_concurrency=concurrency)
     dagger_logs_output = sys.stderr if not dagger_logs_path else create_and_open_file(dagger_logs_path)
     async with dagger.Connection(Config(log_output=dagger_logs_output, execute_timeout=execute_timeout)) as dagger_client:
         docker_hub_username = contexts[0].docker_hub_username
@@ -112,10 +171,11 @@ async def run_connectors_pipelines(
             for context in contexts:
                 context.dagger_client = dagger_client
                 context.dockerd_service = dockerd_service
+                # The admission is entered by the connector pipeline like a semaphore
                 tg_connectors.start_soon(
                     connector_pipeline,
                     context,
-                    CONNECTOR_LANGUAGE_TO_FORCED_CONCURRENCY_MAPPING.get(context.connector.language, default_connectors_semaphore),
+                    admission_controller.admit(get_connector_resource_weight(context.connector)),
                     *args,
                 )
 
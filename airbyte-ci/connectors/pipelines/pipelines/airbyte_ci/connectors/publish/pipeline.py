@@ -31,6 +31,7 @@ from pipelines.consts import LOCAL_BUILD_PLATFORM
 from pipelines.dagger.actions.remote_storage import upload_to_gcs
 from pipelines.dagger.actions.system import docker
 from pipelines.helpers.connectors.dagger_fs import dagger_read_file, dagger_write_file
+from pipelines.helpers.execution.admission_control import Admission
 from pipelines.helpers.pip import is_package_published
 from pipelines.models.steps import Step, StepModifyingFiles, StepResult, StepStatus
 
@@ -472,7 +473,7 @@ def create_connector_report(results: List[StepResult], context: PublishConnector
 
 
 # Pipeline
-async def run_connector_publish_pipeline(context: PublishConnectorContext, semaphore: anyio.Semaphore) -> ConnectorReport:
+async def run_connector_publish_pipeline(context: PublishConnectorContext, semaphore: Admission) -> ConnectorReport:
     """Run a publish pipeline for a single connector.
 
     1. Validate the metadata file.
@@ -643,7 +644,7 @@ def get_rollback_pr_creation_arguments(
     }
 
 
-async def run_connector_rollback_pipeline(context: PublishConnectorContext, semaphore: anyio.Semaphore) -> ConnectorReport:
+async def run_connector_rollback_pipeline(context: PublishConnectorContext, semaphore: Admission) -> ConnectorReport:
     """Run a rollback pipeline for a single connector.
 
     1. Disable progressive rollout in metadata file.
@@ -700,7 +701,7 @@ def get_promotion_pr_creation_arguments(
     }
 
 
-async def run_connector_promote_pipeline(context: PublishConnectorContext, semaphore: anyio.Semaphore) -> ConnectorReport:
+async def run_connector_promote_pipeline(context: PublishConnectorContext, semaphore: Admission) -> ConnectorReport:
     """Run a promote pipeline for a single connector.
 
     1. Update connector metadata to:
@@ -15,7 +15,7 @@ from pipelines.helpers.git import get_modified_files
 from pipelines.helpers.utils import transform_strs_to_paths
 
 if TYPE_CHECKING:
-    from anyio import Semaphore
+    from pipelines.helpers.execution.admission_control import Admission
 
 
 ## HELPER FUNCTIONS
@@ -56,7 +56,7 @@ def replace_placeholder_with_pr_number(context: ConnectorContext, pr_number: int
 
 async def run_connector_pull_request_pipeline(
     context: ConnectorContext,
-    semaphore: "Semaphore",
+    semaphore: "Admission",
     message: str,
     branch_id: str,
     title: str | None = None,
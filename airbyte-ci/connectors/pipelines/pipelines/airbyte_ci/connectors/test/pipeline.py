@@ -7,7 +7,6 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-import anyio
 from connector_ops.utils import ConnectorLanguage  # type: ignore
 
 from pipelines.airbyte_ci.connectors.consts import CONNECTOR_TEST_STEP_ID
@@ -18,6 +17,7 @@ from pipelines.airbyte_ci.connectors.test.steps.common import QaChecks, VersionI
 from pipelines.helpers.execution.run_steps import StepToRun, run_steps
 
 if TYPE_CHECKING:
+    from pipelines.helpers.execution.admission_control import Admission
     from pipelines.helpers.execution.run_steps import STEP_TREE
 
 LANGUAGE_MAPPING = {
@@ -46,7 +46,7 @@ def get_test_steps(context: ConnectorTestContext) -> STEP_TREE:
         return []
 
 
-async def run_connector_test_pipeline(context: ConnectorTestContext, semaphore: anyio.Semaphore) -> ConnectorReport:
+async def run_connector_test_pipeline(context: ConnectorTestContext, semaphore: Admission) -> ConnectorReport:
     """
     Compute the steps to run for a connector test pipeline.
     """
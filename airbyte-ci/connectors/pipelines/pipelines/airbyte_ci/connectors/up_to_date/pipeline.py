@@ -24,9 +24,9 @@ from .steps import DependencyUpdate, GetDependencyUpdates, PoetryUpdate
 if TYPE_CHECKING:
     from typing import Dict, Iterable, List, Set, Tuple
 
-    from anyio import Semaphore
     from github import PullRequest
 
+    from pipelines.helpers.execution.admission_control import Admission
     from pipelines.models.steps import StepResult
 
 UP_TO_DATE_PR_LABEL = "up-to-date"
@@ -73,7 +73,7 @@ def get_pr_creation_arguments(
 ## MAIN FUNCTION
 async def run_connector_up_to_date_pipeline(
     context: ConnectorContext,
-    semaphore: "Semaphore",
+    semaphore: "Admission",
     create_pull_request: bool = False,
     auto_merge: bool = False,
     specific_dependencies: List[str] = [],
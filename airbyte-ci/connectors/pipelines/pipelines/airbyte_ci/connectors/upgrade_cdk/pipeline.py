@@ -21,7 +21,7 @@ from pipelines.models.steps import Step, StepResult, StepStatus
 if TYPE_CHECKING:
     from typing import Optional
 
-    from anyio import Semaphore
+    from pipelines.helpers.execution.admission_control import Admission
 
 # GLOBALS
 
@@ -152,7 +152,7 @@ class SetCDKVersion(Step):
 
 async def run_connector_cdk_upgrade_pipeline(
     context: ConnectorContext,
-    semaphore: Semaphore,
+    semaphore: Admission,
     target_version: str,
 ) -> ConnectorReport:
     """Run a pipeline to upgrade the CDK version for a single connector.
@@ -11,7 +11,7 @@ from pipelines.helpers.execution.run_steps import STEP_TREE, run_steps
 from pipelines.models.steps import Step, StepStatus
 
 if TYPE_CHECKING:
-    from anyio import Semaphore
+    from pipelines.helpers.execution.admission_control import Admission
 
 
 def get_connector_contexts(ctx: click.Context, pipeline_description: str, enable_report_auto_open: bool) -> List[ConnectorContext]:
@@ -68,7 +68,7 @@ async def run_connector_pipeline(
 
 
 async def run_connector_steps(
-    context: ConnectorContext, semaphore: "Semaphore", steps_to_run: STEP_TREE, restore_original_state: Step | None = None
+    context: ConnectorContext, semaphore: "Admission", steps_to_run: STEP_TREE, restore_original_state: Step | None = None
 ) -> Report:
     async with semaphore:
         async with context:
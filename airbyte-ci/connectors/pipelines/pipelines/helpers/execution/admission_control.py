@@ -0,0 +1,201 @@
+#
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+#
+
+"""Admission control of concurrent pipelines based on their resource weight and the resources available on the host."""
+
+from __future__ import annotations
+
+import os
+import re
+from collections import deque
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Deque, Optional, Tuple, Type
+
+import anyio
+import docker  # type: ignore
+
+from pipelines import main_logger
+
+
+GIB = 1024**3
+
+# Share of the memory and CPUs of the host which can be reserved by admitted pipelines, the rest is left to the dagger engine and the OS
+DEFAULT_RESOURCE_BUDGET_RATIO = 0.8
+
+MEMORY_QUANTITY_UNITS = {
+    "": 1,
+    "k": 1000,
+    "K": 1000,
+    "M": 1000**2,
+    "G": 1000**3,
+    "T": 1000**4,
+    "Ki": 1024,
+    "Mi": 1024**2,
+    "Gi": 1024**3,
+    "Ti": 1024**4,
+}
+
+
+@dataclass(frozen=True)
+class ResourceWeight:
+    """The memory and CPUs reserved by a pipeline while it runs."""
+
+    memory_bytes: int
+    cpus: float
+
+    def __add__(self, other: ResourceWeight) -> ResourceWeight:
+        return ResourceWeight(self.memory_bytes + other.memory_bytes, self.cpus + other.cpus)
+
+    def __sub__(self, other: ResourceWeight) -> ResourceWeight:
+        return ResourceWeight(self.memory_bytes - other.memory_bytes, self.cpus - other.cpus)
+
+    def fits_in(self, budget: ResourceWeight) -> bool:
+        return self.memory_bytes <= budget.memory_bytes and self.cpus <= budget.cpus
+
+    def __str__(self) -> str:
+        return f"{self.memory_bytes / GIB:.1f}GiB of memory and {self.cpus:g} CPUs"
+
+
+NO_RESOURCES = ResourceWeight(memory_bytes=0, cpus=0)
+
+
+def parse_memory_quantity(quantity: str | int) -> int:
+    """Parse a Kubernetes memory quantity, like the ones declared in the connectors metadata (e.g. 1Gi, 512Mi), to bytes.
+
+    Raises:
+        ValueError: If the quantity is not a valid memory quantity.
+    """
+    if isinstance(quantity, int):
+        return quantity
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kKMGT]i?)?\s*", quantity)
+    if not match or (match.group(2) or "") not in MEMORY_QUANTITY_UNITS:
+        raise ValueError(f"Invalid memory quantity: {quantity}")
+    return int(float(match.group(1)) * MEMORY_QUANTITY_UNITS[match.group(2) or ""])
+
+
+def parse_cpu_quantity(quantity: str | int | float) -> float:
+    """Parse a Kubernetes CPU quantity (e.g. 2, 0.5, 500m) to a number of CPUs.
+
+    Raises:
+        ValueError: If the quantity is not a valid CPU quantity.
+    """
+    if isinstance(quantity, (int, float)):
+        return float(quantity)
+    if quantity.endswith("m"):
+        return float(quantity[:-1]) / 1000
+    return float(quantity)
+
+
+def _get_docker_daemon_resources() -> Optional[ResourceWeight]:
+    # The dagger engine runs in the docker daemon, which can have less resources than the host (e.g. Docker Desktop VM)
+    try:
+        daemon_info = docker.from_env().info()
+        return ResourceWeight(memory_bytes=int(daemon_info["MemTotal"]), cpus=float(daemon_info["NCPU"]))
+    except Exception:
+        return None
+
+
+def _get_host_resources() -> ResourceWeight:
+    # The total memory, like the MemTotal reported by the docker daemon: the budget ratio leaves room for the other processes
+    memory_bytes = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    return ResourceWeight(memory_bytes=memory_bytes, cpus=float(cpus))
+
+
+def get_resource_budget(ratio: float = DEFAULT_RESOURCE_BUDGET_RATIO) -> ResourceWeight:
+    """Get the resources which can be reserved by concurrent pipelines.
+
+    The resources of the docker daemon running the dagger engine are used when it is reachable, the resources of the host otherwise.
+
+    Args:
+        ratio (float, optional): Share of the resources which can be reserved. Defaults to DEFAULT_RESOURCE_BUDGET_RATIO.
+
+    Returns:
+        ResourceWeight: The resource budget.
+    """
+    resources = _get_docker_daemon_resources() or _get_host_resources()
+    return ResourceWeight(memory_bytes=int(resources.memory_bytes * ratio), cpus=max(resources.cpus * ratio, 1.0))
+
+
+class ResourceAdmissionController:
+    """Admit pipelines when their resource weight fits in what is left of a resource budget.
+
+    Pipelines are admitted in the order they asked to be, so that heavy pipelines are not starved by lighter ones.
+    A pipeline heavier than the whole budget is admitted when no other pipeline is running.
+
+    Usage:
+        async with admission_controller.admit(weight):
+            ...
+    """
+
+    def __init__(self, budget: ResourceWeight, max_concurrency: Optional[int] = None) -> None:
+        self.budget = budget
+        self.max_concurrency = max_concurrency
+        self.reserved = NO_RESOURCES
+        self.running_count = 0
+        self._waiting: Deque[Tuple[ResourceWeight, anyio.Event]] = deque()
+
+    def admit(self, weight: ResourceWeight) -> Admission:
+        return Admission(self, weight)
+
+    def _can_admit(self, weight: ResourceWeight) -> bool:
+        if self.running_count == 0:
+            return True
+        if self.max_concurrency is not None and self.running_count >= self.max_concurrency:
+            return False
+        return (self.reserved + weight).fits_in(self.budget)
+
+    def _reserve(self, weight: ResourceWeight) -> None:
+        self.reserved += weight
+        self.running_count += 1
+
+    async def acquire(self, weight: ResourceWeight) -> None:
+        if not self._waiting and self._can_admit(weight):
+            self._reserve(weight)
+            return
+        main_logger.info(f"Waiting for {weight} to be available, {self.reserved} are reserved by {self.running_count} running pipelines.")
+        admitted = anyio.Event()
+        self._waiting.append((weight, admitted))
+        try:
+            await admitted.wait()
+        except BaseException:
+            if admitted.is_set():
+                # The resources were reserved for this pipeline before it got cancelled
+                self.release(weight)
+            else:
+                self._waiting.remove((weight, admitted))
+                self._admit_waiting()
+            raise
+
+    def release(self, weight: ResourceWeight) -> None:
+        self.reserved -= weight
+        self.running_count -= 1
+        self._admit_waiting()
+
+    def _admit_waiting(self) -> None:
+        while self._waiting and self._can_admit(self._waiting[0][0]):
+            weight, admitted = self._waiting.popleft()
+            self._reserve(weight)
+            admitted.set()
+
+
+class Admission:
+    """Async context manager reserving a resource weight from a ResourceAdmissionController while it is entered.
+
+    It is a drop-in replacement of the semaphores the connector pipelines enter before running their steps.
+    """
+
+    def __init__(self, controller: ResourceAdmissionController, weight: ResourceWeight) -> None:
+        self.controller = controller
+        self.weight = weight
+
+    async def __aenter__(self) -> Admission:
+        await self.controller.acquire(self.weight)
+        return self
+
+    async def __aexit__(
+        self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException], traceback: Optional[TracebackType]
+    ) -> None:
+        self.controller.release(self.weight)
@@ -7,7 +7,9 @@
 from __future__ import annotations
 
 import inspect
+import time
 from dataclasses import dataclass, field
+from datetime import timedelta
 from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
 
 import anyio
@@ -15,6 +17,7 @@ import asyncer
 import dpath
 
 from pipelines import main_logger
+from pipelines.helpers.utils import format_duration
 from pipelines.models.steps import StepStatus
 
 if TYPE_CHECKING:
@@ -82,6 +85,7 @@ class RunStepOptions:
     skip_steps: List[str] = field(default_factory=list)
     keep_steps: List[str] = field(default_factory=list)
     log_step_tree: bool = True
+    log_timing_report: bool = True
     concurrency: int = 10
     step_params: Dict[CONNECTOR_TEST_STEP_ID, STEP_PARAMS] = field(default_factory=dict)
 
@@ -146,23 +150,6 @@ async def evaluate_run_args(args: ARGS_TYPE, results: RESULTS_DICT) -> Dict:
     raise TypeError(f"Unexpected args type: {type(args)}")
 
 
-def _skip_remaining_steps(remaining_steps: STEP_TREE) -> RESULTS_DICT:
-    """
-    Skip all remaining steps.
-    """
-    skipped_results: Dict[str, StepResult] = {}
-    for runnable_step in remaining_steps:
-        if isinstance(runnable_step, StepToRun):
-            skipped_results[runnable_step.id] = runnable_step.step.skip()
-        elif isinstance(runnable_step, list):
-            nested_skipped_results = _skip_remaining_steps(list(runnable_step))
-            skipped_results = {**skipped_results, **nested_skipped_results}
-        else:
-            raise Exception(f"Unexpected step type: {type(runnable_step)}")
-
-    return skipped_results
-
-
 def _step_dependencies_succeeded(step_to_eval: StepToRun, results: RESULTS_DICT) -> bool:
     """
     Check if all dependencies of a step have succeeded.
@@ -184,37 +171,6 @@ def _step_dependencies_succeeded(step_to_eval: StepToRun, results: RESULTS_DICT)
     )
 
 
-def _filter_skipped_steps(steps_to_evaluate: STEP_TREE, skip_steps: List[str], results: RESULTS_DICT) -> Tuple[STEP_TREE, RESULTS_DICT]:
-    """
-    Filter out steps that should be skipped.
-
-    Either because they are in the skip list or because one of their dependencies failed.
-    """
-    steps_to_run: STEP_TREE = []
-    for step_to_eval in steps_to_evaluate:
-        # ignore nested steps
-        if isinstance(step_to_eval, list):
-            steps_to_run.append(step_to_eval)
-            continue
-
-        # skip step if its id is in the skip list
-        if step_to_eval.id in skip_steps:
-            main_logger.info(f"Skipping step {step_to_eval.id}")
-            results[step_to_eval.id] = step_to_eval.step.skip("Skipped by user")
-
-        # skip step if a dependency failed
-        elif not _step_dependencies_succeeded(step_to_eval, results):
-            main_logger.info(
-                f"Skipping step {step_to_eval.id} because one of the dependencies have not been met: {step_to_eval.depends_on}"
-            )
-            results[step_to_eval.id] = step_to_eval.step.skip("Skipped because a dependency was not met")
-
-        else:
-            steps_to_run.append(step_to_eval)
-
-    return steps_to_run, results
-
-
 def _get_next_step_group(steps: STEP_TREE) -> Tuple[STEP_TREE, STEP_TREE]:
     """
     Get the next group of steps to run concurrently.
@@ -253,6 +209,185 @@ def _log_step_tree(step_tree: STEP_TREE, options: RunStepOptions, depth: int = 0
                 main_logger.info(f"{indent * depth}- {steps.id}")
 
 
+@dataclass
+class StepTiming:
+    """Timing of a step run by run_steps, in seconds since the start of the run."""
+
+    step_id: str
+    dependencies: List[int]
+    ready_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    status: Optional[StepStatus] = None
+
+    @property
+    def queued_duration(self) -> float:
+        """Time spent waiting for a concurrency slot once the dependencies were finished."""
+        if self.ready_at is None or self.started_at is None:
+            return 0.0
+        return self.started_at - self.ready_at
+
+    @property
+    def run_duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+def get_critical_path(timings: List[StepTiming]) -> List[StepTiming]:
+    """Get the chain of steps which determined the duration of a run.
+
+    Starting from the last step to finish, walk back through the dependency which finished last,
+    as it is the one which made the step ready to run.
+
+    Args:
+        timings (List[StepTiming]): The timings of the steps of a run, indexed like their dependencies.
+
+    Returns:
+        List[StepTiming]: The steps of the critical path, in execution order.
+    """
+    finished_timings = [timing for timing in timings if timing.finished_at is not None]
+    if not finished_timings:
+        return []
+    critical_path = [max(finished_timings, key=lambda timing: timing.finished_at or 0.0)]
+    while dependencies := [timings[i] for i in critical_path[-1].dependencies if timings[i].finished_at is not None]:
+        critical_path.append(max(dependencies, key=lambda timing: timing.finished_at or 0.0))
+    return list(reversed(critical_path))
+
+
+def _format_seconds(seconds: float) -> str:
+    return format_duration(timedelta(seconds=seconds))
+
+
+def _log_timing_report(timings: List[StepTiming]) -> None:
+    """
+    Log the duration of each step and the critical path of the run to the console.
+    """
+    main_logger.info("STEP TIMINGS:")
+    for timing in sorted(timings, key=lambda timing: timing.started_at if timing.started_at is not None else float("inf")):
+        status = timing.status.value if timing.status else "not run"
+        if timing.started_at is None:
+            main_logger.info(f"- {timing.step_id}: {status}")
+        else:
+            main_logger.info(
+                f"- {timing.step_id}: {status}, started at +{_format_seconds(timing.started_at)}, "
+                f"ran for {_format_seconds(timing.run_duration)}, queued for {_format_seconds(timing.queued_duration)}"
+            )
+    critical_path = [timing for timing in get_critical_path(timings) if timing.started_at is not None]
+    if critical_path:
+        critical_path_duration = sum(timing.run_duration for timing in critical_path)
+        main_logger.info(
+            f"CRITICAL PATH: {' -> '.join(timing.step_id for timing in critical_path)} "
+            f"(steps ran for {_format_seconds(critical_path_duration)} out of {_format_seconds(critical_path[-1].finished_at or 0.0)})"
+        )
+
+
+class _StepScheduler:
+    """Run the steps of a step tree as soon as the steps they depend on are finished.
+
+    A step declaring depends_on only waits for these steps, which must come before it in the step tree.
+    A step without depends_on waits for all the steps before it in the step tree, like a sequential run of the tree would.
+    """
+
+    def __init__(self, runnables: STEP_TREE, step_ids_to_skip: List[str], results: RESULTS_DICT, options: RunStepOptions) -> None:
+        self.step_ids_to_skip = step_ids_to_skip
+        self.results = results
+        self.options = options
+        self.steps_to_run: List[StepToRun] = []
+        self.timings: List[StepTiming] = []
+        self._schedule_step_tree(runnables, [])
+        self._finished_events = [anyio.Event() for _ in self.steps_to_run]
+        self._limiter = anyio.CapacityLimiter(options.concurrency)
+        self._started_at = 0.0
+
+    def _schedule_step_tree(self, steps: STEP_TREE, preceding_steps: List[int]) -> List[int]:
+        """
+        Schedule the steps of a tree after the preceding steps, and return the indexes of the scheduled steps.
+        """
+        scheduled_steps: List[int] = []
+        remaining_steps = steps
+        while remaining_steps:
+            # Steps of a group run concurrently, groups run one after the other
+            step_group, remaining_steps = _get_next_step_group(remaining_steps)
+            group_steps: List[int] = []
+            for step in step_group:
+                if isinstance(step, list):
+                    group_steps.extend(self._schedule_step_tree(list(step), preceding_steps))
+                elif isinstance(step, StepToRun):
+                    group_steps.append(self._schedule_step(step, preceding_steps))
+                else:
+                    raise Exception(f"Unexpected step type: {type(step)}")
+            preceding_steps = preceding_steps + group_steps
+            scheduled_steps.extend(group_steps)
+        return scheduled_steps
+
+    def _schedule_step(self, step_to_run: StepToRun, preceding_steps: List[int]) -> int:
+        if step_to_run.depends_on:
+            dependencies = []
+            for step_id in step_to_run.depends_on:
+                matching_steps = [i for i in preceding_steps if self.steps_to_run[i].id == step_id]
+                if not matching_steps and step_id not in self.results:
+                    raise InvalidStepConfiguration(
+                        f"Step {step_to_run.id} depends on {step_id} which has not been run yet. This implies that the order of the steps is not correct. Please check that the steps are in the correct order."
+                    )
+                dependencies.extend(matching_steps)
+        else:
+            dependencies = list(preceding_steps)
+        self.steps_to_run.append(step_to_run)
+        self.timings.append(StepTiming(step_id=step_to_run.id, dependencies=sorted(set(dependencies))))
+        return len(self.steps_to_run) - 1
+
+    def _now(self) -> float:
+        return time.monotonic() - self._started_at
+
+    def _has_failed(self) -> bool:
+        return any(result.status is StepStatus.FAILURE and result.consider_in_overall_status for result in self.results.values())
+
+    async def run(self) -> RESULTS_DICT:
+        self._started_at = time.monotonic()
+        async with asyncer.create_task_group() as task_group:
+            for i in range(len(self.steps_to_run)):
+                task_group.soonify(self._run_step)(i)
+        return self.results
+
+    async def _run_step(self, i: int) -> None:
+        timing = self.timings[i]
+        try:
+            for dependency in timing.dependencies:
+                await self._finished_events[dependency].wait()
+            timing.ready_at = self._now()
+            step_result = await self._get_step_result(i)
+            timing.status = step_result.status
+            self.results[self.steps_to_run[i].id] = step_result
+        finally:
+            timing.finished_at = self._now()
+            self._finished_events[i].set()
+
+    async def _get_step_result(self, i: int) -> StepResult:
+        step_to_run = self.steps_to_run[i]
+        # If any of the previous steps failed, skip the remaining steps
+        if self.options.fail_fast and self._has_failed():
+            return step_to_run.step.skip()
+
+        if step_to_run.id in self.step_ids_to_skip:
+            main_logger.info(f"Skipping step {step_to_run.id}")
+            return step_to_run.step.skip("Skipped by user")
+
+        if not _step_dependencies_succeeded(step_to_run, self.results):
+            main_logger.info(f"Skipping step {step_to_run.id} because one of the dependencies have not been met: {step_to_run.depends_on}")
+            return step_to_run.step.skip("Skipped because a dependency was not met")
+
+        main_logger.info(f"QUEUING STEP {step_to_run.id}")
+        async with self._limiter:
+            # A step may have failed while this one was waiting for a concurrency slot
+            if self.options.fail_fast and self._has_failed():
+                return step_to_run.step.skip()
+            step_args = await evaluate_run_args(step_to_run.args, self.results)
+            step_to_run.step.extra_params = self.options.step_params.get(step_to_run.id, {})
+            self.timings[i].started_at = self._now()
+            return await step_to_run.step.run(**step_args)
+
+
 async def run_steps(
     runnables: STEP_TREE,
     results: RESULTS_DICT = {},
@@ -260,6 +395,9 @@ async def run_steps(
 ) -> RESULTS_DICT:
     """Run multiple steps sequentially, or in parallel if steps are wrapped into a sublist.
 
+    Each step starts as soon as the steps it depends on are finished: a step declaring depends_on does not wait for the
+    other steps of the previous groups. At the end of the run, the duration of each step and the critical path are logged.
+
     Examples
     --------
     >>> from pipelines.models.steps import Step, StepResult, StepStatus
@@ -287,7 +425,7 @@ async def run_steps(
 
     Args:
         runnables (List[StepToRun]): List of steps to run.
-        results (RESULTS_DICT, optional): Dictionary of step results, used for recursion.
+        results (RESULTS_DICT, optional): Dictionary of results of steps which already ran.
 
     Returns:
         RESULTS_DICT: Dictionary of step results.
@@ -303,43 +441,8 @@ async def run_steps(
         _log_step_tree(runnables, options)
         options.log_step_tree = False
 
-    # If any of the previous steps failed, skip the remaining steps
-    if options.fail_fast and any(result.status is StepStatus.FAILURE and result.consider_in_overall_status for result in results.values()):
-        skipped_results = _skip_remaining_steps(runnables)
-        return {**results, **skipped_results}
-
-    # Pop the next step to run
-    steps_to_evaluate, remaining_steps = _get_next_step_group(runnables)
-
-    # Remove any skipped steps
-    steps_to_run, results = _filter_skipped_steps(steps_to_evaluate, step_ids_to_skip, results)
-
-    # Run all steps in list concurrently
-    semaphore = anyio.Semaphore(options.concurrency)
-    async with semaphore:
-        async with asyncer.create_task_group() as task_group:
-            tasks = []
-            for step_to_run in steps_to_run:
-                # if the step to run is a list, run it in parallel
-                if isinstance(step_to_run, list):
-                    tasks.append(task_group.soonify(run_steps)(list(step_to_run), results, options))
-                else:
-                    step_args = await evaluate_run_args(step_to_run.args, results)
-                    step_to_run.step.extra_params = options.step_params.get(step_to_run.id, {})
-                    main_logger.info(f"QUEUING STEP {step_to_run.id}")
-                    tasks.append(task_group.soonify(step_to_run.step.run)(**step_args))
-
-    # Apply new results
-    new_results: Dict[str, Any] = {}
-    for i, task in enumerate(tasks):
-        step_to_run = steps_to_run[i]
-        if isinstance(step_to_run, list):
-            new_results = {**new_results, **task.value}
-        else:
-            new_results[step_to_run.id] = task.value
-
-    return await run_steps(
-        runnables=remaining_steps,
-        results={**results, **new_results},
-        options=options,
-    )
+    scheduler = _StepScheduler(runnables, step_ids_to_skip, dict(results), options)
+    results = await scheduler.run()
+    if options.log_timing_report:
+        _log_timing_report(scheduler.timings)
+    return results
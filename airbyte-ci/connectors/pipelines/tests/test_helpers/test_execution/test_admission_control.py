@@ -0,0 +1,129 @@
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+
+import anyio
+import pytest
+
+from connector_ops.utils import ConnectorLanguage  # type: ignore
+from pipelines.airbyte_ci.connectors.pipeline import CONNECTOR_LANGUAGE_TO_RESOURCE_WEIGHT, get_connector_resource_weight
+from pipelines.helpers.execution.admission_control import (
+    GIB,
+    ResourceAdmissionController,
+    ResourceWeight,
+    parse_cpu_quantity,
+    parse_memory_quantity,
+)
+
+
+pytestmark = [
+    pytest.mark.anyio,
+]
+
+
+@pytest.mark.parametrize(
+    "quantity, expected_bytes",
+    [(1024, 1024), ("512", 512), ("1Gi", GIB), ("1.5Gi", int(1.5 * GIB)), ("500M", 500 * 1000**2), ("2Ki", 2048)],
+)
+def test_parse_memory_quantity(quantity, expected_bytes):
+    assert parse_memory_quantity(quantity) == expected_bytes
+
+
+def test_parse_invalid_memory_quantity():
+    with pytest.raises(ValueError):
+        parse_memory_quantity("1Gb")
+
+
+@pytest.mark.parametrize("quantity, expected_cpus", [(2, 2.0), ("0.5", 0.5), ("500m", 0.5), ("4.0", 4.0)])
+def test_parse_cpu_quantity(quantity, expected_cpus):
+    assert parse_cpu_quantity(quantity) == expected_cpus
+
+
+async def run_admitted(controller, weight, name, events, duration=0.1):
+    async with controller.admit(weight):
+        events.append(("start", name))
+        await anyio.sleep(duration)
+        events.append(("end", name))
+
+
+async def test_admits_pipelines_fitting_in_the_budget_concurrently():
+    controller = ResourceAdmissionController(ResourceWeight(memory_bytes=4 * GIB, cpus=4))
+    events = []
+    async with anyio.create_task_group() as tg:
+        for name in ["a", "b"]:
+            tg.start_soon(run_admitted, controller, ResourceWeight(2 * GIB, 1), name, events)
+            await anyio.sleep(0)
+
+    assert events[:2] == [("start", "a"), ("start", "b")]
+    assert controller.running_count == 0
+    assert controller.reserved == ResourceWeight(0, 0)
+
+
+async def test_waits_for_resources_in_fifo_order():
+    controller = ResourceAdmissionController(ResourceWeight(memory_bytes=4 * GIB, cpus=4))
+    events = []
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(run_admitted, controller, ResourceWeight(3 * GIB, 1), "heavy_running", events)
+        await anyio.sleep(0)
+        tg.start_soon(run_admitted, controller, ResourceWeight(2 * GIB, 1), "heavy_waiting", events)
+        await anyio.sleep(0)
+        # This one would fit next to the running pipeline but must not overtake the waiting one
+        tg.start_soon(run_admitted, controller, ResourceWeight(1 * GIB, 1), "light", events)
+
+    assert events == [
+        ("start", "heavy_running"),
+        ("end", "heavy_running"),
+        ("start", "heavy_waiting"),
+        ("start", "light"),
+        ("end", "heavy_waiting"),
+        ("end", "light"),
+    ]
+
+
+async def test_admits_pipeline_heavier_than_the_budget_when_nothing_runs():
+    controller = ResourceAdmissionController(ResourceWeight(memory_bytes=1 * GIB, cpus=1))
+    events = []
+    with anyio.fail_after(1):
+        await run_admitted(controller, ResourceWeight(16 * GIB, 8), "huge", events)
+    assert events == [("start", "huge"), ("end", "huge")]
+
+
+async def test_max_concurrency():
+    controller = ResourceAdmissionController(ResourceWeight(memory_bytes=100 * GIB, cpus=100), max_concurrency=1)
+    events = []
+    async with anyio.create_task_group() as tg:
+        for name in ["a", "b"]:
+            tg.start_soon(run_admitted, controller, ResourceWeight(1 * GIB, 1), name, events)
+            await anyio.sleep(0)
+
+    assert events == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")]
+
+
+async def test_cancelled_waiting_pipeline_does_not_block_the_queue():
+    controller = ResourceAdmissionController(ResourceWeight(memory_bytes=2 * GIB, cpus=2))
+    events = []
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(run_admitted, controller, ResourceWeight(2 * GIB, 1), "running", events)
+        await anyio.sleep(0)
+        with anyio.move_on_after(0.01):
+            await controller.acquire(ResourceWeight(2 * GIB, 1))
+        tg.start_soon(run_admitted, controller, ResourceWeight(1 * GIB, 1), "next", events)
+
+    assert events == [("start", "running"), ("end", "running"), ("start", "next"), ("end", "next")]
+    assert controller.running_count == 0
+
+
+def test_connector_resource_weight_includes_declared_requirements(mocker):
+    connector = mocker.Mock(
+        language=ConnectorLanguage.PYTHON,
+        technical_name="source-test",
+        metadata={
+            "resourceRequirements": {
+                "jobSpecific": [{"jobType": "sync", "resourceRequirements": {"memory_limit": "1Gi", "cpu_request": "1", "cpu_limit": "4"}}]
+            }
+        },
+    )
+    language_weight = CONNECTOR_LANGUAGE_TO_RESOURCE_WEIGHT[connector.language]
+
+    assert get_connector_resource_weight(connector) == language_weight + ResourceWeight(memory_bytes=GIB, cpus=1)
+
+    connector.metadata = {"resourceRequirements": {"default": {"memory_limit": "not a quantity"}}}
+    assert get_connector_resource_weight(connector) == language_weight
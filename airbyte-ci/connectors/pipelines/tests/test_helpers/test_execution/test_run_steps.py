@@ -6,7 +6,14 @@ import anyio
 import pytest
 from exceptiongroup import ExceptionGroup
 
-from pipelines.helpers.execution.run_steps import InvalidStepConfiguration, RunStepOptions, StepToRun, run_steps
+from pipelines.helpers.execution.run_steps import (
+    InvalidStepConfiguration,
+    RunStepOptions,
+    StepTiming,
+    StepToRun,
+    get_critical_path,
+    run_steps,
+)
 from pipelines.models.contexts.pipeline_context import PipelineContext
 from pipelines.models.steps import Step, StepResult, StepStatus
 
@@ -376,6 +383,67 @@ async def test_run_steps_with_params():
     assert steps[0].step.params_as_cli_options == ["--param1=value1"]
 
 
+@pytest.mark.anyio
+async def test_run_steps_starts_steps_when_their_dependencies_finish():
+    ran_at = {}
+
+    class SleepStep(Step):
+        title = "Sleep Step"
+
+        async def _run(self, name, sleep) -> StepResult:
+            await anyio.sleep(sleep)
+            ran_at[name] = time.time()
+            return StepResult(step=self, status=StepStatus.SUCCESS)
+
+    steps = [
+        [
+            StepToRun(id="fast", step=SleepStep(test_context), args={"name": "fast", "sleep": 0}),
+            StepToRun(id="slow", step=SleepStep(test_context), args={"name": "slow", "sleep": 2}),
+        ],
+        [StepToRun(id="after_fast", step=SleepStep(test_context), args={"name": "after_fast", "sleep": 0}, depends_on=["fast"])],
+        [StepToRun(id="after_all", step=SleepStep(test_context), args={"name": "after_all", "sleep": 0})],
+    ]
+
+    await run_steps(steps)
+
+    # The step depending on the fast step does not wait for the slow step of its group
+    assert ran_at["after_fast"] < ran_at["slow"]
+    # Steps without dependencies wait for all the previous steps
+    assert ran_at["slow"] < ran_at["after_all"]
+
+
+@pytest.mark.anyio
+async def test_run_steps_fail_fast_skips_steps_which_did_not_start():
+    steps = [
+        [
+            StepToRun(id="step1", step=TestStep(test_context), args={"result_status": StepStatus.FAILURE}),
+            StepToRun(id="step2", step=TestStep(test_context)),
+        ],
+        [StepToRun(id="step3", step=TestStep(test_context), depends_on=["step2"])],
+    ]
+
+    results = await run_steps(steps, options=RunStepOptions(fail_fast=True))
+
+    assert results["step1"].status is StepStatus.FAILURE
+    assert results["step2"].status is StepStatus.SUCCESS
+    assert results["step3"].status is StepStatus.SKIPPED
+
+
+def test_get_critical_path():
+    timings = [
+        StepTiming(step_id="build", dependencies=[], ready_at=0, started_at=0, finished_at=10),
+        StepTiming(step_id="unit", dependencies=[0], ready_at=10, started_at=10, finished_at=15),
+        StepTiming(step_id="acceptance", dependencies=[0], ready_at=10, started_at=12, finished_at=30),
+        StepTiming(step_id="incremental", dependencies=[1, 2], ready_at=30, started_at=30, finished_at=40),
+        StepTiming(step_id="skipped", dependencies=[0]),
+    ]
+
+    assert [timing.step_id for timing in get_critical_path(timings)] == ["build", "acceptance", "incremental"]
+    assert timings[2].queued_duration == 2
+    assert timings[2].run_duration == 18
+    assert get_critical_path([]) == []
+
+
 class TestRunStepOptions:
     def test_init(self):
         options = RunStepOptions()
@@ -0,0 +1,97 @@
+#
+# Copyright (c) 2023 Airbyte, Inc., all rights reserved.
+#
+
+"""
+Benchmark the generation of dbt models on a synthetic catalog of deeply nested streams, rendered serially and in parallel.
+To run this benchmark:
+```
+python3 main_dev_benchmark_transform_catalog.py --streams 2000 --depth 5 --integration-type postgres
+```
+"""
+
+import argparse
+import contextlib
+import filecmp
+import io
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Tuple
+
+from normalization.destination_type import DestinationType
+from normalization.transform_catalog.catalog_processor import CatalogProcessor
+
+
+def build_properties(depth: int, columns: int) -> Dict[str, Any]:
+    properties: Dict[str, Any] = {"id": {"type": ["null", "integer"]}, "updated_at": {"type": ["null", "string"], "format": "date-time"}}
+    for column in range(columns):
+        properties[f"column_{column}"] = {"type": ["null", "string"]}
+    if depth > 1:
+        properties[f"nested_level_{depth - 1}"] = {"type": ["null", "object"], "properties": build_properties(depth - 1, columns)}
+    return properties
+
+
+def build_catalog(streams: int, depth: int, columns: int) -> Dict[str, Any]:
+    return {
+        "streams": [
+            {
+                "stream": {
+                    "name": f"stream_{index}",
+                    "json_schema": {"type": ["null", "object"], "properties": build_properties(depth, columns)},
+                    "supported_sync_modes": ["incremental"],
+                },
+                "sync_mode": "incremental",
+                "cursor_field": ["updated_at"],
+                "destination_sync_mode": "append_dedup",
+                "primary_key": [["id"]],
+            }
+            for index in range(streams)
+        ]
+    }
+
+
+def run(catalog_file: str, destination_type: DestinationType, max_workers: int) -> Tuple[str, float]:
+    output_directory = tempfile.mkdtemp(prefix=f"normalization_benchmark_{max_workers}_")
+    processor = CatalogProcessor(output_directory, destination_type, max_workers=max_workers)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor.process(catalog_file, "_airbyte_data", "benchmark")
+    return output_directory, time.perf_counter() - start
+
+
+def assert_same_outputs(left: str, right: str):
+    comparison = filecmp.dircmp(left, right, ignore=[])
+    pending = [comparison]
+    while pending:
+        current = pending.pop()
+        _, mismatch, errors = filecmp.cmpfiles(current.left, current.right, current.common_files, shallow=False)
+        if current.left_only or current.right_only or mismatch or errors:
+            raise AssertionError(f"Outputs differ in {current.left}: {current.left_only + current.right_only + mismatch + errors}")
+        pending += current.subdirs.values()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=2000, help="number of top level streams in the catalog")
+    parser.add_argument("--depth", type=int, default=5, help="levels of nesting of each stream, including the top level")
+    parser.add_argument("--columns", type=int, default=10, help="number of scalar columns at each level")
+    parser.add_argument("--integration-type", type=str, default="postgres", help="type of integration dialect to use")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count(), help="number of processes of the parallel run")
+    args = parser.parse_args()
+
+    destination_type = DestinationType.from_string(args.integration_type)
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as catalog_file:
+        catalog_file.write(json.dumps(build_catalog(args.streams, args.depth, args.columns)))
+
+    serial_output, serial_duration = run(catalog_file.name, destination_type, 1)
+    print(f"serial: {serial_duration:.2f}s")
+    parallel_output, parallel_duration = run(catalog_file.name, destination_type, args.max_workers)
+    print(f"parallel ({args.max_workers} workers): {parallel_duration:.2f}s, speedup x{serial_duration / parallel_duration:.2f}")
+    assert_same_outputs(serial_output, parallel_output)
+    print(f"outputs are identical, see {serial_output} and {parallel_output}")
+
+
+if __name__ == "__main__":
+    main()
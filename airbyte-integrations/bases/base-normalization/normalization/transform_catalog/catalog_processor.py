@@ -3,19 +3,40 @@
 #
 
 
+import contextlib
+import hashlib
+import io
 import json
 import os
 import re
-from typing import Any, Dict, List, Set
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set
 
 import yaml
 from airbyte_cdk.models.airbyte_protocol import DestinationSyncMode, SyncMode  # type: ignore
+from normalization import destination_type
 from normalization.destination_type import DestinationType
 from normalization.transform_catalog import dbt_macro
 from normalization.transform_catalog.destination_name_transformer import DestinationNameTransformer
 from normalization.transform_catalog.stream_processor import StreamProcessor
 from normalization.transform_catalog.table_name_registry import TableNameRegistry
 
+# Records which catalog and generator inputs produced the models of each stream, so unchanged streams are not regenerated
+FINGERPRINTS_FILE = ".normalization_fingerprints.json"
+
+
+class RenderedModels:
+    """
+    The models generated by one StreamProcessor, as sent back from the process that rendered them
+    """
+
+    def __init__(self, depth: int, stream_source: str, models_to_source: Dict[str, str], sql_outputs: Dict[str, str], log: str):
+        self.depth: int = depth
+        self.stream_source: str = stream_source
+        self.models_to_source: Dict[str, str] = models_to_source
+        self.sql_outputs: Dict[str, str] = sql_outputs
+        self.log: str = log
+
 
 class CatalogProcessor:
     """
@@ -28,20 +49,27 @@ class CatalogProcessor:
     This is relying on a StreamProcessor to handle the conversion of a stream to a table one at a time.
     """
 
-    def __init__(self, output_directory: str, destination_type: DestinationType):
+    def __init__(self, output_directory: str, destination_type: DestinationType, max_workers: Optional[int] = None):
         """
         @param output_directory is the path to the directory where this processor should write the resulting SQL files (DBT models)
         @param destination_type is the destination type of warehouse
+        @param max_workers is the number of processes rendering models in parallel, defaults to the number of CPUs
         """
         self.output_directory: str = output_directory
         self.destination_type: DestinationType = destination_type
+        self.max_workers: int = max_workers or os.cpu_count() or 1
         self.name_transformer: DestinationNameTransformer = DestinationNameTransformer(destination_type)
         self.models_to_source: Dict[str, str] = {}
 
     def process(self, catalog_file: str, json_column_name: str, default_schema: str):
         """
-        This method first parse and build models to handle top-level streams.
-        In a second loop will go over the substreams that were nested in a breadth-first traversal manner.
+        This method first parse top-level streams and resolves the table names of all streams and their nested substreams.
+        Once every name is known, the models of each top-level stream and its substreams are rendered independently (on a pool of
+        processes when there are several of them) and written in the same breadth-first traversal order as a serial run would.
+
+        Models of a stream (and of its nested substreams) are only regenerated when its fingerprint changed since the
+        previous run in the same output directory, unchanged .sql files are not rewritten to keep dbt partial parsing effective.
+        Fingerprints are kept per catalog file, so that several catalogs can be processed in the same output directory.
 
         @param catalog_file input AirbyteCatalog file in JSON Schema describing the structure of the raw data
         @param json_column_name is the column name containing the JSON Blob with the raw data
@@ -51,7 +79,7 @@ class CatalogProcessor:
         schema_to_source_tables: Dict[str, Set[str]] = {}
         catalog = read_json(catalog_file)
         # print(json.dumps(catalog, separators=(",", ":")))
-        substreams = []
+        stream_processors_to_render: List[StreamProcessor] = []
         stream_processors = self.build_stream_processor(
             catalog=catalog,
             json_column_name=json_column_name,
@@ -67,7 +95,11 @@ class CatalogProcessor:
                 f"WARN: Resolving conflict: {conflict.schema}.{conflict.table_name_conflict} "
                 f"from '{'.'.join(conflict.json_path)}' into {conflict.table_name_resolved}"
             )
-        for stream_processor in stream_processors:
+        catalog_key = os.path.abspath(catalog_file)
+        previous_fingerprints = self.read_fingerprints().get(catalog_key, {})
+        fingerprints: Dict[str, Dict[str, Any]] = {}
+        resolved_names = tables_registry.get_resolved_names_by_stream()
+        for stream_processor, configured_stream in zip(stream_processors, catalog["streams"]):
             # MySQL table names need to be manually truncated, because it does not do it automatically
             truncate = (
                 self.destination_type == DestinationType.MYSQL
@@ -77,15 +109,39 @@ class CatalogProcessor:
             raw_table_name = self.name_transformer.normalize_table_name(f"_airbyte_raw_{stream_processor.stream_name}", truncate=truncate)
             add_table_to_sources(schema_to_source_tables, stream_processor.schema, raw_table_name)
 
-            nested_processors = stream_processor.process()
-            self.models_to_source.update(stream_processor.models_to_source)
-
-            if nested_processors and len(nested_processors) > 0:
-                substreams += nested_processors
-            for file in stream_processor.sql_outputs:
-                output_sql_file(os.path.join(self.output_directory, file), stream_processor.sql_outputs[file])
+            stream_source = stream_processor.get_stream_source()
+            fingerprint = self.get_stream_fingerprint(
+                configured_stream,
+                json_column_name,
+                default_schema,
+                resolved_names.get(
+                    (self.name_transformer.normalize_schema_name(stream_processor.schema, False, False), stream_processor.stream_name), {}
+                ),
+            )
+            previous = previous_fingerprints.get(stream_source)
+            if previous and previous["fingerprint"] == fingerprint and self.outputs_are_unchanged(previous["files"]):
+                print(f"  Skipping {stream_processor.stream_name}, its models are up to date")
+                fingerprints[stream_source] = previous
+                continue
+            fingerprints[stream_source] = {"fingerprint": fingerprint, "models": [], "files": {}}
+            stream_processors_to_render.append(stream_processor)
         self.write_yaml_sources_file(schema_to_source_tables)
-        self.process_substreams(substreams, tables_registry)
+        rendered_streams = self.render_streams(stream_processors_to_render)
+        # write outputs in the order of a serial breadth-first traversal: top level streams first, then nested ones level by level
+        for depth in range(max((rendered.depth for rendered_stream in rendered_streams for rendered in rendered_stream), default=-1) + 1):
+            for rendered_stream in rendered_streams:
+                for rendered in rendered_stream:
+                    if rendered.depth == depth:
+                        print(rendered.log, end="")
+                        self.collect_outputs(rendered, fingerprints)
+        # models are listed in the order of a run generating every stream: top level streams first, then nested ones level by level
+        for depth in range(max((model[0] for entry in fingerprints.values() for model in entry["models"]), default=-1) + 1):
+            for stream_source, entry in fingerprints.items():
+                for model_depth, file_name in entry["models"]:
+                    if model_depth == depth:
+                        self.models_to_source[file_name] = stream_source
+        self.remove_stale_outputs(previous_fingerprints, fingerprints)
+        self.write_fingerprints(catalog_key, fingerprints)
 
     @staticmethod
     def build_stream_processor(
@@ -165,21 +221,102 @@ class CatalogProcessor:
             result.append(stream_processor)
         return result
 
-    def process_substreams(self, substreams: List[StreamProcessor], tables_registry: TableNameRegistry):
+    def render_streams(self, stream_processors: List[StreamProcessor]) -> List[List[RenderedModels]]:
+        """
+        Render the models of each top-level stream with its nested substreams.
+        Table names are resolved for the whole catalog beforehand, so streams no longer depend on each other at this point.
+        """
+        max_workers = min(self.max_workers, len(stream_processors))
+        if max_workers <= 1:
+            return [render_stream(stream_processor) for stream_processor in stream_processors]
+        # stream processors (and the table registry they share) are handed to each worker once instead of being pickled for every task
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_render_worker, initargs=(stream_processors,)) as executor:
+            chunksize = max(1, len(stream_processors) // (max_workers * 4))
+            return list(executor.map(render_stream_at, range(len(stream_processors)), chunksize=chunksize))
+
+    def collect_outputs(self, rendered: RenderedModels, fingerprints: Dict[str, Dict[str, Any]]):
+        """
+        Write the models generated by a stream processor and record them under the fingerprint of their top level stream
+        """
+        entry = fingerprints[rendered.stream_source]
+        for file_name in rendered.models_to_source:
+            entry["models"].append([rendered.depth, file_name])
+        for file in rendered.sql_outputs:
+            content = output_sql_file(os.path.join(self.output_directory, file), rendered.sql_outputs[file])
+            entry["files"][file] = hash_content(content)
+
+    def get_stream_fingerprint(
+        self, configured_stream: Dict, json_column_name: str, default_schema: str, resolved_names: Dict[str, List[str]]
+    ) -> str:
+        """
+        Hash everything the models of a stream are generated from: its configured stream (schema, sync modes, cursor and primary key),
+        the destination type, the resolved table names of the stream and its substreams and the generator code itself.
+        """
+        return hash_content(
+            json.dumps(
+                {
+                    "generator": GENERATOR_FINGERPRINT,
+                    "destination_type": self.destination_type.value,
+                    "json_column_name": json_column_name,
+                    "default_schema": default_schema,
+                    "configured_stream": configured_stream,
+                    "resolved_names": resolved_names,
+                },
+                sort_keys=True,
+            )
+        )
+
+    def outputs_are_unchanged(self, files: Dict[str, str]) -> bool:
+        """
+        Check that the models generated previously are still on disk and were not modified since
+        """
+        for file, content_hash in files.items():
+            path = os.path.join(self.output_directory, file)
+            if not os.path.exists(path):
+                return False
+            with open(path, "r") as f:
+                if hash_content(f.read()) != content_hash:
+                    return False
+        return True
+
+    def remove_stale_outputs(self, previous_fingerprints: Dict[str, Dict[str, Any]], fingerprints: Dict[str, Dict[str, Any]]):
+        """
+        Delete the models generated by the previous run which are not generated anymore,
+        for streams removed from the catalog or substreams and tables which were renamed
+        """
+        current_files = {file for entry in fingerprints.values() for file in entry["files"]}
+        for entry in previous_fingerprints.values():
+            for file in entry.get("files", {}):
+                path = os.path.join(self.output_directory, file)
+                if file not in current_files and os.path.exists(path):
+                    print(f"  Removing {file}, it is not generated anymore")
+                    os.remove(path)
+
+    def read_fingerprints(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
         """
-        Handle nested stream/substream/children
+        @return the fingerprints of the streams of each catalog file processed in the output directory, by catalog file path
         """
-        while substreams:
-            children = substreams
-            substreams = []
-            for substream in children:
-                substream.tables_registry = tables_registry
-                nested_processors = substream.process()
-                self.models_to_source.update(substream.models_to_source)
-                if nested_processors:
-                    substreams += nested_processors
-                for file in substream.sql_outputs:
-                    output_sql_file(os.path.join(self.output_directory, file), substream.sql_outputs[file])
+        fingerprints_path = os.path.join(self.output_directory, FINGERPRINTS_FILE)
+        if not os.path.exists(fingerprints_path):
+            return {}
+        try:
+            fingerprints = read_json(fingerprints_path)
+        except json.JSONDecodeError:
+            fingerprints = None
+        if not isinstance(fingerprints, dict) or not isinstance(fingerprints.get("catalogs"), dict):
+            print(f"WARN: Ignoring invalid {fingerprints_path}, all models will be generated")
+            return {}
+        return fingerprints["catalogs"]
+
+    def write_fingerprints(self, catalog_key: str, fingerprints: Dict[str, Dict[str, Any]]):
+        """
+        Replace the fingerprints of a catalog file, the fingerprints of the other catalogs are kept
+        """
+        catalogs = {**self.read_fingerprints(), catalog_key: fingerprints}
+        if not os.path.exists(self.output_directory):
+            os.makedirs(self.output_directory)
+        with open(os.path.join(self.output_directory, FINGERPRINTS_FILE), "w") as fh:
+            fh.write(json.dumps({"catalogs": catalogs}, indent=2, sort_keys=True))
 
     def write_yaml_sources_file(self, schema_to_source_tables: Dict[str, Set[str]]):
         """
@@ -211,13 +348,53 @@ class CatalogProcessor:
         output_dir = os.path.dirname(source_path)
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
-        with open(source_path, "w") as fh:
-            fh.write(yaml.dump(source_config, sort_keys=False))
+        write_if_changed(source_path, yaml.dump(source_config, sort_keys=False))
 
 
 # Static Functions
 
 
+# Top-level stream processors of the catalog being rendered by a worker process of CatalogProcessor.render_streams
+_worker_stream_processors: List[StreamProcessor] = []
+
+
+def init_render_worker(stream_processors: List[StreamProcessor]):
+    global _worker_stream_processors
+    _worker_stream_processors = stream_processors
+
+
+def render_stream_at(index: int) -> List[RenderedModels]:
+    return render_stream(_worker_stream_processors[index])
+
+
+def render_stream(stream_processor: StreamProcessor) -> List[RenderedModels]:
+    """
+    Process a top-level stream, then go over its nested substreams in a breadth-first traversal manner
+    @return the models of every processed stream, logs are captured so they can be printed in a deterministic order
+    """
+    result = []
+    stream_processors = [stream_processor]
+    while stream_processors:
+        children = []
+        for processor in stream_processors:
+            log = io.StringIO()
+            with contextlib.redirect_stdout(log):
+                nested_processors = processor.process()
+            result.append(
+                RenderedModels(
+                    len(processor.json_path) - 1,
+                    processor.get_stream_source(),
+                    processor.models_to_source,
+                    processor.sql_outputs,
+                    log.getvalue(),
+                )
+            )
+            if nested_processors:
+                children += nested_processors
+        stream_processors = children
+    return result
+
+
 def read_json(input_path: str) -> Any:
     """
     Reads and load a json file
@@ -284,16 +461,50 @@ def add_table_to_sources(schema_to_source_tables: Dict[str, Set[str]], schema_na
         raise KeyError(f"Duplicate table {table_name} in {schema_name}")
 
 
-def output_sql_file(file: str, sql: str):
+def output_sql_file(file: str, sql: str) -> str:
     """
     @param file is the path to filename to be written
     @param sql is the dbt sql content to be written in the generated model file
+    @return the content of the model file
     """
     output_dir = os.path.dirname(file)
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
+    content = "".join(line + "\n" for line in sql.splitlines() if line.strip()) + "\n"
+    write_if_changed(file, content)
+    return content
+
+
+def write_if_changed(file: str, content: str):
+    """
+    Only write the file when its content differs, so that unchanged files keep their mtime
+    """
+    if os.path.exists(file):
+        with open(file, "r") as f:
+            if f.read() == content:
+                return
     with open(file, "w") as f:
-        for line in sql.splitlines():
-            if line.strip():
-                f.write(line + "\n")
-        f.write("\n")
+        f.write(content)
+
+
+def hash_content(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def get_generator_fingerprint() -> str:
+    """
+    Models have to be regenerated whenever the code generating them changes:
+    every module of the transform_catalog package and the destination types are part of the fingerprint
+    """
+    package_directory = os.path.dirname(os.path.abspath(__file__))
+    modules = sorted(os.path.join(package_directory, file) for file in os.listdir(package_directory) if file.endswith(".py"))
+    modules.append(os.path.abspath(destination_type.__file__))
+    h = hashlib.sha256()
+    for module in modules:
+        h.update(os.path.basename(module).encode("utf-8"))
+        with open(module, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+GENERATOR_FINGERPRINT = get_generator_fingerprint()
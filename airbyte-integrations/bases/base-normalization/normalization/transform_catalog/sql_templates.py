@@ -0,0 +1,382 @@
+#
+# Copyright (c) 2023 Airbyte, Inc., all rights reserved.
+#
+
+
+"""
+Jinja templates used by the StreamProcessor to render dbt models.
+
+Templates are compiled once at import time instead of every time a model is generated.
+"""
+
+from jinja2 import Template
+
+
+JSON_PARSING_MODEL_TEMPLATE = Template(
+    """
+-- SQL model to parse JSON blob stored in a single column and extract into separated field columns as described by the JSON Schema
+-- depends_on: {{ from_table }}
+{{ unnesting_before_query }}
+select
+{%- if parent_hash_id %}
+    {{ parent_hash_id }},
+{%- endif %}
+{%- for field in fields %}
+    {{ field }},
+{%- endfor %}
+    {{ col_ab_id }},
+    {{ col_emitted_at }},
+    {{ '{{ current_timestamp() }}' }} as {{ col_normalized_at }}
+from {{ from_table }} {{ table_alias }}
+{{ sql_table_comment }}
+{{ unnesting_from }}
+where 1 = 1
+{{ unnesting_where }}
+"""
+)
+
+COLUMN_TYPING_MODEL_TEMPLATE = Template(
+    """
+-- SQL model to cast each column to its adequate SQL type converted from the JSON schema type
+-- depends_on: {{ from_table }}
+select
+{%- if parent_hash_id %}
+    {{ parent_hash_id }},
+{%- endif %}
+{%- for field in fields %}
+    {{ field }},
+{%- endfor %}
+    {{ col_ab_id }},
+    {{ col_emitted_at }},
+    {{ '{{ current_timestamp() }}' }} as {{ col_normalized_at }}
+from {{ from_table }}
+{{ sql_table_comment }}
+where 1 = 1
+    """
+)
+
+MYSQL_DATE_FORMAT_STATEMENT_TEMPLATE = Template(
+    """
+        case when {{column_name}} = '' then NULL
+        else cast({{column_name}} as date)
+        end as {{column_name}}
+        """
+)
+
+MYSQL_DATETIME_FORMAT_STATEMENT_TEMPLATE = Template(
+    """
+        case when {{column_name}} regexp '{{regexp}}' THEN STR_TO_DATE(SUBSTR({{column_name}}, 1, 19), '%Y-%m-%dT%H:%i:%S')
+        else cast(if({{column_name}} = '', NULL, {{column_name}}) as datetime)
+        end as {{column_name}}
+        """
+)
+
+SNOWFLAKE_TIMESTAMP_TZ_STATEMENT_TEMPLATE = Template(
+    """
+    case
+{% for format_item in formats %}
+        when {{column_name}} regexp '{{format_item['regex']}}' then to_timestamp_tz({{column_name}}, '{{format_item['format']}}')
+{% endfor %}
+        when {{column_name}} = '' then NULL
+    else to_timestamp_tz({{column_name}})
+    end as {{column_name}}
+    """
+)
+
+SNOWFLAKE_TIMESTAMP_STATEMENT_TEMPLATE = Template(
+    """
+    case
+{% for format_item in formats %}
+        when {{column_name}} regexp '{{format_item['regex']}}' then to_timestamp({{column_name}}, '{{format_item['format']}}')
+{% endfor %}
+        when {{column_name}} = '' then NULL
+    else to_timestamp({{column_name}})
+    end as {{column_name}}
+    """
+)
+
+ID_HASHING_MODEL_TEMPLATE = Template(
+    """
+-- SQL model to build a hash column based on the values of this record
+-- depends_on: {{ from_table }}
+select
+    {{ '{{' }} dbt_utils.surrogate_key([
+{%- if parent_hash_id %}
+        {{ parent_hash_id }},
+{%- endif %}
+{%- for field in fields %}
+        {{ field }},
+{%- endfor %}
+    ]) {{ '}}' }} as {{ hash_id }},
+    tmp.*
+from {{ from_table }} tmp
+{{ sql_table_comment }}
+where 1 = 1
+    """
+)
+
+CLICKHOUSE_ACTIVE_ROW_SQL_TEMPLATE = Template(
+    """
+input_data_with_active_row_num as (
+    select *,
+      row_number() over (
+        partition by {{ primary_key_partition | join(", ") }}
+        order by
+            {{ cursor_field }} {{ order_null }},{{ cdc_updated_at_order }}
+            {{ col_emitted_at }} desc
+      ) as _airbyte_active_row_num
+    from input_data
+),"""
+)
+
+CLICKHOUSE_SCD_COLUMNS_SQL_TEMPLATE = Template(
+    """
+      case when _airbyte_active_row_num = 1{{ cdc_active_row }} then 1 else 0 end as {{ active_row }},
+      {{ lag_begin }}({{ cursor_field }}) over (
+        partition by {{ primary_key_partition | join(", ") }}
+        order by
+            {{ cursor_field }} {{ order_null }},{{ cdc_updated_at_order }}
+            {{ col_emitted_at }} desc
+      {{ lag_end }}) as {{ airbyte_end_at }}"""
+)
+
+SCD_COLUMNS_SQL_TEMPLATE = Template(
+    """
+      lag({{ cursor_field }}) over (
+        partition by {{ primary_key_partition | join(", ") }}
+        order by
+            {{ cursor_field }} {{ order_null }},{{ cdc_updated_at_order }}
+            {{ col_emitted_at }} desc
+      ) as {{ airbyte_end_at }},
+      case when row_number() over (
+        partition by {{ primary_key_partition | join(", ") }}
+        order by
+            {{ cursor_field }} {{ order_null }},{{ cdc_updated_at_order }}
+            {{ col_emitted_at }} desc
+      ) = 1{{ cdc_active_row }} then 1 else 0 end as {{ active_row }}"""
+)
+
+SCD_TYPE_2_MODEL_TEMPLATE = Template(
+    """
+-- depends_on: {{ from_table }}
+with
+{{ '{% if is_incremental() %}' }}
+new_data as (
+    -- retrieve incremental "new" data
+    select
+        *
+    from {{'{{'}} {{ from_table }}  {{'}}'}}
+    {{ sql_table_comment }}
+    where 1 = 1
+    {{ incremental_clause }}
+),
+new_data_ids as (
+    -- build a subset of {{ unique_key }} from rows that are new
+    select distinct
+        {{ '{{' }} dbt_utils.surrogate_key([
+{%- for primary_key in primary_keys %}
+            {{ primary_key }},
+{%- endfor %}
+        ]) {{ '}}' }} as {{ unique_key }}
+    from new_data
+),
+empty_new_data as (
+    -- build an empty table to only keep the table's column types
+    select * from new_data where 1 = 0
+),
+previous_active_scd_data as (
+    -- retrieve "incomplete old" data that needs to be updated with an end date because of new changes
+    select
+        {{ '{{' }} star_intersect({{ from_table }}, this, from_alias='inc_data', intersect_alias='this_data') {{ '}}' }}
+    from {{ '{{ this }}' }} as this_data
+    -- make a join with new_data using primary key to filter active data that need to be updated only
+    join new_data_ids on this_data.{{ unique_key }} = new_data_ids.{{ unique_key }}
+    -- force left join to NULL values (we just need to transfer column types only for the star_intersect macro on schema changes)
+    {{ enable_left_join_null }}left join empty_new_data as inc_data on this_data.{{ col_ab_id }} = inc_data.{{ col_ab_id }}
+    where {{ active_row }} = 1
+),
+input_data as (
+    select {{ '{{' }} dbt_utils.star({{ from_table }}) {{ '}}' }} from new_data
+    union all
+    select {{ '{{' }} dbt_utils.star({{ from_table }}) {{ '}}' }} from previous_active_scd_data
+),
+{{ '{% else %}' }}
+input_data as (
+    select *
+    from {{'{{'}} {{ from_table }}  {{'}}'}}
+    {{ sql_table_comment }}
+),
+{{ '{% endif %}' }}
+{{ clickhouse_active_row_sql }}
+scd_data as (
+    -- SQL model to build a Type 2 Slowly Changing Dimension (SCD) table for each record identified by their primary key
+    select
+{%- if parent_hash_id %}
+      {{ parent_hash_id }},
+{%- endif %}
+      {{ '{{' }} dbt_utils.surrogate_key([
+{%- for primary_key in primary_keys %}
+      {{ primary_key }},
+{%- endfor %}
+      ]) {{ '}}' }} as {{ unique_key }},
+{%- for field in fields %}
+      {{ field }},
+{%- endfor %}
+      {{ cursor_field }} as {{ airbyte_start_at }},
+      {{ scd_columns_sql }},
+      {{ col_ab_id }},
+      {{ col_emitted_at }},
+      {{ hash_id }}
+    from {{ input_data_table }}
+),
+dedup_data as (
+    select
+        -- we need to ensure de-duplicated rows for merge/update queries
+        -- additionally, we generate a unique key for the scd table
+        row_number() over (
+            partition by
+                {{ unique_key }},
+                {{ airbyte_start_at_string }},
+                {{ col_emitted_at }}{{ cdc_cols }}
+            order by {{ active_row }} desc, {{ col_ab_id }}
+        ) as {{ airbyte_row_num }},
+        {{ '{{' }} dbt_utils.surrogate_key([
+          {{ quoted_unique_key }},
+          {{ quoted_airbyte_start_at }},
+          {{ quoted_col_emitted_at }}{{ quoted_cdc_cols }}
+        ]) {{ '}}' }} as {{ airbyte_unique_key_scd }},
+        scd_data.*
+    from scd_data
+)
+select
+{%- if parent_hash_id %}
+    {{ parent_hash_id }},
+{%- endif %}
+    {{ unique_key }},
+    {{ airbyte_unique_key_scd }},
+{%- for field in fields %}
+    {{ field }},
+{%- endfor %}
+    {{ airbyte_start_at }},
+    {{ airbyte_end_at }},
+    {{ active_row }},
+    {{ col_ab_id }},
+    {{ col_emitted_at }},
+    {{ '{{ current_timestamp() }}' }} as {{ col_normalized_at }},
+    {{ hash_id }}
+from dedup_data where {{ airbyte_row_num }} = 1
+"""
+)
+
+FINAL_MODEL_TEMPLATE = Template(
+    """
+-- Final base SQL model
+-- depends_on: {{ from_table }}
+select
+{%- if parent_hash_id %}
+    {{ parent_hash_id }},
+{%- endif %}
+{%- if unique_key %}
+    {{ unique_key }},
+{%- endif %}
+{%- for field in fields %}
+    {{ field }},
+{%- endfor %}
+    {{ col_ab_id }},
+    {{ col_emitted_at }},
+    {{ '{{ current_timestamp() }}' }} as {{ col_normalized_at }},
+    {{ hash_id }}
+from {{ from_table }}
+{{ sql_table_comment }}
+where 1 = 1
+    """
+)
+
+INCREMENTAL_CLAUSE_TEMPLATE = Template(
+    """
+{{ sql_query }}
+{{ incremental_clause }}
+    """
+)
+
+SCD_DELETION_HOOK_TEMPLATE = Template(
+    """
+                    {{ '{%' }}
+                    set final_table_relation = adapter.get_relation(
+                            database=this.database,
+                            schema=this.schema,
+                            identifier='{{ final_table_name }}'
+                        )
+                    {{ '%}' }}
+                    {{ '{#' }}
+                    If the final table doesn't exist, then obviously we can't delete anything from it.
+                    Also, after a reset, the final table is created without the _airbyte_unique_key column (this column is created during the first sync)
+                    So skip this deletion if the column doesn't exist. (in this case, the table is guaranteed to be empty anyway)
+                    {{ '#}' }}
+                    {{ '{%' }}
+                    if final_table_relation is not none and {{ quoted_unique_key }} in adapter.get_columns_in_relation(final_table_relation)|map(attribute='name')
+                    {{ '%}' }}
+
+                    -- Delete records which are no longer active:
+                    -- This query is equivalent, but the left join version is more performant:
+                    -- delete from final_table where unique_key in (
+                    --     select unique_key from scd_table where 1 = 1 <incremental_clause(normalized_at, final_table)>
+                    -- ) and unique_key not in (
+                    --     select unique_key from scd_table where active_row = 1 <incremental_clause(normalized_at, final_table)>
+                    -- )
+                    -- We're incremental against normalized_at rather than emitted_at because we need to fetch the SCD
+                    -- entries that were _updated_ recently. This is because a deleted record will have an SCD record
+                    -- which was emitted a long time ago, but recently re-normalized to have active_row = 0.
+                    {{ delete_statement }} where {{ unique_key_reference }} in (
+                        select recent_records.unique_key
+                        from (
+                                select distinct {{ unique_key }} as unique_key
+                                from {{ '{{ this }}' }}
+                                where 1=1 {{ normalized_at_incremental_clause }}
+                            ) recent_records
+                            left join (
+                                select {{ unique_key }} as unique_key, count({{ unique_key }}) as active_count
+                                from {{ '{{ this }}' }}
+                                where {{ active_row_column_name }} = 1 {{ normalized_at_incremental_clause }}
+                                group by {{ unique_key }}
+                            ) active_counts
+                            on recent_records.unique_key = active_counts.unique_key
+                        where active_count is null or active_count = 0
+                    )
+                    {{ '{% else %}' }}
+                    -- We have to have a non-empty query, so just do a noop delete
+                    {{ noop_delete_statement }}
+                    {{ '{% endif %}' }}
+                    """
+)
+
+DROP_SCD_TABLE_HOOK_TEMPLATE = Template(
+    """
+                    {{ '{%' }}
+                        set scd_table_relation = adapter.get_relation(
+                            database=this.database,
+                            schema=this.schema,
+                            identifier='{{ scd_table_name }}'
+                        )
+                    {{ '%}' }}
+                    {{ '{%' }}
+                        if scd_table_relation is not none
+                    {{ '%}' }}
+                    {{ '{%' }}
+                            do adapter.drop_relation(scd_table_relation)
+                    {{ '%}' }}
+                    {{ '{% endif %}' }}
+                        """
+)
+
+MODEL_CONFIG_TEMPLATE = Template(
+    """
+{{ '{{' }} config(
+{%- for key in config %}
+    {{ key }} = {{ config[key] }},
+{%- endfor %}
+    tags = [ {{ tags }} ]
+) {{ '}}' }}
+{{ sql }}
+    """
+)
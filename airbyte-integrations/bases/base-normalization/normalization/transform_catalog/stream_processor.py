@@ -9,9 +9,8 @@ from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from airbyte_cdk.models.airbyte_protocol import DestinationSyncMode, SyncMode  # type: ignore
-from jinja2 import Template
 from normalization.destination_type import DestinationType
-from normalization.transform_catalog import dbt_macro
+from normalization.transform_catalog import dbt_macro, sql_templates
 from normalization.transform_catalog.destination_name_transformer import DestinationNameTransformer, transform_json_naming
 from normalization.transform_catalog.table_name_registry import TableNameRegistry
 from normalization.transform_catalog.utils import (
@@ -388,28 +387,7 @@ class StreamProcessor(object):
             table_alias = ""
         else:
             table_alias = "as table_alias"
-        template = Template(
-            """
--- SQL model to parse JSON blob stored in a single column and extract into separated field columns as described by the JSON Schema
--- depends_on: {{ from_table }}
-{{ unnesting_before_query }}
-select
-{%- if parent_hash_id %}
-    {{ parent_hash_id }},
-{%- endif %}
-{%- for field in fields %}
-    {{ field }},
-{%- endfor %}
-    {{ col_ab_id }},
-    {{ col_emitted_at }},
-    {{ '{{ current_timestamp() }}' }} as {{ col_normalized_at }}
-from {{ from_table }} {{ table_alias }}
-{{ sql_table_comment }}
-{{ unnesting_from }}
-where 1 = 1
-{{ unnesting_where }}
-"""
-        )
+        template = sql_templates.JSON_PARSING_MODEL_TEMPLATE
         sql = template.render(
             col_ab_id=self.get_ab_id(),
             col_emitted_at=self.get_emitted_at(),
@@ -469,25 +447,7 @@ where 1 = 1
         return f"{json_extract} as {column_name}"
 
     def generate_column_typing_model(self, from_table: str, column_names: Dict[str, Tuple[str, str]]) -> Any:
-        template = Template(
-            """
--- SQL model to cast each column to its adequate SQL type converted from the JSON schema type
--- depends_on: {{ from_table }}
-select
-{%- if parent_hash_id %}
-    {{ parent_hash_id }},
-{%- endif %}
-{%- for field in fields %}
-    {{ field }},
-{%- endfor %}
-    {{ col_ab_id }},
-    {{ col_emitted_at }},
-    {{ '{{ current_timestamp() }}' }} as {{ col_normalized_at }}
-from {{ from_table }}
-{{ sql_table_comment }}
-where 1 = 1
-    """
-        )
+        template = sql_templates.COLUMN_TYPING_MODEL_TEMPLATE
         sql = template.render(
             col_ab_id=self.get_ab_id(),
             col_emitted_at=self.get_emitted_at(),
@@ -602,25 +562,13 @@ where 1 = 1
 
     @staticmethod
     def generate_mysql_date_format_statement(column_name: str) -> Any:
-        template = Template(
-            """
-        case when {{column_name}} = '' then NULL
-        else cast({{column_name}} as date)
-        end as {{column_name}}
-        """
-        )
+        template = sql_templates.MYSQL_DATE_FORMAT_STATEMENT_TEMPLATE
         return template.render(column_name=column_name)
 
     @staticmethod
     def generate_mysql_datetime_format_statement(column_name: str) -> Any:
         regexp = r"\\d{4}-\\d{2}-\\d{2}T\\d{2}:\\d{2}:\\d{2}.*"
-        template = Template(
-            """
-        case when {{column_name}} regexp '{{regexp}}' THEN STR_TO_DATE(SUBSTR({{column_name}}, 1, 19), '%Y-%m-%dT%H:%i:%S')
-        else cast(if({{column_name}} = '', NULL, {{column_name}}) as datetime)
-        end as {{column_name}}
-        """
-        )
+        template = sql_templates.MYSQL_DATETIME_FORMAT_STATEMENT_TEMPLATE
         return template.render(column_name=column_name, regexp=regexp)
 
     @staticmethod
@@ -637,17 +585,7 @@ where 1 = 1
             },
             {"regex": r"\\d{4}-\\d{2}-\\d{2}T(\\d{2}:){2}\\d{2}\\.\\d{1,7}(\\+|-)\\d{2}", "format": "YYYY-MM-DDTHH24:MI:SS.FFTZH"},
         ]
-        template = Template(
-            """
-    case
-{% for format_item in formats %}
-        when {{column_name}} regexp '{{format_item['regex']}}' then to_timestamp_tz({{column_name}}, '{{format_item['format']}}')
-{% endfor %}
-        when {{column_name}} = '' then NULL
-    else to_timestamp_tz({{column_name}})
-    end as {{column_name}}
-    """
-        )
+        template = sql_templates.SNOWFLAKE_TIMESTAMP_TZ_STATEMENT_TEMPLATE
         return template.render(formats=formats, column_name=column_name)
 
     @staticmethod
@@ -659,40 +597,12 @@ where 1 = 1
             {"regex": r"\\d{4}-\\d{2}-\\d{2}T(\\d{2}:){2}\\d{2}", "format": "YYYY-MM-DDTHH24:MI:SS"},
             {"regex": r"\\d{4}-\\d{2}-\\d{2}T(\\d{2}:){2}\\d{2}\\.\\d{1,7}", "format": "YYYY-MM-DDTHH24:MI:SS.FF"},
         ]
-        template = Template(
-            """
-    case
-{% for format_item in formats %}
-        when {{column_name}} regexp '{{format_item['regex']}}' then to_timestamp({{column_name}}, '{{format_item['format']}}')
-{% endfor %}
-        when {{column_name}} = '' then NULL
-    else to_timestamp({{column_name}})
-    end as {{column_name}}
-    """
-        )
+        template = sql_templates.SNOWFLAKE_TIMESTAMP_STATEMENT_TEMPLATE
         return template.render(formats=formats, column_name=column_name)
 
     def generate_id_hashing_model(self, from_table: str, column_names: Dict[str, Tuple[str, str]]) -> Any:
 
-        template = Template(
-            """
--- SQL model to build a hash column based on the values of this record
--- depends_on: {{ from_table }}
-select
-    {{ '{{' }} dbt_utils.surrogate_key([
-{%- if parent_hash_id %}
-        {{ parent_hash_id }},
-{%- endif %}
-{%- for field in fields %}
-        {{ field }},
-{%- endfor %}
-    ]) {{ '}}' }} as {{ hash_id }},
-    tmp.*
-from {{ from_table }} tmp
-{{ sql_table_comment }}
-where 1 = 1
-    """
-        )
+        template = sql_templates.ID_HASHING_MODEL_TEMPLATE
 
         sql = template.render(
             parent_hash_id=self.parent_hash_id(in_jinja=True),
@@ -862,159 +772,14 @@ where 1 = 1
             "unique_key": self.get_unique_key(),
         }
         if self.destination_type == DestinationType.CLICKHOUSE:
-            clickhouse_active_row_sql = Template(
-                """
-input_data_with_active_row_num as (
-    select *,
-      row_number() over (
-        partition by {{ primary_key_partition | join(", ") }}
-        order by
-            {{ cursor_field }} {{ order_null }},{{ cdc_updated_at_order }}
-            {{ col_emitted_at }} desc
-      ) as _airbyte_active_row_num
-    from input_data
-),"""
-            ).render(jinja_variables)
+            clickhouse_active_row_sql = sql_templates.CLICKHOUSE_ACTIVE_ROW_SQL_TEMPLATE.render(jinja_variables)
             jinja_variables["clickhouse_active_row_sql"] = clickhouse_active_row_sql
-            scd_columns_sql = Template(
-                """
-      case when _airbyte_active_row_num = 1{{ cdc_active_row }} then 1 else 0 end as {{ active_row }},
-      {{ lag_begin }}({{ cursor_field }}) over (
-        partition by {{ primary_key_partition | join(", ") }}
-        order by
-            {{ cursor_field }} {{ order_null }},{{ cdc_updated_at_order }}
-            {{ col_emitted_at }} desc
-      {{ lag_end }}) as {{ airbyte_end_at }}"""
-            ).render(jinja_variables)
+            scd_columns_sql = sql_templates.CLICKHOUSE_SCD_COLUMNS_SQL_TEMPLATE.render(jinja_variables)
             jinja_variables["scd_columns_sql"] = scd_columns_sql
         else:
-            scd_columns_sql = Template(
-                """
-      lag({{ cursor_field }}) over (
-        partition by {{ primary_key_partition | join(", ") }}
-        order by
-            {{ cursor_field }} {{ order_null }},{{ cdc_updated_at_order }}
-            {{ col_emitted_at }} desc
-      ) as {{ airbyte_end_at }},
-      case when row_number() over (
-        partition by {{ primary_key_partition | join(", ") }}
-        order by
-            {{ cursor_field }} {{ order_null }},{{ cdc_updated_at_order }}
-            {{ col_emitted_at }} desc
-      ) = 1{{ cdc_active_row }} then 1 else 0 end as {{ active_row }}"""
-            ).render(jinja_variables)
+            scd_columns_sql = sql_templates.SCD_COLUMNS_SQL_TEMPLATE.render(jinja_variables)
             jinja_variables["scd_columns_sql"] = scd_columns_sql
-        sql = Template(
-            """
--- depends_on: {{ from_table }}
-with
-{{ '{% if is_incremental() %}' }}
-new_data as (
-    -- retrieve incremental "new" data
-    select
-        *
-    from {{'{{'}} {{ from_table }}  {{'}}'}}
-    {{ sql_table_comment }}
-    where 1 = 1
-    {{ incremental_clause }}
-),
-new_data_ids as (
-    -- build a subset of {{ unique_key }} from rows that are new
-    select distinct
-        {{ '{{' }} dbt_utils.surrogate_key([
-{%- for primary_key in primary_keys %}
-            {{ primary_key }},
-{%- endfor %}
-        ]) {{ '}}' }} as {{ unique_key }}
-    from new_data
-),
-empty_new_data as (
-    -- build an empty table to only keep the table's column types
-    select * from new_data where 1 = 0
-),
-previous_active_scd_data as (
-    -- retrieve "incomplete old" data that needs to be updated with an end date because of new changes
-    select
-        {{ '{{' }} star_intersect({{ from_table }}, this, from_alias='inc_data', intersect_alias='this_data') {{ '}}' }}
-    from {{ '{{ this }}' }} as this_data
-    -- make a join with new_data using primary key to filter active data that need to be updated only
-    join new_data_ids on this_data.{{ unique_key }} = new_data_ids.{{ unique_key }}
-    -- force left join to NULL values (we just need to transfer column types only for the star_intersect macro on schema changes)
-    {{ enable_left_join_null }}left join empty_new_data as inc_data on this_data.{{ col_ab_id }} = inc_data.{{ col_ab_id }}
-    where {{ active_row }} = 1
-),
-input_data as (
-    select {{ '{{' }} dbt_utils.star({{ from_table }}) {{ '}}' }} from new_data
-    union all
-    select {{ '{{' }} dbt_utils.star({{ from_table }}) {{ '}}' }} from previous_active_scd_data
-),
-{{ '{% else %}' }}
-input_data as (
-    select *
-    from {{'{{'}} {{ from_table }}  {{'}}'}}
-    {{ sql_table_comment }}
-),
-{{ '{% endif %}' }}
-{{ clickhouse_active_row_sql }}
-scd_data as (
-    -- SQL model to build a Type 2 Slowly Changing Dimension (SCD) table for each record identified by their primary key
-    select
-{%- if parent_hash_id %}
-      {{ parent_hash_id }},
-{%- endif %}
-      {{ '{{' }} dbt_utils.surrogate_key([
-{%- for primary_key in primary_keys %}
-      {{ primary_key }},
-{%- endfor %}
-      ]) {{ '}}' }} as {{ unique_key }},
-{%- for field in fields %}
-      {{ field }},
-{%- endfor %}
-      {{ cursor_field }} as {{ airbyte_start_at }},
-      {{ scd_columns_sql }},
-      {{ col_ab_id }},
-      {{ col_emitted_at }},
-      {{ hash_id }}
-    from {{ input_data_table }}
-),
-dedup_data as (
-    select
-        -- we need to ensure de-duplicated rows for merge/update queries
-        -- additionally, we generate a unique key for the scd table
-        row_number() over (
-            partition by
-                {{ unique_key }},
-                {{ airbyte_start_at_string }},
-                {{ col_emitted_at }}{{ cdc_cols }}
-            order by {{ active_row }} desc, {{ col_ab_id }}
-        ) as {{ airbyte_row_num }},
-        {{ '{{' }} dbt_utils.surrogate_key([
-          {{ quoted_unique_key }},
-          {{ quoted_airbyte_start_at }},
-          {{ quoted_col_emitted_at }}{{ quoted_cdc_cols }}
-        ]) {{ '}}' }} as {{ airbyte_unique_key_scd }},
-        scd_data.*
-    from scd_data
-)
-select
-{%- if parent_hash_id %}
-    {{ parent_hash_id }},
-{%- endif %}
-    {{ unique_key }},
-    {{ airbyte_unique_key_scd }},
-{%- for field in fields %}
-    {{ field }},
-{%- endfor %}
-    {{ airbyte_start_at }},
-    {{ airbyte_end_at }},
-    {{ active_row }},
-    {{ col_ab_id }},
-    {{ col_emitted_at }},
-    {{ '{{ current_timestamp() }}' }} as {{ col_normalized_at }},
-    {{ hash_id }}
-from dedup_data where {{ airbyte_row_num }} = 1
-"""
-        ).render(jinja_variables)
+        sql = sql_templates.SCD_TYPE_2_MODEL_TEMPLATE.render(jinja_variables)
         return sql
 
     def get_cursor_field_property_name(self, column_names: Dict[str, Tuple[str, str]]) -> str:
@@ -1087,29 +852,7 @@ from dedup_data where {{ airbyte_row_num }} = 1
         This is the table that the user actually wants. In addition to the columns that the source outputs, it has some additional metadata columns;
         see the basic normalization docs for an explanation: https://docs.airbyte.com/understanding-airbyte/basic-normalization#normalization-metadata-columns
         """
-        template = Template(
-            """
--- Final base SQL model
--- depends_on: {{ from_table }}
-select
-{%- if parent_hash_id %}
-    {{ parent_hash_id }},
-{%- endif %}
-{%- if unique_key %}
-    {{ unique_key }},
-{%- endif %}
-{%- for field in fields %}
-    {{ field }},
-{%- endfor %}
-    {{ col_ab_id }},
-    {{ col_emitted_at }},
-    {{ '{{ current_timestamp() }}' }} as {{ col_normalized_at }},
-    {{ hash_id }}
-from {{ from_table }}
-{{ sql_table_comment }}
-where 1 = 1
-    """
-        )
+        template = sql_templates.FINAL_MODEL_TEMPLATE
         sql = template.render(
             col_ab_id=self.get_ab_id(),
             col_emitted_at=self.get_emitted_at(),
@@ -1128,12 +871,7 @@ where 1 = 1
         return destination_sync_mode.value in [DestinationSyncMode.append.value, DestinationSyncMode.append_dedup.value]
 
     def add_incremental_clause(self, sql_query: str) -> Any:
-        template = Template(
-            """
-{{ sql_query }}
-{{ incremental_clause }}
-    """
-        )
+        template = sql_templates.INCREMENTAL_CLAUSE_TEMPLATE
         sql = template.render(sql_query=sql_query, incremental_clause=self.get_incremental_clause("this"))
         return sql
 
@@ -1210,56 +948,7 @@ where 1 = 1
                     delete_statement = "delete from {{ final_table_relation }}"
                     unique_key_reference = "{{ final_table_relation }}." + self.get_unique_key(in_jinja=False)
                     noop_delete_statement = "delete from {{ this }} where 1=0"
-                deletion_hook = Template(
-                    """
-                    {{ '{%' }}
-                    set final_table_relation = adapter.get_relation(
-                            database=this.database,
-                            schema=this.schema,
-                            identifier='{{ final_table_name }}'
-                        )
-                    {{ '%}' }}
-                    {{ '{#' }}
-                    If the final table doesn't exist, then obviously we can't delete anything from it.
-                    Also, after a reset, the final table is created without the _airbyte_unique_key column (this column is created during the first sync)
-                    So skip this deletion if the column doesn't exist. (in this case, the table is guaranteed to be empty anyway)
-                    {{ '#}' }}
-                    {{ '{%' }}
-                    if final_table_relation is not none and {{ quoted_unique_key }} in adapter.get_columns_in_relation(final_table_relation)|map(attribute='name')
-                    {{ '%}' }}
-
-                    -- Delete records which are no longer active:
-                    -- This query is equivalent, but the left join version is more performant:
-                    -- delete from final_table where unique_key in (
-                    --     select unique_key from scd_table where 1 = 1 <incremental_clause(normalized_at, final_table)>
-                    -- ) and unique_key not in (
-                    --     select unique_key from scd_table where active_row = 1 <incremental_clause(normalized_at, final_table)>
-                    -- )
-                    -- We're incremental against normalized_at rather than emitted_at because we need to fetch the SCD
-                    -- entries that were _updated_ recently. This is because a deleted record will have an SCD record
-                    -- which was emitted a long time ago, but recently re-normalized to have active_row = 0.
-                    {{ delete_statement }} where {{ unique_key_reference }} in (
-                        select recent_records.unique_key
-                        from (
-                                select distinct {{ unique_key }} as unique_key
-                                from {{ '{{ this }}' }}
-                                where 1=1 {{ normalized_at_incremental_clause }}
-                            ) recent_records
-                            left join (
-                                select {{ unique_key }} as unique_key, count({{ unique_key }}) as active_count
-                                from {{ '{{ this }}' }}
-                                where {{ active_row_column_name }} = 1 {{ normalized_at_incremental_clause }}
-                                group by {{ unique_key }}
-                            ) active_counts
-                            on recent_records.unique_key = active_counts.unique_key
-                        where active_count is null or active_count = 0
-                    )
-                    {{ '{% else %}' }}
-                    -- We have to have a non-empty query, so just do a noop delete
-                    {{ noop_delete_statement }}
-                    {{ '{% endif %}' }}
-                    """
-                ).render(
+                deletion_hook = sql_templates.SCD_DELETION_HOOK_TEMPLATE.render(
                     delete_statement=delete_statement,
                     noop_delete_statement=noop_delete_statement,
                     final_table_name=final_table_name,
@@ -1295,38 +984,9 @@ where 1 = 1
                 # drop SCD table after creating the destination table
                 scd_table_name = self.tables_registry.get_table_name(schema, self.json_path, self.stream_name, "scd", truncate_name)
                 print(f"  Adding drop table hook for {scd_table_name} to {file_name}")
-                hooks = [
-                    Template(
-                        """
-                    {{ '{%' }}
-                        set scd_table_relation = adapter.get_relation(
-                            database=this.database,
-                            schema=this.schema,
-                            identifier='{{ scd_table_name }}'
-                        )
-                    {{ '%}' }}
-                    {{ '{%' }}
-                        if scd_table_relation is not none
-                    {{ '%}' }}
-                    {{ '{%' }}
-                            do adapter.drop_relation(scd_table_relation)
-                    {{ '%}' }}
-                    {{ '{% endif %}' }}
-                        """
-                    ).render(scd_table_name=scd_table_name)
-                ]
+                hooks = [sql_templates.DROP_SCD_TABLE_HOOK_TEMPLATE.render(scd_table_name=scd_table_name)]
                 config["post_hook"] = "[" + ",".join(map(wrap_in_quotes, hooks)) + "]"
-        template = Template(
-            """
-{{ '{{' }} config(
-{%- for key in config %}
-    {{ key }} = {{ config[key] }},
-{%- endfor %}
-    tags = [ {{ tags }} ]
-) {{ '}}' }}
-{{ sql }}
-    """
-        )
+        template = sql_templates.MODEL_CONFIG_TEMPLATE
 
         self.sql_outputs[output] = template.render(config=config, sql=sql, tags=self.get_model_tags(is_intermediate))
         json_path = self.current_json_path()
@@ -3,7 +3,7 @@
 #
 
 import hashlib
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 from normalization import DestinationType
 from normalization.transform_catalog.destination_name_transformer import DestinationNameTransformer
@@ -315,6 +315,22 @@ class TableNameRegistry:
 
         return self.name_transformer.normalize_table_name(f"{file_name}{norm_suffix}", False, truncate, conflict, conflict_solver)
 
+    def get_resolved_names_by_stream(self) -> Dict[Tuple[str, str], Dict[str, List[str]]]:
+        """
+        Group the resolved names of every table (top level and nested) by the schema and name of the top level stream it comes from.
+        Conflict resolution depends on the whole catalog, so these names are part of what identifies the models of a stream.
+        """
+        result: Dict[Tuple[str, str], Dict[str, List[str]]] = {}
+        for key in self.simple_table_registry:
+            for value in self.simple_table_registry[key]:
+                names = result.setdefault((value.schema, value.json_path[0]), {})
+                for schema in [value.intermediate_schema, value.schema]:
+                    registry_key = self.get_registry_key(schema, value.json_path, value.stream_name)
+                    if registry_key in self.registry:
+                        resolved = self.registry[registry_key]
+                        names[registry_key] = [resolved.schema, resolved.table_name, resolved.file_name]
+        return result
+
     def to_dict(self, apply_function=(lambda x: x)) -> Dict:
         """
         Converts to a pure dict to serialize as json
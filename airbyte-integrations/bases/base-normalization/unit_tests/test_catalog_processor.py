@@ -0,0 +1,184 @@
+#
+# Copyright (c) 2023 Airbyte, Inc., all rights reserved.
+#
+
+
+import copy
+import json
+import os
+
+import pytest
+from normalization.destination_type import DestinationType
+from normalization.transform_catalog.catalog_processor import CatalogProcessor, read_json
+
+
+@pytest.fixture(scope="function", autouse=True)
+def before_tests(request):
+    # This makes the test run whether it is executed from the tests folder (with pytest/gradle)
+    # or from the base-normalization folder (through pycharm)
+    unit_tests_dir = os.path.join(request.fspath.dirname, "unit_tests")
+    if os.path.exists(unit_tests_dir):
+        os.chdir(unit_tests_dir)
+    else:
+        os.chdir(request.fspath.dirname)
+    yield
+    os.chdir(request.config.invocation_dir)
+
+
+def write_catalog(path, catalog) -> str:
+    with open(path, "w") as f:
+        f.write(json.dumps(catalog))
+    return str(path)
+
+
+def build_catalog():
+    catalog = read_json("resources/nested_catalog.json")
+    simple_stream = copy.deepcopy(catalog["streams"][0])
+    simple_stream["stream"]["name"] = "simple_stream"
+    simple_stream["stream"]["json_schema"]["properties"] = {"id": {"type": ["null", "string"]}}
+    catalog["streams"].append(simple_stream)
+    return catalog
+
+
+def list_mtimes(output_directory):
+    result = {}
+    for root, _, files in os.walk(output_directory):
+        for file in files:
+            path = os.path.join(root, file)
+            result[os.path.relpath(path, output_directory)] = os.stat(path).st_mtime_ns
+    return result
+
+
+def set_old_mtimes(output_directory):
+    for file in list_mtimes(output_directory):
+        os.utime(os.path.join(output_directory, file), ns=(0, 0))
+
+
+def test_unchanged_catalog_does_not_rewrite_models(tmp_path):
+    output_directory = str(tmp_path / "models")
+    catalog_file = write_catalog(tmp_path / "catalog.json", build_catalog())
+
+    first_run = CatalogProcessor(output_directory, DestinationType.POSTGRES)
+    first_run.process(catalog_file, "_airbyte_data", "schema_test")
+    set_old_mtimes(output_directory)
+    second_run = CatalogProcessor(output_directory, DestinationType.POSTGRES)
+    second_run.process(catalog_file, "_airbyte_data", "schema_test")
+
+    assert list(second_run.models_to_source.items()) == list(first_run.models_to_source.items())
+    sql_files = {file: mtime for file, mtime in list_mtimes(output_directory).items() if file.endswith(".sql")}
+    assert sql_files
+    assert set(sql_files.values()) == {0}
+
+
+def test_only_changed_streams_are_regenerated(tmp_path):
+    output_directory = str(tmp_path / "models")
+    catalog = build_catalog()
+    CatalogProcessor(output_directory, DestinationType.POSTGRES).process(
+        write_catalog(tmp_path / "catalog.json", catalog), "_airbyte_data", "schema_test"
+    )
+    set_old_mtimes(output_directory)
+
+    catalog["streams"][1]["stream"]["json_schema"]["properties"]["name"] = {"type": ["null", "string"]}
+    processor = CatalogProcessor(output_directory, DestinationType.POSTGRES)
+    processor.process(write_catalog(tmp_path / "catalog.json", catalog), "_airbyte_data", "schema_test")
+
+    rewritten = {file for file, mtime in list_mtimes(output_directory).items() if mtime != 0 and file.endswith(".sql")}
+    assert rewritten == {
+        os.path.join("airbyte_ctes", "schema_test", "simple_stream_ab1.sql"),
+        os.path.join("airbyte_ctes", "schema_test", "simple_stream_ab2.sql"),
+        os.path.join("airbyte_ctes", "schema_test", "simple_stream_ab3.sql"),
+        os.path.join("airbyte_tables", "schema_test", "simple_stream.sql"),
+    }
+    assert "adcreatives" in processor.models_to_source
+    assert "simple_stream" in processor.models_to_source
+
+
+def test_modified_model_file_is_regenerated(tmp_path):
+    output_directory = str(tmp_path / "models")
+    catalog_file = write_catalog(tmp_path / "catalog.json", build_catalog())
+    CatalogProcessor(output_directory, DestinationType.POSTGRES).process(catalog_file, "_airbyte_data", "schema_test")
+    model_file = os.path.join(output_directory, "airbyte_tables", "schema_test", "simple_stream.sql")
+    with open(model_file, "r") as f:
+        expected_content = f.read()
+    with open(model_file, "w") as f:
+        f.write("-- edited by hand\n")
+
+    CatalogProcessor(output_directory, DestinationType.POSTGRES).process(catalog_file, "_airbyte_data", "schema_test")
+
+    with open(model_file, "r") as f:
+        assert f.read() == expected_content
+
+
+def test_models_of_removed_streams_are_deleted(tmp_path):
+    output_directory = str(tmp_path / "models")
+    catalog = build_catalog()
+    CatalogProcessor(output_directory, DestinationType.POSTGRES).process(
+        write_catalog(tmp_path / "catalog.json", catalog), "_airbyte_data", "schema_test"
+    )
+    simple_stream_model = os.path.join(output_directory, "airbyte_tables", "schema_test", "simple_stream.sql")
+    assert os.path.exists(simple_stream_model)
+
+    catalog["streams"] = catalog["streams"][:1]
+    CatalogProcessor(output_directory, DestinationType.POSTGRES).process(
+        write_catalog(tmp_path / "catalog.json", catalog), "_airbyte_data", "schema_test"
+    )
+
+    assert not os.path.exists(simple_stream_model)
+    assert not [file for file in list_mtimes(output_directory) if "simple_stream" in file]
+    fingerprints = read_json(os.path.join(output_directory, ".normalization_fingerprints.json"))["catalogs"][str(tmp_path / "catalog.json")]
+    assert len(fingerprints) == 1
+    assert not [file for entry in fingerprints.values() for file in entry["files"] if "simple_stream" in file]
+
+
+def test_catalogs_processed_in_the_same_directory_keep_their_models(tmp_path):
+    output_directory = str(tmp_path / "models")
+    catalog = build_catalog()
+    first_catalog = dict(catalog, streams=catalog["streams"][:1])
+    second_catalog = dict(catalog, streams=catalog["streams"][1:])
+    first_catalog_file = write_catalog(tmp_path / "first_catalog.json", first_catalog)
+    second_catalog_file = write_catalog(tmp_path / "second_catalog.json", second_catalog)
+    adcreatives_model = os.path.join(output_directory, "airbyte_tables", "schema_test", "adcreatives.sql")
+    simple_stream_model = os.path.join(output_directory, "airbyte_tables", "schema_test", "simple_stream.sql")
+
+    processor = CatalogProcessor(output_directory, DestinationType.POSTGRES)
+    processor.process(first_catalog_file, "_airbyte_data", "schema_test")
+    processor.process(second_catalog_file, "_airbyte_data", "schema_test")
+    assert os.path.exists(adcreatives_model)
+    assert os.path.exists(simple_stream_model)
+    set_old_mtimes(output_directory)
+
+    # A second run of both catalogs neither deletes nor rewrites the models of the other catalog
+    processor = CatalogProcessor(output_directory, DestinationType.POSTGRES)
+    processor.process(first_catalog_file, "_airbyte_data", "schema_test")
+    processor.process(second_catalog_file, "_airbyte_data", "schema_test")
+    assert not [file for file, mtime in list_mtimes(output_directory).items() if mtime != 0 and file.endswith(".sql")]
+    assert "adcreatives" in processor.models_to_source
+    assert "simple_stream" in processor.models_to_source
+
+    # Streams removed from a catalog are deleted, the models of the other catalog are kept
+    write_catalog(tmp_path / "second_catalog.json", dict(second_catalog, streams=[]))
+    CatalogProcessor(output_directory, DestinationType.POSTGRES).process(second_catalog_file, "_airbyte_data", "schema_test")
+    assert os.path.exists(adcreatives_model)
+    assert not os.path.exists(simple_stream_model)
+
+
+def read_outputs(output_directory):
+    result = {}
+    for file in list_mtimes(output_directory):
+        with open(os.path.join(output_directory, file), "r") as f:
+            result[file] = f.read()
+    return result
+
+
+@pytest.mark.parametrize("destination_type", [DestinationType.POSTGRES, DestinationType.MYSQL])
+def test_parallel_rendering_matches_serial_rendering(tmp_path, capsys, destination_type):
+    catalog_file = write_catalog(tmp_path / "catalog.json", build_catalog())
+    serial = CatalogProcessor(str(tmp_path / "serial"), destination_type, max_workers=1)
+    serial.process(catalog_file, "_airbyte_data", "schema_test")
+    serial_log = capsys.readouterr().out
+    parallel = CatalogProcessor(str(tmp_path / "parallel"), destination_type, max_workers=2)
+    parallel.process(catalog_file, "_airbyte_data", "schema_test")
+
+    assert capsys.readouterr().out == serial_log
+    assert list(parallel.models_to_source.items()) == list(serial.models_to_source.items())
+    assert read_outputs(str(tmp_path / "parallel")) == read_outputs(str(tmp_path / "serial"))
@@ -0,0 +1,132 @@
+#
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+#
+
+"""Compare the compiled schema validation of `verify_records_schema` with validating every record with jsonschema.
+
+Run it on a recorded read output and the configured catalog used for the read:
+    poetry run python benchmarks/schema_validation.py --catalog configured_catalog.json --messages read_output.jsonl --processes 4
+
+Without arguments, a synthetic catalog and set of records are generated.
+"""
+
+import argparse
+import time
+from collections import defaultdict
+from typing import Callable, List, Mapping, Tuple
+
+from connector_acceptance_test.utils.asserts import build_record_validator, verify_records_schema
+from jsonschema import ValidationError
+
+from airbyte_protocol.models import AirbyteMessage, AirbyteRecordMessage, ConfiguredAirbyteCatalog
+from airbyte_protocol.models import Type as AirbyteMessageType
+
+
+def build_synthetic_inputs(records_count: int) -> Tuple[List[AirbyteRecordMessage], ConfiguredAirbyteCatalog]:
+    schema = {
+        "type": ["null", "object"],
+        "properties": {
+            "id": {"type": "integer"},
+            "name": {"type": ["null", "string"]},
+            "amount": {"type": ["null", "number"]},
+            "updated_at": {"type": ["null", "string"], "format": "date-time"},
+            "tags": {"type": ["null", "array"], "items": {"type": "string"}},
+            "address": {
+                "type": ["null", "object"],
+                "properties": {"city": {"type": ["null", "string"]}, "zip": {"type": ["null", "string"]}},
+            },
+        },
+    }
+    catalog = ConfiguredAirbyteCatalog.parse_obj(
+        {
+            "streams": [
+                {
+                    "stream": {"name": stream_name, "json_schema": schema, "supported_sync_modes": ["full_refresh"]},
+                    "sync_mode": "full_refresh",
+                    "destination_sync_mode": "overwrite",
+                }
+                for stream_name in ["users", "orders"]
+            ]
+        }
+    )
+    records = [
+        AirbyteRecordMessage(
+            stream="users" if index % 2 else "orders",
+            data={
+                "id": index if index % 1000 else str(index),
+                "name": f"name {index}",
+                "amount": index / 3,
+                "updated_at": f"2023-01-{index % 28 + 1:02d}T10:00:{index % 60:02d}Z",
+                "tags": ["a", "b"],
+                "address": {"city": "Paris", "zip": None},
+            },
+            emitted_at=0,
+        )
+        for index in range(records_count)
+    ]
+    return records, catalog
+
+
+def read_recorded_inputs(catalog_path: str, messages_path: str) -> Tuple[List[AirbyteRecordMessage], ConfiguredAirbyteCatalog]:
+    catalog = ConfiguredAirbyteCatalog.parse_file(catalog_path)
+    records = []
+    with open(messages_path) as messages_file:
+        for line in messages_file:
+            try:
+                message = AirbyteMessage.parse_raw(line)
+            except ValueError:
+                continue
+            if message.type is AirbyteMessageType.RECORD:
+                records.append(message.record)
+    return records, catalog
+
+
+def verify_records_schema_with_jsonschema(
+    records: List[AirbyteRecordMessage], catalog: ConfiguredAirbyteCatalog
+) -> Mapping[str, Mapping[str, ValidationError]]:
+    """Validate every record with jsonschema, as verify_records_schema used to do"""
+    stream_validators = {stream.stream.name: build_record_validator(stream.stream.json_schema) for stream in catalog.streams}
+    stream_errors = defaultdict(dict)
+    for record in records:
+        if record.stream in stream_validators:
+            for error in stream_validators[record.stream].iter_errors(record.data):
+                stream_errors[record.stream][str(error.schema_path)] = error
+    return stream_errors
+
+
+def summarize(stream_errors: Mapping[str, Mapping[str, ValidationError]]) -> Mapping[str, Mapping[str, str]]:
+    return {stream: {path: error.message for path, error in errors.items()} for stream, errors in stream_errors.items()}
+
+
+def timed(function: Callable, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalog", help="path to the configured catalog of the recorded read")
+    parser.add_argument("--messages", help="path to the recorded output of the read, one airbyte message per line")
+    parser.add_argument("--records", type=int, default=200_000, help="number of synthetic records, when no recorded read is given")
+    parser.add_argument("--processes", type=int, default=1, help="number of processes of the compiled validation")
+    parser.add_argument("--sample-size", type=int, default=None, help="maximum number of records validated per stream")
+    args = parser.parse_args()
+
+    if args.catalog and args.messages:
+        records, catalog = read_recorded_inputs(args.catalog, args.messages)
+    else:
+        records, catalog = build_synthetic_inputs(args.records)
+    print(f"Validating {len(records)} records of {len(catalog.streams)} streams")
+
+    expected_errors, jsonschema_duration = timed(verify_records_schema_with_jsonschema, records, catalog)
+    print(f"jsonschema: {jsonschema_duration:.2f}s")
+    errors, compiled_duration = timed(verify_records_schema, records, catalog, sample_size=args.sample_size, processes=args.processes)
+    print(f"compiled ({args.processes} processes): {compiled_duration:.2f}s, speedup x{jsonschema_duration / compiled_duration:.2f}")
+    if args.sample_size is None:
+        assert summarize(errors) == summarize(expected_errors), "Compiled validation reported different errors than jsonschema"
+        print("Both validations reported the same errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -179,6 +179,10 @@ class BasicReadTestConfig(BaseConfig):
     )
     expect_records: Optional[ExpectedRecordsConfig] = Field(description="Expected records from the read")
     validate_schema: bool = Field(True, description="Ensure that records match the schema of the corresponding stream")
+    validate_schema_sample_size: Optional[int] = Field(
+        None, description="Maximum number of records validated against the schema per stream, all records are validated by default"
+    )
+    validate_schema_processes: int = Field(1, description="Number of processes validating records against the schema")
     validate_stream_statuses: bool = Field(None, description="Ensure that all streams emit status messages")
     validate_state_messages: bool = Field(True, description="Ensure that state messages emitted as expected")
     validate_primary_keys_data_type: bool = Field(True, description="Ensure correct primary keys data type")
@@ -325,6 +329,10 @@ class Config(BaseConfig):
     custom_environment_variables: Optional[Mapping] = Field(
         default={}, description="Mapping of custom environment variables to pass to the connector under test."
     )
+    cache_connector_invocations: bool = Field(
+        default=True,
+        description="Reuse the output of a discover or read command in the following identical invocations of the connector during the test session.",
+    )
 
     @staticmethod
     def is_legacy(config: dict) -> bool:
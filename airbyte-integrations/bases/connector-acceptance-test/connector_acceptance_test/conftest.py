@@ -40,6 +40,7 @@ from connector_acceptance_test.utils import (
     load_yaml_or_json_path,
     parse_manifest_spec,
 )
+from connector_acceptance_test.utils.invocation_cache import ConnectorInvocationCache
 
 
 @pytest.fixture(name="acceptance_test_config", scope="session")
@@ -217,15 +218,30 @@ async def connector_container(dagger_client, image_tag):
     return await connector_container
 
 
+@pytest.fixture(name="connector_invocation_cache", scope="session")
+def connector_invocation_cache_fixture(acceptance_test_config: Config) -> Optional[ConnectorInvocationCache]:
+    """Memo of the connector invocations shared by the connector runners of the whole test session, unless disabled in the config."""
+    if acceptance_test_config.cache_connector_invocations:
+        return ConnectorInvocationCache()
+    return None
+
+
 @pytest.fixture(name="docker_runner", autouse=True)
 def docker_runner_fixture(
-    connector_container, connector_config_path, custom_environment_variables, deployment_mode
+    connector_container,
+    connector_config_path,
+    custom_environment_variables,
+    deployment_mode,
+    connector_invocation_cache,
+    client_container_config,
 ) -> connector_runner.ConnectorRunner:
     return connector_runner.ConnectorRunner(
         connector_container,
         connector_configuration_path=connector_config_path,
         custom_environment_variables=custom_environment_variables,
         deployment_mode=deployment_mode,
+        # Setup and teardown commands of a client container change the data the connector reads between tests
+        invocation_cache=None if client_container_config else connector_invocation_cache,
     )
 
 
@@ -318,13 +334,15 @@ async def previous_version_connector_container(
 
 @pytest.fixture(name="previous_connector_docker_runner")
 async def previous_connector_docker_runner_fixture(
-    previous_version_connector_container, deployment_mode
+    previous_version_connector_container, deployment_mode, connector_invocation_cache
 ) -> connector_runner.ConnectorRunner:
     """Fixture to create a connector runner with the previous connector docker image.
     Returns None if the latest image was not found, to skip downstream tests if the current connector is not yet published to the docker registry.
     Raise not found error if the previous connector image is not latest and expected to be published.
     """
-    return connector_runner.ConnectorRunner(previous_version_connector_container, deployment_mode=deployment_mode)
+    return connector_runner.ConnectorRunner(
+        previous_version_connector_container, deployment_mode=deployment_mode, invocation_cache=connector_invocation_cache
+    )
 
 
 @pytest.fixture(name="empty_streams")
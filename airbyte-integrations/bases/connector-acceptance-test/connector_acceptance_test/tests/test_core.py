@@ -928,13 +928,15 @@ class TestBasicRead(BaseTest):
             ), f" Record {record} from {record.stream} stream with fields {record_fields} should have some fields mentioned by json schema: {schema_paths}"
 
     @staticmethod
-    def _validate_schema(records: List[AirbyteRecordMessage], configured_catalog: ConfiguredAirbyteCatalog):
+    def _validate_schema(
+        records: List[AirbyteRecordMessage], configured_catalog: ConfiguredAirbyteCatalog, sample_size: Optional[int] = None, processes: int = 1
+    ):
         """
         Check if data type and structure in records matches the one in json_schema of the stream in catalog
         """
         TestBasicRead._validate_records_structure(records, configured_catalog)
         bar = "-" * 80
-        streams_errors = verify_records_schema(records, configured_catalog)
+        streams_errors = verify_records_schema(records, configured_catalog, sample_size=sample_size, processes=processes)
         for stream_name, errors in streams_errors.items():
             errors = map(str, errors.values())
             str_errors = f"\n{bar}\n".join(errors)
@@ -1107,6 +1109,7 @@ class TestBasicRead(BaseTest):
         docker_runner: ConnectorRunner,
         detailed_logger: Logger,
         certified_file_based_connector: bool,
+        inputs: BasicReadTestConfig,
     ):
         output = await docker_runner.call_read(connector_config, configured_catalog)
 
@@ -1119,7 +1122,12 @@ class TestBasicRead(BaseTest):
         assert records, "At least one record should be read using provided catalog"
 
         if should_validate_schema:
-            self._validate_schema(records=records, configured_catalog=configured_catalog)
+            self._validate_schema(
+                records=records,
+                configured_catalog=configured_catalog,
+                sample_size=inputs.validate_schema_sample_size,
+                processes=inputs.validate_schema_processes,
+            )
 
         self._validate_empty_streams(records=records, configured_catalog=configured_catalog, allowed_empty_streams=empty_streams)
 
@@ -16,6 +16,7 @@ from .compare import diff_dicts, make_hashable
 from .connector_runner import ConnectorRunner
 from .json_schema_helper import JsonSchemaHelper
 from .manifest_helper import is_manifest_file, parse_manifest_spec
+from .message_store import AirbyteMessageStore
 
 __all__ = [
     "JsonSchemaHelper",
@@ -26,6 +27,7 @@ __all__ = [
     "incremental_only_catalog",
     "SecretDict",
     "ConnectorRunner",
+    "AirbyteMessageStore",
     "diff_dicts",
     "make_hashable",
     "verify_records_schema",
@@ -4,14 +4,16 @@
 
 import copy
 import logging
+import random
 import re
 from collections import defaultdict
-from typing import Any, Dict, List, Mapping
+from typing import Any, Dict, List, Mapping, Optional
 
 import pendulum
 from jsonschema import Draft7Validator, FormatChecker, FormatError, ValidationError, validators
 
 from airbyte_protocol.models import AirbyteRecordMessage, ConfiguredAirbyteCatalog
+from connector_acceptance_test.utils.schema_validation import find_invalid_records
 
 
 # fmt: off
@@ -81,29 +83,66 @@ class CustomFormatChecker(FormatChecker):
             return super().check(instance, format)
 
 
+def build_record_validator(schema: Mapping[str, Any]) -> Draft7Validator:
+    # We will be disabling strict `NoAdditionalPropertiesValidator` until we have a better plan for schema validation. The consequence
+    # is that we will lack visibility on new fields that are not added on the root level (root level is validated by Datadog)
+    #   validator = NoAdditionalPropertiesValidator if fail_on_extra_columns else Draft7ValidatorWithStrictInteger
+    return Draft7ValidatorWithStrictInteger(schema, format_checker=CustomFormatChecker())
+
+
 def verify_records_schema(
-    records: List[AirbyteRecordMessage], catalog: ConfiguredAirbyteCatalog
+    records: List[AirbyteRecordMessage],
+    catalog: ConfiguredAirbyteCatalog,
+    sample_size: Optional[int] = None,
+    processes: int = 1,
 ) -> Mapping[str, Mapping[str, ValidationError]]:
     """Check records against their schemas from the catalog, yield error messages.
     Only first record with error will be yielded for each stream.
+
+    Records are first checked against a validator compiled once per stream schema, only the records it rejects are validated by
+    jsonschema to collect their errors.
+
+    Args:
+        records (List[AirbyteRecordMessage]): The records to validate.
+        catalog (ConfiguredAirbyteCatalog): The catalog holding the schema of each stream.
+        sample_size (Optional[int], optional): The maximum number of records to validate per stream, picked randomly with a fixed seed.
+            Defaults to None, which validates all records.
+        processes (int, optional): The number of processes checking records against the compiled validators. Defaults to 1.
     """
-    stream_validators = {}
-    for stream in catalog.streams:
-        schema_to_validate_against = stream.stream.json_schema
-        # We will be disabling strict `NoAdditionalPropertiesValidator` until we have a better plan for schema validation. The consequence
-        # is that we will lack visibility on new fields that are not added on the root level (root level is validated by Datadog)
-        #   validator = NoAdditionalPropertiesValidator if fail_on_extra_columns else Draft7ValidatorWithStrictInteger
-        validator = Draft7ValidatorWithStrictInteger
-        stream_validators[stream.stream.name] = validator(schema_to_validate_against, format_checker=CustomFormatChecker())
-    stream_errors = defaultdict(dict)
+    schemas = {stream.stream.name: stream.stream.json_schema for stream in catalog.streams}
+    records_to_validate = []
     for record in records:
-        validator = stream_validators.get(record.stream)
-        if not validator:
+        if record.stream not in schemas:
             logging.error(f"Received record from the `{record.stream}` stream, which is not in the catalog.")
             continue
+        records_to_validate.append(record)
+    if sample_size is not None:
+        records_to_validate = sample_records_per_stream(records_to_validate, sample_size)
 
-        errors = list(validator.iter_errors(record.data))
+    invalid_records = find_invalid_records(
+        build_record_validator, schemas, [(record.stream, record.data) for record in records_to_validate], processes=processes
+    )
+    stream_validators = {}
+    stream_errors = defaultdict(dict)
+    for index in invalid_records:
+        record = records_to_validate[index]
+        if record.stream not in stream_validators:
+            stream_validators[record.stream] = build_record_validator(schemas[record.stream])
+        errors = list(stream_validators[record.stream].iter_errors(record.data))
         for error in errors:
             stream_errors[record.stream][str(error.schema_path)] = error
 
     return stream_errors
+
+
+def sample_records_per_stream(records: List[AirbyteRecordMessage], sample_size: int) -> List[AirbyteRecordMessage]:
+    """Keep at most sample_size records of each stream, picked randomly with a fixed seed so that runs are reproducible, in their original order."""
+    indexes_by_stream = defaultdict(list)
+    for index, record in enumerate(records):
+        indexes_by_stream[record.stream].append(index)
+    sampler = random.Random(0)
+    sampled_indexes = set()
+    for stream_name in sorted(indexes_by_stream):
+        indexes = indexes_by_stream[stream_name]
+        sampled_indexes.update(indexes if len(indexes) <= sample_size else sampler.sample(indexes, sample_size))
+    return [record for index, record in enumerate(records) if index in sampled_indexes]
@@ -26,6 +26,7 @@ from airbyte_protocol.models import (
     SyncMode,
 )
 from connector_acceptance_test.config import Config, EmptyStreamConfiguration
+from connector_acceptance_test.utils.message_store import AirbyteMessageStore
 
 
 def load_config(path: str) -> Config:
@@ -65,6 +66,9 @@ def incremental_only_catalog(configured_catalog: ConfiguredAirbyteCatalog) -> Co
 
 def filter_output(records: Iterable[AirbyteMessage], type_) -> List[AirbyteMessage]:
     """Filter messages to match specific type"""
+    if isinstance(records, AirbyteMessageStore):
+        # Only read the messages of the requested type from disk
+        return list(records.of_type(type_))
     return list(filter(lambda x: x.type == type_, records))
 
 
@@ -3,14 +3,16 @@
 #
 
 
+import hashlib
 import io
 import json
 import logging
 import os
 import uuid
 from pathlib import Path
-from typing import Any, List, Mapping, Optional, Union
+from typing import Any, Iterable, List, Mapping, Optional, Union
 
+import anyio
 import dagger
 import docker
 import pytest
@@ -20,6 +22,8 @@ from pydantic import ValidationError
 from airbyte_protocol.models import AirbyteMessage, ConfiguredAirbyteCatalog, OrchestratorType
 from airbyte_protocol.models import Type as AirbyteMessageType
 from connector_acceptance_test.utils import SecretDict
+from connector_acceptance_test.utils.invocation_cache import ConnectorInvocationCache
+from connector_acceptance_test.utils.message_store import AirbyteMessageStore
 
 
 def splitlines_generator(input_string: str):
@@ -129,6 +133,8 @@ async def get_connector_container(dagger_client: dagger.Client, image_name_with_
 
 
 class ConnectorRunner:
+    # Commands whose outputs are reused by identical invocations when the runner has an invocation cache
+    MEMOIZED_COMMANDS = {"discover", "read"}
     DATA_DIR = "/airbyte/data"
     IN_CONTAINER_CONFIG_PATH = f"{DATA_DIR}/config.json"
     IN_CONTAINER_CATALOG_PATH = f"{DATA_DIR}/catalog.json"
@@ -141,6 +147,7 @@ class ConnectorRunner:
         connector_configuration_path: Optional[Path] = None,
         custom_environment_variables: Optional[Mapping] = {},
         deployment_mode: Optional[str] = None,
+        invocation_cache: Optional[ConnectorInvocationCache] = None,
     ):
         env_vars = (
             custom_environment_variables
@@ -149,6 +156,8 @@ class ConnectorRunner:
         )
         self._connector_under_test_container = self.set_env_vars(connector_container, env_vars)
         self._connector_configuration_path = connector_configuration_path
+        self._invocation_cache = invocation_cache
+        self._container_digest: Optional[str] = None
 
     def set_env_vars(self, container: dagger.Container, env_vars: Mapping[str, Any]) -> dagger.Container:
         """Set environment variables on a dagger container.
@@ -164,26 +173,29 @@ class ConnectorRunner:
             container = container.with_env_variable(k, str(v))
         return container
 
-    async def call_spec(self, raise_container_error=False) -> List[AirbyteMessage]:
+    async def call_spec(self, raise_container_error=False) -> AirbyteMessageStore:
         return await self._run(["spec"], raise_container_error)
 
-    async def call_check(self, config: SecretDict, raise_container_error: bool = False) -> List[AirbyteMessage]:
+    async def call_check(self, config: SecretDict, raise_container_error: bool = False) -> AirbyteMessageStore:
         return await self._run(
             ["check", "--config", self.IN_CONTAINER_CONFIG_PATH],
             raise_container_error,
             config=config,
         )
 
-    async def call_discover(self, config: SecretDict, raise_container_error: bool = False) -> List[AirbyteMessage]:
+    async def call_discover(
+        self, config: SecretDict, raise_container_error: bool = False, enable_caching: bool = True
+    ) -> AirbyteMessageStore:
         return await self._run(
             ["discover", "--config", self.IN_CONTAINER_CONFIG_PATH],
             raise_container_error,
             config=config,
+            enable_caching=enable_caching,
         )
 
     async def call_read(
         self, config: SecretDict, catalog: ConfiguredAirbyteCatalog, raise_container_error: bool = False, enable_caching: bool = True
-    ) -> List[AirbyteMessage]:
+    ) -> AirbyteMessageStore:
         return await self._run(
             ["read", "--config", self.IN_CONTAINER_CONFIG_PATH, "--catalog", self.IN_CONTAINER_CATALOG_PATH],
             raise_container_error,
@@ -199,7 +211,7 @@ class ConnectorRunner:
         state: dict,
         raise_container_error: bool = False,
         enable_caching: bool = True,
-    ) -> List[AirbyteMessage]:
+    ) -> AirbyteMessageStore:
         return await self._run(
             [
                 "read",
@@ -235,7 +247,7 @@ class ConnectorRunner:
         catalog: dict = None,
         state: Union[dict, list] = None,
         enable_caching=True,
-    ) -> List[AirbyteMessage]:
+    ) -> AirbyteMessageStore:
         """Run a command in the connector container and return the list of AirbyteMessages emitted by the connector.
 
         Args:
@@ -245,10 +257,19 @@ class ConnectorRunner:
             catalog (dict, optional): The catalog to mount to the container. Defaults to None.
             state (Union[dict, list], optional): The state to mount to the container. Defaults to None.
             enable_caching (bool, optional): Whether to enable command output caching. Defaults to True.
+                Disabling it also prevents reusing the output of an identical invocation from the invocation cache.
 
         Returns:
-            List[AirbyteMessage]: The list of AirbyteMessages emitted by the connector.
+            AirbyteMessageStore: The AirbyteMessages emitted by the connector.
         """
+        invocation_key = None
+        if enable_caching and self._invocation_cache is not None and airbyte_command[0] in self.MEMOIZED_COMMANDS:
+            invocation_key = ConnectorInvocationCache.build_key(
+                await self._get_container_digest(), airbyte_command, config=config, catalog=catalog, state=state
+            )
+            if (cached_output := self._invocation_cache.get(invocation_key)) is not None:
+                return cached_output
+
         container = self._connector_under_test_container
         current_user = (await container.with_exec(["whoami"]).stdout()).strip()
         container = container.with_user(current_user)
@@ -271,15 +292,25 @@ class ConnectorRunner:
                 raise e
             else:
                 if isinstance(e, dagger.ExecError):
-                    output = e.stdout + e.stderr
+                    return self.parse_airbyte_messages_from_command_output(e.stdout + e.stderr)
                 else:
                     pytest.fail(f"Failed to run command {airbyte_command} in container {self.image_tag} with error: {e}")
-        return self.parse_airbyte_messages_from_command_output(output)
+        # Only outputs of commands which ran to completion are reused, failed invocations are run again
+        if invocation_key is not None:
+            self._invocation_cache.set(invocation_key, output)
+        return output
+
+    async def _get_container_digest(self) -> str:
+        """Digest of the connector container, dagger container ids address the image and the environment variables set on it."""
+        if self._container_digest is None:
+            container_id = await self._connector_under_test_container.id()
+            self._container_digest = hashlib.sha256(str(container_id).encode("utf-8")).hexdigest()
+        return self._container_digest
 
     async def _read_output_from_stdout(self, airbyte_command: list, container: dagger.Container) -> str:
         return await container.with_exec(airbyte_command, use_entrypoint=True).stdout()
 
-    async def _read_output_from_file(self, airbyte_command: list, container: dagger.Container) -> str:
+    async def _read_output_from_file(self, airbyte_command: list, container: dagger.Container) -> AirbyteMessageStore:
         local_output_file_path = f"/tmp/{str(uuid.uuid4())}"
         entrypoint = await container.entrypoint()
         airbyte_command = entrypoint + airbyte_command
@@ -288,18 +319,25 @@ class ConnectorRunner:
             ["sh", "-c", " ".join(airbyte_command) + f" > {self.IN_CONTAINER_OUTPUT_PATH} 2>&1 | tee -a {self.IN_CONTAINER_OUTPUT_PATH}"]
         )
         await container.file(self.IN_CONTAINER_OUTPUT_PATH).export(local_output_file_path)
-        output = await AnyioPath(local_output_file_path).read_text()
-        await AnyioPath(local_output_file_path).unlink()
-        return output
-
-    def parse_airbyte_messages_from_command_output(self, command_output: str) -> List[AirbyteMessage]:
-        airbyte_messages = []
-        for line in splitlines_generator(command_output):
+        try:
+            # The output is parsed line by line in a worker thread, without loading it in memory nor blocking the event loop
+            return await anyio.to_thread.run_sync(self._parse_airbyte_messages_from_output_file, local_output_file_path)
+        finally:
+            await AnyioPath(local_output_file_path).unlink()
+
+    def _parse_airbyte_messages_from_output_file(self, output_file_path: str) -> AirbyteMessageStore:
+        with open(output_file_path, "r") as output_file:
+            return self.parse_airbyte_messages_from_command_output(line.rstrip("\n") for line in output_file)
+
+    def parse_airbyte_messages_from_command_output(self, command_output: Union[str, Iterable[str]]) -> AirbyteMessageStore:
+        airbyte_messages = AirbyteMessageStore()
+        lines = splitlines_generator(command_output) if isinstance(command_output, str) else command_output
+        for line in lines:
             try:
                 airbyte_message = AirbyteMessage.parse_raw(line)
                 if airbyte_message.type is AirbyteMessageType.CONTROL and airbyte_message.control.type is OrchestratorType.CONNECTOR_CONFIG:
                     self._persist_new_configuration(airbyte_message.control.connectorConfig.config, int(airbyte_message.control.emitted_at))
-                airbyte_messages.append(airbyte_message)
+                airbyte_messages.append(line, airbyte_message)
             except ValidationError as exc:
                 logging.warning("Unable to parse connector's output %s, error: %s", line, exc)
         return airbyte_messages
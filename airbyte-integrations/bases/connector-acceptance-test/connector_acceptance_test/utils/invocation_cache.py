@@ -0,0 +1,74 @@
+#
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+#
+
+import hashlib
+import json
+import logging
+from typing import Dict, List, Optional, Union
+
+from airbyte_protocol.models import ConfiguredAirbyteCatalog
+from connector_acceptance_test.utils.message_store import AirbyteMessageStore
+
+
+class ConnectorInvocationCache:
+    """Session wide memo of the outputs of connector commands, addressed by the content of their inputs.
+
+    Test classes often run the same command with identical config, catalog and state, e.g. a read of the configured catalog
+    in the basic read and incremental tests. The output of the first invocation is reused by the following identical ones.
+    Each hit gets a read-only copy of the cached message store, which parses its own messages from the stored files:
+    a test changing the messages it reads does not change the output of the following identical invocations.
+    """
+
+    def __init__(self):
+        self._outputs: Dict[str, AirbyteMessageStore] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def build_key(
+        container_digest: str,
+        airbyte_command: List[str],
+        config: Optional[dict] = None,
+        catalog: Optional[ConfiguredAirbyteCatalog] = None,
+        state: Optional[Union[dict, list]] = None,
+    ) -> str:
+        """Build the key of an invocation from the digest of the connector container and the hashes of its inputs.
+
+        Args:
+            container_digest (str): Digest of the connector container, covering its image and environment variables.
+            airbyte_command (List[str]): The command run in the connector container.
+            config (Optional[dict], optional): The config mounted to the container. Defaults to None.
+            catalog (Optional[ConfiguredAirbyteCatalog], optional): The catalog mounted to the container. Defaults to None.
+            state (Optional[Union[dict, list]], optional): The state mounted to the container. Defaults to None.
+
+        Returns:
+            str: The invocation key.
+        """
+        parts = [
+            container_digest,
+            json.dumps(airbyte_command),
+            _hash(json.dumps(dict(config), sort_keys=True) if config else ""),
+            _hash(json.dumps(json.loads(catalog.json()), sort_keys=True) if catalog else ""),
+            _hash(json.dumps(state, sort_keys=True) if state else ""),
+        ]
+        return _hash("\n".join(parts))
+
+    def get(self, key: str) -> Optional[AirbyteMessageStore]:
+        output = self._outputs.get(key)
+        if output is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        logging.info(f"Reusing the output of a previous identical connector invocation ({key[:12]})")
+        return output.copy()
+
+    def set(self, key: str, output: AirbyteMessageStore) -> None:
+        self._outputs[key] = output
+
+    def __len__(self) -> int:
+        return len(self._outputs)
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
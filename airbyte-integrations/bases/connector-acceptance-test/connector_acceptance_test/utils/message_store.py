@@ -0,0 +1,197 @@
+#
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+#
+
+import shutil
+import tempfile
+import weakref
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+from airbyte_protocol.models import AirbyteMessage
+from airbyte_protocol.models import Type as AirbyteMessageType
+
+
+MESSAGE_TYPES: List[AirbyteMessageType] = list(AirbyteMessageType)
+
+# Messages of a type are kept in memory once parsed while their file is smaller than this, larger ones are parsed again on access
+MAX_PARSED_MESSAGES_FILE_SIZE = 16 * 1024**2
+
+
+def _close_files(messages_files: List[Dict[AirbyteMessageType, BinaryIO]]) -> None:
+    for files_by_type in messages_files:
+        for messages_file in files_by_type.values():
+            messages_file.close()
+
+
+def _remove_storage(messages_files: List[Dict[AirbyteMessageType, BinaryIO]], directory: Path) -> None:
+    # The files are closed before their directory is removed, so that no handle is left open on a deleted file
+    _close_files(messages_files)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class AirbyteMessageStore(Sequence[AirbyteMessage]):
+    """Read-only sequence of the messages emitted by a connector command, stored on disk with one JSON lines file per message type.
+
+    An index is kept in memory: the type and file offset of each message in emission order, the number of messages per type
+    and the offsets of the records of each stream. The messages of a type are parsed once and kept in memory when their file is smaller
+    than MAX_PARSED_MESSAGES_FILE_SIZE. Larger files, like the records of high volume reads, are parsed from disk again whenever
+    they are accessed, so that tests can iterate over them without holding all of them in memory.
+    """
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            directory (Optional[Union[str, Path]], optional): Where to create the storage directory of the messages. Defaults to the
+                temporary directory of the system. The storage directory is removed when the store is garbage collected.
+        """
+        self._directory = Path(tempfile.mkdtemp(prefix="airbyte_messages_", dir=directory))
+        self._writers: Dict[AirbyteMessageType, BinaryIO] = {}
+        self._readers: Dict[AirbyteMessageType, BinaryIO] = {}
+        self._cleanup = weakref.finalize(self, _remove_storage, [self._writers, self._readers], self._directory)
+        self._parsed_messages: Dict[AirbyteMessageType, Dict[int, AirbyteMessage]] = {}
+        self._file_sizes: Dict[AirbyteMessageType, int] = {}
+        self._message_types = array("B")
+        self._message_offsets = array("Q")
+        self._record_offsets_by_stream: Dict[str, array] = {}
+        self._message_count_by_type: Counter = Counter()
+        # The store whose files are read by this store when it is a copy
+        self._origin: Optional[AirbyteMessageStore] = None
+
+    @property
+    def message_count_by_type(self) -> Mapping[AirbyteMessageType, int]:
+        return self._message_count_by_type
+
+    @property
+    def record_count_by_stream(self) -> Mapping[str, int]:
+        return {stream: len(offsets) for stream, offsets in self._record_offsets_by_stream.items()}
+
+    def append(self, raw_message: str, message: AirbyteMessage) -> None:
+        """Store a message at the end of the sequence.
+
+        Args:
+            raw_message (str): The serialized message, as emitted by the connector, without line break.
+            message (AirbyteMessage): The parsed message, only used to index it.
+        """
+        if self._origin is not None:
+            raise ValueError("A copy of a message store is read-only")
+        if message.type not in self._writers:
+            self._writers[message.type] = open(self._get_path(message.type), "wb")
+            self._file_sizes[message.type] = 0
+        offset = self._file_sizes[message.type]
+        line = raw_message.encode("utf-8") + b"\n"
+        self._writers[message.type].write(line)
+        self._file_sizes[message.type] += len(line)
+        self._parsed_messages.pop(message.type, None)
+
+        self._message_types.append(MESSAGE_TYPES.index(message.type))
+        self._message_offsets.append(offset)
+        self._message_count_by_type[message.type] += 1
+        if message.type is AirbyteMessageType.RECORD:
+            self._record_offsets_by_stream.setdefault(message.record.stream, array("Q")).append(offset)
+
+    def of_type(self, message_type: AirbyteMessageType) -> Iterator[AirbyteMessage]:
+        """Lazily iterate over the messages of a single type, in emission order. Only the file of this type is read."""
+        if message_type not in self._file_sizes:
+            return
+        parsed_messages = self._get_parsed_messages(message_type)
+        if parsed_messages is not None:
+            yield from parsed_messages.values()
+            return
+        self._flush()
+        with open(self._get_path(message_type), "rb") as messages_file:
+            for line in messages_file:
+                yield AirbyteMessage.parse_raw(line)
+
+    def records(self, stream: Optional[str] = None) -> Iterator[AirbyteMessage]:
+        """Lazily iterate over the record messages, optionally restricted to the records of a single stream, in emission order."""
+        if stream is None:
+            yield from self.of_type(AirbyteMessageType.RECORD)
+            return
+        for offset in self._record_offsets_by_stream.get(stream, []):
+            yield self._read_message(AirbyteMessageType.RECORD, offset)
+
+    def __len__(self) -> int:
+        return len(self._message_types)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[AirbyteMessage, List[AirbyteMessage]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        message_type = MESSAGE_TYPES[self._message_types[index]]
+        return self._read_message(message_type, self._message_offsets[index])
+
+    def __iter__(self) -> Iterator[AirbyteMessage]:
+        """Lazily iterate over all the messages in emission order, reading each file of message type sequentially."""
+        iterators = {message_type: self.of_type(message_type) for message_type in self._file_sizes}
+        for type_index in self._message_types:
+            yield next(iterators[MESSAGE_TYPES[type_index]])
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (AirbyteMessageStore, list)):
+            return len(self) == len(other) and all(left == right for left, right in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        counts = ", ".join(f"{message_type.value}={count}" for message_type, count in self._message_count_by_type.items())
+        return f"{self.__class__.__name__}({counts})"
+
+    def copy(self) -> "AirbyteMessageStore":
+        """Get a read-only store of the same messages, which parses its own message objects from the files of this store.
+
+        Changing the messages read from the copy does not change the messages read from this store, and the other way around.
+        The files are kept on disk while the copy is in use, closing the copy does not remove them.
+        """
+        self._flush()
+        store_copy = self.__class__.__new__(self.__class__)
+        store_copy._origin = self._origin or self
+        store_copy._directory = self._directory
+        store_copy._writers = {}
+        store_copy._readers = {}
+        store_copy._cleanup = weakref.finalize(store_copy, _close_files, [store_copy._readers])
+        store_copy._parsed_messages = {}
+        store_copy._file_sizes = dict(self._file_sizes)
+        store_copy._message_types = array("B", self._message_types)
+        store_copy._message_offsets = array("Q", self._message_offsets)
+        store_copy._record_offsets_by_stream = {stream: array("Q", offsets) for stream, offsets in self._record_offsets_by_stream.items()}
+        store_copy._message_count_by_type = Counter(self._message_count_by_type)
+        return store_copy
+
+    def close(self) -> None:
+        """Remove the stored messages from disk. The store must not be used afterwards."""
+        self._cleanup()
+
+    def _get_path(self, message_type: AirbyteMessageType) -> Path:
+        return self._directory / f"{message_type.value.lower()}.jsonl"
+
+    def _flush(self) -> None:
+        for writer in self._writers.values():
+            writer.flush()
+
+    def _get_parsed_messages(self, message_type: AirbyteMessageType) -> Optional[Dict[int, AirbyteMessage]]:
+        """Get the messages of a type by file offset, parsed on first access. None if their file is too large to be kept in memory."""
+        if message_type in self._parsed_messages:
+            return self._parsed_messages[message_type]
+        if self._file_sizes[message_type] > MAX_PARSED_MESSAGES_FILE_SIZE:
+            return None
+        self._flush()
+        parsed_messages = {}
+        offset = 0
+        with open(self._get_path(message_type), "rb") as messages_file:
+            for line in messages_file:
+                parsed_messages[offset] = AirbyteMessage.parse_raw(line)
+                offset += len(line)
+        self._parsed_messages[message_type] = parsed_messages
+        return parsed_messages
+
+    def _read_message(self, message_type: AirbyteMessageType, offset: int) -> AirbyteMessage:
+        parsed_messages = self._get_parsed_messages(message_type)
+        if parsed_messages is not None:
+            return parsed_messages[offset]
+        self._flush()
+        if message_type not in self._readers:
+            self._readers[message_type] = open(self._get_path(message_type), "rb")
+        reader = self._readers[message_type]
+        reader.seek(offset)
+        return AirbyteMessage.parse_raw(reader.readline())
@@ -0,0 +1,216 @@
+#
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+#
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from jsonschema import TypeChecker
+from jsonschema.exceptions import UnknownType
+from jsonschema.protocols import Validator
+
+
+Check = Callable[[Any], bool]
+ValidatorFactory = Callable[[Mapping[str, Any]], Validator]
+
+# Keywords evaluated by the compiled checks, any other Draft 7 keyword makes its subschema delegate to the jsonschema validator
+COMPILED_KEYWORDS = {"type", "properties", "additionalProperties", "required", "items", "format", "allOf", "anyOf", "oneOf", "not"}
+
+
+def compile_schema(validator: Validator) -> Optional[Check]:
+    """Compile the schema of a jsonschema validator into a function telling whether an instance is valid.
+
+    The compiled function walks the schema once, when compiling, and then only evaluates plain python closures for each instance.
+    It uses the type checker and format checker of the validator so that it accepts exactly the instances the validator accepts.
+    Subschemas using keywords which are not compiled are checked with the validator itself.
+
+    Returns:
+        Optional[Check]: The compiled check, or None when the schema can't be compiled because it contains references.
+    """
+    if _contains_reference(validator.schema):
+        return None
+    return _compile(validator, validator.schema)
+
+
+def find_invalid_records(
+    validator_factory: ValidatorFactory,
+    schemas: Mapping[str, Mapping[str, Any]],
+    records: Sequence[Tuple[str, Any]],
+    processes: int = 1,
+) -> List[int]:
+    """Find the records which don't match the schema of their stream, using a check compiled once per stream schema.
+
+    Args:
+        validator_factory (ValidatorFactory): Builds the jsonschema validator of a schema. It must be picklable when using several processes.
+        schemas (Mapping[str, Mapping[str, Any]]): The schema of each stream.
+        records (Sequence[Tuple[str, Any]]): The stream name and data of each record. All streams must have a schema.
+        processes (int, optional): The number of processes checking records. Defaults to 1, which checks records in this process.
+
+    Returns:
+        List[int]: The indexes of the invalid records, in ascending order.
+    """
+    if processes <= 1 or len(records) < processes:
+        return _find_invalid_records(_compile_stream_checks(validator_factory, schemas), records, 0)
+    chunk_size = -(-len(records) // (processes * 4))
+    chunks = [(start, records[start : start + chunk_size]) for start in range(0, len(records), chunk_size)]
+    # Compiled checks are closures which can't be pickled, each worker process compiles the stream schemas once when it starts
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(validator_factory, schemas),
+    ) as executor:
+        invalid_records = executor.map(_find_invalid_records_in_worker, chunks)
+        return [index for chunk_invalid_records in invalid_records for index in chunk_invalid_records]
+
+
+_worker_stream_checks: Dict[str, Check] = {}
+
+
+def _init_worker(validator_factory: ValidatorFactory, schemas: Mapping[str, Mapping[str, Any]]) -> None:
+    global _worker_stream_checks
+    _worker_stream_checks = _compile_stream_checks(validator_factory, schemas)
+
+
+def _find_invalid_records_in_worker(chunk: Tuple[int, Sequence[Tuple[str, Any]]]) -> List[int]:
+    start, records = chunk
+    return _find_invalid_records(_worker_stream_checks, records, start)
+
+
+def _compile_stream_checks(validator_factory: ValidatorFactory, schemas: Mapping[str, Mapping[str, Any]]) -> Dict[str, Check]:
+    stream_checks = {}
+    for stream_name, schema in schemas.items():
+        validator = validator_factory(schema)
+        stream_checks[stream_name] = compile_schema(validator) or validator.is_valid
+    return stream_checks
+
+
+def _find_invalid_records(stream_checks: Mapping[str, Check], records: Sequence[Tuple[str, Any]], start: int) -> List[int]:
+    return [start + index for index, (stream_name, data) in enumerate(records) if not stream_checks[stream_name](data)]
+
+
+def _contains_reference(schema: Any) -> bool:
+    if isinstance(schema, dict):
+        return "$ref" in schema or any(_contains_reference(value) for value in schema.values())
+    if isinstance(schema, list):
+        return any(_contains_reference(value) for value in schema)
+    return False
+
+
+def _always_valid(instance: Any) -> bool:
+    return True
+
+
+def _never_valid(instance: Any) -> bool:
+    return False
+
+
+def _compile(validator: Validator, schema: Any) -> Check:
+    if schema is True:
+        return _always_valid
+    if schema is False:
+        return _never_valid
+    if not isinstance(schema, dict) or any(keyword not in COMPILED_KEYWORDS for keyword in schema if keyword in validator.VALIDATORS):
+        return validator.evolve(schema=schema).is_valid
+
+    checks: List[Check] = []
+    if "type" in schema:
+        types = [schema["type"]] if isinstance(schema["type"], str) else schema["type"]
+        try:
+            for type_ in types:
+                validator.is_type(None, type_)
+        except UnknownType:
+            return validator.evolve(schema=schema).is_valid
+        checks.append(_compile_type(validator.TYPE_CHECKER, types))
+    if "format" in schema and validator.format_checker is not None:
+        checks.append(_compile_format(validator.format_checker.conforms, schema["format"]))
+    if "properties" in schema or "additionalProperties" in schema or "required" in schema:
+        checks.append(_compile_object(validator, schema))
+    if "items" in schema:
+        checks.append(_compile_items(validator, schema["items"]))
+    if "allOf" in schema:
+        all_of = [_compile(validator, subschema) for subschema in schema["allOf"]]
+        checks.append(lambda instance: all(check(instance) for check in all_of))
+    if "anyOf" in schema:
+        any_of = [_compile(validator, subschema) for subschema in schema["anyOf"]]
+        checks.append(lambda instance: any(check(instance) for check in any_of))
+    if "oneOf" in schema:
+        one_of = [_compile(validator, subschema) for subschema in schema["oneOf"]]
+        checks.append(lambda instance: sum(1 for check in one_of if check(instance)) == 1)
+    if "not" in schema:
+        not_check = _compile(validator, schema["not"])
+        checks.append(lambda instance: not not_check(instance))
+
+    if not checks:
+        return _always_valid
+    if len(checks) == 1:
+        return checks[0]
+    return lambda instance: all(check(instance) for check in checks)
+
+
+def _get_type_check(type_checker: TypeChecker, type_: str) -> Check:
+    # Calling the checker function of the type directly saves a lookup in the type checker for every value
+    type_checkers = getattr(type_checker, "_type_checkers", None)
+    if type_checkers is not None and type_ in type_checkers:
+        return partial(type_checkers[type_], type_checker)
+    return partial(type_checker.is_type, type=type_)
+
+
+def _compile_type(type_checker: TypeChecker, types: List[str]) -> Check:
+    type_checks = [_get_type_check(type_checker, type_) for type_ in types]
+    if len(type_checks) == 1:
+        return type_checks[0]
+
+    def check_type(instance: Any) -> bool:
+        for type_check in type_checks:
+            if type_check(instance):
+                return True
+        return False
+
+    return check_type
+
+
+def _compile_format(conforms: Callable[[Any, str], bool], format_: str) -> Check:
+    return lambda instance: conforms(instance, format_)
+
+
+def _compile_object(validator: Validator, schema: Mapping[str, Any]) -> Check:
+    is_object = _get_type_check(validator.TYPE_CHECKER, "object")
+    properties = schema.get("properties", {})
+    property_checks = [(name, _compile(validator, subschema)) for name, subschema in properties.items()]
+    required = schema.get("required", [])
+    additional_properties = schema.get("additionalProperties", True)
+    if is_object(additional_properties):
+        additional_check = _compile(validator, additional_properties)
+    elif not additional_properties:
+        additional_check = _never_valid
+    else:
+        additional_check = None
+
+    def check_object(instance: Any) -> bool:
+        if not is_object(instance):
+            return True
+        for name in required:
+            if name not in instance:
+                return False
+        for name, check in property_checks:
+            if name in instance and not check(instance[name]):
+                return False
+        if additional_check is not None:
+            for name, value in instance.items():
+                if name not in properties and not additional_check(value):
+                    return False
+        return True
+
+    return check_object
+
+
+def _compile_items(validator: Validator, items: Any) -> Check:
+    is_array = _get_type_check(validator.TYPE_CHECKER, "array")
+    if is_array(items):
+        item_checks = [_compile(validator, subschema) for subschema in items]
+        return lambda instance: not is_array(instance) or all(check(item) for check, item in zip(item_checks, instance))
+    item_check = _compile(validator, items)
+    return lambda instance: not is_array(instance) or all(item_check(item) for item in instance)
@@ -8,13 +8,15 @@ import os
 from pathlib import Path
 
 import pytest
-from connector_acceptance_test.utils import connector_runner
+from connector_acceptance_test.utils import AirbyteMessageStore, SecretDict, connector_runner
+from connector_acceptance_test.utils.invocation_cache import ConnectorInvocationCache
 
 from airbyte_protocol.models import (
     AirbyteControlConnectorConfigMessage,
     AirbyteControlMessage,
     AirbyteMessage,
     AirbyteRecordMessage,
+    ConfiguredAirbyteCatalog,
     OrchestratorType,
 )
 from airbyte_protocol.models import Type as AirbyteMessageType
@@ -69,9 +71,27 @@ class TestContainerRunner:
             mocker.Mock(),
             connector_configuration_path=old_configuration_path,
         )
-        runner.parse_airbyte_messages_from_command_output(raw_command_output)
+        airbyte_messages = runner.parse_airbyte_messages_from_command_output(raw_command_output)
         runner._persist_new_configuration.assert_called_once_with(new_configuration, 1)
         mock_logging.warning.assert_called_once()
+        assert [message.type for message in airbyte_messages] == [AirbyteMessageType.RECORD, AirbyteMessageType.CONTROL]
+        assert airbyte_messages.record_count_by_stream == {"test_stream": 1}
+
+    def test_parse_airbyte_messages_from_output_file(self, mocker, tmp_path):
+        output_file_path = tmp_path / "output.txt"
+        records = [
+            AirbyteMessage(
+                type=AirbyteMessageType.RECORD, record=AirbyteRecordMessage(stream="test_stream", data={"id": i}, emitted_at=1.0)
+            )
+            for i in range(3)
+        ]
+        output_file_path.write_text("\n".join(["Starting connector"] + [record.json(exclude_unset=True) for record in records]) + "\n")
+
+        runner = connector_runner.ConnectorRunner(mocker.Mock())
+        airbyte_messages = runner._parse_airbyte_messages_from_output_file(str(output_file_path))
+
+        assert list(airbyte_messages) == records
+        assert airbyte_messages.message_count_by_type == {AirbyteMessageType.RECORD: 3}
 
     @pytest.mark.parametrize(
         "pass_configuration_path, old_configuration, new_configuration, new_configuration_emitted_at, expect_new_configuration",
@@ -121,6 +141,60 @@ class TestContainerRunner:
         else:
             assert new_configuration_path == tmp_path / "updated_configurations" / f"config|{new_configuration_emitted_at}.json"
 
+    async def test_identical_invocations_are_memoized(self, mocker):
+        container = mocker.MagicMock()
+        container.id = mocker.AsyncMock(return_value="container_id")
+        container.with_exec.return_value.stdout = mocker.AsyncMock(return_value="airbyte")
+        mocker.patch.object(
+            connector_runner.ConnectorRunner, "_read_output_from_file", mocker.AsyncMock(side_effect=lambda *args: AirbyteMessageStore())
+        )
+        invocation_cache = ConnectorInvocationCache()
+        runner = connector_runner.ConnectorRunner(container, invocation_cache=invocation_cache)
+        config = SecretDict({"api_key": "secret"})
+        catalog = ConfiguredAirbyteCatalog(streams=[])
+
+        first_output = await runner.call_read(config, catalog)
+        # Another runner of the same session, e.g. the one of another test class, reuses the output
+        second_output = await connector_runner.ConnectorRunner(container, invocation_cache=invocation_cache).call_read(
+            SecretDict({"api_key": "secret"}), ConfiguredAirbyteCatalog(streams=[])
+        )
+        # Each hit gets its own copy of the output, so that changing its messages does not change the output of the next hits
+        assert second_output is not first_output
+        assert second_output == first_output
+        assert runner._read_output_from_file.call_count == 1
+
+        assert await runner.call_read_with_state(config, catalog, state={"cursor": 1}) is not first_output
+        assert await runner.call_read(config, catalog, enable_caching=False) is not first_output
+        assert await runner.call_discover(config) is not first_output
+        await runner.call_spec()
+        await runner.call_spec()
+        assert runner._read_output_from_file.call_count == 6
+        assert len(invocation_cache) == 3
+        assert (invocation_cache.hits, invocation_cache.misses) == (1, 3)
+
+    @pytest.mark.parametrize(
+        "other_invocation",
+        [
+            pytest.param({"container_digest": "other_digest"}, id="Other container"),
+            pytest.param({"airbyte_command": ["discover", "--config", "config.json"]}, id="Other command"),
+            pytest.param({"config": {"api_key": "other_secret"}}, id="Other config"),
+            pytest.param({"catalog": None}, id="Other catalog"),
+            pytest.param({"state": {"cursor": 2}}, id="Other state"),
+        ],
+    )
+    def test_invocation_key_addresses_all_inputs(self, other_invocation):
+        invocation = {
+            "container_digest": "digest",
+            "airbyte_command": ["read", "--config", "config.json"],
+            "config": {"api_key": "secret", "start_date": "2024-01-01"},
+            "catalog": ConfiguredAirbyteCatalog(streams=[]),
+            "state": {"cursor": 1},
+        }
+        reordered_config = {**invocation, "config": {"start_date": "2024-01-01", "api_key": "secret"}}
+
+        assert ConnectorInvocationCache.build_key(**invocation) == ConnectorInvocationCache.build_key(**reordered_config)
+        assert ConnectorInvocationCache.build_key(**invocation) != ConnectorInvocationCache.build_key(**{**invocation, **other_invocation})
+
 
 async def test_get_connector_container(mocker):
     dagger_client = mocker.AsyncMock()
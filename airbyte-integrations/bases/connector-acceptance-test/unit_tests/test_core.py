@@ -1010,6 +1010,7 @@ async def test_read(mocker, schema, ignored_fields, expect_records_config, recor
             ignored_fields=ignored_fields,
             detailed_logger=MagicMock(),
             certified_file_based_connector=False,
+            inputs=BasicReadTestConfig(),
         )
 
 
@@ -1711,6 +1712,7 @@ async def test_read_validate_async_output_stream_statuses(mocker):
         ignored_fields=None,
         detailed_logger=MagicMock(),
         certified_file_based_connector=False,
+        inputs=BasicReadTestConfig(),
     )
 
 
@@ -1813,6 +1815,7 @@ async def test_read_validate_stream_statuses_exceptions(mocker, output):
             ignored_fields=None,
             detailed_logger=MagicMock(),
             certified_file_based_connector=False,
+            inputs=BasicReadTestConfig(),
         )
 
 
@@ -2008,6 +2011,7 @@ async def test_read_validate_async_output_state_messages(mocker, state_message_p
                 ignored_fields=None,
                 detailed_logger=MagicMock(),
                 certified_file_based_connector=False,
+                inputs=BasicReadTestConfig(),
             )
     else:
         await t.test_read(
@@ -2026,6 +2030,7 @@ async def test_read_validate_async_output_state_messages(mocker, state_message_p
             ignored_fields=None,
             detailed_logger=MagicMock(),
             certified_file_based_connector=False,
+            inputs=BasicReadTestConfig(),
         )
 
 
@@ -2139,4 +2144,5 @@ async def test_read_validate_primary_keys_data_type(mocker, primary_key, record,
             ignored_fields=None,
             detailed_logger=MagicMock(),
             certified_file_based_connector=False,
+            inputs=BasicReadTestConfig(),
         )
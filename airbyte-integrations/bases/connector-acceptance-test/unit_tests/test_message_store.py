@@ -0,0 +1,149 @@
+#
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+#
+
+import gc
+
+import pytest
+from connector_acceptance_test.utils import AirbyteMessageStore, filter_output, message_store
+
+from airbyte_protocol.models import (
+    AirbyteLogMessage,
+    AirbyteMessage,
+    AirbyteRecordMessage,
+    AirbyteStateMessage,
+    AirbyteStateType,
+    AirbyteStreamState,
+    Level,
+    StreamDescriptor,
+)
+from airbyte_protocol.models import Type as AirbyteMessageType
+
+
+def record(stream: str, data: dict) -> AirbyteMessage:
+    return AirbyteMessage(type=AirbyteMessageType.RECORD, record=AirbyteRecordMessage(stream=stream, data=data, emitted_at=1))
+
+
+def state(stream: str, cursor: int) -> AirbyteMessage:
+    return AirbyteMessage(
+        type=AirbyteMessageType.STATE,
+        state=AirbyteStateMessage(
+            type=AirbyteStateType.STREAM,
+            stream=AirbyteStreamState(stream_descriptor=StreamDescriptor(name=stream), stream_state={"cursor": cursor}),
+        ),
+    )
+
+
+def log(message: str) -> AirbyteMessage:
+    return AirbyteMessage(type=AirbyteMessageType.LOG, log=AirbyteLogMessage(level=Level.INFO, message=message))
+
+
+@pytest.fixture
+def messages():
+    return [
+        log("starting"),
+        record("users", {"id": 1}),
+        record("orders", {"id": 10}),
+        record("users", {"id": 2}),
+        state("users", 2),
+        record("orders", {"id": 11}),
+        log("done"),
+    ]
+
+
+@pytest.fixture
+def store(messages, tmp_path):
+    store = AirbyteMessageStore(directory=tmp_path)
+    for message in messages:
+        store.append(message.json(exclude_unset=True), message)
+    return store
+
+
+def test_store_behaves_as_a_list_of_messages(store, messages):
+    assert len(store) == len(messages)
+    assert list(store) == messages
+    assert store == messages
+    assert store[1] == messages[1]
+    assert store[-1] == messages[-1]
+    assert store[2:5] == messages[2:5]
+    assert [message for message in store if message.type == AirbyteMessageType.STATE] == [messages[4]]
+
+
+def test_store_indexes_messages_in_a_single_pass(store):
+    assert store.message_count_by_type == {AirbyteMessageType.LOG: 2, AirbyteMessageType.RECORD: 4, AirbyteMessageType.STATE: 1}
+    assert store.record_count_by_stream == {"users": 2, "orders": 2}
+    assert [message.record.data for message in store.records("orders")] == [{"id": 10}, {"id": 11}]
+    assert [message.record.data["id"] for message in store.records()] == [1, 10, 2, 11]
+    assert list(store.records("unknown")) == []
+
+
+def test_store_reads_messages_of_a_single_type(store, messages):
+    assert list(store.of_type(AirbyteMessageType.LOG)) == [messages[0], messages[6]]
+    assert list(store.of_type(AirbyteMessageType.TRACE)) == []
+    assert filter_output(store, AirbyteMessageType.RECORD) == [messages[1], messages[2], messages[3], messages[5]]
+
+
+def test_store_can_be_appended_while_being_read(store, tmp_path):
+    assert len(list(store)) == 7
+    store.append(log("appended").json(exclude_unset=True), log("appended"))
+    assert store[-1] == log("appended")
+    assert len(list(store.of_type(AirbyteMessageType.LOG))) == 3
+
+
+def test_store_is_removed_from_disk_on_close(store, tmp_path):
+    assert list(tmp_path.iterdir())
+    store.close()
+    assert not list(tmp_path.iterdir())
+
+
+def test_store_copy_parses_its_own_messages(store, messages):
+    store_copy = store.copy()
+    assert store_copy == store
+    store_copy[1].record.data["id"] = 100
+
+    assert store_copy.record_count_by_stream == {"users": 2, "orders": 2}
+    assert store[1] == messages[1]
+    assert store.copy()[1] == messages[1]
+    assert store_copy[1].record.data["id"] == 100
+    with pytest.raises(ValueError):
+        store_copy.append(log("appended").json(exclude_unset=True), log("appended"))
+
+
+def test_store_copy_does_not_remove_the_stored_messages_on_close(store, messages, tmp_path):
+    store_copy = store.copy()
+    store_copy.close()
+    assert list(store) == messages
+    assert list(tmp_path.iterdir())
+
+
+def test_store_parses_small_files_once(store, messages, mocker):
+    parse_raw_spy = mocker.spy(message_store.AirbyteMessage, "parse_raw")
+    assert list(store) == messages
+    assert list(store) == messages
+    assert store[3] == messages[3]
+    assert list(store.records("orders")) == [messages[2], messages[5]]
+    assert parse_raw_spy.call_count == len(messages)
+
+
+def test_store_parses_large_files_on_every_access(store, messages, mocker):
+    mocker.patch.object(message_store, "MAX_PARSED_MESSAGES_FILE_SIZE", 0)
+    parse_raw_spy = mocker.spy(message_store.AirbyteMessage, "parse_raw")
+    assert list(store) == messages
+    assert list(store) == messages
+    assert store[3] == messages[3]
+    assert parse_raw_spy.call_count == 2 * len(messages) + 1
+
+
+def test_store_closes_its_files_before_removing_them_when_garbage_collected(tmp_path, mocker):
+    mocker.patch.object(message_store, "MAX_PARSED_MESSAGES_FILE_SIZE", 0)
+    store = AirbyteMessageStore(directory=tmp_path)
+    store.append(log("starting").json(exclude_unset=True), log("starting"))
+    assert store[0] == log("starting")
+    messages_files = [*store._writers.values(), *store._readers.values()]
+
+    del store
+    gc.collect()
+
+    assert len(messages_files) == 2
+    assert all(messages_file.closed for messages_file in messages_files)
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,75 @@
+#
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+#
+
+import pytest
+from connector_acceptance_test.utils.asserts import build_record_validator
+from connector_acceptance_test.utils.schema_validation import compile_schema, find_invalid_records
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+
+json_values = st.recursive(
+    st.none()
+    | st.booleans()
+    | st.integers()
+    | st.floats(allow_nan=False)
+    | st.sampled_from(["text", "2023-01-01T00:00:00Z", "2023-13-45"]),
+    lambda children: (
+        st.lists(children, max_size=3) | st.dictionaries(st.sampled_from(["id", "name", "nested", "extra"]), children, max_size=4)
+    ),
+    max_leaves=10,
+)
+
+SCHEMAS = [
+    {"type": ["null", "object"], "properties": {"id": {"type": "integer"}, "name": {"type": ["null", "string"]}}},
+    {"type": "object", "properties": {"id": {"type": "number"}}, "required": ["id"], "additionalProperties": False},
+    {"type": "object", "additionalProperties": {"type": "integer"}},
+    {"type": ["null", "string"], "format": "date-time"},
+    {"type": "array", "items": {"type": ["null", "object"], "properties": {"nested": {"type": "array", "items": {"type": "boolean"}}}}},
+    {"type": "array", "items": [{"type": "integer"}, {"type": "string"}]},
+    {"anyOf": [{"type": "string"}, {"type": "array", "items": {"type": "integer"}}]},
+    {"oneOf": [{"type": "number"}, {"type": "integer"}]},
+    {"allOf": [{"type": ["object", "null"]}, {"not": {"type": "null"}}]},
+    {"type": "object", "properties": {"name": {"enum": ["text", None]}, "id": {"minimum": 0}}},
+    {"type": "object", "properties": {"nested": True, "extra": False}},
+    {"type": "object", "patternProperties": {"^id$": {"type": "integer"}}, "additionalProperties": False},
+]
+
+
+@pytest.mark.parametrize("schema", SCHEMAS)
+@settings(max_examples=200, deadline=None)
+@given(instance=json_values)
+def test_compiled_schema_accepts_the_same_instances_as_jsonschema(schema, instance):
+    validator = build_record_validator(schema)
+    assert compile_schema(validator)(instance) == validator.is_valid(instance)
+
+
+@pytest.mark.parametrize(
+    "schema, instance, expected_validity",
+    [
+        pytest.param({"type": "integer"}, 1.0, False, id="Float with zero fractional part is not an integer"),
+        pytest.param({"type": "integer"}, 1, True, id="Integer"),
+        pytest.param({"type": "string", "format": "date-time"}, "2023-01-01 10:00:00", True, id="Valid datetime"),
+        pytest.param({"type": "string", "format": "date-time"}, "2023-01-01", False, id="Date is not a datetime"),
+        pytest.param({"type": ["null", "string"], "format": "date-time"}, None, True, id="Null datetime"),
+    ],
+)
+def test_compiled_schema_keeps_strict_integer_and_custom_formats(schema, instance, expected_validity):
+    assert compile_schema(build_record_validator(schema))(instance) is expected_validity
+
+
+def test_schema_with_references_is_not_compiled():
+    schema = {"definitions": {"id": {"type": "integer"}}, "type": "object", "properties": {"id": {"$ref": "#/definitions/id"}}}
+    assert compile_schema(build_record_validator(schema)) is None
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_find_invalid_records(processes):
+    schemas = {
+        "users": {"type": "object", "properties": {"id": {"type": "integer"}}},
+        "events": {"definitions": {"id": {"type": "string"}}, "type": "object", "properties": {"id": {"$ref": "#/definitions/id"}}},
+    }
+    records = [("users", {"id": 1}), ("events", {"id": 1}), ("users", {"id": "1"}), ("events", {"id": "1"}), ("users", {"id": 2.0})] * 3
+
+    assert find_invalid_records(build_record_validator, schemas, records, processes=processes) == [1, 2, 4, 6, 7, 9, 11, 12, 14]
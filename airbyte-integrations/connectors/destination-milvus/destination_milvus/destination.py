@@ -9,9 +9,8 @@ from typing import Any, Iterable, Mapping
 from airbyte_cdk.destinations import Destination
 from airbyte_cdk.destinations.vector_db_based.document_processor import DocumentProcessor
 from airbyte_cdk.destinations.vector_db_based.embedder import Embedder, create_from_config
-from airbyte_cdk.destinations.vector_db_based.indexer import Indexer
 from airbyte_cdk.destinations.vector_db_based.writer import Writer
-from airbyte_cdk.models import AirbyteConnectionStatus, AirbyteMessage, ConfiguredAirbyteCatalog, ConnectorSpecification, Status
+from airbyte_cdk.models import AirbyteConnectionStatus, AirbyteMessage, ConfiguredAirbyteCatalog, ConnectorSpecification, Status, Type
 from airbyte_cdk.models.airbyte_protocol import DestinationSyncMode
 from destination_milvus.config import ConfigModel
 from destination_milvus.indexer import MilvusIndexer
@@ -21,7 +20,7 @@ BATCH_SIZE = 128
 
 
 class DestinationMilvus(Destination):
-    indexer: Indexer
+    indexer: MilvusIndexer
     embedder: Embedder
 
     def _init_indexer(self, config: ConfigModel):
@@ -36,7 +35,11 @@ class DestinationMilvus(Destination):
         writer = Writer(
             config_model.processing, self.indexer, self.embedder, batch_size=BATCH_SIZE, omit_raw_text=config_model.omit_raw_text
         )
-        yield from writer.write(configured_catalog, input_messages)
+        for message in writer.write(configured_catalog, input_messages):
+            if message.type == Type.STATE:
+                # Inserts are buffered across batches by the indexer, they have to be written before the state is checkpointed
+                self.indexer.flush()
+            yield message
 
     def check(self, logger: logging.Logger, config: Mapping[str, Any]) -> AirbyteConnectionStatus:
         parsed_config = ConfigModel.parse_obj(config)
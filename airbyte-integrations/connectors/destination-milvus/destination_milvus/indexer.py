@@ -4,8 +4,9 @@
 
 
 import os
+from collections import deque
 from multiprocessing import Process
-from typing import Optional
+from typing import Any, List, Optional, Tuple
 
 from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, connections, utility
 
@@ -19,6 +20,18 @@ from destination_milvus.config import MilvusIndexingConfigModel
 
 CLOUD_DEPLOYMENT_MODE = "cloud"
 
+# the largest page size supported by query iterators, so that primary keys are resolved in as few queries as possible
+QUERY_BATCH_SIZE = 16384
+
+# number of primary keys per delete expression
+DELETE_BATCH_SIZE = 5000
+
+# do not flood the server with too many deletes in parallel
+DELETE_PARALLELISM_LIMIT = 4
+
+# inserts are buffered across batches until their estimated size reaches this budget
+MAX_INSERT_BUFFER_BYTES = 8 * 1024 * 1024
+
 
 class MilvusIndexer(Indexer):
     config: MilvusIndexingConfigModel
@@ -26,6 +39,8 @@ class MilvusIndexer(Indexer):
     def __init__(self, config: MilvusIndexingConfigModel, embedder_dimensions: int):
         super().__init__(config)
         self.embedder_dimensions = embedder_dimensions
+        self._insert_buffer: List[dict] = []
+        self._insert_buffer_bytes = 0
 
     def _connect(self):
         connections.connect(
@@ -104,14 +119,36 @@ class MilvusIndexer(Indexer):
                 self._delete_for_filter(f'{METADATA_STREAM_FIELD} == "{create_stream_identifier(stream.stream)}"')
 
     def _delete_for_filter(self, expr: str) -> None:
-        iterator = self._collection.query_iterator(expr=expr)
+        id_field, ids = self._resolve_ids(expr)
+        self._delete_ids(id_field, ids)
+
+    def _resolve_ids(self, expr: str) -> Tuple[Optional[str], List[Any]]:
+        """
+        Collect the primary keys of all the entities matching the expression, in pages as large as query iterators support.
+        """
+        iterator = self._collection.query_iterator(expr=expr, batch_size=QUERY_BATCH_SIZE)
+        id_field = None
+        ids = []
         page = iterator.next()
         while len(page) > 0:
             id_field = next(iter(page[0].keys()))
-            ids = [next(iter(entity.values())) for entity in page]
-            id_list_expr = ", ".join([str(id) for id in ids])
-            self._collection.delete(expr=f"{id_field} in [{id_list_expr}]")
+            ids.extend(next(iter(entity.values())) for entity in page)
             page = iterator.next()
+        return id_field, ids
+
+    def _delete_ids(self, id_field: Optional[str], ids: List[Any]) -> None:
+        """
+        Delete entities by primary key in batches, with at most DELETE_PARALLELISM_LIMIT deletes in flight.
+        """
+        in_flight = deque()
+        for i in range(0, len(ids), DELETE_BATCH_SIZE):
+            if len(in_flight) >= DELETE_PARALLELISM_LIMIT:
+                in_flight.popleft().result()
+            id_list_expr = ", ".join([str(id) for id in ids[i : i + DELETE_BATCH_SIZE]])
+            in_flight.append(self._collection.delete(expr=f"{id_field} in [{id_list_expr}]", _async=True))
+        # Wait for and retrieve responses (this raises in case of error)
+        for mutation_future in in_flight:
+            mutation_future.result()
 
     def _normalize(self, metadata: dict) -> dict:
         result = {}
@@ -125,8 +162,11 @@ class MilvusIndexer(Indexer):
 
         return result
 
+    @staticmethod
+    def _estimate_entity_size(entity: dict, vector_field: str) -> int:
+        return 4 * len(entity[vector_field]) + sum(len(str(value)) for key, value in entity.items() if key != vector_field)
+
     def index(self, document_chunks, namespace, stream):
-        entities = []
         for i in range(len(document_chunks)):
             chunk = document_chunks[i]
             entity = {
@@ -136,11 +176,31 @@ class MilvusIndexer(Indexer):
             }
             if chunk.page_content is not None:
                 entity[self.config.text_field] = chunk.page_content
-            entities.append(entity)
-        self._collection.insert(entities)
+            self._insert_buffer.append(entity)
+            self._insert_buffer_bytes += self._estimate_entity_size(entity, self.config.vector_field)
+        if self._insert_buffer_bytes >= MAX_INSERT_BUFFER_BYTES:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Insert the buffered entities, this has to happen before the state of their records is emitted.
+        """
+        if len(self._insert_buffer) > 0:
+            self._collection.insert(self._insert_buffer)
+        self._insert_buffer = []
+        self._insert_buffer_bytes = 0
+
+    def post_sync(self):
+        self.flush()
+        return []
 
     def delete(self, delete_ids, namespace, stream):
         if len(delete_ids) > 0:
+            # The buffered entities of the deleted records were not inserted yet, they are dropped instead of deleted
+            ids_to_delete = set(delete_ids)
+            self._insert_buffer = [entity for entity in self._insert_buffer if entity.get(METADATA_RECORD_ID_FIELD) not in ids_to_delete]
+            self._insert_buffer_bytes = sum(self._estimate_entity_size(entity, self.config.vector_field) for entity in self._insert_buffer)
+
             id_list_expr = ", ".join([f'"{id}"' for id in delete_ids])
             id_expr = f"{METADATA_RECORD_ID_FIELD} in [{id_list_expr}]"
             self._delete_for_filter(id_expr)
@@ -9,7 +9,7 @@ from unittest.mock import MagicMock, Mock, patch
 from destination_milvus.config import ConfigModel
 from destination_milvus.destination import DestinationMilvus
 
-from airbyte_cdk.models import ConnectorSpecification, Status
+from airbyte_cdk.models import AirbyteMessage, AirbyteStateMessage, ConnectorSpecification, Status, Type
 
 
 class TestDestinationMilvus(unittest.TestCase):
@@ -95,6 +95,26 @@ class TestDestinationMilvus(unittest.TestCase):
         MockedWriter.assert_called_once_with(self.config_model.processing, mock_indexer, mock_embedder, batch_size=128, omit_raw_text=False)
         mock_writer.write.assert_called_once_with(configured_catalog, input_messages)
 
+    @patch("destination_milvus.destination.Writer")
+    @patch("destination_milvus.destination.MilvusIndexer")
+    @patch("destination_milvus.destination.create_from_config")
+    def test_write_flushes_before_state(self, MockedEmbedder, MockedMilvusIndexer, MockedWriter):
+        mock_indexer = Mock()
+        MockedMilvusIndexer.return_value = mock_indexer
+        state_message = AirbyteMessage(type=Type.STATE, state=AirbyteStateMessage(data={}))
+
+        def write(configured_catalog, input_messages):
+            mock_indexer.flush.assert_not_called()
+            yield state_message
+
+        MockedWriter.return_value.write.side_effect = write
+
+        destination = DestinationMilvus()
+        messages = destination.write(self.config, MagicMock(), [])
+
+        self.assertEqual(next(messages), state_message)
+        mock_indexer.flush.assert_called_once()
+
     def test_spec(self):
         destination = DestinationMilvus()
         result = destination.spec()
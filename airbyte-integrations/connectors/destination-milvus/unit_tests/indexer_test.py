@@ -7,7 +7,7 @@ import unittest
 from unittest.mock import Mock, call, patch
 
 from destination_milvus.config import MilvusIndexingConfigModel, NoAuth, TokenAuth
-from destination_milvus.indexer import MilvusIndexer
+from destination_milvus.indexer import QUERY_BATCH_SIZE, MilvusIndexer
 from pymilvus import DataType
 
 from airbyte_cdk.models.airbyte_protocol import AirbyteStream, DestinationSyncMode, SyncMode
@@ -139,8 +139,8 @@ class TestMilvusIndexer(unittest.TestCase):
             )
         )
 
-        mock_Collection.return_value.query_iterator.assert_called_with(expr='_ab_stream == "some_stream"')
-        mock_Collection.return_value.delete.assert_called_with(expr="id in [1]")
+        mock_Collection.return_value.query_iterator.assert_called_with(expr='_ab_stream == "some_stream"', batch_size=QUERY_BATCH_SIZE)
+        mock_Collection.return_value.delete.assert_called_with(expr="id in [1]", _async=True)
 
     def test_pre_sync_does_not_call_delete(self, mock_Collection, mock_utility, mock_connections):
         self.milvus_indexer.pre_sync(
@@ -154,9 +154,48 @@ class TestMilvusIndexer(unittest.TestCase):
         self.milvus_indexer.index(
             [Mock(metadata={"key": "value", "id": 5}, page_content="some content", embedding=[1, 2, 3])], None, "some_stream"
         )
+        self.milvus_indexer._collection.insert.assert_not_called()
+
+        self.milvus_indexer.post_sync()
 
         self.milvus_indexer._collection.insert.assert_called_with([{"key": "value", "vector": [1, 2, 3], "text": "some content", "_id": 5}])
 
+    def test_index_buffers_inserts_up_to_budget(self, mock_Collection, mock_utility, mock_connections):
+        self.milvus_indexer._primary_key = "pk"
+        chunks = [Mock(metadata={"key": "value"}, page_content="x" * 100, embedding=[0.0] * 100) for _ in range(10)]
+        entity_size = MilvusIndexer._estimate_entity_size({"key": "value", "vector": [0.0] * 100, "text": "x" * 100}, "vector")
+
+        with patch("destination_milvus.indexer.MAX_INSERT_BUFFER_BYTES", 25 * entity_size):
+            self.milvus_indexer.index(chunks, None, "some_stream")
+            self.milvus_indexer.index(chunks, None, "some_stream")
+            self.milvus_indexer._collection.insert.assert_not_called()
+            self.milvus_indexer.index(chunks, None, "some_stream")
+
+        self.milvus_indexer._collection.insert.assert_called_once()
+        self.assertEqual(len(self.milvus_indexer._collection.insert.call_args.args[0]), 30)
+        self.milvus_indexer.flush()
+        self.milvus_indexer._collection.insert.assert_called_once()
+
+    def test_delete_drops_buffered_entities(self, mock_Collection, mock_utility, mock_connections):
+        self.milvus_indexer._primary_key = "pk"
+        self.milvus_indexer._collection.query_iterator.return_value.next.return_value = []
+        self.milvus_indexer.index(
+            [
+                Mock(metadata={"_ab_record_id": "some_id"}, page_content="old", embedding=[1, 2, 3]),
+                Mock(metadata={"_ab_record_id": "other_id"}, page_content="other", embedding=[4, 5, 6]),
+            ],
+            None,
+            "some_stream",
+        )
+
+        self.milvus_indexer.delete(["some_id"], None, "some_stream")
+        self.milvus_indexer.flush()
+
+        self.milvus_indexer._collection.delete.assert_not_called()
+        self.milvus_indexer._collection.insert.assert_called_once_with(
+            [{"_ab_record_id": "other_id", "vector": [4, 5, 6], "text": "other"}]
+        )
+
     def test_index_calls_delete(self, mock_Collection, mock_utility, mock_connections):
         mock_iterator = Mock()
         mock_iterator.next.side_effect = [[{"id": "123"}, {"id": "456"}], [{"id": "789"}], []]
@@ -164,5 +203,24 @@ class TestMilvusIndexer(unittest.TestCase):
 
         self.milvus_indexer.delete(["some_id"], None, "some_stream")
 
-        self.milvus_indexer._collection.query_iterator.assert_called_with(expr='_ab_record_id in ["some_id"]')
-        self.milvus_indexer._collection.delete.assert_has_calls([call(expr="id in [123, 456]"), call(expr="id in [789]")], any_order=False)
+        self.milvus_indexer._collection.query_iterator.assert_called_with(expr='_ab_record_id in ["some_id"]', batch_size=QUERY_BATCH_SIZE)
+        self.milvus_indexer._collection.delete.assert_has_calls([call(expr="id in [123, 456, 789]", _async=True)])
+        self.milvus_indexer._collection.delete.return_value.result.assert_called_once()
+
+    def test_delete_in_bounded_parallel_batches(self, mock_Collection, mock_utility, mock_connections):
+        events = []
+
+        def delete(expr, _async):
+            delete_number = len([event for event in events if event.startswith("delete")])
+            events.append(f"delete {delete_number}")
+            return Mock(result=lambda: events.append(f"result {delete_number}"))
+
+        self.milvus_indexer._collection.delete.side_effect = delete
+        with patch("destination_milvus.indexer.DELETE_BATCH_SIZE", 2), patch("destination_milvus.indexer.DELETE_PARALLELISM_LIMIT", 2):
+            self.milvus_indexer._delete_ids("id", [1, 2, 3, 4, 5])
+
+        self.assertEqual(events, ["delete 0", "delete 1", "result 0", "delete 2", "result 1", "result 2"])
+        self.assertEqual(
+            [delete_call.kwargs["expr"] for delete_call in self.milvus_indexer._collection.delete.call_args_list],
+            ["id in [1, 2]", "id in [3, 4]", "id in [5]"],
+        )
@@ -9,9 +9,8 @@ from typing import Any, Iterable, Mapping
 from airbyte_cdk.destinations import Destination
 from airbyte_cdk.destinations.vector_db_based.document_processor import DocumentProcessor
 from airbyte_cdk.destinations.vector_db_based.embedder import Embedder, create_from_config
-from airbyte_cdk.destinations.vector_db_based.indexer import Indexer
 from airbyte_cdk.destinations.vector_db_based.writer import Writer
-from airbyte_cdk.models import AirbyteConnectionStatus, AirbyteMessage, ConfiguredAirbyteCatalog, ConnectorSpecification, Status
+from airbyte_cdk.models import AirbyteConnectionStatus, AirbyteMessage, ConfiguredAirbyteCatalog, ConnectorSpecification, Status, Type
 from airbyte_cdk.models.airbyte_protocol import DestinationSyncMode
 from airbyte_protocol.models.airbyte_protocol import AirbyteLogMessage, Level
 from destination_pinecone.config import ConfigModel
@@ -22,7 +21,7 @@ BATCH_SIZE = 32
 
 
 class DestinationPinecone(Destination):
-    indexer: Indexer
+    indexer: PineconeIndexer
     embedder: Embedder
 
     def _init_indexer(self, config: ConfigModel):
@@ -41,7 +40,11 @@ class DestinationPinecone(Destination):
             writer = Writer(
                 config_model.processing, self.indexer, self.embedder, batch_size=BATCH_SIZE, omit_raw_text=config_model.omit_raw_text
             )
-            yield from writer.write(configured_catalog, input_messages)
+            for message in writer.write(configured_catalog, input_messages):
+                if message.type == Type.STATE:
+                    # The chunks of deduped records which were not indexed again are deleted by the indexer after their batch
+                    self.indexer.flush()
+                yield message
         except Exception as e:
             log_message = AirbyteLogMessage(level=Level.ERROR, message=str(e))
             yield AirbyteMessage(type="LOG", message=log_message)
@@ -2,9 +2,11 @@
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 #
 
+import logging
 import os
 import uuid
-from typing import Optional
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
 
 import urllib3
 from pinecone import PineconeException
@@ -21,13 +23,20 @@ from destination_pinecone.config import PineconeIndexingModel
 # large enough to speed up processing, small enough to not hit pinecone request limits
 PINECONE_BATCH_SIZE = 40
 
-# do not flood the server with too many connections in parallel
-PARALLELISM_LIMIT = 4
+# do not flood the server with too many upserts in parallel: a new upsert request is sent as soon as the
+# estimated size of the requests waiting for a response leaves room for it
+MAX_IN_FLIGHT_UPSERT_BYTES = 8 * 1024 * 1024
 
 MAX_METADATA_SIZE = 40_960 - 10_000
 
 MAX_IDS_PER_DELETE = 1000
 
+MAX_IDS_PER_FETCH = 1000
+
+# number of chunks of a record of a deduped stream, stored with each of its chunks so that the chunks a new version of the record
+# does not overwrite can be deleted by id
+METADATA_CHUNK_COUNT_FIELD = "_ab_chunk_count"
+
 AIRBYTE_TAG = "airbyte"
 AIRBYTE_TEST_TAG = "airbyte_test"
 
@@ -44,6 +53,10 @@ class PineconeIndexer(Indexer):
 
         self.pinecone_index = self.pc.Index(config.index)
         self.embedding_dimensions = embedding_dimensions
+        # chunk counts of the records to dedup, by namespace and stream, read before their new chunks are upserted
+        self._previous_chunk_counts: Dict[Tuple[Optional[str], str], Dict[str, int]] = {}
+        # namespaces and streams which may have vectors written with random ids, which can only be deduped by metadata
+        self._streams_with_random_ids: Set[Tuple[Optional[str], str]] = set()
 
     def determine_spec_type(self, index_name):
         description = self.pc.describe_index(index_name)
@@ -64,8 +77,39 @@ class PineconeIndexer(Indexer):
                 self.delete_vectors(
                     filter={METADATA_STREAM_FIELD: stream_identifier}, namespace=stream.stream.namespace, prefix=stream_identifier
                 )
+            elif stream.destination_sync_mode == DestinationSyncMode.append_dedup and self._may_have_random_ids(
+                stream_identifier, stream.stream.namespace
+            ):
+                self._streams_with_random_ids.add((stream.stream.namespace, stream.stream.name))
+
+    def _may_have_random_ids(self, stream_identifier, namespace=None) -> bool:
+        """
+        Whether the stream may have vectors written before chunk ids were deterministic, they are the only ones without a chunk count.
+        Only starter indexes, which delete by metadata with zero vector queries, are queried for them: the records of the streams of the
+        other indexes are always deleted as before. When the query fails, the stream is assumed to have such vectors to keep deduping them.
+        """
+        if self._pod_type != "starter":
+            return True
+        zero_vector = [0.0] * self.embedding_dimensions
+        filter = {METADATA_STREAM_FIELD: stream_identifier, METADATA_CHUNK_COUNT_FIELD: {"$exists": False}}
+        try:
+            query_result = self.pinecone_index.query(vector=zero_vector, filter=filter, top_k=1, namespace=namespace)
+        except Exception as e:
+            logging.getLogger("airbyte").warning(
+                f"Could not check whether {stream_identifier} has vectors without chunk count, they are deleted by metadata: {e}"
+            )
+            return True
+        return len(query_result.matches) > 0
+
+    def flush(self):
+        """
+        Delete the chunks of the records to dedup which were not indexed again, before the state of their records is emitted.
+        """
+        for namespace, stream in list(self._previous_chunk_counts):
+            self._delete_previous_chunks(namespace, stream)
 
     def post_sync(self):
+        self.flush()
         return []
 
     def get_source_tag(self):
@@ -126,27 +170,119 @@ class PineconeIndexer(Indexer):
 
         return result
 
+    @staticmethod
+    def get_vector_id(prefix: str, record_id: str, chunk_index: int) -> str:
+        """
+        Deterministic id of a chunk of a record of a deduped stream, so that a new version of the record overwrites the previous one.
+        """
+        return f"{prefix}#{uuid.uuid5(uuid.NAMESPACE_OID, record_id)}#{chunk_index}"
+
     def index(self, document_chunks, namespace, streamName):
         pinecone_docs = []
-        for i in range(len(document_chunks)):
-            chunk = document_chunks[i]
-            metadata = self._truncate_metadata(chunk.metadata)
-            if chunk.page_content is not None:
-                metadata["text"] = chunk.page_content
-            prefix = streamName
-            pinecone_docs.append((prefix + "#" + str(uuid.uuid4()), chunk.embedding, metadata))
-        serial_batches = create_chunks(pinecone_docs, batch_size=PINECONE_BATCH_SIZE * PARALLELISM_LIMIT)
-        for batch in serial_batches:
-            async_results = []
-            for ids_vectors_chunk in create_chunks(batch, batch_size=PINECONE_BATCH_SIZE):
-                async_result = self.pinecone_index.upsert(
-                    vectors=ids_vectors_chunk, async_req=True, show_progress=False, namespace=namespace
-                )
-                async_results.append(async_result)
-            # Wait for and retrieve responses (this raises in case of error)
-            [async_result.result() for async_result in async_results]
+        chunks_by_record_id: Dict[str, list] = {}
+        records_by_record_id = {}
+        for chunk in document_chunks:
+            record_id = chunk.metadata.get(METADATA_RECORD_ID_FIELD)
+            if record_id is None:
+                pinecone_docs.append((streamName + "#" + str(uuid.uuid4()), chunk.embedding, self._get_chunk_metadata(chunk)))
+            else:
+                if records_by_record_id.get(record_id) is not chunk.record:
+                    # the chunks of a later version of the record in the same batch replace the ones of the previous version
+                    records_by_record_id[record_id] = chunk.record
+                    chunks_by_record_id[record_id] = []
+                chunks_by_record_id[record_id].append(chunk)
+
+        previous_chunk_counts = self._previous_chunk_counts.get((namespace, streamName), {})
+        stale_ids = []
+        for record_id, chunks in chunks_by_record_id.items():
+            for chunk_index, chunk in enumerate(chunks):
+                metadata = self._get_chunk_metadata(chunk)
+                metadata[METADATA_CHUNK_COUNT_FIELD] = len(chunks)
+                pinecone_docs.append((self.get_vector_id(streamName, record_id, chunk_index), chunk.embedding, metadata))
+            previous_chunk_count = previous_chunk_counts.pop(record_id, 0)
+            stale_ids.extend(self.get_vector_id(streamName, record_id, i) for i in range(len(chunks), previous_chunk_count))
+
+        self._upsert(pinecone_docs, namespace)
+        self._delete_ids(stale_ids, namespace)
+        # the remaining records to dedup have no chunks anymore, e.g. records deleted in the source
+        self._delete_previous_chunks(namespace, streamName)
+
+    def _get_chunk_metadata(self, chunk) -> dict:
+        metadata = self._truncate_metadata(chunk.metadata)
+        if chunk.page_content is not None:
+            metadata["text"] = chunk.page_content
+        return metadata
+
+    @staticmethod
+    def _estimate_vector_size(vector: tuple) -> int:
+        vector_id, embedding, metadata = vector
+        return len(vector_id) + 4 * len(embedding) + len(str(metadata))
+
+    def _upsert(self, pinecone_docs, namespace):
+        """
+        Upsert the vectors in batches, through a window of requests in flight sized by their payload instead of fixed waves of requests.
+        """
+        in_flight = deque()
+        in_flight_bytes = 0
+        for ids_vectors_chunk in create_chunks(pinecone_docs, batch_size=PINECONE_BATCH_SIZE):
+            chunk_bytes = sum(self._estimate_vector_size(vector) for vector in ids_vectors_chunk)
+            # Wait for the oldest requests until the new one fits in the window, a request larger than the window is sent alone
+            while in_flight and in_flight_bytes + chunk_bytes > MAX_IN_FLIGHT_UPSERT_BYTES:
+                async_result, async_result_bytes = in_flight.popleft()
+                async_result.result()
+                in_flight_bytes -= async_result_bytes
+            async_result = self.pinecone_index.upsert(vectors=ids_vectors_chunk, async_req=True, show_progress=False, namespace=namespace)
+            in_flight.append((async_result, chunk_bytes))
+            in_flight_bytes += chunk_bytes
+        # Wait for and retrieve responses (this raises in case of error)
+        for async_result, _ in in_flight:
+            async_result.result()
+
+    def _delete_ids(self, ids: List[str], namespace=None):
+        for batch in create_chunks(ids, batch_size=MAX_IDS_PER_DELETE):
+            self.pinecone_index.delete(ids=list(batch), namespace=namespace)
+
+    def _fetch_chunk_counts(self, record_ids: List[str], namespace, stream) -> Dict[str, int]:
+        """
+        Read the chunk counts of records from their first chunk, records without deterministic chunk ids are not returned.
+        """
+        record_ids_by_vector_id = {self.get_vector_id(stream, record_id, 0): record_id for record_id in record_ids}
+        chunk_counts = {}
+        for batch in create_chunks(list(record_ids_by_vector_id), batch_size=MAX_IDS_PER_FETCH):
+            fetch_response = self.pinecone_index.fetch(ids=list(batch), namespace=namespace)
+            for vector_id, vector in fetch_response.vectors.items():
+                metadata = getattr(vector, "metadata", None) or {}
+                if vector_id in record_ids_by_vector_id and METADATA_CHUNK_COUNT_FIELD in metadata:
+                    chunk_counts[record_ids_by_vector_id[vector_id]] = int(metadata[METADATA_CHUNK_COUNT_FIELD])
+        return chunk_counts
+
+    def _delete_previous_chunks(self, namespace, stream):
+        previous_chunk_counts = self._previous_chunk_counts.pop((namespace, stream), {})
+        self._delete_ids(
+            [
+                self.get_vector_id(stream, record_id, chunk_index)
+                for record_id, chunk_count in previous_chunk_counts.items()
+                for chunk_index in range(chunk_count)
+            ],
+            namespace,
+        )
 
     def delete(self, delete_ids, namespace, stream):
+        """
+        Records written with deterministic chunk ids are overwritten by id when they are indexed, only their chunk counts are read here.
+        The other records are new, or written before chunk ids were deterministic: only the latter have to be deleted by metadata.
+        """
+        if len(delete_ids) > 0:
+            # the records of a previous batch which were not indexed again have no chunks anymore
+            self._delete_previous_chunks(namespace, stream)
+            record_ids = list(dict.fromkeys(delete_ids))
+            chunk_counts = self._fetch_chunk_counts(record_ids, namespace, stream)
+            self._previous_chunk_counts[(namespace, stream)] = chunk_counts
+            if (namespace, stream) in self._streams_with_random_ids:
+                delete_ids = [record_id for record_id in record_ids if record_id not in chunk_counts]
+            else:
+                delete_ids = []
+
         filter = {METADATA_RECORD_ID_FIELD: {"$in": delete_ids}}
         if len(delete_ids) > 0:
             if self._pod_type == "starter":
@@ -7,6 +7,7 @@ from unittest.mock import ANY, MagicMock, Mock, call, patch
 
 import pytest
 import urllib3
+from destination_pinecone import indexer as indexer_module
 from destination_pinecone.config import PineconeIndexingModel
 from destination_pinecone.indexer import PineconeIndexer
 from pinecone import IndexDescription, exceptions
@@ -94,6 +95,7 @@ def test_get_source_tag_with_ci():
 def test_pinecone_index_upsert_and_delete(mock_describe_index):
     indexer = create_pinecone_indexer()
     indexer._pod_type = "p1"
+    indexer._streams_with_random_ids = {("ns1", "some_stram"), ("ns1", "some_stream")}
     indexer.index(
         [
             Mock(page_content="test", metadata={"_ab_stream": "abc"}, embedding=[1, 2, 3]),
@@ -118,6 +120,7 @@ def test_pinecone_index_upsert_and_delete(mock_describe_index):
 def test_pinecone_index_upsert_and_delete_starter(mock_describe_index, mock_determine_spec_type):
     indexer = create_pinecone_indexer()
     indexer._pod_type = "starter"
+    indexer._streams_with_random_ids = {("ns1", "some_stram"), ("ns1", "some_stream")}
     indexer.pinecone_index.query.side_effect = [
         MagicMock(matches=[MagicMock(id="doc_id1"), MagicMock(id="doc_id2")]),
         MagicMock(matches=[MagicMock(id="doc_id3")]),
@@ -152,6 +155,7 @@ def test_pinecone_index_upsert_and_delete_starter(mock_describe_index, mock_dete
 def test_pinecone_index_upsert_and_delete_pod(mock_describe_index, mock_determine_spec_type):
     indexer = create_pinecone_indexer()
     indexer._pod_type = "pod"
+    indexer._streams_with_random_ids = {("ns1", "some_stram"), ("ns1", "some_stream")}
     indexer.pinecone_index.query.side_effect = [
         MagicMock(matches=[MagicMock(id="doc_id1"), MagicMock(id="doc_id2")]),
         MagicMock(matches=[MagicMock(id="doc_id3")]),
@@ -181,6 +185,7 @@ def test_pinecone_index_upsert_and_delete_pod(mock_describe_index, mock_determin
 def test_pinecone_index_upsert_and_delete_serverless(mock_describe_index, mock_determine_spec_type):
     indexer = create_pinecone_indexer()
     indexer._pod_type = "serverless"
+    indexer._streams_with_random_ids = {("ns1", "some_stram"), ("ns1", "some_stream")}
     indexer.pinecone_index.query.side_effect = [
         MagicMock(matches=[MagicMock(id="doc_id1"), MagicMock(id="doc_id2")]),
         MagicMock(matches=[MagicMock(id="doc_id3")]),
@@ -210,6 +215,7 @@ def test_pinecone_index_upsert_and_delete_serverless(mock_describe_index, mock_d
 def test_pinecone_index_delete_1k_limit(mock_describe_index):
     indexer = create_pinecone_indexer()
     indexer._pod_type = "starter"
+    indexer._streams_with_random_ids = {("ns1", "some_stram"), ("ns1", "some_stream")}
     indexer.pinecone_index.query.side_effect = [
         MagicMock(matches=[MagicMock(id=f"doc_id_{str(i)}") for i in range(1300)]),
         MagicMock(matches=[]),
@@ -252,6 +258,203 @@ def test_pinecone_index_upsert_batching():
         )
 
 
+def test_pinecone_index_deterministic_ids():
+    indexer = create_pinecone_indexer()
+    record = Mock()
+    chunks = [
+        Mock(page_content="test", metadata={"_ab_stream": "abc", "_ab_record_id": "abc_1"}, embedding=[1, 2, 3], record=record),
+        Mock(page_content="test2", metadata={"_ab_stream": "abc", "_ab_record_id": "abc_1"}, embedding=[4, 5, 6], record=record),
+    ]
+    indexer.index(chunks, "ns1", "some_stream")
+    indexer.index(chunks, "ns1", "some_stream")
+    first_vectors, second_vectors = [upsert_call.kwargs["vectors"] for upsert_call in indexer.pinecone_index.upsert.call_args_list]
+    assert first_vectors == second_vectors
+    assert [vector[0] for vector in first_vectors] == [
+        PineconeIndexer.get_vector_id("some_stream", "abc_1", 0),
+        PineconeIndexer.get_vector_id("some_stream", "abc_1", 1),
+    ]
+    assert first_vectors[0][2] == {"_ab_stream": "abc", "_ab_record_id": "abc_1", "_ab_chunk_count": 2, "text": "test"}
+    assert [vector[2]["_ab_chunk_count"] for vector in first_vectors] == [2, 2]
+
+
+def test_pinecone_index_keeps_last_version_of_record_in_batch():
+    indexer = create_pinecone_indexer()
+    indexer.index(
+        [
+            Mock(page_content="old", metadata={"_ab_record_id": "abc_1"}, embedding=[1, 2, 3], record=Mock()),
+            Mock(page_content="new", metadata={"_ab_record_id": "abc_1"}, embedding=[4, 5, 6], record=Mock()),
+        ],
+        "ns1",
+        "some_stream",
+    )
+    indexer.pinecone_index.upsert.assert_called_once_with(
+        vectors=(
+            (
+                PineconeIndexer.get_vector_id("some_stream", "abc_1", 0),
+                [4, 5, 6],
+                {"_ab_record_id": "abc_1", "_ab_chunk_count": 1, "text": "new"},
+            ),
+        ),
+        async_req=True,
+        show_progress=False,
+        namespace="ns1",
+    )
+
+
+def test_pinecone_index_overwrite_by_id(mock_describe_index, mock_determine_spec_type):
+    indexer = create_pinecone_indexer()
+    indexer._pod_type = "pod"
+    indexer._streams_with_random_ids = {("ns1", "some_stram"), ("ns1", "some_stream")}
+    indexer.pinecone_index.fetch.return_value = MagicMock(
+        vectors={
+            PineconeIndexer.get_vector_id("some_stream", "abc_1", 0): MagicMock(metadata={"_ab_chunk_count": 3.0}),
+            PineconeIndexer.get_vector_id("some_stream", "abc_2", 0): MagicMock(metadata={"_ab_chunk_count": 2.0}),
+        }
+    )
+    indexer.delete(["abc_1", "abc_2", "abc_3"], "ns1", "some_stream")
+    indexer.pinecone_index.fetch.assert_called_once_with(
+        ids=[PineconeIndexer.get_vector_id("some_stream", record_id, 0) for record_id in ["abc_1", "abc_2", "abc_3"]], namespace="ns1"
+    )
+    # only the record which is not stored with deterministic ids is deleted by metadata
+    indexer.pinecone_index.delete.assert_called_once_with(filter={"_ab_record_id": {"$in": ["abc_3"]}}, namespace="ns1")
+
+    indexer.pinecone_index.delete.reset_mock()
+    indexer.index(
+        [Mock(page_content="test", metadata={"_ab_record_id": "abc_1"}, embedding=[1, 2, 3], record=Mock())],
+        "ns1",
+        "some_stream",
+    )
+    indexer.pinecone_index.delete.assert_has_calls(
+        [
+            call(ids=[PineconeIndexer.get_vector_id("some_stream", "abc_1", i) for i in [1, 2]], namespace="ns1"),
+            call(ids=[PineconeIndexer.get_vector_id("some_stream", "abc_2", i) for i in [0, 1]], namespace="ns1"),
+        ]
+    )
+    indexer.pinecone_index.delete.reset_mock()
+    indexer.post_sync()
+    indexer.pinecone_index.delete.assert_not_called()
+
+
+def test_pinecone_post_sync_deletes_records_without_chunks():
+    indexer = create_pinecone_indexer()
+    indexer.pinecone_index.fetch.return_value = MagicMock(
+        vectors={PineconeIndexer.get_vector_id("some_stream", "abc_1", 0): MagicMock(metadata={"_ab_chunk_count": 2.0})}
+    )
+    indexer.delete(["abc_1"], "ns1", "some_stream")
+    indexer.pinecone_index.delete.assert_not_called()
+    indexer.post_sync()
+    indexer.pinecone_index.delete.assert_called_once_with(
+        ids=[PineconeIndexer.get_vector_id("some_stream", "abc_1", i) for i in [0, 1]], namespace="ns1"
+    )
+
+
+def test_pinecone_index_skips_metadata_delete_without_random_ids(mock_describe_index, mock_determine_spec_type):
+    indexer = create_pinecone_indexer()
+    indexer._pod_type = "starter"
+    indexer.pinecone_index.fetch.return_value = MagicMock(vectors={})
+    indexer.delete(["abc_1"], "ns1", "some_stream")
+    indexer.pinecone_index.query.assert_not_called()
+    indexer.pinecone_index.delete.assert_not_called()
+
+
+def test_pinecone_pre_sync_detects_random_ids(mock_describe_index, mock_determine_spec_type):
+    mock_determine_spec_type.return_value = "starter"
+    indexer = create_pinecone_indexer()
+    indexer.pinecone_index.query.side_effect = [
+        MagicMock(matches=[MagicMock(id="example_stream#3f0e7c4e-3ec4-4bd2-9c6e-2a6d9b7f1c3e")]),
+        MagicMock(matches=[]),
+    ]
+    indexer.pre_sync(generate_catalog())
+    indexer.pinecone_index.query.assert_any_call(
+        vector=[0, 0, 0], filter={"_ab_stream": "ns1_example_stream", "_ab_chunk_count": {"$exists": False}}, top_k=1, namespace="ns1"
+    )
+    assert indexer._streams_with_random_ids == {("ns1", "example_stream")}
+
+
+@pytest.mark.parametrize("pod_type", ["pod", "serverless"])
+def test_pinecone_pre_sync_does_not_query_other_indexes_for_random_ids(mock_describe_index, mock_determine_spec_type, pod_type):
+    mock_determine_spec_type.return_value = pod_type
+    indexer = create_pinecone_indexer()
+    indexer.pre_sync(generate_catalog())
+    indexer.pinecone_index.query.assert_not_called()
+    # the records which are not found by id are deleted as before
+    assert indexer._streams_with_random_ids == {("ns1", "example_stream")}
+
+
+def test_pinecone_random_ids_query_error_keeps_metadata_deletes(mock_describe_index, mock_determine_spec_type):
+    mock_determine_spec_type.return_value = "starter"
+    indexer = create_pinecone_indexer()
+    indexer.pinecone_index.query.side_effect = [exceptions.PineconeException("unavailable"), MagicMock(matches=[])]
+    indexer.pre_sync(generate_catalog())
+    assert indexer._streams_with_random_ids == {("ns1", "example_stream")}
+
+    indexer.pinecone_index.query.side_effect = [MagicMock(matches=[MagicMock(id="example_stream#random_id")]), MagicMock(matches=[])]
+    indexer.pinecone_index.fetch.return_value = MagicMock(vectors={})
+    indexer.delete(["abc_1"], "ns1", "example_stream")
+    indexer.pinecone_index.query.assert_called_with(
+        vector=[0, 0, 0], filter={"_ab_record_id": {"$in": ["abc_1"]}}, top_k=10_000, namespace="ns1"
+    )
+    indexer.pinecone_index.delete.assert_called_with(ids=["example_stream#random_id"], namespace="ns1")
+
+
+def test_pinecone_empty_random_ids_query_result_keeps_deduping_by_id(mock_describe_index, mock_determine_spec_type):
+    mock_determine_spec_type.return_value = "starter"
+    indexer = create_pinecone_indexer()
+    indexer.pinecone_index.query.side_effect = [MagicMock(matches=[]), MagicMock(matches=[])]
+    indexer.pre_sync(generate_catalog())
+    assert indexer._streams_with_random_ids == set()
+
+    indexer.pinecone_index.delete.reset_mock()
+    indexer.pinecone_index.fetch.return_value = MagicMock(
+        vectors={PineconeIndexer.get_vector_id("example_stream", "abc_1", 0): MagicMock(metadata={"_ab_chunk_count": 2.0})}
+    )
+    indexer.delete(["abc_1"], "ns1", "example_stream")
+    indexer.index(
+        [Mock(page_content="test", metadata={"_ab_record_id": "abc_1"}, embedding=[1, 2, 3], record=Mock())],
+        "ns1",
+        "example_stream",
+    )
+    # the new version of the record overwrites its first chunk by id, and its other chunk is deleted
+    upserted_ids = [vector[0] for upsert_call in indexer.pinecone_index.upsert.call_args_list for vector in upsert_call.kwargs["vectors"]]
+    assert upserted_ids == [PineconeIndexer.get_vector_id("example_stream", "abc_1", 0)]
+    indexer.pinecone_index.delete.assert_called_once_with(
+        ids=[PineconeIndexer.get_vector_id("example_stream", "abc_1", 1)], namespace="ns1"
+    )
+
+
+def test_pinecone_flush_deletes_records_without_chunks():
+    indexer = create_pinecone_indexer()
+    indexer.pinecone_index.fetch.return_value = MagicMock(
+        vectors={PineconeIndexer.get_vector_id("s", "s_1", 0): MagicMock(metadata={"_ab_chunk_count": 2.0})}
+    )
+    indexer.delete(["s_1"], None, "s")
+    indexer.flush()
+    indexer.pinecone_index.delete.assert_called_once_with(
+        ids=[PineconeIndexer.get_vector_id("s", "s_1", i) for i in [0, 1]], namespace=None
+    )
+
+
+def test_pinecone_index_upsert_window():
+    indexer = create_pinecone_indexer()
+    events = []
+    upsert_count = 0
+
+    def upsert(vectors, **kwargs):
+        nonlocal upsert_count
+        upsert_number = upsert_count
+        upsert_count += 1
+        events.append(f"upsert {upsert_number}")
+        return Mock(result=lambda: events.append(f"result {upsert_number}"))
+
+    indexer.pinecone_index.upsert.side_effect = upsert
+    chunks = [Mock(page_content="x" * 100, metadata={}, embedding=[0.0] * 100) for _ in range(120)]
+    vector_size = PineconeIndexer._estimate_vector_size(("some_stream#" + "0" * 36, chunks[0].embedding, {"text": chunks[0].page_content}))
+    # room for two batches of 40 vectors in flight
+    with patch.object(indexer_module, "MAX_IN_FLIGHT_UPSERT_BYTES", 100 * vector_size):
+        indexer.index(chunks, "ns1", "some_stream")
+    assert events == ["upsert 0", "upsert 1", "result 0", "upsert 2", "result 1", "result 2"]
+
+
 def generate_catalog():
     return ConfiguredAirbyteCatalog.parse_obj(
         {
@@ -298,6 +501,7 @@ def test_pinecone_pre_sync_starter(mock_describe_index, mock_determine_spec_type
     mock_describe_index.return_value = create_index_description(pod_type="starter")
     indexer = create_pinecone_indexer()
     indexer.pinecone_index.query.side_effect = [
+        MagicMock(matches=[]),
         MagicMock(matches=[MagicMock(id="doc_id1"), MagicMock(id="doc_id2")]),
         MagicMock(matches=[]),
     ]
@@ -1,14 +1,16 @@
 #
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 #
+import csv
+import io
 import os
+import zipfile
 from abc import ABC, abstractmethod
 from datetime import timezone
-from typing import Any, Iterable, List, Mapping, MutableMapping, Optional, Tuple
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, MutableMapping, Optional, TextIO
 
-import pandas as pd
 import pendulum
-from numpy import nan
+from cached_property import cached_property
 
 from airbyte_cdk.models import SyncMode
 from airbyte_cdk.sources.streams import CheckpointMixin
@@ -108,17 +110,26 @@ class BingAdsBulkStream(BingAdsBaseStream, CheckpointMixin, ABC):
             yield record
             self.state = record
 
-    def read_with_chunks(self, path: str, chunk_size: int = 1024) -> Iterable[Tuple[int, Mapping[str, Any]]]:
+    def read_with_chunks(self, path: str, chunk_size: int = 1024) -> Iterable[Mapping[str, Any]]:
+        """
+        Reads bulk file row by row. Zip archives are decompressed on the fly, so the extracted csv is never written to disk.
+        `chunk_size` is kept for backward compatibility, rows are no longer read in chunks.
+        """
         try:
-            with open(path, "r") as data:
-                chunks = pd.read_csv(data, chunksize=chunk_size, iterator=True, dialect="unix", dtype=object)
-                for chunk in chunks:
-                    chunk = chunk.replace({nan: None}).to_dict(orient="records")
-                    for row in chunk:
-                        if row.get("Type") not in ("Format Version", "Account"):
-                            yield row
-        except pd.errors.EmptyDataError as e:
-            self.logger.info(f"Empty data received. {e}")
+            with self._open_bulk_file(path) as data:
+                reader = csv.reader(data, dialect="unix")
+                header = next(reader, None)
+                if not header:
+                    self.logger.info("Empty data received. No columns to parse from file")
+                    return
+                to_record = self._compile_row_converter(header)
+                for row in reader:
+                    if not row:
+                        # blank lines were skipped when reading the file with pandas
+                        continue
+                    record = to_record(row)
+                    if record.get("Type") not in ("Format Version", "Account"):
+                        yield record
         except IOError as ioe:
             self.logger.fatal(
                 f"The IO/Error occurred while reading tmp data. Called: {path}. Stream: {self.name}",
@@ -128,12 +139,40 @@ class BingAdsBulkStream(BingAdsBaseStream, CheckpointMixin, ABC):
             # remove binary tmp file, after data is read
             os.remove(path)
 
+    @staticmethod
+    def _open_bulk_file(path: str) -> TextIO:
+        # bulk files are encoded in utf-8 with BOM
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                member = archive.open(archive.namelist()[0])
+            return io.TextIOWrapper(member, encoding="utf-8-sig", newline="")
+        return open(path, "r", encoding="utf-8-sig", newline="")
+
+    @staticmethod
+    def _compile_row_converter(header: List[str]) -> Callable[[List[str]], Dict[str, Any]]:
+        """
+        Builds row to record converter once per file: empty cells become None, missing trailing cells are filled with None.
+        """
+        columns = tuple(header)
+        empty_row = dict.fromkeys(columns)
+
+        def to_record(row: List[str]) -> Dict[str, Any]:
+            if len(row) != len(columns):
+                return empty_row | {column: value or None for column, value in zip(columns, row)}
+            return {column: value or None for column, value in zip(columns, row)}
+
+        return to_record
+
+    @cached_property
+    def _schema_properties(self) -> FrozenSet[str]:
+        return frozenset(self.get_json_schema()["properties"])
+
     def transform(self, record: MutableMapping[str, Any], stream_slice: Mapping[str, Any], **kwargs) -> MutableMapping[str, Any]:
         """
         Bing Ads Bulk API returns all available properties for all entities.
         This method filter out only available properties.
         """
-        actual_record = {key: value for key, value in record.items() if key in self.get_json_schema()["properties"].keys()}
+        actual_record = {key: value for key, value in record.items() if key in self._schema_properties}
         actual_record["Account Id"] = stream_slice.get("account_id")
         return actual_record
 
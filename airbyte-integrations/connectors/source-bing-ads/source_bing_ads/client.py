@@ -6,6 +6,7 @@ import os
 import socket
 import ssl
 import sys
+import threading
 import uuid
 from datetime import datetime, timedelta, timezone
 from functools import lru_cache
@@ -70,6 +71,8 @@ class Client:
         self.client_secret = client_secret
 
         self.authentication = self._get_auth_client(client_id, tenant_id, client_secret)
+        # report streams issue requests from several threads, only one of them should refresh the token
+        self._token_lock = threading.Lock()
         self.oauth: OAuthTokens = self._get_access_token()
         if reports_start_date:
             self.reports_start_date = pendulum.parse(reports_start_date).astimezone(tz=timezone.utc)
@@ -100,7 +103,8 @@ class Client:
     def _get_access_token(self) -> OAuthTokens:
         self.logger.info("Fetching access token ...")
         # clear caches to be able to use new access token
-        self.get_service.cache_clear()
+        self._get_service.cache_clear()
+        self._get_reporting_service.cache_clear()
         self._get_auth_data.cache_clear()
         try:
             tokens = self.authentication.request_oauth_tokens_by_refresh_token(self.refresh_token)
@@ -174,23 +178,35 @@ class Client:
         """
         Executes appropriate Service Operation on Bing Ads API
         """
-        if self.is_token_expiring():
-            self.oauth = self._get_access_token()
+        with self._token_lock:
+            if self.is_token_expiring():
+                self.oauth = self._get_access_token()
 
         if is_report_service:
-            service = self._get_reporting_service(customer_id=customer_id, account_id=account_id)
+            # suds service clients keep per-call state, so each thread gets its own reporting service manager
+            service = self._get_reporting_service(customer_id=customer_id, account_id=account_id, thread_id=threading.get_ident())
         else:
             service = self.get_service(service_name=service_name, customer_id=customer_id, account_id=account_id)
         if operation_name == "download_report":
             params["download_parameters"].timeout_in_milliseconds = self._download_timeout
         return getattr(service, operation_name)(**params)
 
-    @lru_cache(maxsize=4)
     def get_service(
         self,
         service_name: str,
         customer_id: str = None,
         account_id: Optional[str] = None,
+    ) -> ServiceClient:
+        # report streams build their requests in worker threads, and suds service clients keep per-call state
+        return self._get_service(service_name=service_name, customer_id=customer_id, account_id=account_id, thread_id=threading.get_ident())
+
+    @lru_cache(maxsize=16)
+    def _get_service(
+        self,
+        service_name: str,
+        customer_id: str = None,
+        account_id: Optional[str] = None,
+        thread_id: Optional[int] = None,
     ) -> ServiceClient:
         return ServiceClient(
             service=service_name,
@@ -199,11 +215,12 @@ class Client:
             environment=self.environment,
         )
 
-    @lru_cache(maxsize=4)
+    @lru_cache(maxsize=16)
     def _get_reporting_service(
         self,
         customer_id: Optional[str] = None,
         account_id: Optional[str] = None,
+        thread_id: Optional[int] = None,
     ) -> ServiceClient:
         return ReportingServiceManager(
             authorization_data=self._get_auth_data(customer_id, account_id),
@@ -262,7 +279,8 @@ class Client:
         start_date: Optional[str] = None,
     ) -> str:
         """
-        Return path with zipped csv archive
+        Return path with zipped csv archive.
+        The archive is kept compressed, `BingAdsBulkStream` decompresses it on the fly while reading.
         """
         download_parameters = DownloadParameters(
             # campaign_ids=None,
@@ -271,7 +289,8 @@ class Client:
             file_type=FILE_TYPE,
             last_sync_time_in_utc=start_date,
             result_file_directory=os.getcwd(),
-            result_file_name=str(uuid.uuid4()),
+            # the sdk doesn't decompress files with .zip extension
+            result_file_name=f"{uuid.uuid4()}.zip",
             overwrite_result_file=True,  # Set this value true if you want to overwrite the same file.
             timeout_in_milliseconds=TIMEOUT_IN_MILLISECONDS,  # You may optionally cancel the download after a specified time interval.
         )
@@ -3,11 +3,15 @@
 #
 
 import _csv
+import copy
+import os
 import re
 import xml.etree.ElementTree as ET
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Iterable, List, Mapping, MutableMapping, Optional, Set, Tuple, Union
+from typing import Any, Deque, Dict, Iterable, List, Mapping, MutableMapping, Optional, Set, Tuple, Union
 from urllib.parse import urlparse
 
 import pendulum
@@ -44,6 +48,8 @@ class BingAdsReportingServiceStream(BingAdsStream, ABC):
     # timeout for reporting download operations in milliseconds
     timeout: int = 300000
     report_file_format: str = "Csv"
+    # number of reports which are submitted, polled, downloaded and parsed at the same time
+    max_concurrent_reports: int = 10
 
     transformer: TypeTransformer = TypeTransformer(TransformConfig.DefaultSchemaNormalization)
     primary_key: List[str] = ["TimePeriod", "Network", "DeviceType"]
@@ -234,14 +240,114 @@ class BingAdsReportingServiceStream(BingAdsStream, ABC):
     def stream_slices(
         self, *, sync_mode: SyncMode, cursor_field: Optional[List[str]] = None, stream_state: Optional[Mapping[str, Any]] = None
     ) -> Iterable[Optional[Mapping[str, Any]]]:
+        slices = []
         accounts = Accounts(self.client, self.config)
         for _slice in accounts.stream_slices():
             for account in accounts.read_records(SyncMode.full_refresh, _slice):
                 if self.get_start_date(stream_state, account["Id"]):  # if start date is not provided default time periods will be used
-                    yield {"account_id": account["Id"], "customer_id": account["ParentCustomerId"]}
+                    slices.append({"account_id": account["Id"], "customer_id": account["ParentCustomerId"]})
                 else:
                     for period in self.default_time_periods:
-                        yield {"account_id": account["Id"], "customer_id": account["ParentCustomerId"], "time_period": period}
+                        slices.append({"account_id": account["Id"], "customer_id": account["ParentCustomerId"], "time_period": period})
+        # reports for upcoming slices are requested ahead of time while the records of the current slice are read
+        self._queued_report_slices: Deque[Mapping[str, Any]] = deque(slices)
+        self._report_futures: Dict[Tuple, Future] = {}
+        yield from slices
+
+    def read_records(
+        self,
+        sync_mode: SyncMode,
+        stream_slice: Mapping[str, Any] = None,
+        stream_state: Mapping[str, Any] = None,
+        **kwargs: Mapping[str, Any],
+    ) -> Iterable[Mapping[str, Any]]:
+        """
+        Reports are generated on the Bing Ads side, so most of the time is spent waiting for them to be ready.
+        Requests for the next `max_concurrent_reports` slices are submitted, polled and downloaded in background threads,
+        while records are still emitted slice by slice in the order of `stream_slices` to keep per-account state correct.
+        Downloaded reports wait on disk and their rows are read from the file as they are emitted, so they are never held in memory.
+        """
+        if not stream_slice or self.max_concurrent_reports <= 1 or not hasattr(self, "_report_futures"):
+            yield from super().read_records(sync_mode, stream_slice, stream_state, **kwargs)
+            return
+
+        try:
+            self._submit_queued_reports(stream_state)
+            future = self._report_futures.pop(self._report_slice_key(stream_slice), None)
+            if future is None:
+                yield from super().read_records(sync_mode, stream_slice, stream_state, **kwargs)
+                return
+
+            response, report_file = future.result()
+            self._submit_queued_reports(stream_state)
+            try:
+                for record in self.parse_response(response):
+                    yield self.transform(record, stream_slice)
+            finally:
+                self._remove_report(response, report_file)
+        except BaseException:
+            # the read is aborted: reports requested ahead of time are not read anymore
+            self._abort_queued_reports()
+            raise
+
+    @staticmethod
+    def _report_slice_key(stream_slice: Mapping[str, Any]) -> Tuple:
+        return tuple(sorted((key, str(value)) for key, value in stream_slice.items()))
+
+    @property
+    def _report_executor(self) -> ThreadPoolExecutor:
+        if not getattr(self, "_executor", None):
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_reports, thread_name_prefix=f"{self.name}_report")
+        return self._executor
+
+    def _submit_queued_reports(self, stream_state: Mapping[str, Any]) -> None:
+        # state is updated by the main thread while records are read, so workers get a snapshot of it
+        stream_state = copy.deepcopy(stream_state)
+        while self._queued_report_slices and len(self._report_futures) < self.max_concurrent_reports:
+            stream_slice = self._queued_report_slices.popleft()
+            self._report_futures[self._report_slice_key(stream_slice)] = self._report_executor.submit(
+                self._download_report, stream_slice, stream_state
+            )
+        if not self._queued_report_slices and not self._report_futures:
+            self._shutdown_report_executor()
+
+    def _shutdown_report_executor(self) -> None:
+        if getattr(self, "_executor", None):
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _abort_queued_reports(self) -> None:
+        self._queued_report_slices.clear()
+        for future in self._report_futures.values():
+            # reports which are already being downloaded are removed once their download is done
+            future.add_done_callback(self._remove_downloaded_report)
+        self._report_futures.clear()
+        self._shutdown_report_executor()
+
+    @classmethod
+    def _remove_downloaded_report(cls, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            cls._remove_report(*future.result())
+
+    @staticmethod
+    def _remove_report(response: Optional[_RowReport], report_file: str) -> None:
+        if response is not None:
+            response.close()
+            if os.path.exists(report_file):
+                os.remove(report_file)
+
+    def _download_report(self, stream_slice: Mapping[str, Any], stream_state: Mapping[str, Any]) -> Tuple[Optional[_RowReport], str]:
+        """
+        Runs in a worker thread: submits the report request, waits for it to be generated, then downloads the file.
+        Returns the report, which reads its rows lazily from the file, and the path of the file.
+        """
+        account_id = str(stream_slice["account_id"])
+        customer_id = str(stream_slice["customer_id"])
+        params = self.request_params(stream_state=stream_state, stream_slice=stream_slice, account_id=account_id)
+        # several reports are downloaded at the same time, so each slice gets its own file
+        params["result_file_name"] = "_".join(filter(None, [self.report_name, account_id, stream_slice.get("time_period")]))
+        response = self.send_request(params, customer_id=customer_id, account_id=account_id)
+        return response, os.path.join(params["result_file_directory"], params["result_file_name"])
 
 
 class BingAdsReportingServicePerformanceStream(BingAdsReportingServiceStream, ABC):
@@ -2,6 +2,7 @@
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 #
 
+import zipfile
 from pathlib import Path
 from unittest.mock import patch
 
@@ -103,6 +104,33 @@ def test_bulk_stream_read_with_chunks_app_install_ad_labels(mocked_client, confi
     }
 
 
+@patch.object(source_bing_ads.source, "Client")
+def test_bulk_stream_read_with_chunks_from_zip_archive(mocked_client, config, tmp_path):
+    path_to_archive = tmp_path / "app_install_ads.zip"
+    with zipfile.ZipFile(path_to_archive, "w") as archive:
+        archive.write(Path(__file__).parent / "app_install_ads_base.csv", arcname="app_install_ads.csv")
+
+    app_install_ads = AppInstallAds(mocked_client, config)
+    records = list(app_install_ads.read_with_chunks(path=str(path_to_archive)))
+    assert len(records) == 1
+    assert records[0]["Type"] == "App Install Ad"
+    assert records[0]["Parent Id"] == "-1111"
+    assert records[0]["Destination Url"] is None
+    assert not path_to_archive.exists()
+
+
+@patch.object(source_bing_ads.source, "Client")
+def test_bulk_stream_read_with_chunks_skips_blank_lines(mocked_client, config, tmp_path):
+    path_to_file = tmp_path / "app_install_ads.csv"
+    base_file = (Path(__file__).parent / "app_install_ads_base.csv").read_text(encoding="utf-8-sig")
+    path_to_file.write_text(base_file.rstrip("\n") + "\n\n", encoding="utf-8-sig")
+
+    app_install_ads = AppInstallAds(mocked_client, config)
+    records = list(app_install_ads.read_with_chunks(path=str(path_to_file)))
+    assert len(records) == 1
+    assert records[0]["Type"] == "App Install Ad"
+
+
 @patch.object(source_bing_ads.source, "Client")
 def test_bulk_stream_read_with_chunks_ioe_error(mocked_client, config, caplog):
     app_install_ads = AppInstallAdLabels(mocked_client, config)
@@ -3,6 +3,7 @@
 #
 
 import socket
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from unittest import mock
 from unittest.mock import patch
@@ -190,3 +191,14 @@ def test_get_bulk_entity(requests_mock):
     with patch.object(BulkServiceManager, "download_file", return_value="file.csv"):
         bulk_entity = client.get_bulk_entity(data_scope=["EntityData"], download_entities=["AppInstallAds"])
         assert bulk_entity == "file.csv"
+
+
+@patch("bingads.authorization.OAuthWebAuthCodeGrant.request_oauth_tokens_by_refresh_token")
+def test_get_service_is_not_shared_between_threads(patched_request_tokens):
+    client = source_bing_ads.client.Client("tenant_id", "2020-01-01", client_id="client_id", refresh_token="refresh_token")
+    service = client.get_service(service_name="CustomerManagementService")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_thread_service = executor.submit(client.get_service, service_name="CustomerManagementService").result()
+
+    assert client.get_service(service_name="CustomerManagementService") is service
+    assert other_thread_service is not service
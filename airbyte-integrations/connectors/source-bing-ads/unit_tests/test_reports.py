@@ -5,6 +5,7 @@
 import _csv
 import copy
 import json
+import threading
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch
@@ -494,3 +495,94 @@ def test_hourly_reports(mocked_client, config, stream, response, records):
     with patch.object(stream, "send_request", return_value=_RowReport(file=Path(__file__).parent / response)):
         with open(Path(__file__).parent / records, "r") as file:
             assert list(stream_object.read_records(sync_mode=SyncMode.full_refresh, stream_slice={}, stream_state={})) == json.load(file)
+
+
+@patch.object(source_bing_ads.source, "Client")
+def test_reports_are_requested_ahead_and_emitted_in_slice_order(mocked_client, config):
+    stream = AccountPerformanceReportDaily(mocked_client, config)
+    stream.max_concurrent_reports = 2
+    accounts_read_records = iter(
+        [{"Id": 180519267, "ParentCustomerId": 100}, {"Id": 180278106, "ParentCustomerId": 200}, {"Id": 180535609, "ParentCustomerId": 300}]
+    )
+    parsing_threads = set()
+
+    def parse_response(response):
+        parsing_threads.add(threading.get_ident())
+        yield {"AccountId": response.account_id}
+
+    with (
+        patch.object(Accounts, "read_records", return_value=accounts_read_records),
+        patch.object(
+            AccountPerformanceReportDaily,
+            "send_request",
+            side_effect=lambda params, customer_id, account_id: MagicMock(account_id=account_id),
+        ) as send_request_mock,
+        patch.object(AccountPerformanceReportDaily, "parse_response", side_effect=parse_response),
+    ):
+        records = []
+        for stream_slice in stream.stream_slices(sync_mode=SyncMode.incremental, stream_state={}):
+            records.extend(stream.read_records(sync_mode=SyncMode.incremental, stream_slice=stream_slice, stream_state={}))
+
+    assert records == [{"AccountId": "180519267"}, {"AccountId": "180278106"}, {"AccountId": "180535609"}]
+    # the workers only download the reports, their rows are read from the files while they are emitted
+    assert parsing_threads == {threading.get_ident()}
+    assert send_request_mock.call_count == 3
+    assert {call.args[0]["result_file_name"] for call in send_request_mock.call_args_list} == {
+        "AccountPerformanceReport_180519267",
+        "AccountPerformanceReport_180278106",
+        "AccountPerformanceReport_180535609",
+    }
+
+
+@patch.object(source_bing_ads.source, "Client")
+def test_downloaded_report_is_streamed_then_removed(mocked_client, config, tmp_path):
+    stream = AccountPerformanceReportDaily(mocked_client, config)
+    stream.file_directory = str(tmp_path)
+    report_file = tmp_path / "AccountPerformanceReport_180519267"
+    report_file.write_text((Path(__file__).parent / "hourly_reports/account_performance.csv").read_text())
+
+    with (
+        patch.object(Accounts, "read_records", return_value=iter([{"Id": 180519267, "ParentCustomerId": 100}])),
+        patch.object(
+            AccountPerformanceReportDaily, "send_request", side_effect=lambda params, customer_id, account_id: _RowReport(file=report_file)
+        ),
+    ):
+        stream_slice = next(iter(stream.stream_slices(sync_mode=SyncMode.incremental, stream_state={})))
+        records = stream.read_records(sync_mode=SyncMode.incremental, stream_slice=stream_slice, stream_state={})
+        assert next(records)["AccountId"] == "180519267"
+        assert report_file.exists()
+        assert list(records) == []
+
+    assert not report_file.exists()
+
+
+@patch.object(source_bing_ads.source, "Client")
+def test_aborted_read_shuts_down_the_report_executor_and_removes_downloaded_reports(mocked_client, config, tmp_path):
+    stream = AccountPerformanceReportDaily(mocked_client, config)
+    stream.max_concurrent_reports = 2
+    stream.file_directory = str(tmp_path)
+    csv_report = (Path(__file__).parent / "hourly_reports/account_performance.csv").read_text()
+
+    def send_request(params, customer_id, account_id):
+        report_file = tmp_path / params["result_file_name"]
+        report_file.write_text(csv_report)
+        return _RowReport(file=report_file)
+
+    with (
+        patch.object(
+            Accounts,
+            "read_records",
+            return_value=iter([{"Id": 180519267, "ParentCustomerId": 100}, {"Id": 180278106, "ParentCustomerId": 200}]),
+        ),
+        patch.object(AccountPerformanceReportDaily, "send_request", side_effect=send_request),
+    ):
+        stream_slice = next(iter(stream.stream_slices(sync_mode=SyncMode.incremental, stream_state={})))
+        records = stream.read_records(sync_mode=SyncMode.incremental, stream_slice=stream_slice, stream_state={})
+        next(records)
+        executor = stream._executor
+        records.close()
+
+    executor.shutdown(wait=True)
+    assert stream._executor is None
+    assert stream._report_futures == {}
+    assert list(tmp_path.iterdir()) == []
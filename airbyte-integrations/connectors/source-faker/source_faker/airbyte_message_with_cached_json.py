@@ -2,7 +2,9 @@
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 #
 
-from airbyte_cdk.models import AirbyteMessage
+import json
+
+from airbyte_cdk.models import AirbyteMessage, AirbyteRecordMessage, Type
 
 
 class AirbyteMessageWithCachedJSON(AirbyteMessage):
@@ -20,3 +22,19 @@ class AirbyteMessageWithCachedJSON(AirbyteMessage):
 
     def get_json(self, **kwargs):
         return self._json
+
+    def __reduce__(self):
+        # Only the pre-rendered JSON is sent back from the workers to the main process, which rebuilds the record message from it
+        return AirbyteMessageWithCachedJSON.from_json, (self._json,)
+
+    @classmethod
+    def from_json(cls, message_json: str) -> "AirbyteMessageWithCachedJSON":
+        """
+        Build a record message from its JSON-representation without validating it again, the JSON is reused as is when the message is emitted.
+        """
+        message_dict = json.loads(message_json)
+        record = AirbyteRecordMessage.model_construct(**message_dict["record"])
+        message = cls.model_construct(type=Type(message_dict["type"]), record=record)
+        message._json = message_json
+        message.json = message.get_json
+        return message
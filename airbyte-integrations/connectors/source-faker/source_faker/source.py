@@ -8,7 +8,7 @@ from typing import Any, List, Mapping, Tuple
 from airbyte_cdk.sources import AbstractSource
 from airbyte_cdk.sources.streams import Stream
 
-from .streams import Products, Purchases, Users
+from .streams import DEFAULT_CHUNK_SIZE, Products, Purchases, Users
 
 
 DEFAULT_COUNT = 1_000
@@ -27,9 +27,10 @@ class SourceFaker(AbstractSource):
         records_per_slice: int = config["records_per_slice"] if "records_per_slice" in config else 100
         always_updated: bool = config["always_updated"] if "always_updated" in config else True
         parallelism: int = config["parallelism"] if "parallelism" in config else 4
+        chunk_size: int = config["chunk_size"] if "chunk_size" in config else DEFAULT_CHUNK_SIZE
 
         return [
             Products(count, seed, parallelism, records_per_slice, always_updated),
-            Users(count, seed, parallelism, records_per_slice, always_updated),
-            Purchases(count, seed, parallelism, records_per_slice, always_updated),
+            Users(count, seed, parallelism, records_per_slice, always_updated, chunk_size),
+            Purchases(count, seed, parallelism, records_per_slice, always_updated, chunk_size),
         ]
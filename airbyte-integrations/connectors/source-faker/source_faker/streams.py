@@ -4,8 +4,9 @@
 
 import datetime
 import os
+import threading
 from multiprocessing import Pool
-from typing import Any, Dict, Iterable, List, Mapping, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
 
 from airbyte_cdk.sources.streams import IncrementalMixin, Stream
 
@@ -14,6 +15,39 @@ from .user_generator import UserGenerator
 from .utils import format_airbyte_time, generate_estimate, read_json
 
 
+DEFAULT_CHUNK_SIZE = 100
+
+
+def generate_in_parallel(
+    generate: Callable[[int], Any], initializer: Callable[[], None], count: int, parallelism: int, chunk_size: int
+) -> Iterator[Any]:
+    """
+    Yield the output of generate for the ids 0 to count - 1, in order, as soon as the workers have generated them.
+    Each worker generates chunk_size ids at a time. The workers are at most two chunks ahead of the consumer,
+    so that the memory used stays the same no matter how many records are generated.
+    """
+    in_flight = threading.Semaphore(2 * parallelism * chunk_size)
+    stopped = threading.Event()
+
+    def ids() -> Iterator[int]:
+        # Iterated by the task handler thread of the pool, which blocks until the consumer catches up
+        for id in range(count):
+            in_flight.acquire()
+            if stopped.is_set():
+                return
+            yield id
+
+    with Pool(initializer=initializer, processes=parallelism) as pool:
+        try:
+            for output in pool.imap(generate, ids(), chunksize=chunk_size):
+                in_flight.release()
+                yield output
+        finally:
+            # Unblock the task handler thread so that the pool can be terminated when the consumer stops early
+            stopped.set()
+            in_flight.release()
+
+
 class Products(Stream, IncrementalMixin):
     primary_key = "id"
     cursor_field = "updated_at"
@@ -68,13 +102,23 @@ class Users(Stream, IncrementalMixin):
     primary_key = "id"
     cursor_field = "updated_at"
 
-    def __init__(self, count: int, seed: int, parallelism: int, records_per_slice: int, always_updated: bool, **kwargs):
+    def __init__(
+        self,
+        count: int,
+        seed: int,
+        parallelism: int,
+        records_per_slice: int,
+        always_updated: bool,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
         self.count = count
         self.seed = seed
         self.records_per_slice = records_per_slice
         self.parallelism = parallelism
         self.always_updated = always_updated
+        self.chunk_size = chunk_size
         self.generator = UserGenerator(self.name, self.seed)
 
     @property
@@ -96,6 +140,7 @@ class Users(Stream, IncrementalMixin):
         """
         This is a multi-process implementation of read_records.
         We make N workers (where N is the number of available CPUs) and spread out the CPU-bound work of generating records and serializing them to JSON
+        Records are yielded in order as soon as their chunk is generated, rather than once a whole slice is generated
         """
 
         if "updated_at" in self.state and not self.always_updated:
@@ -107,34 +152,38 @@ class Users(Stream, IncrementalMixin):
         yield generate_estimate(self.name, self.count, median_record_byte_size)
 
         loop_offset = 0
-        with Pool(initializer=self.generator.prepare, processes=self.parallelism) as pool:
-            while loop_offset < self.count:
-                records_remaining_this_loop = min(self.records_per_slice, (self.count - loop_offset))
-                users = pool.map(self.generator.generate, range(loop_offset, loop_offset + records_remaining_this_loop))
-                for user in users:
-                    updated_at = user.record.data["updated_at"]
-                    loop_offset += 1
-                    yield user
-
-                if records_remaining_this_loop == 0:
-                    break
+        for user in generate_in_parallel(self.generator.generate, self.generator.prepare, self.count, self.parallelism, self.chunk_size):
+            updated_at = user.record.data["updated_at"]
+            loop_offset += 1
+            yield user
 
+            if loop_offset % self.records_per_slice == 0:
                 self.state = {"seed": self.seed, "updated_at": updated_at, "loop_offset": loop_offset}
 
-            self.state = {"seed": self.seed, "updated_at": updated_at, "loop_offset": loop_offset}
+        self.state = {"seed": self.seed, "updated_at": updated_at, "loop_offset": loop_offset}
 
 
 class Purchases(Stream, IncrementalMixin):
     primary_key = "id"
     cursor_field = "updated_at"
 
-    def __init__(self, count: int, seed: int, parallelism: int, records_per_slice: int, always_updated: bool, **kwargs):
+    def __init__(
+        self,
+        count: int,
+        seed: int,
+        parallelism: int,
+        records_per_slice: int,
+        always_updated: bool,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
         self.count = count
         self.seed = seed
         self.records_per_slice = records_per_slice
         self.parallelism = parallelism
         self.always_updated = always_updated
+        self.chunk_size = chunk_size
         self.generator = PurchaseGenerator(self.name, self.seed)
 
     @property
@@ -156,6 +205,7 @@ class Purchases(Stream, IncrementalMixin):
         """
         This is a multi-process implementation of read_records.
         We make N workers (where N is the number of available CPUs) and spread out the CPU-bound work of generating records and serializing them to JSON
+        Records are yielded in order as soon as their chunk is generated, rather than once a whole slice is generated
         """
 
         if "updated_at" in self.state and not self.always_updated:
@@ -168,18 +218,15 @@ class Purchases(Stream, IncrementalMixin):
         yield generate_estimate(self.name, (self.count) * 1.3, median_record_byte_size)
 
         loop_offset = 0
-        with Pool(initializer=self.generator.prepare, processes=self.parallelism) as pool:
-            while loop_offset < self.count:
-                records_remaining_this_loop = min(self.records_per_slice, (self.count - loop_offset))
-                carts = pool.map(self.generator.generate, range(loop_offset, loop_offset + records_remaining_this_loop))
-                for purchases in carts:
-                    loop_offset += 1
-                    for purchase in purchases:
-                        updated_at = purchase.record.data["updated_at"]
-                        yield purchase
-                if records_remaining_this_loop == 0:
-                    break
-
+        for purchases in generate_in_parallel(
+            self.generator.generate, self.generator.prepare, self.count, self.parallelism, self.chunk_size
+        ):
+            loop_offset += 1
+            for purchase in purchases:
+                updated_at = purchase.record.data["updated_at"]
+                yield purchase
+
+            if loop_offset % self.records_per_slice == 0:
                 self.state = {"seed": self.seed, "updated_at": updated_at, "loop_offset": loop_offset}
 
-            self.state = {"seed": self.seed, "updated_at": updated_at, "loop_offset": loop_offset}
+        self.state = {"seed": self.seed, "updated_at": updated_at, "loop_offset": loop_offset}
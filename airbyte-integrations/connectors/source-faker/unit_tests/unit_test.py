@@ -2,9 +2,14 @@
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 #
 
+import pickle
+
 import jsonschema
 import pytest
 from source_faker import SourceFaker
+from source_faker.airbyte_message_with_cached_json import AirbyteMessageWithCachedJSON
+from source_faker.streams import generate_in_parallel
+from source_faker.user_generator import UserGenerator
 
 from airbyte_cdk.models import AirbyteMessage, ConfiguredAirbyteCatalog, Type
 
@@ -278,3 +283,33 @@ def test_ensure_no_purchases_without_users():
         state = {}
         iterator = source.read(logger, config, catalog, state)
         iterator.__next__()
+
+
+def test_cached_json_message_is_pickled_as_json():
+    generator = UserGenerator("users", 100)
+    generator.prepare()
+    message = generator.generate(0)
+
+    unpickled_message = pickle.loads(pickle.dumps(message))
+
+    assert isinstance(unpickled_message, AirbyteMessageWithCachedJSON)
+    assert unpickled_message.type == Type.RECORD
+    assert unpickled_message.record.data == message.record.data
+    assert unpickled_message.json(exclude_unset=True) == message.json(exclude_unset=True)
+
+
+def test_generate_in_parallel_is_ordered():
+    generator = UserGenerator("users", None)
+
+    users = list(generate_in_parallel(generator.generate, generator.prepare, count=25, parallelism=2, chunk_size=3))
+
+    assert [user.record.data["id"] for user in users] == list(range(1, 26))
+
+
+def test_generate_in_parallel_stops_early():
+    generator = UserGenerator("users", None)
+
+    users = generate_in_parallel(generator.generate, generator.prepare, count=100_000, parallelism=2, chunk_size=10)
+
+    assert next(users).record.data["id"] == 1
+    users.close()
@@ -5,7 +5,7 @@
 
 import json
 import logging
-import os
+import shutil
 import sys
 import tempfile
 import traceback
@@ -19,9 +19,11 @@ from zipfile import BadZipFile
 import backoff
 import boto3
 import botocore
+import fastparquet
 import google
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 import smart_open
 import smart_open.ssh
 from azure.storage.blob import BlobServiceClient
@@ -257,7 +259,11 @@ class Client:
     """Class that manages reading and parsing data from streams"""
 
     CSV_CHUNK_SIZE = 10_000
+    # Size of the blocks copied when a stream is cached to a temporary file, so that the whole file never has to fit in memory
+    CACHE_STREAM_BLOCK_SIZE = 1024 * 1024
     binary_formats = {"excel", "excel_binary", "feather", "parquet", "orc", "pickle"}
+    # Parquet files are read one row group at a time when only these pandas.read_parquet options are used
+    parquet_row_group_reader_options = {"columns", "filters", "categories", "index"}
 
     def __init__(self, dataset_name: str, url: str, provider: dict, format: str = None, reader_options: dict = None):
         self._dataset_name = dataset_name
@@ -300,17 +306,18 @@ class Client:
         return result
 
     def load_nested_json(self, fp) -> list:
+        return list(self.iter_nested_json(fp))
+
+    def iter_nested_json(self, fp) -> Iterable[dict]:
+        """Yield the JSON records of a file. JSONL records are parsed one line at a time, as they are downloaded."""
         if self._reader_format == "jsonl":
-            result = []
-            line = fp.readline()
-            while line:
-                result.append(json.loads(line))
-                line = fp.readline()
+            for line in fp:
+                yield json.loads(line)
         else:
             result = json.load(fp)
             if not isinstance(result, list):
                 result = [result]
-        return result
+            yield from result
 
     def load_yaml(self, fp):
         if self._reader_format == "yaml":
@@ -365,8 +372,11 @@ class Client:
                 reader_options["engine"] = "pyxlsb"
                 yield reader(fp, **reader_options)
             elif self._reader_format == "parquet":
-                reader_options["engine"] = "fastparquet"
-                yield reader(fp, **reader_options)
+                if reader_options.keys() <= self.parquet_row_group_reader_options:
+                    yield from self.parquet_row_group_reader(fp, read_sample_chunk=read_sample_chunk, **reader_options)
+                else:
+                    reader_options["engine"] = "fastparquet"
+                    yield reader(fp, **reader_options)
             elif self._reader_format == "excel":
                 try:
                     for df_chunk in self.openpyxl_chunk_reader(fp, **reader_options):
@@ -413,13 +423,74 @@ class Client:
     def reader(self) -> reader_class:
         return self.reader_class(url=self._url, provider=self._provider, binary=self.binary_source, encoding=self.encoding)
 
+    @staticmethod
+    def cast_to_json_types(record_batch: pa.RecordBatch, json_schema: dict = None) -> pa.RecordBatch:
+        """Cast the numeric and boolean columns of a record batch declared as strings in the JSON schema to strings.
+
+        :param record_batch: record batch converted from a dataframe
+        :param json_schema: JSON schema of the stream, usually the discovered one
+        :return: the record batch with the columns matching their JSON type
+        """
+        properties = (json_schema or {}).get("properties", {})
+        arrays = []
+        for field, array in zip(record_batch.schema, record_batch.columns):
+            json_type = properties.get(field.name, {}).get("type", [])
+            json_types = {json_type} if isinstance(json_type, str) else set(json_type)
+            if pa.types.is_dictionary(array.type):
+                array = array.dictionary_decode()
+            is_numeric_or_boolean = pa.types.is_integer(array.type) or pa.types.is_floating(array.type) or pa.types.is_boolean(array.type)
+            if is_numeric_or_boolean and "string" in json_types and json_types.isdisjoint({"number", "integer", "boolean"}):
+                array = array.cast(pa.string())
+            arrays.append(array)
+        return pa.RecordBatch.from_arrays(arrays, names=record_batch.schema.names)
+
+    @staticmethod
+    def arrow_array_to_pylist(array: pa.Array) -> list:
+        """Convert an Arrow array to a list of Python values, through numpy for the types numpy converts to the same values."""
+        if pa.types.is_floating(array.type) and array.null_count:
+            values = array.to_numpy(zero_copy_only=False).astype(object)
+            values[array.is_null().to_numpy(zero_copy_only=False)] = None
+            return values.tolist()
+        if pa.types.is_floating(array.type) or pa.types.is_boolean(array.type) or pa.types.is_string(array.type):
+            return array.to_numpy(zero_copy_only=False).tolist()
+        if pa.types.is_integer(array.type) and not array.null_count:
+            return array.to_numpy(zero_copy_only=False).tolist()
+        return array.to_pylist()
+
+    def dataframe_to_records(self, df: pd.DataFrame, json_schema: dict = None) -> Iterable[dict]:
+        """Convert a dataframe to records through Arrow, which converts the columns to Python values and nulls in bulk.
+
+        The column names of the records are strings, like in the emitted record messages.
+        Dataframes which can't be represented as flat Arrow columns, e.g. with mixed types or nested values, are converted by pandas.
+
+        :param df: dataframe with the selected columns
+        :param json_schema: JSON schema of the stream, used to cast the columns to their JSON type
+        :return: the records of the dataframe
+        """
+        try:
+            record_batch = pa.RecordBatch.from_pandas(df, preserve_index=False)
+        except (pa.ArrowException, ValueError, TypeError):
+            record_batch = None
+        if record_batch is None or not record_batch.num_columns or any(pa.types.is_nested(field.type) for field in record_batch.schema):
+            yield from df.replace({np.nan: None}).to_dict(orient="records")
+            return
+        record_batch = self.cast_to_json_types(record_batch, json_schema)
+        names = record_batch.schema.names
+        columns = [self.arrow_array_to_pylist(array) for array in record_batch.columns]
+        for row in zip(*columns):
+            yield dict(zip(names, row))
+
     @backoff.on_exception(backoff.expo, ConnectionResetError, on_backoff=backoff_handler, max_tries=5, max_time=60)
-    def read(self, fields: Iterable = None) -> Iterable[dict]:
-        """Read data from the stream"""
+    def read(self, fields: Iterable = None, json_schema: dict = None) -> Iterable[dict]:
+        """Read data from the stream
+
+        :param fields: names of the columns to read, all of them by default
+        :param json_schema: JSON schema of the stream, the columns are cast to their JSON type when it is provided
+        """
         with self.reader.open() as fp:
             try:
                 if self._reader_format in ["json", "jsonl"]:
-                    yield from self.load_nested_json(fp)
+                    yield from self.iter_nested_json(fp)
                 elif self._reader_format == "yaml":
                     fields = set(fields) if fields else None
                     df = self.load_yaml(fp)
@@ -434,8 +505,7 @@ class Client:
                         fp = self._unzip(fp)
                     for df in self.load_dataframes(fp):
                         columns = fields.intersection(set(df.columns)) if fields else df.columns
-                        df.replace({np.nan: None}, inplace=True)
-                        yield from df[list(columns)].to_dict(orient="records")
+                        yield from self.dataframe_to_records(df[list(columns)], json_schema)
             except ConnectionResetError:
                 logger.info(f"Catched `connection reset error - 104`, stream: {self.stream_name} ({self.reader.full_url})")
                 raise ConnectionResetError
@@ -447,20 +517,27 @@ class Client:
                 raise AirbyteTracedException(message=error_msg, internal_message=error_msg, failure_type=FailureType.config_error) from err
 
     def _unzip(self, fp):
-        tmp_dir = tempfile.TemporaryDirectory()
-        with zipfile.ZipFile(str(fp.name), "r") as zip_ref:
-            zip_ref.extractall(tmp_dir.name)
-
-        logger.info("Temp dir content: " + str(os.listdir(tmp_dir.name)))
-        final_file: str = os.path.join(tmp_dir.name, os.listdir(tmp_dir.name)[0])
-        logger.info("Pick up first file: " + final_file)
-        fp_tmp = open(final_file, "rb")
-        return fp_tmp
+        """Open the first file of a zip archive, without extracting the other members.
+
+        The member is decompressed sequentially while it is read. Binary formats need to seek in the file,
+        so their member is decompressed to a temporary file instead.
+        """
+        zip_ref = zipfile.ZipFile(fp, "r")
+        logger.info("Zip archive content: " + str(zip_ref.namelist()))
+        member = next((info for info in zip_ref.infolist() if not info.is_dir()), None)
+        if member is None:
+            error_msg = f"The zip archive {self._url} does not contain any file."
+            raise AirbyteTracedException(message=error_msg, internal_message=error_msg, failure_type=FailureType.config_error)
+        logger.info("Pick up first file: " + member.filename)
+        member_fp = zip_ref.open(member)
+        if self._reader_format in self.binary_formats:
+            return self._cache_stream(member_fp)
+        return member_fp
 
     def _cache_stream(self, fp):
-        """cache stream to file"""
+        """cache stream to file, one block at a time"""
         fp_tmp = tempfile.NamedTemporaryFile(mode="w+b")
-        fp_tmp.write(fp.read())
+        shutil.copyfileobj(fp, fp_tmp, self.CACHE_STREAM_BLOCK_SIZE)
         fp_tmp.seek(0)
         fp.close()
         return fp_tmp
@@ -506,6 +583,23 @@ class Client:
                 }
         yield AirbyteStream(name=self.stream_name, json_schema=json_schema, supported_sync_modes=[SyncMode.full_refresh])
 
+    @staticmethod
+    def parquet_row_group_reader(file, read_sample_chunk: bool = False, **kwargs):
+        """
+        Use fastparquet to read Parquet files one row group at a time, instead of loading the whole file in a single dataframe.
+        """
+        # Nullable integer and boolean columns are read as float64 columns, like pd.read_parquet does with fastparquet
+        parquet_file = fastparquet.ParquetFile(file, pandas_nulls=False)
+        if not parquet_file.row_groups:
+            # A file without row groups still has columns
+            yield parquet_file.to_pandas(**kwargs)
+            return
+        for df_chunk in parquet_file.iter_row_groups(**kwargs):
+            yield df_chunk
+            if read_sample_chunk:
+                # The column types are the same in all the row groups
+                return
+
     def openpyxl_chunk_reader(self, file, **kwargs):
         """
         Use openpyxl's lazy loading feature to read Excel files (xlsx only) in chunks of 500 lines at a time.
@@ -180,7 +180,7 @@ class SourceFile(Source):
 
         record_counter = 0
         try:
-            for row in client.read(fields=fields):
+            for row in client.read(fields=fields, json_schema=airbyte_stream.json_schema):
                 record = AirbyteRecordMessage(stream=name, data=row, emitted_at=int(datetime.now().timestamp()) * 1000)
 
                 record_counter += 1
@@ -3,10 +3,15 @@
 #
 
 
+import io
+import zipfile
 from tempfile import NamedTemporaryFile
 from unittest.mock import patch, sentinel
 
+import fastparquet
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 from pandas import read_csv, read_excel, testing
 from paramiko import SSHException
@@ -139,6 +144,58 @@ def test_unzip_stream(client, absolute_path, test_files):
         assert client._unzip(file)
 
 
+def test_unzip_opens_the_first_file_only(config, tmp_path):
+    config["format"] = "csv"
+    client = Client(**config)
+    archive_path = tmp_path / "archive.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("directory/", "")
+        archive.writestr("directory/first.csv", "a,b\n1,2\n")
+        archive.writestr("second.csv", "c\n3\n")
+
+    with open(archive_path, mode="rb") as file:
+        fp = client._unzip(file)
+        # The member is decompressed while it is read, it is not extracted to the disk
+        assert isinstance(fp, zipfile.ZipExtFile)
+        assert fp.read() == b"a,b\n1,2\n"
+
+
+def test_unzip_binary_format_member_is_cached(config, tmp_path):
+    config["format"] = "parquet"
+    client = Client(**config)
+    archive_path = tmp_path / "archive.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("demo.parquet", b"PAR1")
+
+    with open(archive_path, mode="rb") as file:
+        fp = client._unzip(file)
+        assert fp.seekable() and fp.read() == b"PAR1"
+
+
+def test_unzip_empty_archive(config, tmp_path):
+    archive_path = tmp_path / "archive.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("directory/", "")
+
+    with open(archive_path, mode="rb") as file, pytest.raises(AirbyteTracedException):
+        Client(**config)._unzip(file)
+
+
+def test_cache_stream_copies_blocks(client):
+    read_sizes = []
+
+    class RecordingStream(io.BytesIO):
+        def read(self, size=-1):
+            read_sizes.append(size)
+            return super().read(size)
+
+    client.CACHE_STREAM_BLOCK_SIZE = 4
+    fp = client._cache_stream(RecordingStream(b"0123456789"))
+
+    assert fp.read() == b"0123456789"
+    assert read_sizes and all(0 < size <= 4 for size in read_sizes)
+
+
 def test_unzip_canonical_ext(absolute_path, test_files):
     config = {
         "dataset_name": "BBB",
@@ -344,3 +401,94 @@ def test_excel_reader_option_header(config):
         read_file = next(client.load_dataframes(fp=tmp.name))
         assert isinstance(read_file, pd.DataFrame)
         assert read_file.to_dict(orient="records") == expected_data
+
+
+def test_load_dataframes_parquet_row_groups(config, tmp_path):
+    config["format"] = "parquet"
+    client = Client(**config)
+    file_path = str(tmp_path / "row_groups.parquet")
+    fastparquet.write(file_path, pd.DataFrame({"a": range(5), "b": list("vwxyz")}), row_group_offsets=2)
+
+    with open(file_path, mode="rb") as file:
+        dfs = list(client.load_dataframes(fp=file))
+    with open(file_path, mode="rb") as file:
+        sample_dfs = list(client.load_dataframes(fp=file, read_sample_chunk=True))
+
+    assert [len(df) for df in dfs] == [2, 2, 1]
+    assert pd.concat(dfs)["b"].tolist() == list("vwxyz")
+    assert len(sample_dfs) == 1
+
+
+def test_load_dataframes_parquet_nullable_columns(config, tmp_path):
+    config["format"] = "parquet"
+    client = Client(**config)
+    file_path = str(tmp_path / "nullable.parquet")
+    table = pa.table({"flag": [True, None, False], "count": pa.array([1, None, 3], pa.int64()), "name": ["a", None, "c"]})
+    pq.write_table(table, file_path)
+
+    with open(file_path, mode="rb") as file:
+        properties = client._stream_properties(file, read_sample_chunk=True)
+    with open(file_path, mode="rb") as file:
+        records = [record for df in client.load_dataframes(fp=file) for record in client.dataframe_to_records(df)]
+
+    # Nullable boolean and integer columns are read as numbers, like pd.read_parquet reads them with fastparquet
+    assert properties == {"flag": {"type": ["number", "null"]}, "count": {"type": ["number", "null"]}, "name": {"type": ["string", "null"]}}
+    assert records == [
+        {"flag": 1.0, "count": 1.0, "name": "a"},
+        {"flag": None, "count": None, "name": None},
+        {"flag": 0.0, "count": 3.0, "name": "c"},
+    ]
+
+
+def test_load_dataframes_parquet_with_pandas_options(config, tmp_path):
+    config["format"] = "parquet"
+    config["reader_options"] = {"columns": ["a"], "storage_options": None}
+    client = Client(**config)
+    file_path = str(tmp_path / "row_groups.parquet")
+    fastparquet.write(file_path, pd.DataFrame({"a": range(5), "b": list("vwxyz")}), row_group_offsets=2)
+
+    with open(file_path, mode="rb") as file:
+        dfs = list(client.load_dataframes(fp=file))
+
+    assert len(dfs) == 1
+    assert dfs[0].columns.tolist() == ["a"]
+
+
+def test_iter_nested_json_yields_lines_as_they_are_read(config):
+    config["format"] = "jsonl"
+    client = Client(**config)
+
+    def lines():
+        yield '{"id": 1}\n'
+        raise AssertionError("The second line should not be read before the first record is emitted")
+
+    assert next(client.iter_nested_json(lines())) == {"id": 1}
+
+
+def test_dataframe_to_records(client):
+    df = pd.DataFrame({"id": [1, 2], "price": [1.5, float("nan")], "name": ["a", None], "flag": [True, False]})
+
+    records = list(client.dataframe_to_records(df))
+
+    assert records == [
+        {"id": 1, "price": 1.5, "name": "a", "flag": True},
+        {"id": 2, "price": None, "name": None, "flag": False},
+    ]
+    assert [type(record["id"]) for record in records] == [int, int]
+
+
+def test_dataframe_to_records_casts_to_json_types(client):
+    df = pd.DataFrame({"code": [1, 2], "amount": [3, 4]})
+    json_schema = {"properties": {"code": {"type": ["string", "null"]}, "amount": {"type": ["number", "null"]}}}
+
+    records = list(client.dataframe_to_records(df, json_schema))
+
+    assert records == [{"code": "1", "amount": 3}, {"code": "2", "amount": 4}]
+
+
+def test_dataframe_to_records_mixed_types_fallback(client):
+    df = pd.DataFrame({"mixed": [1, "a", float("nan")], "nested": [{"a": 1}, {"b": 2}, None]})
+
+    records = list(client.dataframe_to_records(df))
+
+    assert records == [{"mixed": 1, "nested": {"a": 1}}, {"mixed": "a", "nested": {"b": 2}}, {"mixed": None, "nested": None}]